@@ -11,8 +11,14 @@ from .encryption import (
 	encrypt_bytes,
 	decrypt_bytes,
 	encrypt_file,
+	encrypt_to_file,
 	decrypt_file,
+	encrypt_stream,
+	decrypt_stream,
+	ChunkedReader,
 	generate_key,
 )  # noqa: F401
 from .service import CaptureService, build_default_service  # noqa: F401
-from .active_window import get_active_window  # noqa: F401
+from .active_window import get_active_window, grab_frame  # noqa: F401
+from .frame import Frame  # noqa: F401
+from .catalog import CaptureCatalog, CatalogEntry  # noqa: F401
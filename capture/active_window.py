@@ -7,12 +7,18 @@ Currently Linux-focused; other platforms provide graceful fallbacks.
 
 from __future__ import annotations
 
+import logging
 import platform
 import os
 import subprocess
+import threading
+import time
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
+from .codecs import save_image
+from .frame import Frame
+
 try:  # optional dependency used by service
     import mss  # type: ignore
     from mss.exception import ScreenShotError  # type: ignore
@@ -20,6 +26,8 @@ except ImportError:  # pragma: no cover
     mss = None  # type: ignore
     ScreenShotError = Exception  # type: ignore
 
+LOGGER = logging.getLogger("hindsight.capture")
+
 _GLOBAL_MSS = None  # cached mss instance (avoid repeated open/close on X11 which can intermittently fail)
 _DISPLAY_FAILURES = 0  # consecutive display open/grab failures
 _BACKEND = 'mss'  # or 'imagegrab'
@@ -27,6 +35,13 @@ _BACKEND = 'mss'  # or 'imagegrab'
 _FORCE = os.environ.get('HINDSIGHT_FORCE_BACKEND', '').strip().lower()
 if _FORCE in ('imagegrab', 'mss'):
     _BACKEND = _FORCE
+# Active window source on Linux: 'x11' (in-process tracker, xdotool fallback) or 'xdotool'.
+_WINDOW_TRACKER = os.environ.get('HINDSIGHT_WINDOW_TRACKER', 'x11').strip().lower()
+_TRACKER = None  # X11WindowTracker once started
+_TRACKER_RETRY_SEC = 60.0  # wait before reconnecting after the tracker failed
+_TRACKER_NEXT_TRY = 0.0
+_TRACKER_LOCK = threading.Lock()
+_WINDOW_LISTENERS = []  # callbacks attached to every tracker instance
 
 def _get_mss():  # pragma: no cover - depends on display
     global _GLOBAL_MSS
@@ -87,15 +102,74 @@ def _linux_active_window() -> Optional[WindowInfo]:  # pragma: no cover - enviro
         return None
 
 
+def _window_tracker():
+    """Running X11 tracker, started on first use; None means use xdotool."""
+    global _TRACKER, _TRACKER_NEXT_TRY
+    if _WINDOW_TRACKER != 'x11' or not os.environ.get('DISPLAY'):
+        return None
+    with _TRACKER_LOCK:
+        if _TRACKER is not None and not _TRACKER.failed:
+            return _TRACKER
+        if _TRACKER is not None:
+            _TRACKER.stop(timeout=0)
+            _TRACKER = None
+            _TRACKER_NEXT_TRY = time.monotonic() + _TRACKER_RETRY_SEC
+        if time.monotonic() < _TRACKER_NEXT_TRY:
+            return None
+        try:
+            from .window_tracker import X11WindowTracker
+
+            _TRACKER = X11WindowTracker()
+            for callback in _WINDOW_LISTENERS:
+                _TRACKER.add_listener(callback)
+            _TRACKER.start()
+        except Exception as exc:  # python-xlib missing or display refused
+            LOGGER.info("X11 window tracker unavailable (%s); using xdotool", exc)
+            _TRACKER_NEXT_TRY = time.monotonic() + _TRACKER_RETRY_SEC
+            return None
+        return _TRACKER
+
+
+def watch_window_changes(callback) -> bool:
+    """Register ``callback(kind, info)`` for focus / title changes.
+
+    Returns:
+        bool: True if the X11 tracker is running now (xdotool gives no events).
+    """
+    with _TRACKER_LOCK:
+        if callback not in _WINDOW_LISTENERS:
+            _WINDOW_LISTENERS.append(callback)
+        if _TRACKER is not None:
+            _TRACKER.add_listener(callback)
+    return _window_tracker() is not None
+
+
+def unwatch_window_changes(callback) -> None:
+    with _TRACKER_LOCK:
+        if callback in _WINDOW_LISTENERS:
+            _WINDOW_LISTENERS.remove(callback)
+        if _TRACKER is not None:
+            _TRACKER.remove_listener(callback)
+
+
+def get_window_tracker() -> str:
+    """Active window source in use: ``x11`` or ``xdotool``."""
+    return 'x11' if _TRACKER is not None and not _TRACKER.failed else 'xdotool'
+
+
 def get_active_window() -> WindowInfo:
     """Get active window info or a fullscreen fallback.
 
+    On Linux the in-process X11 tracker answers from its cache; ``xdotool`` is
+    used when the tracker is unavailable or disabled (``HINDSIGHT_WINDOW_TRACKER=xdotool``).
+
     Returns:
         WindowInfo: Active window metadata; if detection fails, uses monitor 0 size.
     """
     system = platform.system().lower()
     if system == "linux":
-        info = _linux_active_window()
+        tracker = _window_tracker()
+        info = tracker.current() if tracker is not None else _linux_active_window()
         if info:
             return info
     # Fallback: full screen geometry from persistent mss (if available)
@@ -121,12 +195,33 @@ def get_active_window() -> WindowInfo:
 def get_backend() -> str:
     return _BACKEND
 
-def capture_region(bbox: Tuple[int, int, int, int], output_path: str) -> None:
-    """Capture the specified screen region to a PNG file.
+def _save_frame(img, output_path: Optional[str]) -> Optional[bytes]:
+    """Encode ``img`` with the configured codec (``capture.codecs``) to ``output_path`` or bytes."""
+    return save_image(img, output_path)
+
+
+def capture_region(bbox: Tuple[int, int, int, int], output_path: Optional[str] = None) -> Optional[bytes]:
+    """Capture the specified screen region, encoded with the configured codec (PNG by default).
+
+    Args:
+        bbox: (left, top, width, height)
+        output_path: File path to write the image. When omitted the frame is
+            kept in memory and returned instead of being written to disk.
+
+    Returns:
+        bytes | None: Encoded image bytes when ``output_path`` is None, else None.
+    """
+    return _save_frame(grab_frame(bbox).image(), output_path)
+
+
+def grab_frame(bbox: Tuple[int, int, int, int]) -> Frame:
+    """Capture the specified screen region as a raw ``Frame`` (nothing encoded).
+
+    With mss the frame wraps the grab's own BGRA buffer; hashing, duplicate
+    detection and OCR read it in place (see ``capture.frame``).
 
     Args:
         bbox: (left, top, width, height)
-        output_path: File path to write PNG.
     """
     if mss is None:  # pragma: no cover
         raise RuntimeError("mss not installed for screen capture")
@@ -141,9 +236,7 @@ def capture_region(bbox: Tuple[int, int, int, int], output_path: str) -> None:
             raise RuntimeError("Pillow ImageGrab backend not available") from exc
         box = (left, top, left + width, top + height)
         try:
-            img = ImageGrab.grab(bbox=box)  # type: ignore
-            img.save(output_path, format='PNG')
-            return
+            return Frame.from_image(ImageGrab.grab(bbox=box))  # type: ignore
         except Exception as exc:  # pragma: no cover - transient backend issues
             # ImageGrab on some Linux/Wayland setups may intermittently create a temp file
             # that Pillow then cannot re-open (UnidentifiedImageError). When that occurs
@@ -162,15 +255,9 @@ def capture_region(bbox: Tuple[int, int, int, int], output_path: str) -> None:
             sct = _get_mss()
             if sct is None:
                 raise RuntimeError("mss not available")
-            grabbed = sct.grab(region)
-            try:
-                from PIL import Image  # type: ignore
-            except ImportError as exc:  # pragma: no cover
-                raise RuntimeError("Pillow required for capture conversion") from exc
-            im = Image.frombytes("RGB", grabbed.size, grabbed.rgb)  # type: ignore
-            im.save(output_path, format="PNG")
+            frame = Frame.from_screenshot(sct.grab(region))
             _DISPLAY_FAILURES = 0
-            return
+            return frame
         except ScreenShotError:
             _DISPLAY_FAILURES += 1
             _GLOBAL_MSS = None  # force re-init
@@ -180,9 +267,8 @@ def capture_region(bbox: Tuple[int, int, int, int], output_path: str) -> None:
     try:
         from PIL import ImageGrab  # type: ignore
         box = (left, top, left + width, top + height)
-        img = ImageGrab.grab(bbox=box)  # type: ignore
-        img.save(output_path, format='PNG')
+        frame = Frame.from_image(ImageGrab.grab(bbox=box))  # type: ignore
         _BACKEND = 'imagegrab'
-        return
+        return frame
     except Exception as exc:  # pragma: no cover - give combined context
         raise RuntimeError(f"Display capture failed (mss + fallback). failures={_DISPLAY_FAILURES}: {exc}") from exc
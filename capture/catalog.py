@@ -0,0 +1,402 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Capture metadata catalog (SQLite).
+
+One row per encrypted capture with indexed columns for timestamp, window
+title, bbox, hashes, OCR length and artifact paths. Before the catalog the
+only record of a capture was its file name (``generate_filename`` packs a
+sanitised title and a local timestamp) and the transient ``status.json``, so
+counting or finding captures meant listing ``enc_dir``.
+
+The catalog is append-only: rows are inserted once per capture in their own
+transaction and are never rewritten, except that retention stamps
+``deleted_utc`` on removed captures and a layout migration may move artifact
+paths. ``count()`` is kept in memory and adjusted on every write, so the
+capture service never recounts the archive.
+
+Default location: ``<enc_dir>/catalog.sqlite3`` (next to the artifacts it
+describes, so purging the encrypted directory also purges the catalog).
+
+Usage::
+
+    python -m capture.catalog --base-dir data --recent 20 --json
+    python -m capture.catalog --base-dir data --import   # backfill from existing files
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .screenshot import filename_timestamp
+
+LOGGER = logging.getLogger("hindsight.capture")
+
+CATALOG_NAME = "catalog.sqlite3"
+_FILENAME_RE = re.compile(r"^(?P<title>.*)_(?P<ts>\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})(?:-\d+)?$")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS captures ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " capture_id TEXT NOT NULL UNIQUE,"
+    " ts REAL NOT NULL,"
+    " title TEXT NOT NULL DEFAULT '',"
+    " bbox_left INTEGER, bbox_top INTEGER, bbox_width INTEGER, bbox_height INTEGER,"
+    " backend TEXT,"
+    " image_sha256 TEXT,"
+    " frame_hash TEXT,"
+    " ocr_chars INTEGER NOT NULL DEFAULT 0,"
+    " image_path TEXT,"
+    " text_path TEXT,"
+    " image_bytes INTEGER NOT NULL DEFAULT 0,"
+    " text_bytes INTEGER NOT NULL DEFAULT 0,"
+    " deleted_utc TEXT,"
+    " codec TEXT)",
+    "CREATE INDEX IF NOT EXISTS captures_ts ON captures(ts)",
+    "CREATE INDEX IF NOT EXISTS captures_title ON captures(title COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS captures_sha ON captures(image_sha256)",
+    "CREATE INDEX IF NOT EXISTS captures_text_path ON captures(text_path)",
+)
+
+
+@dataclass
+class CatalogEntry:
+    """Metadata of one capture.
+
+    Attributes:
+        capture_id: Capture name without extension (``TITLE_YYYY-MM-DD_HH-MM-SS``).
+        ts: Capture time (epoch seconds).
+        title: Active window title.
+        bbox: Captured region ``(left, top, width, height)``.
+        backend: Capture backend (``mss`` / ``imagegrab``).
+        image_sha256: SHA-256 of the plaintext image (of its raw pixels for
+            in-memory captures).
+        frame_hash: Perceptual hash as hex (``WxH:bits``), if computed.
+        ocr_chars: Length of the OCR text.
+        image_path: Encrypted image artifact.
+        text_path: Encrypted OCR text artifact.
+        image_bytes: Size of the encrypted image.
+        text_bytes: Size of the encrypted text.
+        id: Catalog row id (set once stored).
+        deleted_utc: ISO timestamp set when retention removed the capture.
+        codec: Image codec of the image artifact (``capture.codecs``; None = PNG).
+    """
+
+    capture_id: str
+    ts: float
+    title: str = ""
+    bbox: Optional[Tuple[int, int, int, int]] = None
+    backend: Optional[str] = None
+    image_sha256: Optional[str] = None
+    frame_hash: Optional[str] = None
+    ocr_chars: int = 0
+    image_path: Optional[str] = None
+    text_path: Optional[str] = None
+    image_bytes: int = 0
+    text_bytes: int = 0
+    id: Optional[int] = None
+    deleted_utc: Optional[str] = None
+    codec: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @property
+    def total_bytes(self) -> int:
+        return self.image_bytes + self.text_bytes
+
+
+_COLUMNS = (
+    "id, capture_id, ts, title, bbox_left, bbox_top, bbox_width, bbox_height, backend, image_sha256, "
+    "frame_hash, ocr_chars, image_path, text_path, image_bytes, text_bytes, deleted_utc, codec"
+)
+
+
+def _entry(row: Tuple) -> CatalogEntry:
+    (rid, capture_id, ts, title, left, top, width, height, backend, sha, frame_hash, ocr_chars,
+     image_path, text_path, image_bytes, text_bytes, deleted_utc, codec) = row
+    bbox = (left, top, width, height) if left is not None else None
+    return CatalogEntry(
+        capture_id=capture_id, ts=ts, title=title, bbox=bbox, backend=backend, image_sha256=sha,
+        frame_hash=frame_hash, ocr_chars=ocr_chars, image_path=image_path, text_path=text_path,
+        image_bytes=image_bytes, text_bytes=text_bytes, id=rid, deleted_utc=deleted_utc, codec=codec,
+    )
+
+
+def capture_id_for(name: str) -> str:
+    """Capture id of an artifact name (``X.png``, ``X.txt.enc`` -> ``X``)."""
+    return Path(name).name.split(".", 1)[0]
+
+
+class CaptureCatalog:
+    """SQLite catalog of captures (WAL mode; safe to read from another process).
+
+    Args:
+        db_path: Database file (created if missing).
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for stmt in _SCHEMA:
+                self._conn.execute(stmt)
+            if "codec" not in {row[1] for row in self._conn.execute("PRAGMA table_info(captures)")}:
+                self._conn.execute("ALTER TABLE captures ADD COLUMN codec TEXT")
+            # The only full count; afterwards writes adjust it.
+            self._count = self._conn.execute("SELECT COUNT(*) FROM captures WHERE deleted_utc IS NULL").fetchone()[0]
+
+    # --- writes ---
+    def record(self, entry: CatalogEntry) -> int:
+        """Insert ``entry`` in its own transaction.
+
+        Returns:
+            int: Row id.
+
+        Raises:
+            sqlite3.IntegrityError: If ``capture_id`` is already catalogued (the
+                capture's files were overwritten by a colliding capture).
+        """
+        return self.record_many([entry])[0]  # type: ignore[return-value]
+
+    def record_many(self, entries: Iterable[CatalogEntry], skip_existing: bool = False) -> List[Optional[int]]:
+        """Insert entries in one transaction.
+
+        Args:
+            entries: Entries to insert.
+            skip_existing: Leave already catalogued ids alone (their slot is None)
+                instead of failing the whole transaction (bulk import).
+        """
+        verb = "INSERT OR IGNORE" if skip_existing else "INSERT"
+        ids: List[Optional[int]] = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for e in entries:
+                    left, top, width, height = e.bbox if e.bbox else (None, None, None, None)
+                    cur = self._conn.execute(
+                        f"{verb} INTO captures(capture_id, ts, title, bbox_left, bbox_top, bbox_width, "
+                        "bbox_height, backend, image_sha256, frame_hash, ocr_chars, image_path, text_path, "
+                        "image_bytes, text_bytes, codec) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (e.capture_id, e.ts, e.title, left, top, width, height, e.backend, e.image_sha256,
+                         e.frame_hash, e.ocr_chars, e.image_path, e.text_path, e.image_bytes, e.text_bytes,
+                         e.codec),
+                    )
+                    added = cur.rowcount == 1
+                    ids.append(cur.lastrowid if added else None)
+                    if added:
+                        e.id = cur.lastrowid
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._count += sum(1 for i in ids if i is not None)
+        return ids
+
+    def mark_deleted(self, ids: Iterable[int], when: Optional[str] = None) -> int:
+        """Tombstone captures removed from disk (retention).
+
+        Returns:
+            int: Rows newly marked.
+        """
+        ids = list(ids)
+        if not ids:
+            return 0
+        when = when or datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            marked = 0
+            self._conn.execute("BEGIN IMMEDIATE")
+            for offset in range(0, len(ids), 500):
+                batch = ids[offset:offset + 500]
+                marks = ",".join("?" * len(batch))
+                marked += self._conn.execute(
+                    f"UPDATE captures SET deleted_utc = ? WHERE deleted_utc IS NULL AND id IN ({marks})",
+                    (when, *batch),
+                ).rowcount
+            self._conn.execute("COMMIT")
+            self._count -= marked
+        return marked
+
+    def update_paths(self, capture_id: str, image_path: Optional[str], text_path: Optional[str]) -> bool:
+        """Point a capture at relocated artifacts (layout migration)."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE captures SET image_path = COALESCE(?, image_path), text_path = COALESCE(?, text_path) "
+                "WHERE capture_id = ?",
+                (image_path, text_path, capture_id),
+            )
+            return cur.rowcount == 1
+
+    # --- reads ---
+    def count(self) -> int:
+        """Live (not deleted) captures."""
+        with self._lock:
+            return self._count
+
+    def get(self, capture_id: str) -> Optional[CatalogEntry]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM captures WHERE capture_id = ?", (capture_id,)).fetchone()
+        return _entry(row) if row else None
+
+    def by_text_path(self, text_path: str) -> Optional[CatalogEntry]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM captures WHERE text_path = ?", (text_path,)).fetchone()
+        return _entry(row) if row else None
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        title: Optional[str] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = False,
+        include_deleted: bool = False,
+    ) -> List[CatalogEntry]:
+        """Captures in ``[start, end]`` (optionally whose title contains ``title``)."""
+        clauses, params = [], []  # type: List[str], List[Any]
+        if not include_deleted:
+            clauses.append("deleted_utc IS NULL")
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(end)
+        if title:
+            clauses.append("title LIKE ? COLLATE NOCASE")
+            params.append(f"%{title}%")
+        sql = f"SELECT {_COLUMNS} FROM captures"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ts DESC, id DESC" if newest_first else " ORDER BY ts, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [_entry(r) for r in self._conn.execute(sql, params).fetchall()]
+
+    def recent(self, n: int = 20) -> List[CatalogEntry]:
+        return self.query(limit=n, newest_first=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(ts), MAX(ts), COALESCE(SUM(image_bytes + text_bytes), 0) FROM captures "
+                "WHERE deleted_utc IS NULL"
+            ).fetchone()
+        return {"captures": self.count(), "oldest_ts": row[0], "newest_ts": row[1], "bytes": row[2]}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # --- backfill ---
+    def import_existing(self, enc_dir: Path) -> int:
+        """Catalogue ``*.png.enc`` captures not yet recorded, using their file names.
+
+        Titles are the sanitised ones from the file name and ``ts`` is parsed
+        from it (falling back to the file mtime); hashes are left empty.
+
+        Returns:
+            int: Captures added.
+        """
+        entries = []
+        for img in Path(enc_dir).rglob("*.png.enc"):
+            cid = capture_id_for(img.name)
+            if self.get(cid) is not None:
+                continue
+            txt = img.with_name(f"{cid}.txt.enc")
+            entries.append(entry_from_files(img, txt if txt.exists() else None))
+        if not entries:
+            return 0
+        added = sum(1 for i in self.record_many(entries, skip_existing=True) if i is not None)
+        LOGGER.info("Catalog: imported %s existing captures from %s", added, enc_dir)
+        return added
+
+
+def entry_from_files(image_path: Path, text_path: Optional[Path]) -> CatalogEntry:
+    """Best-effort entry for an already encrypted capture (no plaintext available)."""
+    cid = capture_id_for(image_path.name)
+    match = _FILENAME_RE.match(cid)
+    stat = image_path.stat()
+    ts = stat.st_mtime
+    title = cid
+    if match is not None:
+        title = match.group("title").replace("_", " ")
+        try:
+            ts = filename_timestamp(match.group("ts"))
+        except ValueError:  # pragma: no cover - regex guarantees the shape
+            pass
+    return CatalogEntry(
+        capture_id=cid,
+        ts=ts,
+        title=title,
+        image_path=str(image_path),
+        text_path=str(text_path) if text_path is not None else None,
+        image_bytes=stat.st_size,
+        text_bytes=text_path.stat().st_size if text_path is not None else 0,
+    )
+
+
+def default_catalog_path() -> Path:
+    """Catalog location: HINDSIGHT_CATALOG_DB or <HINDSIGHT_BASE_DIR|data>/encrypted/catalog.sqlite3."""
+    explicit = os.environ.get("HINDSIGHT_CATALOG_DB")
+    if explicit:
+        return Path(explicit)
+    return Path(os.environ.get("HINDSIGHT_BASE_DIR") or "data") / "encrypted" / CATALOG_NAME
+
+
+_DEFAULT: Dict[Path, CaptureCatalog] = {}
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_catalog() -> Optional[CaptureCatalog]:
+    """Process-wide catalog at ``default_catalog_path()``, or None if none exists yet."""
+    path = default_catalog_path()
+    if not path.exists():
+        return None
+    with _DEFAULT_LOCK:
+        catalog = _DEFAULT.get(path)
+        if catalog is None:
+            catalog = _DEFAULT[path] = CaptureCatalog(path)
+        return catalog
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect the capture metadata catalog")
+    parser.add_argument("--base-dir", type=Path, default=Path("data"))
+    parser.add_argument("--recent", type=int, default=20, help="List the N newest captures")
+    parser.add_argument("--import", dest="do_import", action="store_true", help="Backfill from existing .enc files")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    enc_dir = args.base_dir / "encrypted"
+    catalog = CaptureCatalog(enc_dir / CATALOG_NAME)
+    if args.do_import:
+        print(f"imported {catalog.import_existing(enc_dir)}", file=sys.stderr)
+    entries = catalog.recent(args.recent)
+    if args.json:
+        print(json.dumps({"stats": catalog.stats(), "recent": [e.to_dict() for e in entries]}, indent=2))
+    else:
+        for e in entries:
+            when = datetime.fromtimestamp(e.ts).isoformat(timespec="seconds")
+            print(f"{when}  {e.ocr_chars:>6} chars  {e.title}")
+    catalog.close()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(_main())
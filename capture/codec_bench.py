@@ -0,0 +1,169 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Image codec benchmark: encode time, bytes per frame and OCR impact.
+
+Usage::
+
+    python -m capture.codec_bench --frames 5 --width 2560 --height 1440
+    python -m capture.codec_bench --images shots/ --max-dim 1920 --ocr --json
+
+Frames are either real screenshots (``--images``, any format Pillow reads) or
+synthetic text-heavy frames. ``--ocr`` runs OCR on each original frame and on
+its decoded encoding and reports their text similarity (1.0 = identical).
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import io
+import json
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from .codecs import CODECS, encode_image, get_codec
+
+OCRFunction = Callable[[bytes], str]
+
+
+@dataclass
+class CodecResult:
+    """Measurements for one codec over the sample frames."""
+
+    codec: str
+    frames: int
+    encode_ms_p50: float
+    encode_ms_mean: float
+    bytes_per_frame: int
+    size_vs_png: float
+    ocr_similarity: Optional[float] = None
+
+
+def sample_frames(count: int, width: int, height: int) -> List[object]:
+    """Synthetic screenshot-like frames: dark text lines on a light background."""
+    from PIL import Image, ImageDraw  # type: ignore
+
+    words = "invoice meeting notes quarterly report deploy pipeline search capture window terminal".split()
+    frames = []
+    for n in range(count):
+        img = Image.new("RGB", (width, height), (246, 246, 246))
+        draw = ImageDraw.Draw(img)
+        draw.rectangle((0, 0, width, 28), fill=(40, 44, 52))
+        for row, y in enumerate(range(40, height - 16, 18)):
+            line = " ".join(words[(n + row + i) % len(words)] for i in range(12))
+            draw.text((12 + (row % 3) * 8, y), f"{row:04d} {line}", fill=(20, 20, 20))
+        frames.append(img)
+    return frames
+
+
+def load_frames(directory: Path) -> List[object]:
+    from PIL import Image  # type: ignore
+
+    frames = []
+    for path in sorted(directory.iterdir()):
+        try:
+            with Image.open(path) as img:
+                frames.append(img.convert("RGB"))
+        except OSError:
+            continue
+    return frames
+
+
+def _png_bytes(img) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def text_similarity(reference: str, other: str) -> float:
+    """Similarity of two OCR outputs, compared word by word."""
+    return difflib.SequenceMatcher(None, reference.split(), other.split()).ratio()
+
+
+def measure_codec(
+    name: str,
+    frames: Sequence[object],
+    repeats: int = 3,
+    max_dim: Optional[int] = None,
+    ocr: Optional[OCRFunction] = None,
+    png_sizes: Optional[Sequence[int]] = None,
+) -> CodecResult:
+    """Encode every frame ``repeats`` times with codec ``name``."""
+    codec = get_codec(name, max_dim)
+    timings: List[float] = []
+    sizes: List[int] = []
+    similarities: List[float] = []
+    for img in frames:
+        data = b""
+        for _ in range(max(1, repeats)):
+            started = time.perf_counter()
+            data = encode_image(img, codec)
+            timings.append((time.perf_counter() - started) * 1000)
+        sizes.append(len(data))
+        if ocr is not None:
+            similarities.append(text_similarity(ocr(_png_bytes(img)), ocr(data)))
+    png_total = sum(png_sizes) if png_sizes else 0
+    return CodecResult(
+        codec=codec.name if codec.max_dim is None else f"{codec.name}@{codec.max_dim}",
+        frames=len(frames),
+        encode_ms_p50=round(statistics.median(timings), 2),
+        encode_ms_mean=round(statistics.fmean(timings), 2),
+        bytes_per_frame=int(statistics.fmean(sizes)),
+        size_vs_png=round(sum(sizes) / png_total, 3) if png_total else 1.0,
+        ocr_similarity=round(statistics.fmean(similarities), 4) if similarities else None,
+    )
+
+
+def _format_table(results: Sequence[CodecResult]) -> str:
+    lines = [f"{'codec':<20} {'p50 ms':>8} {'mean ms':>8} {'bytes/frame':>12} {'vs png':>7} {'ocr sim':>8}"]
+    for r in results:
+        sim = f"{r.ocr_similarity:.3f}" if r.ocr_similarity is not None else "-"
+        lines.append(
+            f"{r.codec:<20} {r.encode_ms_p50:>8.1f} {r.encode_ms_mean:>8.1f} {r.bytes_per_frame:>12} "
+            f"{r.size_vs_png:>7.2f} {sim:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare image codecs for captured frames")
+    parser.add_argument("--images", type=Path, help="Directory of screenshots to encode")
+    parser.add_argument("--frames", type=int, default=3, help="Synthetic frames when --images is not given")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--codecs", nargs="+", default=list(CODECS), choices=list(CODECS))
+    parser.add_argument("--max-dim", type=int, default=0, help="Also downscale to this size (0 = off)")
+    parser.add_argument("--ocr", action="store_true", help="Measure OCR text similarity (needs Tesseract)")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args(argv)
+    try:
+        frames = load_frames(args.images) if args.images else sample_frames(args.frames, args.width, args.height)
+    except ImportError:
+        print("Pillow is required", file=sys.stderr)
+        return 2
+    if not frames:
+        print("no readable frames", file=sys.stderr)
+        return 2
+    ocr: Optional[OCRFunction] = None
+    if args.ocr:
+        from .ocr import extract_text
+
+        ocr = extract_text
+    png_sizes = [len(_png_bytes(img)) for img in frames]
+    results = [
+        measure_codec(name, frames, args.repeats, args.max_dim or None, ocr, png_sizes) for name in args.codecs
+    ]
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(_format_table(results))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,135 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Image encoders for captured frames.
+
+Frames used to be saved with Pillow's default PNG settings (zlib level 6),
+which costs a lot of CPU per cycle on large monitors. The encoder is now
+selected from named codecs:
+
+* ``png``           Pillow default (the previous behaviour).
+* ``png-fast``      PNG at zlib level 1: much faster, somewhat larger.
+* ``webp-lossless`` Lossless WebP at its fastest method; smaller than PNG.
+* ``webp``          Lossy WebP (quality 85); smallest, text edges may blur.
+
+Any codec can be combined with a maximum dimension: frames larger than it
+are downscaled (aspect preserved) before encoding.
+
+The image artifact keeps its ``.png.enc`` name whatever the codec. The codec
+is recorded in the capture catalog, and ``sniff`` identifies the format from
+its leading bytes. Pillow's ``Image.open`` (OCR, dedup, verification) detects
+it on its own.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Optional
+
+LOGGER = logging.getLogger("hindsight.capture")
+
+
+@dataclass(frozen=True)
+class ImageCodec:
+    """A named encoder configuration.
+
+    Attributes:
+        name: Codec name recorded in metadata.
+        format: Pillow format (``PNG`` / ``WEBP``).
+        options: Keyword arguments for ``Image.save``.
+        max_dim: Downscale frames whose larger side exceeds this (None = never).
+    """
+
+    name: str
+    format: str
+    options: Dict[str, Any] = field(default_factory=dict)
+    max_dim: Optional[int] = None
+
+    @property
+    def lossless(self) -> bool:
+        return self.format == "PNG" or bool(self.options.get("lossless"))
+
+
+CODECS: Dict[str, ImageCodec] = {
+    "png": ImageCodec("png", "PNG"),
+    "png-fast": ImageCodec("png-fast", "PNG", {"compress_level": 1}),
+    "webp-lossless": ImageCodec("webp-lossless", "WEBP", {"lossless": True, "quality": 0, "method": 0}),
+    "webp": ImageCodec("webp", "WEBP", {"quality": 85, "method": 2}),
+}
+DEFAULT_CODEC = "png"
+
+_CURRENT: Dict[str, Any] = {"codec": CODECS[DEFAULT_CODEC]}
+_LOCK = threading.Lock()
+
+
+def webp_available() -> bool:
+    """True if this Pillow build can write WebP."""
+    try:
+        from PIL import features  # type: ignore
+    except ImportError:  # pragma: no cover
+        return False
+    return bool(features.check("webp"))
+
+
+def get_codec(name: str = DEFAULT_CODEC, max_dim: Optional[int] = None) -> ImageCodec:
+    """Resolve ``name`` to a codec, falling back to ``png`` if it is unknown or unsupported."""
+    codec = CODECS.get(name)
+    if codec is None:
+        LOGGER.warning("Unknown image codec %r; using %s", name, DEFAULT_CODEC)
+        codec = CODECS[DEFAULT_CODEC]
+    elif codec.format == "WEBP" and not webp_available():
+        LOGGER.warning("Pillow lacks WebP support; using %s instead of %s", DEFAULT_CODEC, name)
+        codec = CODECS[DEFAULT_CODEC]
+    return replace(codec, max_dim=max_dim if max_dim and max_dim > 0 else None)
+
+
+def configure_codec(name: str = DEFAULT_CODEC, max_dim: Optional[int] = None) -> ImageCodec:
+    """Select the codec ``encode_image`` uses by default (process-wide)."""
+    codec = get_codec(name, max_dim)
+    with _LOCK:
+        _CURRENT["codec"] = codec
+    return codec
+
+
+def current_codec() -> ImageCodec:
+    with _LOCK:
+        return _CURRENT["codec"]
+
+
+def prepare(img, codec: ImageCodec):
+    """Downscale ``img`` to ``codec.max_dim`` if needed (returns a new image or ``img``)."""
+    if codec.max_dim is None or max(img.size) <= codec.max_dim:
+        return img
+    from PIL import Image  # type: ignore
+
+    scale = codec.max_dim / max(img.size)
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(size, Image.BILINEAR)
+
+
+def encode_image(img, codec: Optional[ImageCodec] = None) -> bytes:
+    """Encode a Pillow image with ``codec`` (default: the configured one)."""
+    codec = codec or current_codec()
+    buf = io.BytesIO()
+    prepare(img, codec).save(buf, format=codec.format, **codec.options)
+    return buf.getvalue()
+
+
+def save_image(img, output_path: Optional[str], codec: Optional[ImageCodec] = None) -> Optional[bytes]:
+    """Write ``img`` to ``output_path`` or, when None, return the encoded bytes."""
+    codec = codec or current_codec()
+    if output_path is None:
+        return encode_image(img, codec)
+    prepare(img, codec).save(output_path, format=codec.format, **codec.options)
+    return None
+
+
+def sniff(data: bytes) -> Optional[str]:
+    """Container format of encoded image bytes (``png`` / ``webp``), or None."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    return None
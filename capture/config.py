@@ -0,0 +1,37 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Access to ``config/default.yaml``.
+
+The file is a flat list of ``key: value`` pairs, read without a YAML
+dependency. Environment variables set by the Electron supervisor take
+precedence over it wherever both exist.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent.parent / "config" / "default.yaml"
+
+
+def config_value(name: str, path: Optional[Path] = None) -> Optional[str]:
+    """Top-level ``name: value`` from the config file (None if absent or unreadable)."""
+    try:
+        lines = Path(path or DEFAULT_CONFIG).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return None
+    for line in lines:
+        key, sep, value = line.partition(":")
+        if sep and key.strip() == name and not line[:1].isspace():
+            return value.split("#", 1)[0].strip()
+    return None
+
+
+def setting(env: str, name: str, default: str = "", path: Optional[Path] = None) -> str:
+    """``env`` from the environment, else ``name`` from the config file, else ``default``."""
+    value = os.environ.get(env)
+    if value is None:
+        value = config_value(name, path)
+    return default if value is None or value == "" else value
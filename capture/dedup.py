@@ -0,0 +1,223 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Perceptual near-duplicate frame detection.
+
+A SHA-256 of the encoded PNG changes whenever a single pixel does (blinking
+cursor, a clock in the corner). This module instead hashes a small grayscale
+thumbnail of the frame and compares hashes by Hamming distance, so frames that
+look the same can be skipped before OCR / encryption.
+
+A classic 8x8 difference hash is too coarse for text-heavy windows (adding a
+whole line of text often flips no bits), so the hash is an "ink map": the frame
+is box-downscaled to a fine grid and each cell contributes one bit recording
+whether it deviates from the background (median) intensity. The Hamming
+distance between two hashes is then the number of grid cells whose ink changed.
+
+A few edited characters in one line often flip no cell at all, so the ink map
+alone cannot tell typing apart from a blinking cursor. Each hash therefore also
+carries exact digests of full-resolution horizontal bands: a frame within the
+Hamming threshold only counts as a duplicate when every one of its bands has
+already been seen in that window's recent history. A cursor blinking between
+two states or a clock returning to a shown value is skipped; a new band state
+(fresh text) is always stored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from .frame import Frame
+
+try:
+    from PIL import Image  # type: ignore
+except ImportError:  # pragma: no cover - optional at scaffold stage
+    Image = None  # type: ignore
+
+DEFAULT_CELL_SIZE = 8  # source pixels per grid cell side
+MAX_GRID_WIDTH = 240  # caps hash size (and history memory) on very wide windows
+DEFAULT_INK_DELTA = 24  # grey levels a cell must differ from background to count as ink
+DEFAULT_THRESHOLD = 3  # cells; a blinking cursor or ticking clock changes 1-3 cells
+DEFAULT_HISTORY = 8
+DEFAULT_BAND_HEIGHT = 32  # px per exact-digest band; about two lines of text
+
+
+@dataclass(frozen=True)
+class FrameHash:
+    """Perceptual hash of one frame.
+
+    Attributes:
+        width: Grid width in cells.
+        height: Grid height in cells.
+        bits: One byte-aligned bit per cell (packed as an int).
+        bands: Exact digests of full-resolution pixel bands, top to bottom;
+            empty when not computed. Not part of equality.
+    """
+
+    width: int
+    height: int
+    bits: int = field(repr=False)
+    bands: Tuple[bytes, ...] = field(default=(), repr=False, compare=False)
+
+    def distance(self, other: "FrameHash") -> Optional[int]:
+        """Hamming distance to ``other``; None if the grids differ in size."""
+        if (self.width, self.height) != (other.width, other.height):
+            return None
+        return hamming_distance(self.bits, other.bits)
+
+
+def perceptual_hash(
+    image: Any,
+    cell_size: int = DEFAULT_CELL_SIZE,
+    ink_delta: int = DEFAULT_INK_DELTA,
+    band_height: int = DEFAULT_BAND_HEIGHT,
+) -> FrameHash:
+    """Compute the ink-map hash of a PIL image.
+
+    Args:
+        image: PIL image (any mode) or a ``capture.frame.Frame``; a frame is
+            downscaled straight from its raw buffer.
+        cell_size: Source pixels per cell side, so a cursor or clock digit
+            covers about the same number of cells in any window size.
+        ink_delta: Minimum deviation from the background grey level for a
+            cell to count as ink.
+        band_height: Rows per exact band digest; 0 skips band digests.
+
+    Returns:
+        FrameHash: Hash comparable with others of the same grid size.
+    """
+    if Image is None:  # pragma: no cover
+        raise RuntimeError("Pillow required for perceptual hashing")
+    width, height = image.size
+    grid_w, grid_h = grid_size(width, height, cell_size)
+    # Box filter averages every source pixel into its cell, so thin features
+    # (cursor, text strokes) still move the cell value.
+    if isinstance(image, Frame):
+        thumb = image.thumbnail((grid_w, grid_h)).convert("L")
+    else:
+        thumb = image.resize((grid_w, grid_h), Image.BOX).convert("L")
+    frame_hash = hash_gray_cells(thumb.tobytes(), grid_w, grid_h, ink_delta)
+    if band_height <= 0:
+        return frame_hash
+    return FrameHash(grid_w, grid_h, frame_hash.bits, band_digests(image, band_height))
+
+
+def band_digests(image: Any, band_height: int = DEFAULT_BAND_HEIGHT) -> Tuple[bytes, ...]:
+    """Exact digests of ``band_height``-row bands of a PIL image or ``Frame``."""
+    width, height = image.size
+    if isinstance(image, Frame):
+        rows = image.rows
+    else:
+        raw = memoryview(image.tobytes())
+        row_bytes = len(raw) // max(1, height)
+        rows = lambda top, bottom: raw[top * row_bytes:bottom * row_bytes]  # noqa: E731
+    return tuple(
+        hashlib.blake2b(rows(top, min(height, top + band_height)), digest_size=16).digest()
+        for top in range(0, height, band_height)
+    )
+
+
+def grid_size(width: int, height: int, cell_size: int = DEFAULT_CELL_SIZE) -> Tuple[int, int]:
+    """Return the (columns, rows) hash grid for a ``width`` x ``height`` frame."""
+    cell = max(cell_size, -(-width // MAX_GRID_WIDTH))
+    return max(1, round(width / cell)), max(1, round(height / cell))
+
+
+def hash_gray_cells(cells: bytes, width: int, height: int, ink_delta: int = DEFAULT_INK_DELTA) -> FrameHash:
+    """Build a ``FrameHash`` from an 8-bit grayscale thumbnail buffer."""
+    histogram = [0] * 256
+    for value in cells:
+        histogram[value] += 1
+    background = _median_from_histogram(histogram, len(cells))
+    table = bytes(1 if abs(level - background) > ink_delta else 0 for level in range(256))
+    return FrameHash(width=width, height=height, bits=int.from_bytes(cells.translate(table), "big"))
+
+
+def _median_from_histogram(histogram: list, total: int) -> int:
+    seen = 0
+    half = total // 2
+    for level, count in enumerate(histogram):
+        seen += count
+        if seen > half:
+            return level
+    return 0
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Return the number of differing bits between two hashes."""
+    return bin(a ^ b).count("1")
+
+
+class NearDuplicateDetector:
+    """Per-window history of recent frame hashes.
+
+    Args:
+        threshold: Maximum Hamming distance treated as "same frame".
+        history: Hashes remembered per window title.
+        max_titles: Window titles tracked before the least recent is evicted.
+    """
+
+    def __init__(
+        self,
+        threshold: int = DEFAULT_THRESHOLD,
+        history: int = DEFAULT_HISTORY,
+        max_titles: int = 64,
+    ) -> None:
+        self.threshold = threshold
+        self.history = max(1, history)
+        self.max_titles = max(1, max_titles)
+        self._seen: "OrderedDict[str, Deque[FrameHash]]" = OrderedDict()
+
+    def match(self, title: str, frame_hash: FrameHash) -> Optional[int]:
+        """Return the closest distance if ``frame_hash`` is a near duplicate for ``title``."""
+        recent = self._seen.get(title)
+        if not recent:
+            return None
+        self._seen.move_to_end(title)
+        distances = [d for d in (frame_hash.distance(h) for h in recent) if d is not None]
+        if not distances:
+            return None
+        best = min(distances)
+        if best > self.threshold or not self._bands_seen(frame_hash, recent):
+            return None
+        return best
+
+    @staticmethod
+    def _bands_seen(frame_hash: FrameHash, recent: Deque[FrameHash]) -> bool:
+        """True if every band of ``frame_hash`` matches that band in some recent frame."""
+        if not frame_hash.bands:
+            return True  # no band digests: ink map only
+        seen: Set[Tuple[int, bytes]] = set()
+        for h in recent:
+            if len(h.bands) == len(frame_hash.bands):
+                seen.update(enumerate(h.bands))
+        return all(band in seen for band in enumerate(frame_hash.bands))
+
+    def remember(self, title: str, frame_hash: FrameHash) -> None:
+        recent = self._seen.get(title)
+        if recent is None:
+            recent = deque(maxlen=self.history)
+            self._seen[title] = recent
+            while len(self._seen) > self.max_titles:
+                self._seen.popitem(last=False)
+        else:
+            self._seen.move_to_end(title)
+        recent.append(frame_hash)
+
+    def forget(self, title: str, frame_hash: FrameHash) -> None:
+        """Drop a remembered hash (e.g. the frame was never stored)."""
+        recent = self._seen.get(title)
+        if recent is None:
+            return
+        try:
+            recent.remove(frame_hash)
+        except ValueError:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "threshold": self.threshold,
+            "titles_tracked": len(self._seen),
+        }
@@ -4,16 +4,38 @@ Encryption utilities for at-rest data.
 
 Provides simple symmetric encryption (placeholder) wrappers. In production
 this should use strong key management and authenticated encryption.
+
+Two on-disk formats are understood:
+
+* Fernet tokens (legacy, default): one base64 token per file.
+* Chunked AES-256-GCM container ("HRC1"): a fixed header followed by
+  independently authenticated chunks of ``chunk_size`` plaintext bytes. Files
+  are written and read as streams (bounded memory, no base64 inflation) and a
+  reader can decrypt just the chunks covering a byte range.
+
+Chunked layout::
+
+    header = b"HRC1" | chunk_size (u32 BE) | salt (16) | nonce_prefix (7)
+    chunk_i = AES-GCM(file_key, nonce_prefix | i (u32 BE) | last (u8), plaintext_i, aad=header)
+
+``file_key`` is HKDF-SHA256 of the Fernet data key with the per-file salt, so
+the same data key protects both formats. The ``last`` flag in the nonce makes
+truncation at a chunk boundary detectable. ``decrypt_file`` / ``decrypt_bytes``
+detect the format from the leading bytes.
 """
 
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Union
+from typing import BinaryIO, Iterator, Union
+import io
 import json
 import base64
 import os
+import struct
 
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM  # type: ignore
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF  # type: ignore
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC  # type: ignore
 from cryptography.hazmat.primitives import hashes  # type: ignore
 from cryptography.hazmat.backends import default_backend  # type: ignore
@@ -25,6 +47,12 @@ except ImportError:  # pragma: no cover
 
 BytesLike = Union[bytes, bytearray]
 
+CHUNKED_MAGIC = b"HRC1"
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_HEADER = struct.Struct(">4sI16s7s")
+_TAG_SIZE = 16
+_HKDF_INFO = b"hindsight-recall chunked v1"
+
 
 def generate_key() -> bytes:
     """Generate a new symmetric key.
@@ -111,12 +139,159 @@ def decrypt_bytes(token: BytesLike, key: bytes) -> bytes:
     Returns:
         bytes: Decrypted plaintext.
     """
+    if bytes(token[:len(CHUNKED_MAGIC)]) == CHUNKED_MAGIC:
+        out = io.BytesIO()
+        decrypt_stream(io.BytesIO(bytes(token)), out, key)
+        return out.getvalue()
     if Fernet is None:  # pragma: no cover
         raise RuntimeError("cryptography library not installed")
     return Fernet(key).decrypt(bytes(token))
 
 
-def encrypt_file(path: Path, key: bytes, dest_dir: Path | None = None) -> Path:
+def _file_key(key: bytes, salt: bytes, info: bytes = _HKDF_INFO) -> AESGCM:
+    """Derive the per-file AES-256-GCM key from a Fernet data key."""
+    hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt, info=info, backend=default_backend())
+    return AESGCM(hkdf.derive(base64.urlsafe_b64decode(key)))
+
+
+def _nonce(prefix: bytes, index: int, last: bool) -> bytes:
+    return prefix + struct.pack(">IB", index, 1 if last else 0)
+
+
+def encrypt_stream(src: BinaryIO, dst: BinaryIO, key: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Encrypt ``src`` into ``dst`` as a chunked container, one chunk in memory at a time.
+
+    Args:
+        src: Readable binary stream of plaintext.
+        dst: Writable binary stream for the container.
+        key: Fernet data key (urlsafe base64).
+        chunk_size: Plaintext bytes per authenticated chunk.
+
+    Returns:
+        int: Plaintext bytes encrypted.
+    """
+    if not 0 < chunk_size < 2 ** 32:
+        raise ValueError("chunk_size out of range")
+    header = _HEADER.pack(CHUNKED_MAGIC, chunk_size, os.urandom(16), os.urandom(7))
+    _magic, _size, salt, prefix = _HEADER.unpack(header)
+    aead = _file_key(key, salt)
+    dst.write(header)
+    total = 0
+    index = 0
+    chunk = src.read(chunk_size)
+    while True:
+        # Read one chunk ahead so the final chunk can be flagged as last.
+        following = src.read(chunk_size) if len(chunk) == chunk_size else b""
+        last = not following
+        dst.write(aead.encrypt(_nonce(prefix, index, last), chunk, header))
+        total += len(chunk)
+        if last:
+            return total
+        chunk = following
+        index += 1
+
+
+def decrypt_stream(src: BinaryIO, dst: BinaryIO, key: bytes) -> int:
+    """Decrypt a chunked container from ``src`` into ``dst``.
+
+    Raises:
+        ValueError: Not a chunked container, or truncated.
+        cryptography.exceptions.InvalidTag: A chunk failed authentication.
+
+    Returns:
+        int: Plaintext bytes written.
+    """
+    header, chunk_size, prefix, aead = _read_header(src, key)
+    total = 0
+    index = 0
+    sealed = src.read(chunk_size + _TAG_SIZE)
+    while True:
+        following = src.read(chunk_size + _TAG_SIZE) if len(sealed) == chunk_size + _TAG_SIZE else b""
+        plaintext = aead.decrypt(_nonce(prefix, index, not following), sealed, header)
+        dst.write(plaintext)
+        total += len(plaintext)
+        if not following:
+            return total
+        sealed = following
+        index += 1
+
+
+def _read_header(src: BinaryIO, key: bytes):
+    header = src.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise ValueError("truncated chunked container")
+    magic, chunk_size, salt, prefix = _HEADER.unpack(header)
+    if magic != CHUNKED_MAGIC:
+        raise ValueError("not a chunked container")
+    return header, chunk_size, prefix, _file_key(key, salt)
+
+
+def is_chunked_file(path: Path) -> bool:
+    """Return True if ``path`` holds a chunked container (vs a Fernet token)."""
+    with open(path, "rb") as fh:
+        return fh.read(len(CHUNKED_MAGIC)) == CHUNKED_MAGIC
+
+
+class ChunkedReader:
+    """Random-access reader over a chunked container file.
+
+    Only the chunks overlapping a requested range are read and authenticated.
+
+    Args:
+        path: Container file path.
+        key: Fernet data key.
+    """
+
+    def __init__(self, path: Path, key: bytes) -> None:
+        self._fh = open(path, "rb")
+        try:
+            self._header, self.chunk_size, self._prefix, self._aead = _read_header(self._fh, key)
+            body = os.fstat(self._fh.fileno()).st_size - _HEADER.size
+            sealed = self.chunk_size + _TAG_SIZE
+            self.num_chunks = max(1, -(-body // sealed))
+            self.size = body - self.num_chunks * _TAG_SIZE
+            if self.size < 0:
+                raise ValueError("truncated chunked container")
+        except Exception:
+            self._fh.close()
+            raise
+
+    def __enter__(self) -> "ChunkedReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def read_chunk(self, index: int) -> bytes:
+        """Decrypt and return chunk ``index``."""
+        if not 0 <= index < self.num_chunks:
+            raise IndexError(index)
+        sealed = self.chunk_size + _TAG_SIZE
+        self._fh.seek(_HEADER.size + index * sealed)
+        data = self._fh.read(sealed)
+        last = index == self.num_chunks - 1
+        return self._aead.decrypt(_nonce(self._prefix, index, last), data, self._header)
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        for index in range(self.num_chunks):
+            yield self.read_chunk(index)
+
+    def read(self, offset: int = 0, length: int = -1) -> bytes:
+        """Return plaintext ``[offset, offset + length)`` (to the end if ``length`` < 0)."""
+        offset = max(0, offset)
+        end = self.size if length < 0 else min(self.size, offset + length)
+        if offset >= end:
+            return b""
+        first, last = offset // self.chunk_size, (end - 1) // self.chunk_size
+        data = b"".join(self.read_chunk(i) for i in range(first, last + 1))
+        start = offset - first * self.chunk_size
+        return data[start:start + (end - offset)]
+
+
+def encrypt_file(path: Path, key: bytes, dest_dir: Path | None = None, chunked: bool = False) -> Path:
     """Encrypt a file and write an .enc artifact.
 
     By default writes alongside the original (filename.ext.enc). If ``dest_dir``
@@ -127,22 +302,52 @@ def encrypt_file(path: Path, key: bytes, dest_dir: Path | None = None) -> Path:
         path: Source plaintext file path.
         key: Symmetric key bytes.
         dest_dir: Optional destination directory for encrypted output.
+        chunked: Stream into the chunked AES-GCM container instead of a
+            single Fernet token.
 
     Returns:
         Path: Path to encrypted file.
     """
-    ciphertext = encrypt_bytes(path.read_bytes(), key)
     if dest_dir is not None:
         dest_dir.mkdir(parents=True, exist_ok=True)
         enc_path = dest_dir / (path.name + ".enc")
     else:
         enc_path = path.with_suffix(path.suffix + ".enc")
+    if chunked:
+        with open(path, "rb") as src, open(enc_path, "wb") as dst:
+            encrypt_stream(src, dst, key)
+        return enc_path
+    ciphertext = encrypt_bytes(path.read_bytes(), key)
+    enc_path.write_bytes(ciphertext)
+    return enc_path
+
+
+def encrypt_to_file(data: BytesLike, key: bytes, enc_path: Path, chunked: bool = False) -> Path:
+    """Encrypt in-memory plaintext straight to ``enc_path``.
+
+    Used by the in-memory capture path so plaintext never touches disk.
+
+    Args:
+        data: Plaintext bytes.
+        key: Symmetric key bytes.
+        enc_path: Destination path for the encrypted artifact.
+        chunked: Write the chunked AES-GCM container instead of a Fernet token.
+
+    Returns:
+        Path: ``enc_path``.
+    """
+    enc_path.parent.mkdir(parents=True, exist_ok=True)
+    if chunked:
+        with open(enc_path, "wb") as dst:
+            encrypt_stream(io.BytesIO(bytes(data)), dst, key)
+        return enc_path
+    ciphertext = encrypt_bytes(data, key)
     enc_path.write_bytes(ciphertext)
     return enc_path
 
 
 def decrypt_file(path: Path, key: bytes) -> bytes:
-    """Decrypt an encrypted file and return plaintext bytes.
+    """Decrypt an encrypted file (Fernet or chunked) and return plaintext bytes.
 
     Args:
         path: Encrypted file path.
@@ -151,4 +356,9 @@ def decrypt_file(path: Path, key: bytes) -> bytes:
     Returns:
         bytes: Decrypted plaintext.
     """
+    if is_chunked_file(path):
+        out = io.BytesIO()
+        with open(path, "rb") as src:
+            decrypt_stream(src, out, key)
+        return out.getvalue()
     return decrypt_bytes(path.read_bytes(), key)
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Raw captured frames shared by hashing, duplicate detection and OCR.
+
+``mss`` hands back each grab as a BGRA ``bytearray`` (``ScreenShot.raw``).
+Its ``.rgb`` property makes a converted copy, and the old capture path then
+copied that again into a Pillow image, encoded it, and decoded the encoding
+once more for the perceptual hash and again for OCR.
+
+``Frame`` wraps the grab's own buffer in a ``memoryview`` instead:
+
+* ``digest()`` SHA-256s the pixel buffer in place (no encoding needed first).
+* ``thumbnail()`` maps the buffer into Pillow without copying
+  (``Image.frombuffer``) and box-downscales it, so the perceptual hash only
+  allocates the hash-sized grid.
+* ``rows()`` gives row ranges as buffer slices for OCR band digests.
+* ``image()`` converts to RGB once, on first use, and caches the result. OCR
+  crops and the codec encoder share that one image.
+
+``mss`` allocates a fresh buffer per grab, so a frame stays valid while later
+grabs run (pipelined OCR / encryption).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Any, Optional, Tuple
+
+from .codecs import ImageCodec, encode_image
+
+_BYTES_PER_PIXEL = {"BGRA": 4, "BGRX": 4, "RGBA": 4, "RGBX": 4, "RGB": 3, "L": 1}
+
+
+class Frame:
+    """One captured frame backed by a raw pixel buffer or a Pillow image.
+
+    Args:
+        buffer: Pixel rows, top to bottom, without padding.
+        size: ``(width, height)`` in pixels.
+        raw_mode: Pixel layout of ``buffer`` (``BGRA`` for mss grabs).
+    """
+
+    def __init__(self, buffer: Any, size: Tuple[int, int], raw_mode: str = "BGRA") -> None:
+        if raw_mode not in _BYTES_PER_PIXEL:
+            raise ValueError(f"unsupported raw mode {raw_mode!r}")
+        self.buffer = memoryview(buffer).cast("B")
+        self.size = (int(size[0]), int(size[1]))
+        self.raw_mode = raw_mode
+        self._image = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_screenshot(cls, shot: Any) -> "Frame":
+        """Wrap an ``mss`` ``ScreenShot`` without copying its pixels."""
+        raw = getattr(shot, "raw", None)
+        if raw is not None:
+            return cls(raw, shot.size, "BGRA")
+        return cls(shot.rgb, shot.size, "RGB")
+
+    @classmethod
+    def from_image(cls, image: Any) -> "Frame":
+        """Wrap an already decoded Pillow image (e.g. from ``ImageGrab``)."""
+        frame = cls.__new__(cls)
+        frame.buffer = None  # materialised by ``pixels`` only if a consumer asks
+        frame.size = tuple(image.size)
+        frame.raw_mode = image.mode
+        frame._image = image
+        frame._lock = threading.Lock()
+        return frame
+
+    @property
+    def width(self) -> int:
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        return self.size[1]
+
+    @property
+    def row_bytes(self) -> int:
+        bpp = _BYTES_PER_PIXEL.get(self.raw_mode)
+        return self.width * (bpp if bpp is not None else len(self.image().getbands()))
+
+    @property
+    def converted(self) -> bool:
+        """True once the RGB image exists (for image-backed frames, always)."""
+        return self._image is not None
+
+    def pixels(self) -> memoryview:
+        """The raw pixel buffer (image-backed frames serialise their image once)."""
+        if self.buffer is None:
+            with self._lock:
+                if self.buffer is None:
+                    self.buffer = memoryview(self._image.tobytes())
+        return self.buffer
+
+    def check(self) -> None:
+        """Raise ``ValueError`` if the buffer does not hold ``size`` pixels."""
+        if self.buffer is None:
+            return
+        if self.width <= 0 or self.height <= 0 or len(self.buffer) != self.row_bytes * self.height:
+            raise ValueError(f"frame buffer holds {len(self.buffer)} bytes, expected {self.size} {self.raw_mode}")
+
+    def digest(self) -> str:
+        """SHA-256 of the pixel buffer (hex)."""
+        return hashlib.sha256(self.pixels()).hexdigest()
+
+    def rows(self, top: int, bottom: int) -> memoryview:
+        """Slice of the buffer holding rows ``top..bottom-1`` (no copy)."""
+        row = self.row_bytes
+        return self.pixels()[top * row:bottom * row]
+
+    def image(self):
+        """RGB Pillow image of the frame, converted on first call and cached."""
+        if self._image is None:
+            with self._lock:
+                if self._image is None:
+                    self._image = self._convert()
+        return self._image
+
+    def thumbnail(self, size: Tuple[int, int]):
+        """Box-downscale to ``size`` (an RGB image) without converting the whole frame."""
+        from PIL import Image  # type: ignore
+
+        if self._image is not None or self.raw_mode not in ("BGRA", "BGRX"):
+            return self.image().resize(size, Image.BOX)
+        # Map the BGRA buffer as RGBA (zero copy) and swap channels on the small result.
+        mapped = Image.frombuffer("RGBA", self.size, self.buffer, "raw", "RGBA", 0, 1)
+        blue, green, red, _ = mapped.resize(size, Image.BOX).split()
+        return Image.merge("RGB", (red, green, blue))
+
+    def encode(self, codec: Optional[ImageCodec] = None) -> bytes:
+        """Encode with ``codec`` (default: the configured one) from the shared RGB image."""
+        return encode_image(self.image(), codec)
+
+    def release(self) -> None:
+        """Drop the cached image and buffer once the frame has been stored."""
+        with self._lock:
+            self._image = None
+            self.buffer = None
+
+    def _convert(self):
+        from PIL import Image  # type: ignore
+
+        if self.raw_mode in ("BGRA", "BGRX"):
+            return Image.frombuffer("RGB", self.size, self.buffer, "raw", "BGRX", 0, 1)
+        if self.raw_mode == "RGB":
+            return Image.frombytes("RGB", self.size, self.buffer)
+        return Image.frombuffer(self.raw_mode, self.size, self.buffer, "raw", self.raw_mode, 0, 1).convert("RGB")
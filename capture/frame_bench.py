@@ -0,0 +1,166 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Frame handoff benchmark: full-frame bytes copied per capture, before and after ``Frame``.
+
+Usage::
+
+    python -m capture.frame_bench --width 2560 --height 1440 --frames 5
+    python -m capture.frame_bench --json
+
+Both paths start from the same BGRA ``mss`` screenshot and do what an in-memory
+capture cycle needs: exact hash, perceptual hash, OCR band digests and one
+stored encoding.
+
+* ``legacy`` is the old handoff: ``ScreenShot.rgb`` -> ``Image.frombytes`` ->
+  encode -> SHA-256 of the encoding -> decode for the perceptual hash -> decode
+  again for OCR -> ``tobytes`` for band digests.
+* ``frame`` wraps the screenshot in ``capture.frame.Frame``.
+
+Every buffer or image a step materialises is tallied. Pillow keeps multi-band
+pixels in 32 bits, so an RGB image counts ``4 * w * h``. ``ScreenShot.rgb``
+counts three times its size: three channel slices, the bytearray they fill, and
+the final ``bytes`` copy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .codecs import encode_image, get_codec
+from .dedup import perceptual_hash
+from .frame import Frame
+from .ocr import IncrementalOCR
+
+PATHS = ("legacy", "frame")
+
+
+@dataclass
+class HandoffResult:
+    """Per-frame copy tally and timing of one handoff path."""
+
+    path: str
+    frames: int
+    bytes_copied_per_frame: int
+    copies_per_frame: int
+    ms_per_frame: float
+    steps: Dict[str, int] = field(default_factory=dict)
+
+
+def _image_bytes(img: Any) -> int:
+    return img.width * img.height * (1 if img.mode in ("1", "L", "P") else 4)
+
+
+def sample_screenshot(width: int, height: int, seed: int = 0):
+    """An ``mss`` ``ScreenShot`` over a synthetic BGRA buffer with some text."""
+    from mss.screenshot import ScreenShot  # type: ignore
+    from PIL import Image, ImageDraw  # type: ignore
+
+    img = Image.new("RGB", (width, height), (246, 246, 246))
+    draw = ImageDraw.Draw(img)
+    for row, y in enumerate(range(12, height - 16, 18)):
+        draw.text((12, y), f"{seed:03d}-{row:04d} the quick brown fox jumps over the lazy dog", fill=(20, 20, 20))
+    raw = bytearray(img.convert("RGBA").tobytes("raw", "BGRA"))
+    return ScreenShot(raw, {"left": 0, "top": 0, "width": width, "height": height})
+
+
+def legacy_handoff(shot: Any, codec=None, ocr: Optional[IncrementalOCR] = None) -> Dict[str, int]:
+    """The pre-``Frame`` in-memory cycle; returns bytes copied per step."""
+    from PIL import Image  # type: ignore
+
+    ocr = ocr or IncrementalOCR()
+    steps: Dict[str, int] = {}
+    rgb = shot.rgb
+    steps["mss .rgb"] = 3 * len(rgb)
+    im = Image.frombytes("RGB", shot.size, rgb)
+    steps["Image.frombytes"] = _image_bytes(im)
+    encoded = encode_image(im, codec)
+    steps["encode"] = len(encoded)
+    hashlib.sha256(encoded).hexdigest()
+    with Image.open(io.BytesIO(encoded)) as decoded:
+        decoded.load()
+        steps["decode for perceptual hash"] = _image_bytes(decoded)
+        perceptual_hash(decoded)
+    with Image.open(io.BytesIO(encoded)) as decoded:
+        rgb_image = decoded.convert("RGB") if decoded.mode != "RGB" else decoded
+        steps["decode for OCR"] = _image_bytes(decoded) + (_image_bytes(rgb_image) if rgb_image is not decoded else 0)
+        steps["band digests (tobytes)"] = rgb_image.width * rgb_image.height * 3
+        ocr._band_digests(rgb_image)
+    return steps
+
+
+def frame_handoff(shot: Any, codec=None, ocr: Optional[IncrementalOCR] = None) -> Dict[str, int]:
+    """The ``Frame`` cycle; returns bytes copied per step."""
+    ocr = ocr or IncrementalOCR()
+    steps: Dict[str, int] = {}
+    frame = Frame.from_screenshot(shot)
+    frame.digest()
+    perceptual_hash(frame)  # only the hash-sized thumbnail is allocated
+    ocr._band_digests(frame)
+    steps["RGB conversion (once)"] = _image_bytes(frame.image())
+    steps["encode"] = len(frame.encode(codec))
+    frame.release()
+    return steps
+
+
+def measure_path(path: str, shots: List[Any], codec_name: str = "png-fast") -> HandoffResult:
+    run = legacy_handoff if path == "legacy" else frame_handoff
+    codec = get_codec(codec_name)
+    timings: List[float] = []
+    tallies: List[Dict[str, int]] = []
+    for shot in shots:
+        started = time.perf_counter()
+        tallies.append(run(shot, codec))
+        timings.append((time.perf_counter() - started) * 1000)
+    steps = {name: int(statistics.fmean(t[name] for t in tallies)) for name in tallies[0]}
+    return HandoffResult(
+        path=path,
+        frames=len(shots),
+        bytes_copied_per_frame=sum(steps.values()),
+        copies_per_frame=len(steps),
+        ms_per_frame=round(statistics.fmean(timings), 2),
+        steps=steps,
+    )
+
+
+def _format_table(results: List[HandoffResult]) -> str:
+    lines = [f"{'path':<8} {'MB copied/frame':>16} {'copies':>7} {'ms/frame':>9}"]
+    for r in results:
+        lines.append(
+            f"{r.path:<8} {r.bytes_copied_per_frame / 1e6:>16.1f} {r.copies_per_frame:>7} {r.ms_per_frame:>9.1f}"
+        )
+        for step, size in r.steps.items():
+            lines.append(f"  {step:<30} {size / 1e6:>8.1f} MB")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare bytes copied per frame before/after the Frame handoff")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--frames", type=int, default=3)
+    parser.add_argument("--codec", default="png-fast", help="Codec for the stored encoding (see capture.codecs)")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args(argv)
+    try:
+        shots = [sample_screenshot(args.width, args.height, seed=i) for i in range(max(1, args.frames))]
+    except ImportError as e:
+        print(f"mss and Pillow are required: {e}", file=sys.stderr)
+        return 2
+    results = [measure_path(path, shots, args.codec) for path in PATHS]
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(_format_table(results))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,199 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+On-disk layout of encrypted captures.
+
+``flat`` (the original layout) writes every ``.png.enc`` / ``.txt.enc`` pair
+directly into ``enc_dir``. ``dated`` partitions them by capture date::
+
+    encrypted/2025/10/02/Inbox_Mozilla_Firefox_2025-10-02_09-30-00.png.enc
+
+The partition comes from the timestamp already embedded in the capture id
+(``generate_filename``), so a capture id resolves to its path with at most two
+``stat`` calls and no directory listing. Ids without a timestamp stay in
+``enc_dir`` itself.
+
+Existing flat archives are moved with the migration tool, which also re-keys
+the catalog and the search indexes (their doc ids are artifact paths)::
+
+    python -m capture.layout --base-dir data --dry-run
+    python -m capture.layout --base-dir data
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .catalog import CATALOG_NAME, CaptureCatalog, capture_id_for
+
+LOGGER = logging.getLogger("hindsight.capture")
+
+LAYOUTS = ("flat", "dated")
+ARTIFACT_SUFFIXES = {"image": ".png.enc", "text": ".txt.enc"}
+_TS_RE = re.compile(r"_(?P<y>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})_\d{2}-\d{2}-\d{2}(?:-\d+)?$")
+
+
+def validate_layout(layout: str) -> str:
+    if layout not in LAYOUTS:
+        raise ValueError(f"unknown layout {layout!r} (expected one of {', '.join(LAYOUTS)})")
+    return layout
+
+
+def partition(capture_id: str) -> Optional[Path]:
+    """Relative ``YYYY/MM/DD`` directory of a capture id, or None if it has no timestamp."""
+    match = _TS_RE.search(capture_id)
+    if match is None:
+        return None
+    return Path(match.group("y"), match.group("m"), match.group("d"))
+
+
+def artifact_dir(enc_dir: Path, capture_id: str, layout: str = "dated") -> Path:
+    """Directory new artifacts of ``capture_id`` are written to under ``layout``."""
+    part = partition(capture_id) if layout == "dated" else None
+    return enc_dir / part if part is not None else enc_dir
+
+
+def resolve(enc_dir: Path, capture_id: str, kind: str = "image") -> Optional[Path]:
+    """Path of an existing artifact (``kind`` is ``image`` or ``text``), in either layout.
+
+    Checks the dated location first, then the flat one; never lists a directory.
+    """
+    name = capture_id + ARTIFACT_SUFFIXES[kind]
+    for directory in (artifact_dir(enc_dir, capture_id, "dated"), enc_dir):
+        path = directory / name
+        if path.exists():
+            return path
+    return None
+
+
+def resolve_pair(enc_dir: Path, capture_id: str) -> Tuple[Optional[Path], Optional[Path]]:
+    """``(image, text)`` artifact paths of ``capture_id`` (None where missing)."""
+    return resolve(enc_dir, capture_id, "image"), resolve(enc_dir, capture_id, "text")
+
+
+@dataclass
+class MigrationReport:
+    """Outcome of ``migrate``.
+
+    Attributes:
+        moved: Artifact files moved into date partitions.
+        captures: Distinct captures touched.
+        skipped: Artifacts left in place (no timestamp in the name).
+        failed: Artifacts that could not be moved.
+        reindexed: Search index documents re-keyed to the new paths.
+    """
+
+    moved: int = 0
+    captures: int = 0
+    skipped: int = 0
+    failed: int = 0
+    reindexed: int = 0
+
+
+def migrate(
+    enc_dir: Path,
+    catalog=None,
+    keyword_index=None,
+    vector_store=None,
+    dry_run: bool = False,
+) -> MigrationReport:
+    """Move flat ``enc_dir`` artifacts into ``YYYY/MM/DD`` partitions.
+
+    References are re-keyed before each file is moved, so an interrupted run is
+    finished by running it again (renames of already re-keyed ids are no-ops).
+    Stop the capture service first; it may otherwise write flat files meanwhile.
+
+    Args:
+        enc_dir: Encrypted capture directory.
+        catalog: ``capture.catalog.CaptureCatalog`` whose paths are updated.
+        keyword_index: ``search.indexer.KeywordIndex`` whose doc ids are updated.
+        vector_store: ``search.vector_store.VectorStore`` whose capture ids are updated.
+        dry_run: Only count what would move.
+    """
+    enc_dir = Path(enc_dir)
+    report = MigrationReport()
+    pending: List[Tuple[str, Path]] = []
+    # One listing of the flat directory; partitions are never scanned.
+    with os.scandir(enc_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(tuple(ARTIFACT_SUFFIXES.values())):
+                pending.append((capture_id_for(entry.name), Path(entry.path)))
+    pending.sort()
+    seen = set()
+    for capture_id, src in pending:
+        target_dir = artifact_dir(enc_dir, capture_id, "dated")
+        if target_dir == enc_dir:
+            report.skipped += 1
+            continue
+        dst = target_dir / src.name
+        if capture_id not in seen:
+            seen.add(capture_id)
+            report.captures += 1
+        if dry_run:
+            report.moved += 1
+            continue
+        try:
+            is_text = src.name.endswith(ARTIFACT_SUFFIXES["text"])
+            if is_text:
+                if keyword_index is not None:
+                    report.reindexed += int(keyword_index.rename(str(src), str(dst)))
+                if vector_store is not None:
+                    report.reindexed += int(vector_store.rename(str(src), str(dst)) > 0)
+            if catalog is not None:
+                catalog.update_paths(
+                    capture_id, None if is_text else str(dst), str(dst) if is_text else None
+                )
+            target_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(src, dst)
+            report.moved += 1
+        except OSError as e:
+            report.failed += 1
+            LOGGER.warning("Layout migration could not move %s: %s", src.name, e)
+    LOGGER.info(
+        "Layout migration%s: %s files of %s captures moved, %s skipped, %s failed",
+        " (dry run)" if dry_run else "",
+        report.moved,
+        report.captures,
+        report.skipped,
+        report.failed,
+    )
+    return report
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Move encrypted captures into YYYY/MM/DD directories")
+    parser.add_argument("--base-dir", type=Path, default=Path("data"))
+    parser.add_argument("--dry-run", action="store_true", help="Report what would move without moving it")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    enc_dir = args.base_dir / "encrypted"
+    index_dir = args.base_dir / "index"
+    catalog = keyword_index = vector_store = None
+    if not args.dry_run:
+        if (enc_dir / CATALOG_NAME).exists():
+            catalog = CaptureCatalog(enc_dir / CATALOG_NAME)
+        if (index_dir / "keyword.sqlite3").exists():
+            from search.indexer import KeywordIndex
+
+            keyword_index = KeywordIndex(index_dir / "keyword.sqlite3")
+        if (index_dir / "vectors" / "ids.sqlite3").exists():
+            try:
+                from search.vector_store import VectorStore
+
+                vector_store = VectorStore(index_dir / "vectors")
+            except RuntimeError as e:
+                LOGGER.warning("Vector store not re-keyed (%s); re-embed after migrating", e)
+    report = migrate(enc_dir, catalog, keyword_index, vector_store, dry_run=args.dry_run)
+    for resource in (catalog, keyword_index, vector_store):
+        if resource is not None:
+            resource.close()
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(_main())
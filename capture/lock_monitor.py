@@ -0,0 +1,337 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Cached screen-lock state, kept current from D-Bus signals.
+
+``CaptureService._is_screen_locked`` used to run its probes on every cycle:
+``loginctl``, then ``gdbus``, ``qdbus`` and ``dbus-send``, each with a one
+second timeout. On desktops where the early probes fail, that is up to four
+forks and four seconds of blocking per interval. ``LockMonitor`` moves that
+work off the capture loop:
+
+* it subscribes to logind ``Session.Lock`` / ``Session.Unlock`` (system bus)
+  and ``ScreenSaver.ActiveChanged`` (session bus, freedesktop and GNOME
+  names) on daemon threads, via jeepney when it is installed;
+* it polls on a background thread. The first probe that answers is
+  remembered and asked first from then on; the others run again only when it
+  stops answering. The poll runs every ``poll_interval`` seconds without
+  signals, and every ``resync_interval`` seconds with them as a safety net;
+* ``locked()`` returns the cached boolean. Only the very first call, before
+  anything is known, probes synchronously.
+
+Buses are injectable: anything with ``add_match(**rule)``,
+``receive(timeout) -> Signal | None`` and ``close()`` works, so tests use a
+stub instead of a real D-Bus.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:  # optional dependency
+    from jeepney import HeaderFields, MatchRule, MessageType  # type: ignore
+    from jeepney.bus_messages import message_bus  # type: ignore
+    from jeepney.io.blocking import open_dbus_connection  # type: ignore
+except ImportError:  # pragma: no cover - optional
+    open_dbus_connection = None  # type: ignore
+
+LOGGER = logging.getLogger("hindsight.capture")
+
+DEFAULT_POLL_INTERVAL = 10.0  # seconds between probes without lock signals
+DEFAULT_RESYNC_INTERVAL = 120.0  # seconds between probes while signals arrive
+
+LOGIND_SESSION = "org.freedesktop.login1.Session"
+SCREENSAVER_INTERFACES = ("org.freedesktop.ScreenSaver", "org.gnome.ScreenSaver")
+
+Probe = Callable[[], Optional[bool]]
+LockListener = Callable[[bool], None]
+
+
+@dataclass(frozen=True)
+class Signal:
+    """A D-Bus signal, reduced to what the monitor matches on."""
+
+    interface: Optional[str]
+    member: Optional[str]
+    path: Optional[str]
+    body: Tuple[Any, ...] = ()
+
+
+def session_path(session_id: str) -> str:
+    """logind object path of a session (``sd_bus_path_encode`` escaping)."""
+    label = "".join(
+        ch if ch.isascii() and ch.isalnum() and not (i == 0 and ch.isdigit()) else "_%02x" % ord(ch)
+        for i, ch in enumerate(session_id)
+    )
+    return "/org/freedesktop/login1/session/" + (label or "_")
+
+
+class _JeepneyBus:
+    """Blocking jeepney connection adapted to the monitor's bus interface."""
+
+    def __init__(self, kind: str) -> None:
+        self._conn = open_dbus_connection(bus=kind)
+
+    def add_match(self, **rule: Any) -> None:
+        self._conn.send_and_get_reply(message_bus.AddMatch(MatchRule(type="signal", **rule)), timeout=1.0)
+
+    def receive(self, timeout: float) -> Optional[Signal]:
+        try:
+            msg = self._conn.receive(timeout=timeout)
+        except TimeoutError:
+            return None
+        if msg.header.message_type != MessageType.signal:
+            return None
+        fields = msg.header.fields
+        return Signal(
+            fields.get(HeaderFields.interface),
+            fields.get(HeaderFields.member),
+            fields.get(HeaderFields.path),
+            tuple(msg.body or ()),
+        )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _connect(kind: str) -> Optional[Any]:
+    if open_dbus_connection is None:
+        return None
+    try:
+        return _JeepneyBus(kind)
+    except Exception as exc:  # no bus, no permission
+        LOGGER.debug("Cannot connect to the %s bus: %s", kind.lower(), exc)
+        return None
+
+
+class LockMonitor:
+    """Screen-lock state served from a cache.
+
+    Args:
+        probes: ``(name, probe)`` pairs in preference order; a probe returns
+            True / False, or None when it cannot tell on this machine.
+        session_id: logind session whose ``Lock`` / ``Unlock`` signals count.
+        buses: ``{"system": bus, "session": bus}`` (either may be missing).
+            None connects with jeepney on ``start``.
+        poll_interval: Seconds between probes while no bus is subscribed.
+        resync_interval: Seconds between probes while signals are subscribed.
+        wait: Seconds a bus thread blocks in ``receive`` before rechecking ``stop``.
+        clock: Monotonic time source (tests).
+    """
+
+    def __init__(
+        self,
+        probes: Sequence[Tuple[str, Probe]],
+        session_id: Optional[str] = None,
+        buses: Optional[Dict[str, Any]] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        resync_interval: float = DEFAULT_RESYNC_INTERVAL,
+        wait: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.poll_interval = max(0.1, poll_interval)
+        self.resync_interval = max(self.poll_interval, resync_interval)
+        self.wait = wait
+        self._probes = list(probes)
+        self._session_path = session_path(session_id) if session_id else None
+        self._buses = buses
+        self._connects = buses is None  # reconnect on every start
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()  # one probe sequence at a time
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._listeners: List[LockListener] = []
+        self._locked: Optional[bool] = None
+        self._source: Optional[str] = None
+        self._probe: Optional[Tuple[str, Probe]] = None
+        self._checked_at: Optional[float] = None
+        self._subscribed = 0
+        self.signals = 0
+        self.probe_runs = 0
+
+    # --- public API ---
+    def start(self) -> "LockMonitor":
+        """Subscribe to lock signals and start polling (idempotent)."""
+        if self._threads:
+            return self
+        self._stop.clear()
+        if self._buses is None:
+            self._buses = {kind: _connect(kind.upper()) for kind in ("system", "session")}
+        for kind, bus in self._buses.items():
+            if bus is not None and self._subscribe(kind, bus):
+                self._spawn(self._run_bus, bus, name="LockSignals-%s" % kind)
+        self._spawn(self._run_poll, name="LockPoll")
+        LOGGER.info(
+            "Screen lock monitor started (signals=%s, poll every %ss)",
+            self.subscribed,
+            self.resync_interval if self.subscribed else self.poll_interval,
+        )
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        for bus in (self._buses or {}).values():
+            if bus is None:
+                continue
+            try:
+                bus.close()
+            except Exception:  # pragma: no cover - already gone
+                pass
+        with self._lock:
+            self._subscribed = 0
+        if self._connects:
+            self._buses = None
+
+    def locked(self) -> bool:
+        """Cached lock state; probes synchronously only while nothing is known yet."""
+        with self._lock:
+            state = self._locked
+        if state is None:
+            return self.refresh()
+        return state
+
+    def refresh(self) -> bool:
+        """Probe now: the remembered probe first, the rest only if it cannot tell."""
+        with self._probe_lock:
+            with self._lock:
+                seen = self.signals
+            remembered = self._probe
+            order = ([remembered] if remembered else []) + [p for p in self._probes if p is not remembered]
+            for entry in order:
+                name, probe = entry
+                try:
+                    value = probe()
+                except Exception as exc:  # a probe must not stop the monitor
+                    LOGGER.debug("Lock probe %s failed: %s", name, exc)
+                    value = None
+                if value is None:
+                    continue
+                if self._probe is None or self._probe[0] != name:
+                    LOGGER.info("Screen lock probe: %s", name)
+                self._probe = entry
+                self._checked(bool(value), name, seen)
+                break
+            else:
+                self._probe = None
+                self._checked(None, None, seen)
+        with self._lock:
+            return bool(self._locked)
+
+    @property
+    def subscribed(self) -> bool:
+        """True while at least one bus delivers lock signals."""
+        with self._lock:
+            return self._subscribed > 0
+
+    def add_listener(self, callback: LockListener) -> None:
+        """Call ``callback(locked)`` whenever the state flips (from a monitor thread)."""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback: LockListener) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "locked": bool(self._locked),
+                "source": self._source,
+                "probe": self._probe[0] if self._probe else None,
+                "signals_subscribed": self._subscribed > 0,
+                "signals": self.signals,
+                "probe_runs": self.probe_runs,
+            }
+
+    # --- internals ---
+    def _spawn(self, target: Callable[..., None], *args: Any, name: str) -> None:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _subscribe(self, kind: str, bus: Any) -> bool:
+        rules: List[Dict[str, str]] = []
+        if kind == "system" and self._session_path:
+            rules = [{"interface": LOGIND_SESSION, "member": m, "path": self._session_path} for m in ("Lock", "Unlock")]
+        elif kind == "session":
+            rules = [{"interface": iface, "member": "ActiveChanged"} for iface in SCREENSAVER_INTERFACES]
+        if not rules:
+            return False
+        try:
+            for rule in rules:
+                bus.add_match(**rule)
+        except Exception as exc:
+            LOGGER.debug("Cannot subscribe to lock signals on the %s bus: %s", kind, exc)
+            return False
+        with self._lock:
+            self._subscribed += 1
+        return True
+
+    def _run_bus(self, bus: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                signal = bus.receive(self.wait)
+            except Exception as exc:
+                if not self._stop.is_set():
+                    LOGGER.warning("Lock signals lost (%s); polling every %ss", exc, self.poll_interval)
+                with self._lock:
+                    self._subscribed -= 1
+                return
+            if signal is not None:
+                self._handle(signal)
+
+    def _run_poll(self) -> None:
+        while not self._stop.is_set():
+            interval = self.resync_interval if self.subscribed else self.poll_interval
+            with self._lock:
+                last = self._checked_at
+            now = self._clock()
+            if last is None or now - last >= interval:
+                self.refresh()
+                continue
+            # Wake at least every poll_interval so a lost subscription is noticed.
+            self._stop.wait(min(last + interval - now, self.poll_interval))
+
+    def _handle(self, signal: Signal) -> None:
+        if signal.interface == LOGIND_SESSION and signal.member in ("Lock", "Unlock"):
+            if self._session_path is not None and signal.path != self._session_path:
+                return
+            self._set(signal.member == "Lock", "logind")
+        elif signal.interface in SCREENSAVER_INTERFACES and signal.member == "ActiveChanged" and signal.body:
+            self._set(bool(signal.body[0]), "screensaver")
+
+    def _checked(self, value: Optional[bool], source: Optional[str], seen: int) -> None:
+        with self._lock:
+            self.probe_runs += 1
+            self._checked_at = self._clock()
+            if self.signals != seen:
+                return  # a signal arrived while probing; it is newer than the answer
+        if value is not None:
+            self._set(value, source, signal=False)
+        else:
+            with self._lock:
+                if self._locked is None:
+                    self._locked = False  # nothing can tell: assume unlocked, as before
+
+    def _set(self, locked: bool, source: Optional[str], signal: bool = True) -> None:
+        with self._lock:
+            if signal:
+                self.signals += 1
+            changed = self._locked is not None and self._locked != locked
+            self._locked = locked
+            self._source = source
+            listeners = list(self._listeners) if changed else []
+        for callback in listeners:
+            try:
+                callback(locked)
+            except Exception as exc:  # a listener must not stop the monitor
+                LOGGER.debug("Lock listener failed: %s", exc)
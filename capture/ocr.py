@@ -3,37 +3,305 @@
 OCR extraction logic using Tesseract.
 
 This module performs OCR over captured screenshots and returns extracted text.
+
+For repeated captures of the same window, ``IncrementalOCR`` keeps the previous
+frame's band grid (full-width horizontal tiles) together with the OCR'd lines
+that fell in each band. A new frame is diffed band by band and Tesseract only
+runs over the changed regions; unchanged bands reuse their cached lines.
+
+Recognition goes through a persistent ``tesserocr`` handle pool
+(``capture.ocr_engine``) when that package is installed, and falls back to a
+``pytesseract`` subprocess per call otherwise.
+
+In-memory captures arrive as a ``capture.frame.Frame``: band digests are taken
+straight from its raw buffer, and the RGB image is only converted when some
+band actually needs recognising.
 """
 
 from __future__ import annotations
 
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .frame import Frame
+from .ocr_engine import load_engine
 
 try:
-    import pytesseract  # type: ignore
     from PIL import Image  # type: ignore
 except ImportError:  # pragma: no cover - optional at scaffold stage
-    pytesseract = None  # type: ignore
     Image = None  # type: ignore
 
+try:  # only needed when no persistent tesserocr engine is configured
+    import pytesseract  # type: ignore
+except ImportError:  # pragma: no cover - optional at scaffold stage
+    pytesseract = None  # type: ignore
+
+DEFAULT_BAND_HEIGHT = 64  # px per tile row; a few text lines
+DEFAULT_MARGIN = 16  # px of context added above/below a dirty run so edge lines are not cut
+FULL_OCR_FRACTION = 0.5  # above this share of dirty bands a single full pass is cheaper
+
 
-def extract_text(image_path: Path, lang: str = "eng") -> str:
-    """Run OCR on the provided image file.
+def _open_image(image_path: Union[Path, bytes, Any]):
+    if isinstance(image_path, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(image_path))
+    if isinstance(image_path, (str, Path)):
+        return Image.open(image_path)
+    return image_path  # already a PIL image or a Frame
+
+
+def extract_text(
+    image_path: Union[Path, bytes, Frame],
+    lang: str = "eng",
+    region_key: Optional[str] = None,
+) -> str:
+    """Run OCR on the provided image.
 
     Args:
-        image_path: Path to the image to process.
+        image_path: Path to the image to process, encoded image bytes, or a
+            raw ``Frame`` (in-memory capture path).
         lang: Tesseract language(s) to use.
+        region_key: Optional stable key for the captured region (e.g. window
+            title). When given, only bands that changed since the previous
+            frame with the same key are re-OCR'd.
 
     Returns:
         str: Extracted text (empty string if OCR unavailable).
     """
-    if pytesseract is None or Image is None:
+    if Image is None:
+        return ""
+    engine = get_engine()
+    if engine is None and pytesseract is None:
         return ""
-    image = Image.open(image_path)
+    image = _open_image(image_path)
+    if region_key is not None:
+        return _INCREMENTAL.extract(image, region_key, lang=lang)
+    if isinstance(image, Frame):
+        image = image.image()
+    if engine is not None:
+        return engine.image_to_string(image, lang=lang)
     return pytesseract.image_to_string(image, lang=lang)
 
 
+_ENGINE_LOCK = threading.Lock()
+_ENGINE: Dict[str, Any] = {"engine": None, "loaded": False, "kind": "auto", "size": 2}
+
+
+def configure_engine(kind: str = "auto", size: int = 2) -> None:
+    """Select the OCR backend used by ``extract_text``.
+
+    Args:
+        kind: ``auto`` (tesserocr when installed), ``tesserocr`` or ``pytesseract``.
+        size: Persistent Tesseract handles kept per language (OCR parallelism).
+    """
+    with _ENGINE_LOCK:
+        old = _ENGINE["engine"]
+        _ENGINE.update(engine=None, loaded=False, kind=kind, size=max(1, size))
+    if old is not None:
+        old.close()
+
+
+def get_engine():
+    """Return the persistent engine, loading it on first use; None means pytesseract."""
+    with _ENGINE_LOCK:
+        if not _ENGINE["loaded"]:
+            _ENGINE["engine"] = load_engine(_ENGINE["kind"], _ENGINE["size"])
+            _ENGINE["loaded"] = True
+        return _ENGINE["engine"]
+
+
+def warmup_engine(lang: str = "eng") -> bool:
+    """Load language data into every pooled handle ahead of the first capture.
+
+    Returns:
+        bool: True if a persistent engine was warmed.
+    """
+    engine = get_engine()
+    if engine is None:
+        return False
+    engine.warmup(lang)
+    return True
+
+
+def engine_stats() -> Dict[str, Any]:
+    """Return counters of the active OCR engine."""
+    engine = get_engine()
+    return engine.stats() if engine is not None else {"engine": "pytesseract"}
+
+
+def _image_to_data(image: Any, lang: str) -> Dict[str, List[Any]]:
+    engine = get_engine()
+    if engine is not None:
+        return engine.image_to_data(image, lang=lang)
+    return pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+
+
+@dataclass
+class _Line:
+    """One OCR'd text line with its absolute position."""
+
+    top: int
+    left: int
+    text: str
+
+
+@dataclass
+class _RegionState:
+    """Cached band digests and per-band lines for one region key."""
+
+    size: Tuple[int, int]
+    digests: List[bytes]
+    lines: List[List[_Line]]
+
+
+class IncrementalOCR:
+    """Per-region band cache that re-OCRs only changed bands.
+
+    Args:
+        band_height: Height in pixels of each tile row.
+        margin: Extra context pixels above/below each dirty run.
+        max_regions: Region keys cached before the least recent is evicted.
+    """
+
+    def __init__(
+        self,
+        band_height: int = DEFAULT_BAND_HEIGHT,
+        margin: int = DEFAULT_MARGIN,
+        max_regions: int = 16,
+    ) -> None:
+        self.band_height = max(8, band_height)
+        self.margin = max(0, margin)
+        self.max_regions = max(1, max_regions)
+        self._states: "OrderedDict[str, _RegionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "frames": 0,
+            "full_passes": 0,
+            "cache_hits": 0,
+            "bands_total": 0,
+            "bands_ocrd": 0,
+        }
+
+    def extract(self, image: Any, key: str, lang: str = "eng") -> str:
+        """OCR ``image`` (PIL image or ``Frame``) reusing cached bands from the previous frame for ``key``."""
+        frame = image if isinstance(image, Frame) else None
+        if frame is None:
+            image = image.convert("RGB") if image.mode != "RGB" else image
+        width, height = image.size
+        digests = self._band_digests(image)
+        with self._lock:
+            previous = self._states.get(key)
+        if previous is None or previous.size != (width, height):
+            dirty = list(range(len(digests)))
+        else:
+            dirty = [i for i, d in enumerate(digests) if previous.digests[i] != d]
+        lines: List[List[_Line]] = (
+            [list(band) for band in previous.lines] if previous is not None and len(dirty) < len(digests)
+            else [[] for _ in digests]
+        )
+        if frame is not None and dirty:
+            image = frame.image()
+        if len(dirty) > len(digests) * FULL_OCR_FRACTION:
+            lines = [[] for _ in digests]
+            self._ocr_rows(image, 0, len(digests) - 1, lines, lang)
+            full = True
+        else:
+            for first, last in _contiguous_runs(dirty):
+                for band in range(first, last + 1):
+                    lines[band] = []
+                self._ocr_rows(image, first, last, lines, lang)
+            full = False
+        state = _RegionState(size=(width, height), digests=digests, lines=lines)
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_regions:
+                self._states.popitem(last=False)
+            self.stats["frames"] += 1
+            self.stats["bands_total"] += len(digests)
+            self.stats["bands_ocrd"] += len(digests) if full else len(dirty)
+            if full:
+                self.stats["full_passes"] += 1
+            elif not dirty:
+                self.stats["cache_hits"] += 1
+        return "\n".join(line.text for band in lines for line in band)
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Forget cached state for ``key`` (or every key)."""
+        with self._lock:
+            if key is None:
+                self._states.clear()
+            else:
+                self._states.pop(key, None)
+
+    def _band_digests(self, image: Any) -> List[bytes]:
+        width, height = image.size
+        if isinstance(image, Frame):
+            rows = image.rows
+        else:
+            raw = memoryview(image.tobytes())
+            row_bytes = width * 3
+            rows = lambda top, bottom: raw[top * row_bytes:bottom * row_bytes]  # noqa: E731
+        digests = []
+        for top in range(0, height, self.band_height):
+            bottom = min(height, top + self.band_height)
+            digests.append(hashlib.blake2b(rows(top, bottom), digest_size=16).digest())
+        return digests
+
+    def _ocr_rows(self, image: Any, first: int, last: int, lines: List[List[_Line]], lang: str) -> None:
+        """OCR bands ``first..last`` and file each line under the band holding its centre."""
+        width, height = image.size
+        y0 = first * self.band_height
+        y1 = min(height, (last + 1) * self.band_height)
+        crop_top = max(0, y0 - self.margin)
+        crop = image.crop((0, crop_top, width, min(height, y1 + self.margin)))
+        data = _image_to_data(crop, lang)
+        for top, left, h, text in _group_lines(data):
+            centre = crop_top + top + h // 2
+            if y0 <= centre < y1:
+                lines[centre // self.band_height].append(_Line(top=crop_top + top, left=left, text=text))
+
+
+def _group_lines(data: Dict[str, List[Any]]) -> List[Tuple[int, int, int, str]]:
+    """Collapse Tesseract word rows into (top, left, height, text) lines in reading order."""
+    grouped: "OrderedDict[Tuple[int, int, int], List[int]]" = OrderedDict()
+    for idx, word in enumerate(data.get("text", [])):
+        if not str(word).strip():
+            continue
+        key = (data["block_num"][idx], data["par_num"][idx], data["line_num"][idx])
+        grouped.setdefault(key, []).append(idx)
+    result = []
+    for indices in grouped.values():
+        top = min(int(data["top"][i]) for i in indices)
+        bottom = max(int(data["top"][i]) + int(data["height"][i]) for i in indices)
+        left = min(int(data["left"][i]) for i in indices)
+        text = " ".join(str(data["text"][i]).strip() for i in indices)
+        result.append((top, left, bottom - top, text))
+    return result
+
+
+def _contiguous_runs(indices: List[int]) -> List[Tuple[int, int]]:
+    runs: List[Tuple[int, int]] = []
+    for idx in indices:
+        if runs and idx == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], idx)
+        else:
+            runs.append((idx, idx))
+    return runs
+
+
+_INCREMENTAL = IncrementalOCR()
+
+
+def incremental_stats() -> Dict[str, int]:
+    """Return counters of the shared incremental OCR cache."""
+    return dict(_INCREMENTAL.stats)
+
+
 def ocr_text_filename(screenshot_filename: str) -> str:
     """Return standardized OCR text filename from a screenshot filename.
 
@@ -44,4 +312,4 @@ def ocr_text_filename(screenshot_filename: str) -> str:
         str: Derived .txt filename.
     """
     base = screenshot_filename.rsplit(".", 1)[0]
-    return f"{base}.txt"
\ No newline at end of file
+    return f"{base}.txt"
@@ -0,0 +1,231 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Persistent in-process Tesseract engines.
+
+``pytesseract`` forks a ``tesseract`` process per call, writes a temp image and
+reloads the language data every time. ``TesserocrPool`` instead keeps a small
+pool of long-lived ``tesserocr.PyTessBaseAPI`` handles (one per concurrent
+caller) with their language models already loaded. Recognition releases the
+GIL, so OCR worker threads run in parallel. A handle that raises is discarded
+and replaced by a fresh one on the next call (graceful restart).
+
+``capture.ocr.extract_text`` uses the pool transparently when ``tesserocr`` is
+installed; otherwise it keeps using ``pytesseract``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:  # optional dependency
+    import tesserocr  # type: ignore
+except ImportError:  # pragma: no cover - optional
+    tesserocr = None  # type: ignore
+
+LOGGER = logging.getLogger("hindsight.capture.ocr")
+
+ENGINE_KINDS = ("auto", "tesserocr", "pytesseract")
+
+
+class TesserocrPool:
+    """Pool of warm ``PyTessBaseAPI`` handles keyed by language.
+
+    Args:
+        size: Maximum concurrent handles per language.
+        path: Optional tessdata directory.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, size: int = 2, path: Optional[str] = None) -> None:
+        if tesserocr is None:
+            raise RuntimeError("tesserocr not installed")
+        self.size = max(1, int(size))
+        self.path = path
+        self._idle: Dict[str, List[Any]] = {}
+        self._created: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._closed = False
+        self.restarts = 0
+        self.calls = 0
+        if self.size > 1:
+            # Each handle is single-threaded; keep Tesseract's own OpenMP threads
+            # from oversubscribing cores on top of our parallel handles.
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    def _new_api(self, lang: str) -> Any:
+        kwargs: Dict[str, Any] = {"lang": lang}
+        if self.path:
+            kwargs["path"] = self.path
+        return tesserocr.PyTessBaseAPI(**kwargs)
+
+    @contextmanager
+    def _api(self, lang: str) -> Iterator[Any]:
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("OCR engine closed")
+                idle = self._idle.setdefault(lang, [])
+                if idle:
+                    api, create = idle.pop(), False
+                    break
+                if self._created.get(lang, 0) < self.size:
+                    self._created[lang] = self._created.get(lang, 0) + 1
+                    api, create = None, True
+                    break
+                # Woken when a handle comes back or a crashed one is retired.
+                self._available.wait()
+        if create:
+            try:
+                api = self._new_api(lang)
+            except Exception:
+                self._release_slot(lang)
+                raise
+        healthy = False
+        try:
+            yield api
+            healthy = True
+        finally:
+            if healthy and not self._closed:
+                with self._available:
+                    idle.append(api)
+                    self._available.notify()
+            else:
+                self._retire(lang, api)
+
+    def _release_slot(self, lang: str) -> None:
+        with self._available:
+            self._created[lang] = max(0, self._created.get(lang, 0) - 1)
+            # A waiter may now build a replacement handle.
+            self._available.notify()
+
+    def _retire(self, lang: str, api: Any) -> None:
+        self._release_slot(lang)
+        try:
+            api.End()
+        except Exception:  # pragma: no cover - handle already broken
+            pass
+
+    def _run(self, lang: str, fn) -> Any:
+        """Call ``fn(api)``; on failure restart the handle and retry once."""
+        self.calls += 1
+        try:
+            with self._api(lang) as api:
+                return fn(api)
+        except Exception as exc:
+            if self._closed:
+                raise
+            self.restarts += 1
+            LOGGER.warning("Tesseract handle failed (%s); restarting it", exc)
+            with self._api(lang) as api:
+                return fn(api)
+
+    def warmup(self, lang: str = "eng") -> None:
+        """Create every handle for ``lang`` now so the first captures don't pay model loading."""
+        handles = []
+        try:
+            with self._lock:
+                idle = self._idle.setdefault(lang, [])
+                missing = self.size - self._created.get(lang, 0)
+                self._created[lang] = self._created.get(lang, 0) + max(0, missing)
+            for _ in range(max(0, missing)):
+                handles.append(self._new_api(lang))
+        finally:
+            with self._available:
+                self._created[lang] -= max(0, missing) - len(handles)
+                idle.extend(handles)
+                self._available.notify_all()
+
+    def image_to_string(self, image: Any, lang: str = "eng") -> str:
+        def _ocr(api):
+            api.SetImage(image)
+            return api.GetUTF8Text()
+
+        return self._run(lang, _ocr)
+
+    def image_to_data(self, image: Any, lang: str = "eng") -> Dict[str, List[Any]]:
+        """Word boxes in ``pytesseract.image_to_data(..., output_type=DICT)`` layout."""
+
+        def _ocr(api):
+            api.SetImage(image)
+            api.Recognize()
+            return _iterate_words(api)
+
+        return self._run(lang, _ocr)
+
+    def close(self) -> None:
+        with self._available:
+            self._closed = True
+            handles = [api for idle in self._idle.values() for api in idle]
+            for idle in self._idle.values():
+                idle.clear()
+            self._available.notify_all()
+        for api in handles:
+            try:
+                api.End()
+            except Exception:  # pragma: no cover
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            handles = dict(self._created)
+        return {"engine": self.name, "handles": handles, "calls": self.calls, "restarts": self.restarts}
+
+
+def _iterate_words(api: Any) -> Dict[str, List[Any]]:
+    RIL = tesserocr.RIL
+    out: Dict[str, List[Any]] = {
+        k: [] for k in ("text", "block_num", "par_num", "line_num", "left", "top", "width", "height", "conf")
+    }
+    iterator = api.GetIterator()
+    if iterator is None:
+        return out
+    block = par = line = 0
+    for word in tesserocr.iterate_level(iterator, RIL.WORD):
+        if word.IsAtBeginningOf(RIL.BLOCK):
+            block, par, line = block + 1, 0, 0
+        if word.IsAtBeginningOf(RIL.PARA):
+            par, line = par + 1, 0
+        if word.IsAtBeginningOf(RIL.TEXTLINE):
+            line += 1
+        box = word.BoundingBox(RIL.WORD)
+        if box is None:
+            continue
+        x1, y1, x2, y2 = box
+        out["text"].append(word.GetUTF8Text(RIL.WORD) or "")
+        out["block_num"].append(block)
+        out["par_num"].append(par)
+        out["line_num"].append(line)
+        out["left"].append(x1)
+        out["top"].append(y1)
+        out["width"].append(x2 - x1)
+        out["height"].append(y2 - y1)
+        out["conf"].append(word.Confidence(RIL.WORD))
+    return out
+
+
+def load_engine(kind: str = "auto", size: int = 2) -> Optional[TesserocrPool]:
+    """Return a persistent engine for ``kind`` or None to use pytesseract.
+
+    Args:
+        kind: ``auto`` (tesserocr when installed), ``tesserocr`` or ``pytesseract``.
+        size: Concurrent handles per language.
+    """
+    kind = (kind or "auto").strip().lower()
+    if kind not in ENGINE_KINDS:
+        LOGGER.warning("Unknown OCR engine %r; using auto", kind)
+        kind = "auto"
+    if kind == "pytesseract" or tesserocr is None:
+        if kind == "tesserocr":
+            LOGGER.warning("tesserocr requested but not installed; falling back to pytesseract")
+        return None
+    try:
+        return TesserocrPool(size=size, path=os.environ.get("HINDSIGHT_TESSDATA") or None)
+    except Exception as exc:  # pragma: no cover - broken install
+        LOGGER.warning("tesserocr unavailable (%s); falling back to pytesseract", exc)
+        return None
@@ -0,0 +1,275 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Bounded worker stages for the capture pipeline.
+
+The scheduler thread only grabs frames; OCR and encryption run on small worker
+pools fed through bounded queues so a slow OCR pass cannot push the capture
+loop off its interval. Each queue applies a backpressure policy when full:
+
+    * ``drop_oldest``: discard the oldest queued job to make room.
+    * ``coalesce``: replace a queued job with the same key (e.g. window title)
+      by the newer one; falls back to ``drop_oldest`` when no key matches.
+    * ``block``: wait for space (bounded by the caller's timeout).
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+LOGGER = logging.getLogger("hindsight.capture.pipeline")
+
+BACKPRESSURE_POLICIES = ("drop_oldest", "coalesce", "block")
+
+
+class StageQueue:
+    """Bounded FIFO queue with a configurable overflow policy.
+
+    Args:
+        maxsize: Maximum number of queued items (>= 1).
+        policy: One of ``BACKPRESSURE_POLICIES``.
+        key_fn: Coalescing key extractor (only used by ``coalesce``).
+        on_drop: Callback invoked with each item discarded by the policy.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4,
+        policy: str = "drop_oldest",
+        key_fn: Optional[Callable[[Any], Any]] = None,
+        on_drop: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy!r}")
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+        self._key_fn = key_fn
+        self._on_drop = on_drop
+        self._items: Deque[Any] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.enqueued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """Enqueue an item applying the overflow policy.
+
+        Returns:
+            bool: False if the item itself was rejected (closed queue or
+            ``block`` timed out), True otherwise.
+        """
+        dropped: List[Any] = []
+        accepted = True
+        with self._cond:
+            if self._closed:
+                return False
+            replaced = False
+            if self.policy == "coalesce" and self._key_fn is not None:
+                key = self._key_fn(item)
+                for idx, queued in enumerate(self._items):
+                    if self._key_fn(queued) == key:
+                        dropped.append(queued)
+                        self._items[idx] = item
+                        self.coalesced += 1
+                        replaced = True
+                        break
+            if not replaced:
+                if len(self._items) >= self.maxsize and self.policy == "block":
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    if len(self._items) >= self.maxsize or self._closed:
+                        accepted = False
+                        self.dropped += 1
+                        dropped.append(item)
+                elif len(self._items) >= self.maxsize:
+                    dropped.append(self._items.popleft())
+                    self.dropped += 1
+                if accepted:
+                    self._items.append(item)
+            if accepted:
+                self.enqueued += 1
+                self.high_water = max(self.high_water, len(self._items))
+                self._cond.notify_all()
+        for victim in dropped:
+            self._discard(victim)
+        return accepted
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Dequeue the oldest item; raises ``queue.Empty`` on timeout or close."""
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._items:
+                if self._closed:
+                    raise queue.Empty
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._cond.wait(remaining)
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def open(self) -> None:
+        """Accept puts again after ``close``."""
+        with self._cond:
+            self._closed = False
+
+    def close(self) -> None:
+        """Reject further puts and wake any waiters."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def drain(self) -> List[Any]:
+        """Remove and return all queued items."""
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+            self._cond.notify_all()
+            return items
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def _discard(self, item: Any) -> None:
+        if self._on_drop is None:
+            return
+        try:
+            self._on_drop(item)
+        except Exception:  # pragma: no cover - cleanup is best effort
+            LOGGER.debug("on_drop callback failed", exc_info=True)
+
+
+class Stage:
+    """A named worker pool draining a ``StageQueue`` through ``handler``.
+
+    Args:
+        name: Stage name (used for thread names and metrics).
+        handler: Callable processing one item.
+        workers: Number of worker threads.
+        maxsize: Queue capacity.
+        policy: Backpressure policy applied by ``submit``.
+        key_fn: Coalescing key extractor.
+        on_drop: Called for items discarded by backpressure or shutdown.
+        on_error: Called with ``(item, exc)`` when ``handler`` raises.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], None],
+        workers: int = 1,
+        maxsize: int = 4,
+        policy: str = "drop_oldest",
+        key_fn: Optional[Callable[[Any], Any]] = None,
+        on_drop: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Any, BaseException], None]] = None,
+    ) -> None:
+        self.name = name
+        self.workers = max(1, int(workers))
+        self._handler = handler
+        self._on_error = on_error
+        self._on_drop = on_drop
+        self.queue = StageQueue(maxsize=maxsize, policy=policy, key_fn=key_fn, on_drop=on_drop)
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._busy = 0
+        self.processed = 0
+        self.failed = 0
+        self._last_ms: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self.queue.open()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> bool:
+        return self.queue.put(item, timeout=timeout)
+
+    def stop(self, timeout: Optional[float] = 5.0, drain: bool = True) -> None:
+        """Stop workers; with ``drain`` queued items are processed first."""
+        if not drain:
+            for item in self.queue.drain():
+                self.queue._discard(item)
+        self.queue.close()
+        self._stop.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for t in self._threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            t.join(remaining)
+        # Anything still queued after the deadline never reaches the handler.
+        for item in self.queue.drain():
+            self.queue._discard(item)
+
+    def _work(self) -> None:
+        while True:
+            try:
+                item = self.queue.get(timeout=0.25)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            with self._lock:
+                self._busy += 1
+            started = time.monotonic()
+            try:
+                self._handler(item)
+                with self._lock:
+                    self.processed += 1
+            except Exception as exc:
+                with self._lock:
+                    self.failed += 1
+                if self._on_error is not None:
+                    try:
+                        self._on_error(item, exc)
+                    except Exception:  # pragma: no cover
+                        LOGGER.exception("Stage %s error callback failed", self.name)
+                else:  # pragma: no cover
+                    LOGGER.exception("Stage %s handler failed: %s", self.name, exc)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    self._last_ms = round((time.monotonic() - started) * 1000.0, 1)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of queue and worker counters."""
+        with self._lock:
+            busy, processed, failed, last_ms = self._busy, self.processed, self.failed, self._last_ms
+        q = self.queue
+        return {
+            "depth": len(q),
+            "capacity": q.maxsize,
+            "high_water": q.high_water,
+            "policy": q.policy,
+            "workers": self.workers,
+            "busy": busy,
+            "enqueued": q.enqueued,
+            "processed": processed,
+            "failed": failed,
+            "dropped": q.dropped,
+            "coalesced": q.coalesced,
+            "last_ms": last_ms,
+        }
@@ -0,0 +1,344 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Retention: delete captures older than ``retention_days``.
+
+Expired captures are found without walking the archive:
+
+* with the capture catalog, one indexed range query (``ts <= cutoff``);
+* otherwise from ``YYYY/MM/DD`` partitions (only day directories older than
+  the cutoff day are listed) plus one listing of any flat legacy files, whose
+  names carry their capture date. Without the catalog retention works at day
+  granularity.
+
+Captures are deleted oldest first in small batches with a pause between
+batches (``max_deletes_per_sec``), so a large backlog after raising the
+retention window or a long shutdown drains gradually instead of competing with
+capture for disk IO. For each capture the engine removes both ``.enc`` files,
+its keyword index document (decrypting the text first when a key is given, so
+its terms are purged from the contentless FTS table too), its vectors and
+finally tombstones the catalog row. Captures kept in segment files
+(``capture.segments``) are dropped from the segment index instead, and the
+segments are compacted after each pass.
+
+``retention_days`` comes from ``HINDSIGHT_RETENTION_DAYS`` or
+``config/default.yaml``; 0 keeps everything.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .catalog import capture_id_for
+from .config import setting
+from .layout import ARTIFACT_SUFFIXES, partition
+from .screenshot import filename_date, filename_timestamp
+
+LOGGER = logging.getLogger("hindsight.capture")
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_DELETES_PER_SEC = 20.0
+DEFAULT_RUN_INTERVAL = 3600.0  # seconds between retention passes in the capture service
+
+
+def configured_retention_days(config_path: Optional[Path] = None) -> int:
+    """``retention_days`` from HINDSIGHT_RETENTION_DAYS, else the config file (0 = keep forever)."""
+    value = setting("HINDSIGHT_RETENTION_DAYS", "retention_days", "0", config_path)
+    try:
+        return max(0, int(value))
+    except ValueError:
+        LOGGER.warning("Ignoring invalid retention_days=%r (keeping everything)", value)
+        return 0
+
+
+@dataclass
+class ExpiredCapture:
+    """A capture selected for deletion."""
+
+    capture_id: str
+    image_path: Optional[Path]
+    text_path: Optional[Path]
+    catalog_id: Optional[int] = None
+
+
+@dataclass
+class RetentionReport:
+    """Outcome of one or more retention batches.
+
+    Attributes:
+        deleted: Captures removed.
+        reclaimed_bytes: Bytes of ``.enc`` files deleted.
+        keyword_docs: Keyword index documents removed.
+        vectors: Vector rows removed.
+        failed: Artifacts that could not be deleted (retried next pass).
+        batches: Batches run.
+        more: True if expired captures remain (the run was stopped early).
+    """
+
+    deleted: int = 0
+    reclaimed_bytes: int = 0
+    keyword_docs: int = 0
+    vectors: int = 0
+    failed: int = 0
+    batches: int = 0
+    more: bool = False
+
+    def merge(self, other: "RetentionReport") -> None:
+        for name in ("deleted", "reclaimed_bytes", "keyword_docs", "vectors", "failed", "batches"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.more = other.more
+
+
+class RetentionEngine:
+    """Deletes expired captures and their index entries in rate-limited batches.
+
+    Args:
+        enc_dir: Encrypted capture directory (flat or dated layout).
+        days: Retention window; captures older than this are deleted (0 disables).
+        catalog: ``capture.catalog.CaptureCatalog`` used to find expired captures.
+        keyword_index: ``search.indexer.KeywordIndex`` to purge.
+        vector_store: ``search.vector_store.VectorStore`` to purge.
+        segments: ``capture.segments.SegmentStore`` holding packed artifacts.
+        key: Data key; lets the keyword index purge the deleted text's terms.
+        decrypt: Override for ``capture.segments.read_artifact``.
+        batch_size: Captures deleted per batch.
+        max_deletes_per_sec: Deletion rate cap (None = unthrottled).
+        clock: Wall-clock time source (tests).
+        sleep: Sleep function used between batches (tests).
+    """
+
+    def __init__(
+        self,
+        enc_dir: Path,
+        days: int,
+        catalog=None,
+        keyword_index=None,
+        vector_store=None,
+        segments=None,
+        key: Optional[bytes] = None,
+        decrypt: Optional[Callable[[Path, bytes], bytes]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_deletes_per_sec: Optional[float] = DEFAULT_MAX_DELETES_PER_SEC,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.enc_dir = Path(enc_dir)
+        self.days = max(0, int(days))
+        self.catalog = catalog
+        self.keyword_index = keyword_index
+        self.vector_store = vector_store
+        self.segments = segments
+        self.key = key
+        self._decrypt = decrypt
+        self.batch_size = max(1, batch_size)
+        self.max_deletes_per_sec = max_deletes_per_sec if max_deletes_per_sec and max_deletes_per_sec > 0 else None
+        self._clock = clock
+        self._sleep = sleep
+        self.totals = RetentionReport()
+        self._last_run_utc: Optional[str] = None
+
+    def cutoff(self, now: Optional[float] = None) -> float:
+        """Epoch seconds before which captures are expired."""
+        return (self._clock() if now is None else now) - self.days * 86400
+
+    def expired(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[ExpiredCapture]:
+        """Expired captures, oldest first (at most ``limit``)."""
+        if self.days == 0:
+            return []
+        cutoff = self.cutoff(now)
+        if self.catalog is not None:
+            return [
+                ExpiredCapture(
+                    e.capture_id,
+                    Path(e.image_path) if e.image_path else None,
+                    Path(e.text_path) if e.text_path else None,
+                    e.id,
+                )
+                for e in self.catalog.query(end=cutoff, limit=limit)
+            ]
+        return self._expired_from_partitions(filename_date(cutoff), limit)
+
+    def run_batch(self, now: Optional[float] = None) -> RetentionReport:
+        """Delete up to ``batch_size`` expired captures."""
+        report = RetentionReport()
+        batch = self.expired(now, limit=self.batch_size + 1)
+        report.more = len(batch) > self.batch_size
+        batch = batch[: self.batch_size]
+        if not batch:
+            return report
+        report.batches = 1
+        docs: List[Tuple[str, Optional[str]]] = []
+        deleted_ids: List[int] = []
+        touched_dirs = set()
+        packed: List[str] = []
+        for capture in batch:
+            # Read before unlinking: the FTS terms can only be purged with the original text.
+            text = self._read_text(capture.text_path) if capture.text_path is not None else None
+            ok = True
+            for path in (capture.image_path, capture.text_path):
+                if path is None:
+                    continue
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                    report.reclaimed_bytes += size
+                    touched_dirs.add(path.parent)
+                except FileNotFoundError:
+                    if self.segments is not None and self.segments.contains(path.name):
+                        packed.append(path.name)
+                except OSError as e:
+                    ok = False
+                    report.failed += 1
+                    LOGGER.warning("Retention could not delete %s: %s", path.name, e)
+            if ok:
+                report.deleted += 1
+                # Only captures that actually left disk leave the search indexes; a
+                # capture that failed to delete stays fully searchable until a retry.
+                if capture.text_path is not None:
+                    docs.append((str(capture.text_path), text))
+                if capture.catalog_id is not None:
+                    deleted_ids.append(capture.catalog_id)
+        if packed:
+            report.reclaimed_bytes += self.segments.delete(packed)
+        if self.keyword_index is not None and docs:
+            report.keyword_docs = self.keyword_index.remove_many(docs)
+        if self.vector_store is not None and docs:
+            report.vectors = self.vector_store.remove(doc for doc, _ in docs)
+        if self.catalog is not None:
+            self.catalog.mark_deleted(deleted_ids)
+        self._prune_dirs(touched_dirs)
+        if report.failed and not report.deleted:
+            report.more = False  # nothing deletable left; do not spin on the same failures
+        return report
+
+    def run(
+        self,
+        now: Optional[float] = None,
+        stop: Optional[Callable[[], bool]] = None,
+        max_batches: Optional[int] = None,
+    ) -> RetentionReport:
+        """Delete expired captures batch by batch, pacing to ``max_deletes_per_sec``.
+
+        Args:
+            now: Reference time (default: the clock).
+            stop: Checked between batches; returning True ends the run early.
+            max_batches: Upper bound on batches in this run.
+        """
+        total = RetentionReport()
+        while True:
+            started = time.monotonic()
+            report = self.run_batch(now)
+            total.merge(report)
+            if not report.more or (max_batches is not None and total.batches >= max_batches):
+                break
+            if stop is not None and stop():
+                break
+            if self.max_deletes_per_sec is not None:
+                pause = report.deleted / self.max_deletes_per_sec - (time.monotonic() - started)
+                if pause > 0:
+                    self._sleep(pause)
+        if self.segments is not None and total.deleted:
+            self.segments.compact()
+        self.totals.merge(total)
+        self.totals.more = total.more
+        self._last_run_utc = datetime.now(timezone.utc).isoformat()
+        if total.deleted:
+            LOGGER.info(
+                "Retention deleted %s captures older than %s days (%s bytes)",
+                total.deleted,
+                self.days,
+                total.reclaimed_bytes,
+            )
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        """Cumulative counters for ``status.json``."""
+        stats = asdict(self.totals)
+        stats.update(retention_days=self.days, last_run_utc=self._last_run_utc)
+        return stats
+
+    # --- internals ---
+    def _read_text(self, path: Path) -> Optional[str]:
+        if self.key is None or self.keyword_index is None:
+            return None
+        decrypt = self._decrypt
+        if decrypt is None:
+            from .segments import read_artifact as decrypt
+        try:
+            return decrypt(path, self.key).decode("utf-8", errors="replace")
+        except Exception:  # noqa: BLE001 - the doc is still removed, only its terms linger
+            return None
+
+    def _expired_from_partitions(self, cutoff_day: date, limit: Optional[int]) -> List[ExpiredCapture]:
+        """Captures from days before ``cutoff_day``: dated partitions plus flat legacy files."""
+        found: Dict[str, Dict[str, Path]] = {}
+
+        def _collect(directory: Path) -> None:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    for kind, suffix in ARTIFACT_SUFFIXES.items():
+                        if entry.is_file() and entry.name.endswith(suffix):
+                            cid = capture_id_for(entry.name)
+                            day = _partition_day(cid)
+                            if day is not None and day < cutoff_day:
+                                found.setdefault(cid, {})[kind] = Path(entry.path)
+
+        if self.enc_dir.is_dir():
+            _collect(self.enc_dir)
+            for day_dir in _day_dirs(self.enc_dir, cutoff_day):
+                _collect(day_dir)
+        if self.segments is not None:
+            cutoff_ts = filename_timestamp(cutoff_day.strftime("%Y-%m-%d") + "_00-00-00")
+            for name, _ts in self.segments.names(end=cutoff_ts):
+                for kind, suffix in ARTIFACT_SUFFIXES.items():
+                    if name.endswith(suffix):
+                        found.setdefault(capture_id_for(name), {})[kind] = self.enc_dir / name
+        ordered = sorted(found.items(), key=lambda item: (_partition_day(item[0]) or date.min, item[0]))
+        if limit is not None:
+            ordered = ordered[:limit]
+        return [ExpiredCapture(cid, paths.get("image"), paths.get("text")) for cid, paths in ordered]
+
+    def _prune_dirs(self, dirs) -> None:
+        """Remove day/month/year partition directories left empty."""
+        for directory in sorted(dirs, key=lambda d: len(d.parts), reverse=True):
+            while directory != self.enc_dir and self.enc_dir in directory.parents:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break
+                directory = directory.parent
+
+
+def _partition_day(capture_id: str) -> Optional[date]:
+    part = partition(capture_id)
+    if part is None:
+        return None
+    try:
+        return date(*(int(p) for p in part.parts))
+    except ValueError:
+        return None
+
+
+def _day_dirs(enc_dir: Path, before: date) -> List[Path]:
+    """``YYYY/MM/DD`` directories under ``enc_dir`` for days before ``before``."""
+    days = []
+    for year in sorted(p for p in enc_dir.iterdir() if p.is_dir() and p.name.isdigit() and len(p.name) == 4):
+        if int(year.name) > before.year:
+            break
+        for month in sorted(p for p in year.iterdir() if p.is_dir() and p.name.isdigit()):
+            if (int(year.name), int(month.name)) > (before.year, before.month):
+                break
+            for day in sorted(p for p in month.iterdir() if p.is_dir() and p.name.isdigit()):
+                try:
+                    when = date(int(year.name), int(month.name), int(day.name))
+                except ValueError:
+                    continue
+                if when >= before:
+                    break
+                days.append(day)
+    return days
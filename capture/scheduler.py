@@ -0,0 +1,176 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Adaptive capture scheduling.
+
+The fixed loop wakes every ``interval`` seconds whether or not anything
+changed, and most wakeups end as duplicates. ``AdaptiveScheduler`` instead:
+
+* backs off while nothing changes: every capture that produced no new frame
+  (duplicate, screen locked) multiplies the wait by ``backoff``, up to
+  ``max_interval``. A new frame resets it to ``interval``;
+* captures promptly on window events (focus or title change from the X11
+  window tracker). It waits ``settle`` seconds so the window can repaint, and
+  events arriving meanwhile collapse into one capture. Activity also resets
+  the backoff;
+* rate limits event-driven captures with a token bucket. At most ``burst``
+  captures run back to back, then one more every ``refill`` seconds. Events
+  beyond that wait for a token or for the next timer capture, whichever comes
+  first.
+
+A short-lived window is therefore captured when it appears, not only if it
+happens to be open on the next tick, while an idle desktop is sampled ever
+more rarely.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+DEFAULT_MAX_INTERVAL = 60.0  # seconds; idle back-off ceiling
+DEFAULT_BACKOFF = 2.0
+DEFAULT_SETTLE = 0.3  # seconds between a window event and its capture
+DEFAULT_BURST = 3  # event-driven captures allowed back to back
+DEFAULT_REFILL = 2.0  # seconds per additional event-driven capture
+
+TIMER = "timer"
+
+
+class AdaptiveScheduler:
+    """Decides when the capture loop runs next.
+
+    Args:
+        interval: Base seconds between timer captures.
+        max_interval: Ceiling for the idle back-off.
+        backoff: Factor applied per consecutive capture without a new frame.
+        settle: Delay between a window event and the capture it triggers.
+        burst: Token bucket capacity for event-driven captures.
+        refill: Seconds to earn one token back.
+        clock: Monotonic time source (tests).
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        backoff: float = DEFAULT_BACKOFF,
+        settle: float = DEFAULT_SETTLE,
+        burst: int = DEFAULT_BURST,
+        refill: float = DEFAULT_REFILL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.interval = max(0.01, interval)
+        self.max_interval = max(self.interval, max_interval)
+        self.backoff = max(1.0, backoff)
+        self.settle = max(0.0, settle)
+        self.burst = max(1, burst)
+        self.refill = max(0.01, refill)
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._current = self.interval
+        self._idle_streak = 0
+        self._last: Optional[float] = None
+        self._pending: Optional[str] = None
+        self._pending_at = 0.0
+        self._tokens = float(self.burst)
+        self._tokens_at = clock()
+        self._interrupted = False
+        self._counts = {"timer": 0, "triggered": 0, "coalesced": 0, "rate_limited": 0}
+        self._limited = False
+        self.last_reason: Optional[str] = None
+
+    def trigger(self, reason: str, *_: Any) -> None:
+        """Request a prompt capture (window tracker callback; any thread)."""
+        with self._cond:
+            if self._pending is None:
+                self._pending_at = self._clock()
+                self._limited = False
+            else:
+                self._counts["coalesced"] += 1
+            self._pending = reason
+            # Activity: resume polling at the base rate.
+            self._current = self.interval
+            self._idle_streak = 0
+            self._cond.notify_all()
+
+    def interrupt(self) -> None:
+        """Wake ``wait`` so the loop can observe its stop flag."""
+        with self._cond:
+            self._interrupted = True
+            self._cond.notify_all()
+
+    def wait(self, stop: Optional[threading.Event] = None) -> Optional[str]:
+        """Block until the next capture is due.
+
+        Returns:
+            str | None: ``timer`` or the triggering event's reason; None once
+            interrupted or ``stop`` is set.
+        """
+        with self._cond:
+            self._interrupted = False
+            while True:
+                if self._interrupted or (stop is not None and stop.is_set()):
+                    return None
+                now = self._clock()
+                due, reason = self._next(now)
+                if due <= now:
+                    return self._fire(now, reason)
+                self._cond.wait(due - now)
+
+    def record(self, new_frame: bool) -> None:
+        """Feed back a capture's outcome: a new frame resets the back-off."""
+        with self._cond:
+            if new_frame:
+                self._idle_streak = 0
+                self._current = self.interval
+            else:
+                self._idle_streak += 1
+                self._current = min(self.max_interval, self.interval * self.backoff ** self._idle_streak)
+
+    @property
+    def current_interval(self) -> float:
+        with self._cond:
+            return self._current
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "interval_sec": round(self._current, 3),
+                "idle_streak": self._idle_streak,
+                "last_trigger": self.last_reason,
+                **self._counts,
+            }
+
+    # --- internals (called with the condition held) ---
+    def _next(self, now: float) -> Tuple[float, str]:
+        """When the next capture is due and why."""
+        timer_due = now if self._last is None else self._last + self._current
+        if self._pending is None:
+            return timer_due, TIMER
+        self._refill_tokens(now)
+        token_due = now if self._tokens >= 1.0 else now + (1.0 - self._tokens) * self.refill
+        if token_due > now and not self._limited:
+            self._limited = True
+            self._counts["rate_limited"] += 1
+        event_due = max(self._pending_at + self.settle, token_due)
+        if event_due < timer_due:
+            return event_due, self._pending
+        return timer_due, TIMER
+
+    def _fire(self, now: float, reason: str) -> str:
+        if reason == TIMER:
+            self._counts["timer"] += 1
+        else:
+            self._tokens -= 1.0
+            self._counts["triggered"] += 1
+        # A timer capture also satisfies any pending event.
+        self._pending = None
+        self._last = now
+        self.last_reason = reason
+        return reason
+
+    def _refill_tokens(self, now: float) -> None:
+        elapsed = max(0.0, now - self._tokens_at)
+        self._tokens = min(float(self.burst), self._tokens + elapsed / self.refill)
+        self._tokens_at = now
@@ -93,10 +93,60 @@ def _current_time_with_prefs() -> _dt.datetime:
     return now_utc + (_dt.timedelta(hours=1) if dst_adjust else _dt.timedelta())
 
 
-def generate_filename(window_title: str, ts: Optional[_dt.datetime] = None) -> str:
+FILENAME_TS_FORMAT = "%Y-%m-%d_%H-%M-%S"
+
+
+def _dst_adjust() -> _dt.timedelta:
+    on = os.environ.get("HINDSIGHT_DST_ADJUST", "0") in {"1", "TRUE", "YES", "Y"}
+    return _dt.timedelta(hours=1) if on else _dt.timedelta()
+
+
+def _filename_offset() -> Optional[_dt.timedelta]:
+    """UTC offset of the wall clock ``generate_filename`` writes; None means system local time.
+
+    Mirrors ``_current_time_with_prefs`` (including the DST hour), so a timestamp
+    read back from a file name is the epoch it was written at.
+    """
+    spec = os.environ.get("HINDSIGHT_TZ_SPEC", "UTC").strip().upper()
+    dst = _dst_adjust()
+    if spec == "LOCAL":
+        return None
+    if re.match(r"^[+-]\d{4}$", spec):
+        sign = -1 if spec[0] == '-' else 1
+        return sign * _dt.timedelta(hours=int(spec[1:3]), minutes=int(spec[3:5])) + dst
+    return dst  # UTC (and the UTC fallback for unknown specs)
+
+
+def filename_timestamp(stamp: str) -> float:
+    """Epoch seconds of a ``YYYY-MM-DD_HH-MM-SS`` file-name stamp.
+
+    The stamp is read in the zone of ``HINDSIGHT_TZ_SPEC`` (the one it was
+    written in), not the host's local zone. Names written under another spec
+    are off by the difference between the two.
+
+    Raises:
+        ValueError: If ``stamp`` is not in ``FILENAME_TS_FORMAT``.
+    """
+    wall = _dt.datetime.strptime(stamp, FILENAME_TS_FORMAT)
+    offset = _filename_offset()
+    if offset is None:
+        return (wall - _dst_adjust()).timestamp()
+    return wall.replace(tzinfo=_dt.timezone(offset)).timestamp()
+
+
+def filename_date(ts: float) -> _dt.date:
+    """Calendar date a capture at epoch ``ts`` carries in its file name."""
+    offset = _filename_offset()
+    if offset is None:
+        return (_dt.datetime.fromtimestamp(ts) + _dst_adjust()).date()
+    return _dt.datetime.fromtimestamp(ts, _dt.timezone(offset)).date()
+
+
+def generate_filename(window_title: str, ts: Optional[_dt.datetime] = None, seq: int = 0) -> str:
     """Generate a standardized filename for a capture.
 
-    Format: WINDOW-TITLE_YYYY-MM-DD_HH-MM-SS.png
+    Format: WINDOW-TITLE_YYYY-MM-DD_HH-MM-SS.png, or WINDOW-TITLE_YYYY-MM-DD_HH-MM-SS-N.png
+    when ``seq`` (N > 0) tells apart several captures of one window within the same second.
 
     If ``ts`` is omitted we compute the current time using timezone preferences supplied via
     environment variables (set by the Electron layer). Explicit ``ts`` always wins (tests rely on
@@ -108,6 +158,7 @@ def generate_filename(window_title: str, ts: Optional[_dt.datetime] = None) -> s
     cleaned = re.sub(r"[^A-Za-z0-9]+", "_", window_title.strip())
     cleaned = re.sub(r"_+", "_", cleaned).strip("_") or "window"
     safe_title = cleaned[:80]
-    filename = f"{safe_title}_{ts.strftime('%Y-%m-%d_%H-%M-%S')}.png"
+    stamp = ts.strftime(FILENAME_TS_FORMAT) + (f"-{seq}" if seq > 0 else "")
+    filename = f"{safe_title}_{stamp}.png"
     filename = filename.replace("\n", "").replace("\r", "")
     return filename
\ No newline at end of file
@@ -0,0 +1,402 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Segment (pack-file) storage for encrypted captures.
+
+Instead of two small ``.enc`` files per capture, artifacts can be appended to
+rolling segment files under ``enc_dir/segments/``. An SQLite offset index maps
+each artifact name (``X.png.enc`` / ``X.txt.enc``) to its record, so a read
+seeks straight to one record and decrypts only that record.
+
+Segment layout::
+
+    header   = b"HRS1" | salt (16)
+    record_i = sealed_len (u32 BE) | nonce (12) | AES-GCM(segment_key, nonce, plaintext, aad=header | name)
+
+``segment_key`` is HKDF-SHA256 of the Fernet data key with the segment salt
+(as for the chunked container in ``capture.encryption``). Binding the name in
+the AAD means a record cannot be swapped for another one undetected.
+
+The active segment is sealed once it reaches ``max_bytes`` or ``max_age``
+seconds; sealed segments are never appended to again. A record is written and
+flushed before its index row commits, and on open the active segment is cut
+back to the last committed offset, so a crash mid-append leaves no torn record.
+Deleting records (retention) only updates the index; ``compact()`` then
+rewrites sealed segments whose dead fraction is high by copying the live
+ciphertext into a new segment (no re-encryption) and drops empty ones.
+
+Artifacts stored here keep their usual path (``enc_dir/X.txt.enc``) as their
+id in the catalog and search indexes; ``read_artifact`` resolves such a path
+from a segment when no file exists.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .encryption import _file_key, decrypt_file
+
+LOGGER = logging.getLogger("hindsight.capture")
+
+SEGMENT_MAGIC = b"HRS1"
+SEGMENTS_DIR = "segments"
+INDEX_NAME = "index.sqlite3"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE = 3600.0  # seconds
+DEFAULT_COMPACT_RATIO = 0.5  # dead fraction at which a sealed segment is rewritten
+
+_HEADER = struct.Struct(">4s16s")
+_RECORD = struct.Struct(">I12s")
+_HKDF_INFO = b"hindsight-recall segment v1"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS segments ("
+    " name TEXT PRIMARY KEY, created REAL NOT NULL, sealed INTEGER NOT NULL DEFAULT 0,"
+    " bytes INTEGER NOT NULL, dead_bytes INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE IF NOT EXISTS records ("
+    " name TEXT PRIMARY KEY, segment TEXT NOT NULL, offset INTEGER NOT NULL,"
+    " length INTEGER NOT NULL, ts REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS records_segment ON records(segment)",
+    "CREATE INDEX IF NOT EXISTS records_ts ON records(ts)",
+)
+
+
+@dataclass
+class CompactionReport:
+    """Outcome of ``SegmentStore.compact``.
+
+    Attributes:
+        rewritten: Segments rewritten without their dead records.
+        dropped: Segments deleted because no live record was left.
+        reclaimed_bytes: Disk bytes freed.
+    """
+
+    rewritten: int = 0
+    dropped: int = 0
+    reclaimed_bytes: int = 0
+
+
+class SegmentStore:
+    """Append-only encrypted segment files with an SQLite offset index.
+
+    Opened with a key it is the writer and repairs torn appends on open; without
+    one it is a read-only view (e.g. the search UI) that passes keys to ``read``.
+
+    Args:
+        root: Directory holding ``seg-*.hrs`` files and the index.
+        key: Fernet data key (required to append; reads may pass their own).
+        max_bytes: Size at which the active segment is sealed.
+        max_age: Seconds after which the active segment is sealed.
+        clock: Wall-clock time source (tests).
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        key: Optional[bytes] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age: float = DEFAULT_MAX_AGE,
+        clock=time.time,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.key = key
+        self.max_bytes = max(_HEADER.size + 1, max_bytes)
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._aeads: Dict[Tuple[str, bytes], Any] = {}
+        self._headers: Dict[str, bytes] = {}
+        self._db = sqlite3.connect(str(self.root / INDEX_NAME), check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            for stmt in _SCHEMA:
+                self._db.execute(stmt)
+            if key is not None:  # only the writer repairs; readers may run beside it
+                self._recover()
+
+    # --- writes ---
+    def append(self, name: str, data: bytes, ts: Optional[float] = None) -> int:
+        """Encrypt ``data`` as record ``name`` (replacing an older record of that name).
+
+        Returns:
+            int: Bytes the record occupies in its segment.
+        """
+        return self.append_many([(name, data)], ts=ts)[0]
+
+    def append_many(self, items: Sequence[Tuple[str, bytes]], ts: Optional[float] = None) -> List[int]:
+        """Append several records (e.g. a capture's image and text) under one index commit."""
+        if self.key is None:
+            raise ValueError("segment store opened without a key")
+        ts = self._clock() if ts is None else ts
+        sizes: List[int] = []
+        with self._lock:
+            segment, end = self._active_segment(sum(len(d) for _, d in items))
+            header = self._header(segment)
+            aead = self._aead(segment, self.key)
+            rows = []
+            with open(self.root / segment, "r+b") as fh:
+                fh.seek(end)
+                for name, data in items:
+                    nonce = os.urandom(12)
+                    sealed = aead.encrypt(nonce, bytes(data), header + name.encode("utf-8"))
+                    fh.write(_RECORD.pack(len(sealed), nonce))
+                    fh.write(sealed)
+                    size = _RECORD.size + len(sealed)
+                    rows.append((name, segment, end, size, ts))
+                    sizes.append(size)
+                    end += size
+                fh.flush()
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                for name, *_ in rows:
+                    self._forget(name)
+                self._db.executemany(
+                    "INSERT INTO records(name, segment, offset, length, ts) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                self._db.execute("UPDATE segments SET bytes = ? WHERE name = ?", (end, segment))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return sizes
+
+    def delete(self, names: Iterable[str]) -> int:
+        """Drop records from the index; their bytes become dead until ``compact``.
+
+        Returns:
+            int: Record bytes released.
+        """
+        freed = 0
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            for name in names:
+                freed += self._forget(name)
+            self._db.execute("COMMIT")
+        return freed
+
+    def seal(self) -> None:
+        """Seal the active segment; the next append starts a new one."""
+        with self._lock:
+            self._db.execute("UPDATE segments SET sealed = 1 WHERE sealed = 0")
+
+    def compact(self, min_dead_ratio: float = DEFAULT_COMPACT_RATIO) -> CompactionReport:
+        """Rewrite sealed segments with at least ``min_dead_ratio`` dead bytes."""
+        report = CompactionReport()
+        with self._lock:
+            candidates = self._db.execute(
+                "SELECT name, bytes, dead_bytes FROM segments WHERE sealed = 1 AND dead_bytes > 0"
+            ).fetchall()
+            for segment, size, dead in candidates:
+                live = self._db.execute(
+                    "SELECT name, offset, length FROM records WHERE segment = ? ORDER BY offset", (segment,)
+                ).fetchall()
+                if live and dead / max(1, size - _HEADER.size) < min_dead_ratio:
+                    continue
+                if live:
+                    self._rewrite(segment, live)
+                    report.rewritten += 1
+                else:
+                    self._db.execute("DELETE FROM segments WHERE name = ?", (segment,))
+                    report.dropped += 1
+                self._headers.pop(segment, None)
+                self._aeads = {k: v for k, v in self._aeads.items() if k[0] != segment}
+                (self.root / segment).unlink(missing_ok=True)
+                report.reclaimed_bytes += dead
+        if report.rewritten or report.dropped:
+            LOGGER.info(
+                "Compacted segments: %s rewritten, %s dropped, %s bytes reclaimed",
+                report.rewritten,
+                report.dropped,
+                report.reclaimed_bytes,
+            )
+        return report
+
+    # --- reads ---
+    def read(self, name: str, key: Optional[bytes] = None) -> bytes:
+        """Decrypt record ``name``.
+
+        Raises:
+            KeyError: No such record.
+            cryptography.exceptions.InvalidTag: The record failed authentication.
+        """
+        key = key or self.key
+        if key is None:
+            raise ValueError("no key to decrypt with")
+        with self._lock:
+            row = self._db.execute("SELECT segment, offset, length FROM records WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            segment, offset, length = row
+            header = self._header(segment)
+            aead = self._aead(segment, key)
+            # Under the lock so compaction cannot move the record mid-read.
+            fd = os.open(self.root / segment, os.O_RDONLY)
+            try:
+                raw = os.pread(fd, length, offset)
+            finally:
+                os.close(fd)
+        sealed_len, nonce = _RECORD.unpack_from(raw)
+        return aead.decrypt(nonce, raw[_RECORD.size:_RECORD.size + sealed_len], header + name.encode("utf-8"))
+
+    def contains(self, name: str) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM records WHERE name = ?", (name,)).fetchone() is not None
+
+    def record_size(self, name: str) -> int:
+        """Bytes record ``name`` occupies (0 if absent)."""
+        with self._lock:
+            row = self._db.execute("SELECT length FROM records WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def names(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Tuple[str, float]]:
+        """``(name, ts)`` of records in ``[start, end]``, oldest first."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT name, ts FROM records WHERE ts >= ? AND ts <= ? ORDER BY ts, name",
+                (float("-inf") if start is None else start, float("inf") if end is None else end),
+            ).fetchall()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            segments, sealed, size, dead = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(sealed), 0), COALESCE(SUM(bytes), 0), COALESCE(SUM(dead_bytes), 0) "
+                "FROM segments"
+            ).fetchone()
+            records = self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        return {"segments": segments, "sealed": sealed, "records": records, "bytes": size, "dead_bytes": dead}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # --- internals ---
+    def _recover(self) -> None:
+        """Cut torn appends off unsealed segments and delete files the index does not know."""
+        known = {}
+        for name, size, sealed in self._db.execute("SELECT name, bytes, sealed FROM segments").fetchall():
+            known[name] = size
+            path = self.root / name
+            if not sealed and path.exists() and path.stat().st_size > size:
+                with open(path, "r+b") as fh:
+                    fh.truncate(size)
+        for path in self.root.glob("seg-*.hrs*"):
+            if path.name not in known:
+                path.unlink(missing_ok=True)
+
+    def _active_segment(self, incoming: int) -> Tuple[str, int]:
+        """Name and end offset of the segment to append to, sealing or creating as needed."""
+        row = self._db.execute("SELECT name, created, bytes FROM segments WHERE sealed = 0").fetchone()
+        if row is not None:
+            name, created, size = row
+            full = size > _HEADER.size and size + incoming > self.max_bytes
+            if not full and self._clock() - created < self.max_age:
+                return name, size
+            self._db.execute("UPDATE segments SET sealed = 1 WHERE name = ?", (name,))
+        return self._new_segment(sealed=False)
+
+    def _new_segment(self, sealed: bool, header: Optional[bytes] = None) -> Tuple[str, int]:
+        last = self._db.execute("SELECT MAX(name) FROM segments").fetchone()[0]
+        number = int(last[4:10]) + 1 if last else 1
+        name = f"seg-{number:06d}.hrs"
+        header = header or _HEADER.pack(SEGMENT_MAGIC, os.urandom(16))
+        with open(self.root / name, "wb") as fh:
+            fh.write(header)
+        self._db.execute(
+            "INSERT INTO segments(name, created, sealed, bytes) VALUES (?, ?, ?, ?)",
+            (name, self._clock(), int(sealed), len(header)),
+        )
+        return name, len(header)
+
+    def _rewrite(self, segment: str, live: List[Tuple[str, int, int]]) -> None:
+        """Copy ``live`` records of ``segment`` (ciphertext as is) into a new sealed segment."""
+        header = self._header(segment)
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            target, end = self._new_segment(sealed=True, header=header)
+            moved = []
+            with open(self.root / segment, "rb") as src, open(self.root / target, "r+b") as dst:
+                dst.seek(end)
+                for name, offset, length in live:
+                    src.seek(offset)
+                    dst.write(src.read(length))
+                    moved.append((target, end, name))
+                    end += length
+                dst.flush()
+                os.fsync(dst.fileno())
+            self._db.executemany("UPDATE records SET segment = ?, offset = ? WHERE name = ?", moved)
+            self._db.execute("UPDATE segments SET bytes = ? WHERE name = ?", (end, target))
+            self._db.execute("DELETE FROM segments WHERE name = ?", (segment,))
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _forget(self, name: str) -> int:
+        row = self._db.execute("SELECT segment, length FROM records WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return 0
+        self._db.execute("DELETE FROM records WHERE name = ?", (name,))
+        self._db.execute("UPDATE segments SET dead_bytes = dead_bytes + ? WHERE name = ?", (row[1], row[0]))
+        return row[1]
+
+    def _header(self, segment: str) -> bytes:
+        header = self._headers.get(segment)
+        if header is None:
+            with open(self.root / segment, "rb") as fh:
+                header = fh.read(_HEADER.size)
+            magic, _salt = _HEADER.unpack(header)
+            if magic != SEGMENT_MAGIC:
+                raise ValueError(f"{segment} is not a segment file")
+            self._headers[segment] = header
+        return header
+
+    def _aead(self, segment: str, key: bytes):
+        header = self._header(segment)
+        cached = self._aeads.get((segment, key))
+        if cached is None:
+            cached = self._aeads[(segment, key)] = _file_key(key, _HEADER.unpack(header)[1], _HKDF_INFO)
+        return cached
+
+
+_OPEN: Dict[Path, SegmentStore] = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def open_store(enc_dir: Path, key: Optional[bytes] = None, **kwargs: Any) -> SegmentStore:
+    """Process-wide segment store of ``enc_dir`` (created if missing)."""
+    root = (Path(enc_dir) / SEGMENTS_DIR).resolve()
+    with _OPEN_LOCK:
+        store = _OPEN.get(root)
+        if store is None:
+            store = _OPEN[root] = SegmentStore(root, key=key, **kwargs)
+        elif key is not None and store.key is None:
+            store.key = key
+        return store
+
+
+def store_for(path: Path) -> Optional[SegmentStore]:
+    """Segment store that may hold artifact ``path`` (None if its directory has none)."""
+    enc_dir = Path(path).parent
+    if not (enc_dir / SEGMENTS_DIR / INDEX_NAME).exists():
+        return None
+    return open_store(enc_dir)
+
+
+def read_artifact(path: Path, key: bytes) -> bytes:
+    """Decrypt an artifact from its ``.enc`` file, or from a segment when no file exists."""
+    path = Path(path)
+    if path.exists():
+        return decrypt_file(path, key)
+    store = store_for(path)
+    if store is None or not store.contains(path.name):
+        raise FileNotFoundError(path)
+    return store.read(path.name, key)
@@ -1,7 +1,7 @@
 """SPDX-License-Identifier: GPL-3.0-only
 
 Background capture service that periodically screenshots the active window,
-performs OCR, encrypts artifacts, and manages retention stubs.
+performs OCR, encrypts artifacts, and enforces retention.
 """
 
 from __future__ import annotations
@@ -11,22 +11,62 @@ import threading
 import time
 import os
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import json
 from datetime import datetime, timezone
 import hashlib
 import subprocess
 import shlex
+from dataclasses import dataclass
 
-from .screenshot import generate_filename
-from .ocr import extract_text, ocr_text_filename
-from .encryption import encrypt_file, generate_key
-from .active_window import get_active_window, capture_region, get_backend
+from .screenshot import _current_time_with_prefs, generate_filename
+from .ocr import configure_engine, engine_stats, extract_text, incremental_stats, ocr_text_filename, warmup_engine
+from .encryption import encrypt_file, encrypt_to_file, generate_key
+from .active_window import (
+    capture_region,
+    get_active_window,
+    get_backend,
+    get_window_tracker,
+    grab_frame,
+    unwatch_window_changes,
+    watch_window_changes,
+)
+from .frame import Frame
+from .pipeline import Stage
+from .scheduler import DEFAULT_MAX_INTERVAL, AdaptiveScheduler
+from .lock_monitor import LockMonitor
+from .codecs import DEFAULT_CODEC, configure_codec, current_codec
+from .config import setting
+from .catalog import CATALOG_NAME, CaptureCatalog, CatalogEntry, capture_id_for
+from .layout import artifact_dir, validate_layout
+from .segments import DEFAULT_MAX_AGE as DEFAULT_SEGMENT_MAX_AGE
+from .segments import DEFAULT_MAX_BYTES as DEFAULT_SEGMENT_MAX_BYTES
+from .segments import open_store
+from .retention import DEFAULT_MAX_DELETES_PER_SEC, DEFAULT_RUN_INTERVAL, RetentionEngine, configured_retention_days
+from .dedup import DEFAULT_HISTORY, DEFAULT_THRESHOLD, FrameHash, NearDuplicateDetector, perceptual_hash
 from uuid import uuid4
 
 LOGGER = logging.getLogger("hindsight.capture")
 
 
+@dataclass
+class _CaptureJob:
+    """Work item handed from the grab stage to the OCR / encrypt stages."""
+
+    title: str
+    bbox: Tuple[int, int, int, int]
+    fname: str
+    img_path: Path
+    image_hash: Optional[str]
+    txt_path: Optional[Path] = None
+    image_bytes: Optional[bytes] = None  # encoded frame (in memory; set by the encrypt stage)
+    frame: Optional[Frame] = None  # raw frame when capturing in memory
+    frame_hash: Optional[FrameHash] = None  # perceptual hash remembered for near-duplicate checks
+    text: Optional[str] = None  # OCR text when capturing in memory
+    captured_at: float = 0.0  # epoch seconds when the frame was grabbed
+    codec: Optional[str] = None  # image codec the frame was encoded with
+
+
 class CaptureService:
     """Screenshot capture loop.
 
@@ -35,6 +75,57 @@ class CaptureService:
         enc_dir: Directory for encrypted outputs (.enc files).
         interval: Seconds between captures.
         key_file: Path to key file; created if missing.
+        status_file: Path of the status JSON written after every cycle.
+        pipeline: Run OCR and encryption on background worker stages so the
+            scheduler thread only grabs frames.
+        ocr_workers: OCR worker threads (pipeline mode).
+        encrypt_workers: Encryption worker threads (pipeline mode).
+        queue_size: Capacity of each stage queue (pipeline mode).
+        backpressure: Policy when the OCR queue is full: ``drop_oldest``,
+            ``coalesce`` (per window title) or ``block``.
+        in_memory: Keep the frame and OCR text in memory; only the ``.enc``
+            outputs are written (nothing lands in ``output_dir``). The raw
+            grab buffer is hashed and OCR'd in place and encoded once, in the
+            encrypt stage.
+        dedup_threshold: Maximum perceptual-hash Hamming distance (changed grid
+            cells) for a frame to count as a near duplicate of a recent frame of
+            the same window; negative disables perceptual dedup (exact SHA-256
+            dedup always applies).
+        dedup_history: Recent frame hashes remembered per window title.
+        incremental_ocr: Re-OCR only the bands of a window that changed since
+            its previous frame (see ``capture.ocr.IncrementalOCR``).
+        chunked_encryption: Write the streamed, chunked AES-GCM container
+            instead of Fernet tokens (both remain readable).
+        keyword_index: SQLite file for the keyword (FTS5) index; OCR text is
+            added as each capture is encrypted. None disables indexing.
+        vector_index: Directory of the FAISS vector store
+            (``search.vector_store``); each capture's OCR text is embedded and
+            appended. None disables it.
+        ann_index: ANN index kind built per vector shard (``flat``,
+            ``ivf_flat``, ``ivf_pq`` or ``hnsw``; see ``search.ann``).
+        embed_chunks_per_sec: Throughput cap for the background embedding
+            worker (None = unthrottled).
+        catalog: SQLite capture metadata catalog (``capture.catalog``); each
+            encrypted capture is recorded there and ``capture_count`` comes
+            from it. None keeps an in-memory count seeded from ``enc_dir``.
+        layout: ``flat`` writes artifacts directly into ``enc_dir``; ``dated``
+            writes them into ``enc_dir/YYYY/MM/DD/`` (see ``capture.layout``).
+        retention_days: Delete captures (and their index entries) older than
+            this many days; 0 keeps everything (see ``capture.retention``).
+        retention_rate: Maximum captures deleted per second by retention.
+        retention_interval: Seconds between retention passes.
+        segments: Append artifacts to rolling encrypted segment files under
+            ``enc_dir/segments/`` instead of writing two ``.enc`` files per
+            capture (see ``capture.segments``); ``layout`` then does not apply.
+        segment_max_bytes: Size at which the active segment is sealed.
+        segment_max_age: Seconds after which the active segment is sealed.
+        adaptive: Schedule captures with ``capture.scheduler.AdaptiveScheduler``:
+            back off while frames repeat and capture promptly on window focus
+            or title changes (X11 window tracker) instead of every ``interval``.
+        max_interval: Idle back-off ceiling in seconds (adaptive mode).
+        lock_monitor: Serve screen-lock state from ``capture.lock_monitor.LockMonitor``
+            (D-Bus lock signals plus background polling) instead of running
+            the lock probes on every cycle.
     """
 
     def __init__(
@@ -44,10 +135,45 @@ class CaptureService:
         interval: float = 5.0,
         key_file: Optional[Path] = None,
         status_file: Optional[Path] = None,
+        pipeline: bool = False,
+        ocr_workers: int = 1,
+        encrypt_workers: int = 1,
+        queue_size: int = 4,
+        backpressure: str = "drop_oldest",
+        in_memory: bool = False,
+        dedup_threshold: int = DEFAULT_THRESHOLD,
+        dedup_history: int = DEFAULT_HISTORY,
+        incremental_ocr: bool = False,
+        chunked_encryption: bool = False,
+        keyword_index: Optional[Path] = None,
+        vector_index: Optional[Path] = None,
+        ann_index: str = "flat",
+        embed_chunks_per_sec: Optional[float] = None,
+        catalog: Optional[Path] = None,
+        layout: str = "flat",
+        retention_days: int = 0,
+        retention_rate: Optional[float] = DEFAULT_MAX_DELETES_PER_SEC,
+        retention_interval: float = DEFAULT_RUN_INTERVAL,
+        segments: bool = False,
+        segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES,
+        segment_max_age: float = DEFAULT_SEGMENT_MAX_AGE,
+        adaptive: bool = False,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        lock_monitor: bool = False,
     ) -> None:
         self.output_dir = output_dir
+        self.chunked_encryption = chunked_encryption
+        self.in_memory = in_memory
+        self.incremental_ocr = incremental_ocr
         self.enc_dir = enc_dir
+        self.layout = validate_layout(layout)
         self.interval = interval
+        self._scheduler: Optional[AdaptiveScheduler] = None
+        if adaptive:
+            self._scheduler = AdaptiveScheduler(interval, max_interval=max_interval)
+        self._lock_monitor: Optional[LockMonitor] = None
+        if lock_monitor and os.name == 'posix':
+            self._lock_monitor = LockMonitor(self._lock_probes(), session_id=os.environ.get('XDG_SESSION_ID'))
         self.key_file = key_file or enc_dir / "key.fernet"
         self.status_file = status_file or enc_dir.parent / "status.json"
         self._stop = threading.Event()
@@ -59,16 +185,90 @@ class CaptureService:
         self._started_utc = datetime.now(timezone.utc).isoformat()
         self._sequence = 0  # monotonic sequence for each status write (error or success)
         self._last_image_hash = None  # hash of previous raw PNG to detect duplicates
+        # File names only have 1 s resolution; see _unique_filename.
+        self._fname_second: Optional[datetime] = None
+        self._fname_seq: Dict[str, int] = {}
         self._consecutive_unidentified = 0  # track consecutive UnidentifiedImageError occurrences
         self._backend_switch_reason = os.environ.get('HINDSIGHT_BACKEND_SWITCH_REASON') or None
+        self._status_lock = threading.RLock()  # guards sequence/status/count across worker threads
+        self._near_dup: Optional[NearDuplicateDetector] = None
+        if dedup_threshold >= 0:
+            self._near_dup = NearDuplicateDetector(threshold=dedup_threshold, history=dedup_history)
+        self._dedup_skipped = {"exact": 0, "near": 0}
+        self._ocr_stage: Optional[Stage] = None
+        self._encrypt_stage: Optional[Stage] = None
+        if pipeline:
+            self._ocr_stage = Stage(
+                "OCRWorker",
+                self._ocr_job,
+                workers=ocr_workers,
+                maxsize=queue_size,
+                policy=backpressure,
+                key_fn=lambda job: job.title,
+                on_drop=self._discard_job,
+                on_error=self._job_failed,
+            )
+            # Encryption is cheap relative to OCR; block the OCR worker rather than drop OCR'd work.
+            self._encrypt_stage = Stage(
+                "EncryptWorker",
+                self._encrypt_job,
+                workers=encrypt_workers,
+                maxsize=queue_size,
+                policy="block",
+                on_drop=self._discard_job,
+                on_error=self._job_failed,
+            )
         # Ensure directories & key
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.enc_dir.mkdir(parents=True, exist_ok=True)
         self._load_or_create_key()
-        try:
-            self._capture_count = sum(1 for _ in self.enc_dir.glob('*.png.enc'))
-        except Exception:  # pragma: no cover - best effort
-            self._capture_count = 0
+        self._segments = None
+        if segments:
+            self._segments = open_store(
+                self.enc_dir, key=self._key, max_bytes=segment_max_bytes, max_age=segment_max_age
+            )
+        self._keyword_index = None
+        if keyword_index is not None:
+            from search.indexer import KeywordIndex
+
+            self._keyword_index = KeywordIndex(keyword_index)
+        self._vector_store = None
+        self._embedder = None
+        if vector_index is not None:
+            try:
+                from search.ann import ANNParams
+                from search.embedding_worker import EmbeddingWorker
+                from search.vector_store import VectorStore
+
+                self._vector_store = VectorStore(vector_index, ann=ANNParams(kind=ann_index))
+                self._embedder = EmbeddingWorker(self._vector_store, target_chunks_per_sec=embed_chunks_per_sec)
+            except (RuntimeError, ValueError) as e:
+                LOGGER.warning("Vector index disabled: %s", e)
+        self._catalog: Optional[CaptureCatalog] = None
+        if catalog is not None:
+            self._catalog = CaptureCatalog(catalog)
+            if self._catalog.count() == 0:
+                # First run with a catalog: backfill captures taken before it existed.
+                self._catalog.import_existing(self.enc_dir)
+            self._capture_count = self._catalog.count()
+        else:
+            try:
+                self._capture_count = sum(1 for _ in self.enc_dir.rglob('*.png.enc'))
+            except Exception:  # pragma: no cover - best effort
+                self._capture_count = 0
+        self.retention_interval = retention_interval
+        self._retention: Optional[RetentionEngine] = None
+        if retention_days > 0:
+            self._retention = RetentionEngine(
+                self.enc_dir,
+                retention_days,
+                catalog=self._catalog,
+                keyword_index=self._keyword_index,
+                vector_store=self._vector_store,
+                segments=self._segments,
+                key=self._key,
+                max_deletes_per_sec=retention_rate,
+            )
 
     def _load_or_create_key(self) -> None:
         # Support two modes: plain key file (legacy) or passphrase-wrapped key file
@@ -156,17 +356,108 @@ class CaptureService:
         if self._thread and self._thread.is_alive():  # pragma: no cover
             return
         self._stop.clear()
+        for stage in (self._encrypt_stage, self._ocr_stage):
+            if stage is not None:
+                stage.start()
+        threading.Thread(target=self._warm_ocr, name="OCRWarmup", daemon=True).start()
+        if self._embedder is not None:
+            threading.Thread(target=self._warm_embedding_model, name="EmbedWarmup", daemon=True).start()
+            self._embedder.start(catch_up=(self.enc_dir, self._key), catalog=self._catalog)
+        if self._keyword_index is not None:
+            threading.Thread(target=self._catch_up_keyword_index, name="KeywordIndexer", daemon=True).start()
+        if self._retention is not None:
+            threading.Thread(target=self._retention_loop, name="Retention", daemon=True).start()
+        if self._scheduler is not None and not watch_window_changes(self._scheduler.trigger):
+            LOGGER.info("No window events (X11 tracker unavailable); adaptive capture uses the timer only")
+        if self._lock_monitor is not None:
+            if self._scheduler is not None or self._keyword_index is not None:
+                self._lock_monitor.add_listener(self._on_lock_change)
+            self._lock_monitor.start()
         self._thread = threading.Thread(target=self._run_loop, name="CaptureLoop", daemon=True)
         self._thread.start()
-        LOGGER.info("Capture service started (interval=%ss)", self.interval)
+        LOGGER.info(
+            "Capture service started (interval=%ss, pipeline=%s, adaptive=%s)",
+            self.interval,
+            self._ocr_stage is not None,
+            self._scheduler is not None,
+        )
+
+    @staticmethod
+    def _warm_ocr() -> None:
+        """Load Tesseract language data into the persistent engine off the capture thread."""
+        try:
+            if warmup_engine():
+                LOGGER.info("OCR engine warmed: %s", engine_stats())
+        except Exception as e:  # noqa: BLE001
+            LOGGER.warning("OCR engine warmup failed (%s); falling back per call", e)
+
+    @staticmethod
+    def _warm_embedding_model() -> None:
+        """Load the embedding model once, off the capture thread, before the first capture needs it."""
+        try:
+            from search.semantic import MODELS
+
+            MODELS.warmup()
+        except Exception as e:  # noqa: BLE001
+            LOGGER.warning("Embedding model warmup failed: %s", e)
+
+    def _catch_up_keyword_index(self) -> None:
+        """Index encrypted text written while indexing was off (since the checkpoint)."""
+        try:
+            self._keyword_index.update_from_encrypted(self.enc_dir, self._key, catalog=self._catalog)
+        except Exception as e:  # noqa: BLE001
+            LOGGER.warning("Keyword index catch-up failed: %s", e)
+
+    def _retention_loop(self) -> None:
+        """Run a retention pass every ``retention_interval`` seconds until stopped."""
+        while not self._stop.is_set():
+            self.enforce_retention()
+            self._stop.wait(self.retention_interval)
+
+    def enforce_retention(self) -> int:
+        """Delete expired captures now (rate limited); returns the number deleted."""
+        if self._retention is None:
+            return 0
+        try:
+            report = self._retention.run(stop=self._stop.is_set)
+        except Exception as e:  # noqa: BLE001 - retention must not break capture
+            LOGGER.warning("Retention pass failed: %s", e)
+            return 0
+        if report.deleted:
+            with self._status_lock:
+                if self._catalog is not None:
+                    self._capture_count = self._catalog.count()
+                else:
+                    self._capture_count = max(0, self._capture_count - report.deleted)
+        return report.deleted
 
     def stop(self, timeout: Optional[float] = 5.0) -> None:
         self._stop.set()
+        if self._scheduler is not None:
+            unwatch_window_changes(self._scheduler.trigger)
+            self._scheduler.interrupt()
+        if self._lock_monitor is not None:
+            self._lock_monitor.remove_listener(self._on_lock_change)
+            self._lock_monitor.stop()
         if self._thread:
             self._thread.join(timeout=timeout)
+        # Drain queued jobs so no plaintext is left behind in output_dir.
+        for stage in (self._ocr_stage, self._encrypt_stage):
+            if stage is not None:
+                stage.stop(timeout=timeout)
+        if self._keyword_index is not None:
+            self._keyword_index.commit()
+        if self._embedder is not None:
+            self._embedder.stop(timeout=timeout)
+        if self._vector_store is not None:
+            self._vector_store.flush()
+        if self._thread:
             LOGGER.info("Capture service stopped")
 
     def _run_loop(self) -> None:
+        if self._scheduler is not None:
+            self._run_adaptive_loop()
+            return
         # Use monotonic scheduling to reduce drift: schedule based on fixed next_target.
         next_target = time.monotonic()
         while not self._stop.is_set():
@@ -179,52 +470,40 @@ class CaptureService:
                     self._stop.wait(remaining_pre)
                 if self._stop.is_set():
                     break
-            start = time.time()
-            try:
-                if self._is_screen_locked():
-                    # Emit lightweight paused status at most once per interval change
-                    self._sequence += 1
-                    pause_status = {
-                        "last_capture_utc": datetime.now(timezone.utc).isoformat(),
-                        "window_title": None,
-                        "window_bbox": None,
-                        "encrypted_image": None,
-                        "encrypted_text": None,
-                        "capture_count": self._capture_count,
-                        "interval_sec": self.interval,
-                        "error": None,
-                        "display_env": os.environ.get('DISPLAY'),
-                        "session_type": os.environ.get('XDG_SESSION_TYPE'),
-                        "process_pid": os.getpid(),
-                        "capture_backend": get_backend(),
-                        "service_instance_id": self._instance_id,
-                        "service_start_utc": self._started_utc,
-                        "sequence": self._sequence,
-                        "paused": True,
-                        "pause_reason": "screen_locked",
-                    }
-                    self._last_status = pause_status
-                    self._write_status(pause_status)
-                else:
-                    self._capture_once()
-            except Exception as exc:  # pragma: no cover - safety net
-                LOGGER.exception("Capture cycle failed: %s", exc)
-                # Backend auto-adaptation: if repeated UnidentifiedImageError under ImageGrab, force mss next cycle.
-                try:
-                    from . import active_window as _aw  # type: ignore
-                    if 'UnidentifiedImageError' in type(exc).__name__ or 'UnidentifiedImageError' in str(exc):
-                        self._consecutive_unidentified += 1
-                        if getattr(_aw, '_BACKEND', '') == 'imagegrab' and self._consecutive_unidentified >= 2:
-                            setattr(_aw, '_BACKEND', 'mss')
-                            setattr(_aw, '_GLOBAL_MSS', None)
-                            LOGGER.warning("Switching capture backend to mss after %s consecutive UnidentifiedImageError failures", self._consecutive_unidentified)
-                    else:
-                        self._consecutive_unidentified = 0
-                except Exception:  # pragma: no cover
-                    pass
-                # Emit an error status so external monitors / UI can surface the issue.
-                self._sequence += 1
-                err_status = {
+            self._cycle()
+            # Schedule next capture strictly by incrementing next_target by interval.
+            next_target += self.interval
+            # If we fell behind (e.g., long OCR/encrypt), catch up but avoid tight loop; skip missed periods.
+            behind = time.monotonic() - next_target
+            if behind > 0:
+                # Drop to current time baseline to prevent spiral of death if extremely behind.
+                skips = int(behind // self.interval)
+                if skips > 0:
+                    next_target += self.interval * skips
+            wait_duration = max(0.0, next_target - time.monotonic())
+            if wait_duration > 0:
+                self._stop.wait(wait_duration)
+
+    def _run_adaptive_loop(self) -> None:
+        """Capture when the scheduler says so (timer with back-off, or a window event)."""
+        scheduler = self._scheduler
+        assert scheduler is not None
+        while not self._stop.is_set():
+            if scheduler.wait(self._stop) is None:
+                break
+            scheduler.record(self._cycle())
+
+    def _cycle(self) -> bool:
+        """One loop iteration: capture unless the screen is locked.
+
+        Returns:
+            bool: True if a new (non-duplicate) frame was captured.
+        """
+        try:
+            self._commit_keyword_index()
+            if self._is_screen_locked():
+                # Emit lightweight paused status at most once per interval change
+                pause_status = {
                     "last_capture_utc": datetime.now(timezone.utc).isoformat(),
                     "window_title": None,
                     "window_bbox": None,
@@ -232,167 +511,472 @@ class CaptureService:
                     "encrypted_text": None,
                     "capture_count": self._capture_count,
                     "interval_sec": self.interval,
-                    "error": f"{type(exc).__name__}: {exc}"[:500],
+                    "error": None,
                     "display_env": os.environ.get('DISPLAY'),
                     "session_type": os.environ.get('XDG_SESSION_TYPE'),
                     "process_pid": os.getpid(),
                     "capture_backend": get_backend(),
                     "service_instance_id": self._instance_id,
                     "service_start_utc": self._started_utc,
-                    "sequence": self._sequence,
+                    "paused": True,
+                    "pause_reason": "screen_locked",
                 }
-                self._last_status = err_status
-                self._write_status(err_status)
-            # Schedule next capture strictly by incrementing next_target by interval.
-            next_target += self.interval
-            # If we fell behind (e.g., long OCR/encrypt), catch up but avoid tight loop; skip missed periods.
-            behind = time.monotonic() - next_target
-            if behind > 0:
-                # Drop to current time baseline to prevent spiral of death if extremely behind.
-                skips = int(behind // self.interval)
-                if skips > 0:
-                    next_target += self.interval * skips
-            wait_duration = max(0.0, next_target - time.monotonic())
-            if wait_duration > 0:
-                self._stop.wait(wait_duration)
+                self._publish_status(pause_status)
+                return False
+            return self._capture_once()
+        except Exception as exc:  # pragma: no cover - safety net
+            LOGGER.exception("Capture cycle failed: %s", exc)
+            # Backend auto-adaptation: if repeated UnidentifiedImageError under ImageGrab, force mss next cycle.
+            try:
+                from . import active_window as _aw  # type: ignore
+                if 'UnidentifiedImageError' in type(exc).__name__ or 'UnidentifiedImageError' in str(exc):
+                    self._consecutive_unidentified += 1
+                    if getattr(_aw, '_BACKEND', '') == 'imagegrab' and self._consecutive_unidentified >= 2:
+                        setattr(_aw, '_BACKEND', 'mss')
+                        setattr(_aw, '_GLOBAL_MSS', None)
+                        LOGGER.warning("Switching capture backend to mss after %s consecutive UnidentifiedImageError failures", self._consecutive_unidentified)
+                else:
+                    self._consecutive_unidentified = 0
+            except Exception:  # pragma: no cover
+                pass
+            # Emit an error status so external monitors / UI can surface the issue.
+            self._publish_error(exc)
+            return False
+
+    def _capture_once(self) -> bool:
+        """Run one capture cycle.
+
+        The grab (screenshot, verify, duplicate check) always runs on the calling
+        thread. OCR and encryption are handed to the worker stages when the
+        pipeline is running, otherwise they run inline.
+
+        Returns:
+            bool: False if the frame was a duplicate.
+        """
+        job = self._grab()
+        if job is None:
+            return False
+        if self._ocr_stage is not None and self._ocr_stage.running:
+            self._ocr_stage.submit(job, timeout=self.interval)
+            return True
+        try:
+            self._ocr_job(job)
+        except Exception:
+            self._discard_job(job)
+            raise
+        return True
 
-    def _capture_once(self) -> None:
+    def _grab(self) -> Optional[_CaptureJob]:
+        """Screenshot the active window; returns None for a duplicate frame."""
         info = get_active_window()
-        fname = generate_filename(info.title)
+        captured_at = time.time()
+        fname = self._unique_filename(info.title)
         img_path = self.output_dir / fname
+        frame = self._grab_frame(info.bbox, img_path)
+        # Compute hash to detect duplicate frame before heavy work (OCR/encrypt).
+        # In memory the raw pixel buffer is hashed in place; nothing is encoded yet.
+        try:
+            if frame is not None:
+                current_hash = frame.digest()
+            else:
+                current_hash = hashlib.sha256(img_path.read_bytes()).hexdigest()
+        except Exception:  # pragma: no cover - best effort
+            current_hash = None  # type: ignore
+        duplicate = self._last_image_hash is not None and current_hash == self._last_image_hash
+        frame_hash: Optional[FrameHash] = None
+        near_distance: Optional[int] = None
+        if not duplicate and self._near_dup is not None:
+            frame_hash = self._perceptual_hash(frame, img_path)
+            if frame_hash is not None:
+                near_distance = self._near_dup.match(info.title, frame_hash)
+                duplicate = near_distance is not None
+        if duplicate:
+            if near_distance is None:
+                self._dedup_skipped["exact"] += 1
+            else:
+                self._dedup_skipped["near"] += 1
+            # Remove newly captured duplicate file; do not increment capture_count; still emit status.
+            try:
+                img_path.unlink(missing_ok=True)  # type: ignore[arg-type]
+            except Exception:  # pragma: no cover
+                pass
+            status = {
+                "last_capture_utc": datetime.now(timezone.utc).isoformat(),
+                "window_title": info.title,
+                "window_bbox": info.bbox,
+                "encrypted_image": None,
+                "encrypted_text": None,
+                "capture_count": self._capture_count,  # unchanged
+                "interval_sec": self.interval,
+                "display_env": os.environ.get('DISPLAY'),
+                "session_type": os.environ.get('XDG_SESSION_TYPE'),
+                "process_pid": os.getpid(),
+                "capture_backend": get_backend(),
+                "service_instance_id": self._instance_id,
+                "service_start_utc": self._started_utc,
+                "duplicate": True,
+                "duplicate_kind": "exact" if near_distance is None else "near",
+                "hamming_distance": near_distance,
+            }
+            self._publish_status(status)
+            return None
+        # Remember the accepted frame now (not after encryption) so frames grabbed
+        # while this one is still queued are compared against it.
+        if current_hash:
+            self._last_image_hash = current_hash
+        if frame_hash is not None and self._near_dup is not None:
+            self._near_dup.remember(info.title, frame_hash)
+        return _CaptureJob(
+            title=info.title,
+            bbox=info.bbox,
+            fname=fname,
+            img_path=img_path,
+            image_hash=current_hash,
+            frame=frame,
+            frame_hash=frame_hash,
+            captured_at=captured_at,
+            codec=current_codec().name,
+        )
+
+    def _unique_filename(self, title: str) -> str:
+        """File name for a new capture, numbering repeat captures of a window within one second.
+
+        Event bursts can grab the same window several times a second (also
+        interleaved with others: A, B, A); without the sequence they would share
+        a capture id and overwrite each other's files. The next number is kept
+        per base name for the current second.
+        """
+        now = _current_time_with_prefs().replace(microsecond=0)
+        if now != self._fname_second:
+            self._fname_second, self._fname_seq = now, {}
+        base = generate_filename(title, ts=now)
+        seq = self._fname_seq.get(base, 0)
+        self._fname_seq[base] = seq + 1
+        return generate_filename(title, ts=now, seq=seq) if seq else base
+
+    @staticmethod
+    def _perceptual_hash(frame: Optional[Frame], img_path: Path) -> Optional[FrameHash]:
+        """Perceptual hash of the captured frame; None when it cannot be decoded."""
+        try:
+            if frame is not None:
+                return perceptual_hash(frame)
+            from PIL import Image  # type: ignore
+            with Image.open(img_path) as im:
+                return perceptual_hash(im)
+        except Exception as exc:  # best effort: fall back to exact-hash dedup only
+            LOGGER.debug("Perceptual hash unavailable: %s", exc)
+            return None
+
+    def _grab_frame(self, bbox: Tuple[int, int, int, int], img_path: Path) -> Optional[Frame]:
+        """Capture ``bbox`` and check the result is usable.
+
+        In memory mode the raw ``Frame`` is returned and nothing is encoded or
+        written; otherwise the PNG is written to ``img_path`` and None is returned.
+        """
+        if self.in_memory:
+            capture = grab_frame
+        else:
+            def capture(region):
+                return capture_region(region, str(img_path))
         # Capture with automatic fallback: if ImageGrab yields UnidentifiedImageError, switch to mss and retry once.
         try:
-            capture_region(info.bbox, str(img_path))
+            frame = capture(bbox)
         except Exception as exc:
             if 'UnidentifiedImageError' in type(exc).__name__ or 'UnidentifiedImageError' in str(exc):
-                try:
-                    from . import active_window as _aw  # type: ignore
-                    # Force backend reset to mss and retry one time.
-                    _aw._BACKEND = 'mss'  # type: ignore[attr-defined]
-                    _aw._GLOBAL_MSS = None  # type: ignore[attr-defined]
-                    capture_region(info.bbox, str(img_path))
-                except Exception:
-                    raise  # propagate original failure chain
+                self._force_mss_backend()
+                frame = capture(bbox)
             else:
                 raise
-        # Validate that the file is a readable PNG; ImageGrab can sometimes write
-        # a zero-byte or corrupt file on some desktops. If unreadable, retry once
+        # Validate that the frame is a readable PNG; ImageGrab can sometimes produce
+        # a zero-byte or corrupt image on some desktops. If unreadable, retry once
         # with forced mss backend before giving up.
         try:
-            from PIL import Image  # type: ignore
-            with Image.open(img_path) as im:  # noqa: F841
-                im.verify()  # lightweight integrity check
+            self._verify_frame(frame, img_path)
         except Exception as exc:  # UnidentifiedImageError or others
             if 'UnidentifiedImageError' in type(exc).__name__ or 'cannot identify image file' in str(exc):
-                try:
+                if frame is None:
                     # Remove bad file
                     try:
                         img_path.unlink()
                     except Exception:
                         pass
-                    from . import active_window as _aw  # type: ignore
-                    _aw._BACKEND = 'mss'  # type: ignore[attr-defined]
-                    _aw._GLOBAL_MSS = None  # type: ignore[attr-defined]
-                    # Retry capture once using mss
-                    capture_region(info.bbox, str(img_path))
-                    # Re-validate
-                    from PIL import Image as _Image  # type: ignore
-                    with _Image.open(img_path) as _im:  # noqa: F841
-                        _im.verify()
-                except Exception:
-                    # Give up; raise original so outer loop records error status
-                    raise
+                self._force_mss_backend()
+                # Retry capture once using mss; give up (raise) if it fails again so
+                # the outer loop records an error status.
+                frame = capture(bbox)
+                self._verify_frame(frame, img_path)
             else:
                 raise
-        # Compute hash to detect duplicate frame before heavy work (OCR/encrypt)
-        try:
-            raw_bytes = img_path.read_bytes()
-            current_hash = hashlib.sha256(raw_bytes).hexdigest()
-        except Exception:  # pragma: no cover - best effort
-            current_hash = None  # type: ignore
-            raw_bytes = None  # type: ignore
-        duplicate = self._last_image_hash is not None and current_hash == self._last_image_hash
-        if duplicate:
-            # Remove newly captured duplicate file; do not increment capture_count; still emit status.
+        return frame
+
+    @staticmethod
+    def _verify_frame(frame: Optional[Frame], img_path: Path) -> None:
+        if frame is not None:
+            frame.check()
+            return
+        from PIL import Image  # type: ignore
+        with Image.open(img_path) as im:  # noqa: F841
+            im.verify()  # lightweight integrity check
+
+    @staticmethod
+    def _force_mss_backend() -> None:
+        from . import active_window as _aw  # type: ignore
+        _aw._BACKEND = 'mss'  # type: ignore[attr-defined]
+        _aw._GLOBAL_MSS = None  # type: ignore[attr-defined]
+
+    def _ocr_job(self, job: _CaptureJob) -> None:
+        """OCR stage: extract text and hand the job to encryption."""
+        # Incremental OCR keys its band cache on the window title.
+        ocr_kwargs = {"region_key": job.title} if self.incremental_ocr else {}
+        if job.frame is not None:
+            job.text = extract_text(job.frame, **ocr_kwargs)
+        else:
+            text = job.text = extract_text(job.img_path, **ocr_kwargs)
+            job.txt_path = self.output_dir / ocr_text_filename(job.fname)
+            job.txt_path.write_text(text, encoding="utf-8")
+        if self._encrypt_stage is not None and self._encrypt_stage.running:
+            self._encrypt_stage.submit(job)
+            return
+        self._encrypt_job(job)
+
+    def _encrypt_job(self, job: _CaptureJob) -> None:
+        """Encrypt stage: write .enc artifacts, remove plaintext and publish status."""
+        assert self._key is not None, "Encryption key not loaded"
+        enc_kwargs = {"chunked": True} if self.chunked_encryption else {}
+        dest_dir = artifact_dir(self.enc_dir, capture_id_for(job.fname), self.layout)
+        record_sizes = None
+        if job.frame is not None:
+            # The one encode of an in-memory frame, reusing the RGB image OCR converted.
+            job.image_bytes = job.frame.encode()
+            job.frame.release()
+            job.frame = None
+        if self._segments is not None:
+            enc_img, enc_txt, record_sizes = self._append_to_segments(job)
+        elif job.image_bytes is not None:
+            # In-memory frame: plaintext never touches output_dir.
+            assert job.text is not None, "OCR stage did not run"
+            enc_img = encrypt_to_file(job.image_bytes, self._key, dest_dir / (job.fname + ".enc"), **enc_kwargs)
+            txt_name = ocr_text_filename(job.fname)
+            enc_txt = encrypt_to_file(
+                job.text.encode("utf-8"), self._key, dest_dir / (txt_name + ".enc"), **enc_kwargs
+            )
+        else:
+            img_path = job.img_path
+            txt_path = job.txt_path
+            assert txt_path is not None, "OCR stage did not run"
+            # Encrypt both (write encrypted copies into enc_dir)
+            enc_img = encrypt_file(img_path, self._key, dest_dir, **enc_kwargs)
+            enc_txt = encrypt_file(txt_path, self._key, dest_dir, **enc_kwargs)
+            # Remove plaintext originals
             try:
                 img_path.unlink(missing_ok=True)  # type: ignore[arg-type]
-            except Exception:  # pragma: no cover
-                pass
-            self._sequence += 1
+                txt_path.unlink(missing_ok=True)  # type: ignore[arg-type]
+            except TypeError:  # Python <3.8 compatibility fallback
+                if img_path.exists():
+                    img_path.unlink()
+                if txt_path.exists():
+                    txt_path.unlink()
+        if job.text is not None:
+            self._index_capture(
+                enc_txt,
+                job.text,
+                {"title": job.title, "bbox": job.bbox, "backend": get_backend()},
+                ts=job.captured_at or None,
+            )
+        self._record_capture(job, enc_img, enc_txt, record_sizes)
+        with self._status_lock:
+            if self._catalog is not None:
+                self._capture_count = self._catalog.count()
+            else:
+                self._capture_count += 1
             status = {
                 "last_capture_utc": datetime.now(timezone.utc).isoformat(),
-                "window_title": info.title,
-                "window_bbox": info.bbox,
-                "encrypted_image": None,
-                "encrypted_text": None,
-                "capture_count": self._capture_count,  # unchanged
+                "window_title": job.title,
+                "window_bbox": job.bbox,
+                "encrypted_image": enc_img.name,
+                "encrypted_text": enc_txt.name,
+                "image_codec": job.codec,
+                "capture_count": self._capture_count,
                 "interval_sec": self.interval,
                 "display_env": os.environ.get('DISPLAY'),
                 "session_type": os.environ.get('XDG_SESSION_TYPE'),
                 "process_pid": os.getpid(),
                 "capture_backend": get_backend(),
+                "window_tracker": get_window_tracker(),
                 "service_instance_id": self._instance_id,
                 "service_start_utc": self._started_utc,
-                "sequence": self._sequence,
-                "duplicate": True,
+                "duplicate": False,
+                "backend_switch_reason": self._backend_switch_reason,
             }
-            self._last_status = status
-            self._write_status(status)
+            # Only include switch reason on first success after a switch, then clear.
+            self._backend_switch_reason = None
+            self._publish_status(status)
+        LOGGER.debug(
+            "Captured #%s and encrypted %s / %s (title=%r)",
+            self._capture_count,
+            enc_img.name,
+            enc_txt.name,
+            job.title,
+        )
+
+    def _append_to_segments(self, job: _CaptureJob) -> Tuple[Path, Path, Tuple[int, int]]:
+        """Segment mode: append image and OCR text as records; returns their virtual paths and sizes."""
+        assert job.text is not None, "OCR stage did not run"
+        image = job.image_bytes if job.image_bytes is not None else job.img_path.read_bytes()
+        names = (job.fname + ".enc", ocr_text_filename(job.fname) + ".enc")
+        sizes = self._segments.append_many(
+            [(names[0], image), (names[1], job.text.encode("utf-8"))], ts=job.captured_at or None
+        )
+        for path in (job.img_path, job.txt_path):
+            if path is not None:
+                path.unlink(missing_ok=True)
+        return self.enc_dir / names[0], self.enc_dir / names[1], (sizes[0], sizes[1])
+
+    def _record_capture(
+        self, job: _CaptureJob, enc_img: Path, enc_txt: Path, sizes: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """Append the capture's metadata to the catalog (best effort)."""
+        if self._catalog is None:
             return
-        # OCR (only for non-duplicate)
-        text = extract_text(img_path)
-        txt_path = self.output_dir / ocr_text_filename(fname)
-        txt_path.write_text(text, encoding="utf-8")
-        # Encrypt both (write encrypted copies into enc_dir)
-        assert self._key is not None, "Encryption key not loaded"
-        enc_img = encrypt_file(img_path, self._key, self.enc_dir)
-        enc_txt = encrypt_file(txt_path, self._key, self.enc_dir)
-        # Remove plaintext originals
+        frame_hash = job.frame_hash
         try:
-            img_path.unlink(missing_ok=True)  # type: ignore[arg-type]
-            txt_path.unlink(missing_ok=True)  # type: ignore[arg-type]
-        except TypeError:  # Python <3.8 compatibility fallback
-            if img_path.exists():
-                img_path.unlink()
-            if txt_path.exists():
-                txt_path.unlink()
-        # Recount encrypted image captures (authoritative).
+            if sizes is None:
+                sizes = (enc_img.stat().st_size, enc_txt.stat().st_size)
+            self._catalog.record(
+                CatalogEntry(
+                    capture_id=capture_id_for(enc_img.name),
+                    ts=job.captured_at or time.time(),
+                    title=job.title,
+                    bbox=tuple(job.bbox),
+                    backend=get_backend(),
+                    image_sha256=job.image_hash,
+                    frame_hash=f"{frame_hash.width}x{frame_hash.height}:{frame_hash.bits:x}" if frame_hash else None,
+                    ocr_chars=len(job.text or ""),
+                    image_path=str(enc_img),
+                    text_path=str(enc_txt),
+                    image_bytes=sizes[0],
+                    text_bytes=sizes[1],
+                    codec=job.codec,
+                )
+            )
+        except Exception as e:  # noqa: BLE001 - the encrypted artifacts are already safe on disk
+            LOGGER.warning("Catalog write failed for %s: %s", enc_img.name, e)
+
+    def _commit_keyword_index(self, if_due: bool = True) -> None:
+        """Commit a keyword batch left open when capture goes quiet (idle, locked, duplicates).
+
+        Readers in other processes only see committed batches. With ``if_due``
+        the batch is committed once it has waited the index's ``max_delay``.
+        """
+        if self._keyword_index is None:
+            return
         try:
-            self._capture_count = sum(1 for _ in self.enc_dir.glob('*.png.enc'))
-        except Exception:  # pragma: no cover
-            pass
-        self._sequence += 1
-        if current_hash:
-            self._last_image_hash = current_hash
-        status = {
+            if if_due:
+                self._keyword_index.commit_if_due()
+            else:
+                self._keyword_index.commit()
+        except Exception as e:  # noqa: BLE001 - search must not break capture
+            LOGGER.warning("Keyword index commit failed: %s", e)
+
+    def _index_capture(
+        self, enc_txt: Path, text: str, meta: Optional[dict] = None, ts: Optional[float] = None
+    ) -> None:
+        """Feed a capture's OCR text and metadata to the keyword index and vector store (best effort).
+
+        ``ts`` is the capture time, the clock the catalog (and so index catch-up) queries by.
+        """
+        if self._keyword_index is not None:
+            try:
+                self._keyword_index.add(str(enc_txt), text, mtime=ts, meta=meta)
+            except Exception as e:  # noqa: BLE001 - search must not break capture
+                LOGGER.warning("Keyword indexing failed for %s: %s", enc_txt.name, e)
+        if self._embedder is not None and text.strip():
+            # Chunked, batched embedding happens on the worker thread.
+            self._embedder.submit(str(enc_txt), text, ts=ts, meta=meta)
+
+    def _discard_job(self, job: _CaptureJob) -> None:
+        """Remove plaintext for a job that will never be encrypted (dropped or failed)."""
+        if job.frame is not None:
+            job.frame.release()
+        for path in (job.img_path, job.txt_path):
+            if path is None:
+                continue
+            try:
+                path.unlink(missing_ok=True)  # type: ignore[arg-type]
+            except Exception:  # pragma: no cover - best effort
+                pass
+        # Forget the frame so an unchanged screen is captured again next cycle.
+        with self._status_lock:
+            if job.image_hash and self._last_image_hash == job.image_hash:
+                self._last_image_hash = None
+            if job.frame_hash is not None and self._near_dup is not None:
+                self._near_dup.forget(job.title, job.frame_hash)
+
+    def _job_failed(self, job: _CaptureJob, exc: BaseException) -> None:
+        LOGGER.error("Capture job for %r failed: %s", job.title, exc, exc_info=exc)
+        self._discard_job(job)
+        self._publish_error(exc)
+
+    def _publish_error(self, exc: BaseException) -> None:
+        err_status = {
             "last_capture_utc": datetime.now(timezone.utc).isoformat(),
-            "window_title": info.title,
-            "window_bbox": info.bbox,
-            "encrypted_image": enc_img.name,
-            "encrypted_text": enc_txt.name,
+            "window_title": None,
+            "window_bbox": None,
+            "encrypted_image": None,
+            "encrypted_text": None,
             "capture_count": self._capture_count,
             "interval_sec": self.interval,
+            "error": f"{type(exc).__name__}: {exc}"[:500],
             "display_env": os.environ.get('DISPLAY'),
             "session_type": os.environ.get('XDG_SESSION_TYPE'),
             "process_pid": os.getpid(),
             "capture_backend": get_backend(),
             "service_instance_id": self._instance_id,
             "service_start_utc": self._started_utc,
-            "sequence": self._sequence,
-            "duplicate": False,
-            "backend_switch_reason": self._backend_switch_reason,
         }
-        # Only include switch reason on first success after a switch, then clear.
-        self._backend_switch_reason = None
-        self._last_status = status
-        self._write_status(status)
-        LOGGER.debug(
-            "Captured #%s and encrypted %s / %s (title=%r)",
-            self._capture_count,
-            enc_img.name,
-            enc_txt.name,
-            info.title,
-        )
+        self._publish_status(err_status)
+
+    def _publish_status(self, status: Dict[str, Any]) -> None:
+        """Stamp the next sequence number (plus stage metrics) and write status."""
+        with self._status_lock:
+            self._sequence += 1
+            status["sequence"] = self._sequence
+            metrics = self.pipeline_metrics()
+            if metrics:
+                status["pipeline"] = metrics
+            status["dedup"] = self.dedup_metrics()
+            if self._retention is not None:
+                status["retention"] = self._retention.stats()
+            if self._scheduler is not None:
+                status["scheduler"] = self._scheduler.stats()
+            if self._lock_monitor is not None:
+                status["lock_monitor"] = self._lock_monitor.stats()
+            if self.incremental_ocr:
+                status["ocr_incremental"] = incremental_stats()
+            engine = engine_stats()
+            if engine.get("engine") != "pytesseract":
+                status["ocr_engine"] = engine
+            self._last_status = status
+            self._write_status(status)
+
+    def dedup_metrics(self) -> Dict[str, Any]:
+        """Return skipped-frame counters for exact and perceptual duplicates."""
+        metrics: Dict[str, Any] = {
+            "skipped_exact": self._dedup_skipped["exact"],
+            "skipped_near": self._dedup_skipped["near"],
+        }
+        if self._near_dup is not None:
+            metrics.update(self._near_dup.stats())
+        return metrics
+
+    def pipeline_metrics(self) -> Dict[str, Any]:
+        """Return per-stage queue depth / throughput counters (empty when not pipelined)."""
+        metrics: Dict[str, Any] = {}
+        if self._ocr_stage is not None:
+            metrics["ocr"] = self._ocr_stage.metrics()
+        if self._encrypt_stage is not None:
+            metrics["encrypt"] = self._encrypt_stage.metrics()
+        return metrics
 
     # --- Lock Detection Helpers (Linux focus) ---
     def _is_screen_locked(self) -> bool:
@@ -402,21 +986,30 @@ class CaptureService:
         # Fast env hint (custom integration point)
         if os.environ.get('HINDSIGHT_SCREEN_LOCKED') == '1':
             return True
-        # loginctl LockedHint
+        if self._lock_monitor is not None:
+            return self._lock_monitor.locked()
+        for _, probe in self._lock_probes():
+            val = probe()
+            if val is not None:
+                return val
+        return False
+
+    def _lock_probes(self):
+        """Lock probes in preference order: loginctl LockedHint, GNOME, then KDE / freedesktop."""
+        probes = []
         sid = os.environ.get('XDG_SESSION_ID')
         if sid:
-            locked = self._loginctl_locked(sid)
-            if locked is not None:
-                return locked
-        # GNOME dbus
-        val = self._dbus_screensaver_gnome()
-        if val is not None:
-            return val
-        # KDE / freedesktop
-        val = self._dbus_screensaver_generic()
-        if val is not None:
-            return val
-        return False
+            probes.append(('loginctl', lambda: self._loginctl_locked(sid)))
+        probes.append(('gnome', self._dbus_screensaver_gnome))
+        probes.append(('freedesktop', self._dbus_screensaver_generic))
+        return probes
+
+    def _on_lock_change(self, locked: bool) -> None:
+        if locked:
+            self._commit_keyword_index(if_due=False)  # nothing more arrives while locked
+        # Unlocking usually reveals a different screen: capture it promptly.
+        if not locked and self._scheduler is not None:
+            self._scheduler.trigger("unlock")
 
     def _loginctl_locked(self, session_id: str):
         try:
@@ -479,7 +1072,85 @@ def build_default_service(base_dir: Path, interval: float = 5.0) -> CaptureServi
     Layout:
         base_dir/plain/  (transient plaintext)
         base_dir/encrypted/ (.enc outputs)
+
+    Pipeline tuning is read from the environment (set by the Electron supervisor):
+        HINDSIGHT_PIPELINE: '1' to run OCR / encryption on worker stages.
+        HINDSIGHT_OCR_WORKERS / HINDSIGHT_ENCRYPT_WORKERS: worker counts (default 1).
+        HINDSIGHT_QUEUE_SIZE: per-stage queue capacity (default 4).
+        HINDSIGHT_BACKPRESSURE: drop_oldest | coalesce | block (default drop_oldest).
+        HINDSIGHT_IN_MEMORY: '1' to never write plaintext PNG/TXT to base_dir/plain.
+        HINDSIGHT_DEDUP_THRESHOLD: near-duplicate Hamming threshold (-1 disables).
+        HINDSIGHT_DEDUP_HISTORY: frame hashes remembered per window title.
+        HINDSIGHT_OCR_INCREMENTAL: '1' to re-OCR only changed bands of a window.
+        HINDSIGHT_OCR_ENGINE: auto | tesserocr | pytesseract (default auto).
+        HINDSIGHT_OCR_THREADS: persistent Tesseract handles (default: OCR workers).
+        HINDSIGHT_CHUNKED_ENCRYPTION: '1' to write the chunked AES-GCM container.
+        HINDSIGHT_KEYWORD_INDEX: '1' to maintain base_dir/index/keyword.sqlite3.
+        HINDSIGHT_VECTOR_INDEX: '1' to embed captures into base_dir/index/vectors.
+        HINDSIGHT_ANN_INDEX: flat | ivf_flat | ivf_pq | hnsw per vector shard (default flat).
+        HINDSIGHT_EMBED_CHUNKS_PER_SEC: embedding throughput cap (default unthrottled).
+        HINDSIGHT_ENC_LAYOUT: flat | dated (YYYY/MM/DD partitions under base_dir/encrypted; default flat).
+        HINDSIGHT_IMAGE_CODEC: png | png-fast | webp-lossless | webp (default: image_codec in config/default.yaml).
+        HINDSIGHT_IMAGE_MAX_DIM: downscale frames whose larger side exceeds this (default: image_max_dim; 0 = never).
+        HINDSIGHT_RETENTION_DAYS: retention window in days (default: retention_days in config/default.yaml; 0 keeps all).
+        HINDSIGHT_RETENTION_RATE: maximum captures deleted per second (default 20).
+        HINDSIGHT_SEGMENTS: '1' to pack artifacts into encrypted segment files (base_dir/encrypted/segments).
+        HINDSIGHT_SEGMENT_MAX_MB: size at which a segment is sealed (default 64).
+        HINDSIGHT_ADAPTIVE: '1' to back off while idle and capture on window focus / title changes.
+        HINDSIGHT_MAX_INTERVAL: idle back-off ceiling in seconds (adaptive mode; default 60).
+        HINDSIGHT_LOCK_MONITOR: '0' to probe the screen lock on every cycle instead of caching it (default on).
+        HINDSIGHT_CATALOG: '0' to skip the capture catalog at base_dir/encrypted/catalog.sqlite3 (default on).
     """
+    ocr_workers = _env_int('HINDSIGHT_OCR_WORKERS', 1)
+    configure_engine(
+        os.environ.get('HINDSIGHT_OCR_ENGINE', 'auto').strip().lower() or 'auto',
+        _env_int('HINDSIGHT_OCR_THREADS', ocr_workers),
+    )
+    try:
+        max_dim = int(setting('HINDSIGHT_IMAGE_MAX_DIM', 'image_max_dim', '0'))
+    except ValueError:
+        max_dim = 0
+    configure_codec(setting('HINDSIGHT_IMAGE_CODEC', 'image_codec', DEFAULT_CODEC).strip().lower(), max_dim)
     plain = base_dir / "plain"
     enc = base_dir / "encrypted"
-    return CaptureService(output_dir=plain, enc_dir=enc, interval=interval, status_file=base_dir / "status.json")
+    return CaptureService(
+        output_dir=plain,
+        enc_dir=enc,
+        interval=interval,
+        status_file=base_dir / "status.json",
+        pipeline=_env_flag('HINDSIGHT_PIPELINE'),
+        ocr_workers=ocr_workers,
+        encrypt_workers=_env_int('HINDSIGHT_ENCRYPT_WORKERS', 1),
+        queue_size=_env_int('HINDSIGHT_QUEUE_SIZE', 4),
+        backpressure=os.environ.get('HINDSIGHT_BACKPRESSURE', 'drop_oldest').strip().lower() or 'drop_oldest',
+        in_memory=_env_flag('HINDSIGHT_IN_MEMORY'),
+        dedup_threshold=_env_int('HINDSIGHT_DEDUP_THRESHOLD', DEFAULT_THRESHOLD),
+        dedup_history=_env_int('HINDSIGHT_DEDUP_HISTORY', DEFAULT_HISTORY),
+        incremental_ocr=_env_flag('HINDSIGHT_OCR_INCREMENTAL'),
+        chunked_encryption=_env_flag('HINDSIGHT_CHUNKED_ENCRYPTION'),
+        keyword_index=base_dir / "index" / "keyword.sqlite3" if _env_flag('HINDSIGHT_KEYWORD_INDEX') else None,
+        vector_index=base_dir / "index" / "vectors" if _env_flag('HINDSIGHT_VECTOR_INDEX') else None,
+        ann_index=os.environ.get('HINDSIGHT_ANN_INDEX', 'flat').strip().lower() or 'flat',
+        embed_chunks_per_sec=_env_int('HINDSIGHT_EMBED_CHUNKS_PER_SEC', 0) or None,
+        catalog=enc / CATALOG_NAME if _env_flag('HINDSIGHT_CATALOG', '1') else None,
+        layout=os.environ.get('HINDSIGHT_ENC_LAYOUT', 'flat').strip().lower() or 'flat',
+        retention_days=configured_retention_days(),
+        segments=_env_flag('HINDSIGHT_SEGMENTS'),
+        segment_max_bytes=_env_int('HINDSIGHT_SEGMENT_MAX_MB', DEFAULT_SEGMENT_MAX_BYTES // (1024 * 1024)) * 1024 * 1024,
+        retention_rate=_env_int('HINDSIGHT_RETENTION_RATE', int(DEFAULT_MAX_DELETES_PER_SEC)) or None,
+        adaptive=_env_flag('HINDSIGHT_ADAPTIVE'),
+        max_interval=_env_int('HINDSIGHT_MAX_INTERVAL', int(DEFAULT_MAX_INTERVAL)),
+        lock_monitor=_env_flag('HINDSIGHT_LOCK_MONITOR', '1'),
+    )
+
+
+def _env_flag(name: str, default: str = '0') -> bool:
+    return os.environ.get(name, default).strip().upper() in {'1', 'TRUE', 'YES', 'Y'}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        LOGGER.warning("Ignoring invalid %s=%r (using %s)", name, os.environ.get(name), default)
+        return default
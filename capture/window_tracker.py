@@ -0,0 +1,234 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+In-process active window tracking over X11 (EWMH).
+
+``_linux_active_window`` forks ``xdotool`` three times per capture (active
+window id, name, geometry) and parses the text output. ``X11WindowTracker``
+keeps one python-xlib connection instead and follows property changes on a
+daemon thread:
+
+* ``_NET_ACTIVE_WINDOW`` on the root window (focus changes),
+* ``_NET_WM_NAME`` / ``WM_NAME`` on the active window (title changes),
+* ``ConfigureNotify`` / ``DestroyNotify`` of the active window (moves,
+  resizes, closing).
+
+The resulting ``WindowInfo`` is cached, so ``get_active_window()`` is a locked
+read. Listeners are told about focus and title changes, which the adaptive
+scheduler (``capture.scheduler``) turns into immediate captures.
+``capture.active_window`` goes back to ``xdotool`` when python-xlib is missing,
+the display cannot be opened or the connection drops.
+"""
+
+from __future__ import annotations
+
+import logging
+import select
+import threading
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .active_window import WindowInfo
+
+try:  # optional dependency
+    from Xlib import display as xdisplay  # type: ignore
+    from Xlib import error as xerror  # type: ignore
+except ImportError:  # pragma: no cover - optional
+    xdisplay = None  # type: ignore
+    xerror = None  # type: ignore
+
+LOGGER = logging.getLogger("hindsight.capture")
+
+# X protocol constants (X.h); kept here so injected displays work without python-xlib.
+_ANY_PROPERTY_TYPE = 0
+_STRUCTURE_NOTIFY_MASK = 1 << 17
+_PROPERTY_CHANGE_MASK = 1 << 22
+_DESTROY_NOTIFY = 17
+_CONFIGURE_NOTIFY = 22
+_PROPERTY_NOTIFY = 28
+
+_ATOMS = ("_NET_ACTIVE_WINDOW", "_NET_WM_NAME", "UTF8_STRING", "WM_NAME")
+
+WindowListener = Callable[[str, Optional[WindowInfo]], None]
+
+
+class X11WindowTracker:
+    """Cache of the active window, kept current from X property events.
+
+    Args:
+        display: Open ``Xlib.display.Display`` (default: a new one on ``$DISPLAY``).
+        poll: Seconds the event thread waits for X events before rechecking ``stop``.
+
+    Raises:
+        RuntimeError: python-xlib is not installed.
+        Xlib.error.DisplayError: The display cannot be opened.
+    """
+
+    def __init__(self, display: Any = None, poll: float = 0.5) -> None:
+        if display is None:
+            if xdisplay is None:
+                raise RuntimeError("python-xlib not installed")
+            display = xdisplay.Display()
+        self.poll = poll
+        self._display = display
+        self._root = display.screen().root
+        self._atoms: Dict[str, int] = {name: display.intern_atom(name) for name in _ATOMS}
+        self._lock = threading.Lock()
+        self._info: Optional[WindowInfo] = None
+        self._window: Any = None
+        self._failed = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._listeners: List[WindowListener] = []
+        self.events = 0
+        self.refreshes = 0
+        display.set_error_handler(self._on_x_error)
+        self._root.change_attributes(event_mask=_PROPERTY_CHANGE_MASK)
+        self._refresh_active()
+
+    # --- public API ---
+    def start(self) -> "X11WindowTracker":
+        """Start the event thread (idempotent)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="X11WindowTracker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self._display.close()
+        except Exception:  # pragma: no cover - already gone
+            pass
+
+    @property
+    def failed(self) -> bool:
+        """True once the X connection is unusable; callers fall back to xdotool."""
+        return self._failed
+
+    def current(self) -> Optional[WindowInfo]:
+        """Cached active window, or None when no window is active."""
+        with self._lock:
+            return self._info
+
+    def add_listener(self, callback: WindowListener) -> None:
+        """Call ``callback(kind, info)`` on ``focus`` and ``title`` changes (from the event thread)."""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback: WindowListener) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"events": self.events, "refreshes": self.refreshes, "failed": self._failed}
+
+    # --- event handling (event thread only, after start) ---
+    def _run(self) -> None:
+        fd = self._display.fileno()
+        while not self._stop.is_set():
+            try:
+                if not self._display.pending_events():
+                    select.select([fd], [], [], self.poll)
+                    continue
+                self._handle(self._display.next_event())
+            except Exception as exc:
+                if self._is_window_error(exc):
+                    self._refresh_active()
+                    continue
+                LOGGER.warning("X11 window tracker stopped (%s); falling back to xdotool", exc)
+                self._failed = True
+                return
+
+    def _handle(self, event: Any) -> None:
+        self.events += 1
+        window = getattr(event, "window", None)
+        on_root = window is not None and window.id == self._root.id
+        on_active = window is not None and self._window is not None and window.id == self._window.id
+        if event.type == _PROPERTY_NOTIFY:
+            if on_root and event.atom == self._atoms["_NET_ACTIVE_WINDOW"]:
+                self._refresh_active()
+            elif on_active and event.atom in (self._atoms["_NET_WM_NAME"], self._atoms["WM_NAME"]):
+                if self._update(title=self._title(self._window)):
+                    self._notify("title")
+        elif event.type == _CONFIGURE_NOTIFY and on_active:
+            self._update(bbox=self._geometry(self._window))
+        elif event.type == _DESTROY_NOTIFY and on_active:
+            self._refresh_active()
+
+    def _refresh_active(self) -> None:
+        """Re-read ``_NET_ACTIVE_WINDOW`` and (re)subscribe to the active window."""
+        self.refreshes += 1
+        info = None
+        previous = self._window.id if self._window is not None else None
+        try:
+            prop = self._root.get_full_property(self._atoms["_NET_ACTIVE_WINDOW"], _ANY_PROPERTY_TYPE)
+            window_id = int(prop.value[0]) if prop is not None and len(prop.value) else 0
+            if window_id:
+                window = self._display.create_resource_object("window", window_id)
+                if self._window is None or self._window.id != window_id:
+                    window.change_attributes(event_mask=_PROPERTY_CHANGE_MASK | _STRUCTURE_NOTIFY_MASK)
+                    self._window = window
+                info = WindowInfo(title=self._title(window), bbox=self._geometry(window))
+            else:
+                self._window = None
+        except Exception as exc:
+            if not self._is_window_error(exc):
+                raise
+            LOGGER.debug("Active window vanished while reading it: %s", exc)
+            self._window = None
+        with self._lock:
+            self._info = info
+        current = self._window.id if self._window is not None else None
+        if current != previous:
+            self._notify("focus")
+
+    def _update(self, **changes: Any) -> bool:
+        """Apply ``changes`` to the cached info; True if anything changed."""
+        with self._lock:
+            if self._info is None:
+                return False
+            updated = replace(self._info, **changes)
+            changed = updated != self._info
+            self._info = updated
+            return changed
+
+    def _notify(self, kind: str) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+            info = self._info
+        for callback in listeners:
+            try:
+                callback(kind, info)
+            except Exception as exc:  # a listener must not stop the tracker
+                LOGGER.debug("Window listener failed: %s", exc)
+
+    def _title(self, window: Any) -> str:
+        for atom, kind in (("_NET_WM_NAME", self._atoms["UTF8_STRING"]), ("WM_NAME", _ANY_PROPERTY_TYPE)):
+            prop = window.get_full_property(self._atoms[atom], kind)
+            if prop is not None and prop.value:
+                value = prop.value
+                title = value.decode("utf-8", "replace") if isinstance(value, (bytes, bytearray)) else str(value)
+                if title.strip():
+                    return title.strip()
+        return "window"
+
+    def _geometry(self, window: Any) -> Tuple[int, int, int, int]:
+        geom = window.get_geometry()
+        origin = self._root.translate_coords(window, 0, 0)
+        return (int(origin.x), int(origin.y), int(geom.width), int(geom.height))
+
+    @staticmethod
+    def _is_window_error(exc: BaseException) -> bool:
+        """BadWindow / BadDrawable: the window went away between event and query."""
+        if xerror is not None:
+            return isinstance(exc, (xerror.BadWindow, xerror.BadDrawable))
+        return type(exc).__name__ in ("BadWindow", "BadDrawable")
+
+    def _on_x_error(self, err: Any, request: Any = None) -> None:
+        # Asynchronous errors (e.g. selecting events on a window that just closed).
+        LOGGER.debug("X error in window tracker: %s", err)
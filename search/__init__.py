@@ -3,9 +3,10 @@
 Hindsight Recall Search Backend package.
 
 Exposes high-level hybrid search utilities combining:
-	* Keyword search (Recoll)
+	* Keyword search (SQLite FTS5)
 	* Semantic search (DistilBERT embeddings + FAISS)
-	* Reranking (fine-tuned DistilBERT model placeholder)
+	* Reranking (cross-encoder over the fused candidates)
 """
 
 from .hybrid import hybrid_search, SearchResult  # noqa: F401
+from .filters import SearchFilters  # noqa: F401
@@ -0,0 +1,168 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Approximate nearest neighbour index construction.
+
+Index kinds (all inner-product over L2-normalised vectors, wrapped in
+``IndexIDMap2`` so results carry capture vector ids):
+
+* ``flat``     exact search, 4 * dim bytes per vector.
+* ``ivf_flat`` inverted file over ``nlist`` k-means cells; ``nprobe`` cells scanned.
+* ``ivf_pq``   IVF with product-quantised codes (``pq_m`` bytes per vector).
+* ``hnsw``     graph index (``hnsw_m`` links per node), no training needed.
+
+Trained kinds learn their quantisers from a random sample of the vectors being
+indexed (``train_size``).
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+try:  # optional heavy dependencies
+    import faiss  # type: ignore
+except ImportError:  # pragma: no cover
+    faiss = None  # type: ignore
+
+try:  # pragma: no cover - optional
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+INDEX_KINDS = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+MIN_POINTS_PER_CENTROID = 39  # faiss k-means warns (and clusters poorly) below this
+
+
+@dataclass
+class ANNParams:
+    """Tunable ANN parameters.
+
+    Attributes:
+        kind: One of ``INDEX_KINDS``.
+        nlist: IVF cells; 0 picks ~4*sqrt(n) capped by the sample size.
+        nprobe: IVF cells scanned per query.
+        pq_m: PQ sub-quantisers (bytes per vector); 0 picks ~dim/8.
+        hnsw_m: HNSW links per node.
+        ef_search: HNSW candidate list size at query time.
+        train_size: Maximum vectors sampled for training.
+    """
+
+    kind: str = "flat"
+    nlist: int = 0
+    nprobe: int = 16
+    pq_m: int = 0
+    hnsw_m: int = 32
+    ef_search: int = 64
+    train_size: int = 50_000
+
+    def __post_init__(self) -> None:
+        if self.kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown ANN index kind {self.kind!r}; expected one of {INDEX_KINDS}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def min_train_points(params: ANNParams) -> int:
+    """Smallest corpus for which ``params.kind`` can be trained sensibly."""
+    if params.kind == "ivf_flat":
+        return MIN_POINTS_PER_CENTROID * max(1, params.nlist or 16)
+    if params.kind == "ivf_pq":
+        # 8-bit PQ learns 256 centroids per sub-quantiser.
+        return max(256, MIN_POINTS_PER_CENTROID * max(1, params.nlist or 16))
+    return 1
+
+
+def choose_nlist(n: int, requested: int = 0) -> int:
+    """Pick an IVF cell count for ``n`` training vectors."""
+    nlist = requested or int(4 * math.sqrt(max(1, n)))
+    return max(1, min(nlist, n // MIN_POINTS_PER_CENTROID or 1))
+
+
+def choose_pq_m(dim: int, requested: int = 0) -> int:
+    """Largest divisor of ``dim`` not above the requested (or ~dim/8) sub-quantiser count."""
+    target = max(1, min(dim, requested or dim // 8))
+    for m in range(target, 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def factory_string(params: ANNParams, dim: int, n: int) -> str:
+    """Return the ``faiss.index_factory`` description for ``params``."""
+    if params.kind == "flat":
+        return "Flat"
+    if params.kind == "hnsw":
+        return f"HNSW{params.hnsw_m},Flat"
+    nlist = choose_nlist(n, params.nlist)
+    if params.kind == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    return f"IVF{nlist},PQ{choose_pq_m(dim, params.pq_m)}x8"
+
+
+def build_index(params: ANNParams, vectors, ids, seed: int = 0):
+    """Train (if needed) and fill an index of ``params.kind``.
+
+    Args:
+        params: ANN parameters.
+        vectors: ``(n, dim)`` float32 array of normalised vectors.
+        ids: ``(n,)`` int64 vector ids.
+        seed: Sampling seed for the training subset.
+
+    Returns:
+        faiss.IndexIDMap2: Populated index configured for search.
+    """
+    if faiss is None or np is None:
+        raise RuntimeError("faiss or numpy not installed")
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, dim = vectors.shape
+    index = create_index(params, dim, n)
+    if not index.is_trained:
+        sample = vectors
+        if n > params.train_size:
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(n, params.train_size, replace=False)]
+        index.train(sample)
+    index.add_with_ids(vectors, np.ascontiguousarray(ids, dtype="int64"))
+    return index
+
+
+def create_index(params: ANNParams, dim: int, n: int):
+    """Return an empty (possibly untrained) id-mapped index sized for ``n`` vectors."""
+    if faiss is None:
+        raise RuntimeError("faiss not installed")
+    inner = faiss.index_factory(dim, factory_string(params, dim, n), faiss.METRIC_INNER_PRODUCT)
+    index = faiss.IndexIDMap2(inner)
+    configure_search(index, params)
+    return index
+
+
+def configure_search(index, params: ANNParams) -> None:
+    """Apply query-time parameters (``nprobe`` / ``efSearch``) to ``index``."""
+    if faiss is None:  # pragma: no cover
+        return
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else faiss.downcast_index(index)
+    if hasattr(inner, "nprobe"):
+        inner.nprobe = max(1, min(params.nprobe, inner.nlist))
+    hnsw: Optional[Any] = getattr(inner, "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = max(1, params.ef_search)
+
+
+def search_parameters(index, selector):
+    """Search parameters restricting ``index`` to ``selector`` with its current nprobe/efSearch."""
+    if faiss is None:  # pragma: no cover
+        raise RuntimeError("faiss not installed")
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else faiss.downcast_index(index)
+    if hasattr(inner, "nprobe"):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=inner.nprobe)
+    hnsw = getattr(inner, "hnsw", None)
+    if hnsw is not None:
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def index_bytes(index) -> int:
+    """Serialized size of ``index`` in bytes."""
+    return int(faiss.serialize_index(index).size)
@@ -0,0 +1,203 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+ANN index benchmark: recall@k against exact search, query latency and size.
+
+Usage::
+
+    python -m search.benchmark --store data/index/vectors --k 10
+    python -m search.benchmark --synthetic 100000 --dim 768 --kinds ivf_flat,ivf_pq,hnsw
+
+Queries are held out from the corpus (they are not indexed), so recall reflects
+searching for content that is similar to, not identical with, stored captures.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from .ann import INDEX_KINDS, ANNParams, build_index, factory_string, index_bytes
+
+try:  # optional heavy dependencies
+    import faiss  # type: ignore
+except ImportError:  # pragma: no cover
+    faiss = None  # type: ignore
+
+try:  # pragma: no cover - optional
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements for one index kind.
+
+    Attributes:
+        kind: ANN index kind.
+        factory: faiss factory string that was built.
+        n: Indexed vectors.
+        recall_at_k: Mean overlap with the exact top-k (1.0 = identical).
+        p50_ms: Median single-query latency.
+        p99_ms: 99th percentile single-query latency.
+        bytes_per_vector: Serialized index size divided by ``n``.
+        build_seconds: Training plus add time.
+    """
+
+    kind: str
+    factory: str
+    n: int
+    recall_at_k: float
+    p50_ms: float
+    p99_ms: float
+    bytes_per_vector: float
+    build_seconds: float
+
+
+def run_benchmark(
+    vectors,
+    queries,
+    kinds: Sequence[str] = INDEX_KINDS,
+    k: int = 10,
+    base: Optional[ANNParams] = None,
+) -> List[BenchmarkResult]:
+    """Build each index kind over ``vectors`` and measure it with ``queries``.
+
+    Args:
+        vectors: ``(n, dim)`` float32 corpus (normalised).
+        queries: ``(q, dim)`` float32 queries (normalised).
+        kinds: Index kinds to compare; exact ``flat`` is always the reference.
+        k: Neighbours per query.
+        base: Shared parameters (nprobe, pq_m, ...) applied to every kind.
+
+    Returns:
+        list[BenchmarkResult]: One entry per kind.
+    """
+    if faiss is None or np is None:
+        raise RuntimeError("faiss or numpy not installed")
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    queries = np.ascontiguousarray(queries, dtype="float32")
+    n, dim = vectors.shape
+    ids = np.arange(n, dtype="int64")
+    k = max(1, min(k, n))
+    exact = faiss.IndexFlatIP(dim)
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+    base = base or ANNParams()
+    results = []
+    for kind in kinds:
+        params = ANNParams(**{**base.to_dict(), "kind": kind})
+        started = time.perf_counter()
+        index = build_index(params, vectors, ids)
+        build_seconds = time.perf_counter() - started
+        latencies = []
+        hits = 0
+        for row, query in enumerate(queries):
+            t0 = time.perf_counter()
+            _, found = index.search(query.reshape(1, -1), k)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            hits += len(set(found[0].tolist()) & set(truth[row].tolist()))
+        results.append(
+            BenchmarkResult(
+                kind=kind,
+                factory=factory_string(params, dim, n),
+                n=n,
+                recall_at_k=hits / float(k * len(queries)) if len(queries) else 0.0,
+                p50_ms=float(np.percentile(latencies, 50)) if latencies else 0.0,
+                p99_ms=float(np.percentile(latencies, 99)) if latencies else 0.0,
+                bytes_per_vector=index_bytes(index) / float(n),
+                build_seconds=build_seconds,
+            )
+        )
+    return results
+
+
+def split_queries(vectors, n_queries: int, seed: int = 0) -> Tuple[object, object]:
+    """Hold out ``n_queries`` random rows as queries; return (corpus, queries)."""
+    rng = np.random.default_rng(seed)
+    n_queries = max(1, min(n_queries, len(vectors) // 10 or 1))
+    held = rng.choice(len(vectors), n_queries, replace=False)
+    mask = np.ones(len(vectors), dtype=bool)
+    mask[held] = False
+    return vectors[mask], vectors[held]
+
+
+def synthetic_vectors(n: int, dim: int, clusters: int = 64, seed: int = 0):
+    """Clustered, normalised random vectors (embeddings of similar screens cluster too)."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype("float32")
+    data = centres[rng.integers(0, clusters, n)] + 0.35 * rng.standard_normal((n, dim)).astype("float32")
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def load_store_vectors(root: Path, limit: Optional[int] = None):
+    """Read stored vectors from the flat segments of a ``VectorStore`` directory."""
+    parts = []
+    total = 0
+    for path in sorted(Path(root).glob("*/seg-*.faiss")):
+        seg = faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        parts.append(seg.index.reconstruct_n(0, seg.ntotal))
+        total += seg.ntotal
+        if limit is not None and total >= limit:
+            break
+    if not parts:
+        raise ValueError(f"No vector segments under {root}")
+    vectors = np.concatenate(parts)
+    return vectors[:limit] if limit is not None else vectors
+
+
+def _format_table(results: List[BenchmarkResult], k: int) -> str:
+    header = f"{'kind':<9} {'factory':<18} {'recall@' + str(k):>9} {'p50 ms':>8} {'p99 ms':>8} {'B/vec':>8} {'build s':>8}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.kind:<9} {r.factory:<18} {r.recall_at_k:>9.3f} {r.p50_ms:>8.3f} {r.p99_ms:>8.3f} "
+            f"{r.bytes_per_vector:>8.1f} {r.build_seconds:>8.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ANN index kinds against exact search")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--store", type=Path, help="VectorStore directory to sample vectors from")
+    source.add_argument("--synthetic", type=int, metavar="N", help="Generate N synthetic vectors")
+    parser.add_argument("--dim", type=int, default=768, help="Dimension for --synthetic")
+    parser.add_argument("--limit", type=int, default=None, help="Max stored vectors to load")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--kinds", default=",".join(INDEX_KINDS))
+    parser.add_argument("--nlist", type=int, default=0)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--pq-m", type=int, default=0)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    args = parser.parse_args(argv)
+    if faiss is None or np is None:
+        print("faiss and numpy are required", file=sys.stderr)
+        return 2
+    if args.store is not None:
+        vectors = load_store_vectors(args.store, args.limit)
+    else:
+        vectors = synthetic_vectors(args.synthetic, args.dim)
+    corpus, queries = split_queries(vectors, args.queries)
+    base = ANNParams(
+        nlist=args.nlist, nprobe=args.nprobe, pq_m=args.pq_m, hnsw_m=args.hnsw_m, ef_search=args.ef_search
+    )
+    kinds = [k.strip() for k in args.kinds.split(",") if k.strip()]
+    results = run_benchmark(corpus, queries, kinds=kinds, k=args.k, base=base)
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(_format_table(results, args.k))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
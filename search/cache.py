@@ -0,0 +1,161 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Caches for repeated searches.
+
+* Query embeddings are cached by (normalised query text, model version), so
+  refining a query or paging back to it does not run the embedding model again.
+* Hybrid search results are cached by (normalised query, filters, search
+  parameters, index generation). The generation comes from the keyword index
+  and the vector store and advances whenever newly indexed captures become
+  searchable, so stale entries are never served; they simply stop matching and
+  age out of the LRU.
+
+Both caches are bounded LRUs with a time-to-live and expose hit/miss counters
+through ``cache_stats()``.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from . import indexer, semantic, vector_store
+
+DEFAULT_EMBEDDING_ENTRIES = 512
+DEFAULT_EMBEDDING_TTL = 3600.0  # seconds
+DEFAULT_RESULT_ENTRIES = 256
+DEFAULT_RESULT_TTL = 300.0  # seconds
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Args:
+        max_entries: Entries kept before the least recently used are evicted.
+        ttl: Seconds an entry stays valid (None = no expiry).
+        clock: Monotonic time source (tests).
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and self.ttl is not None and self._clock() - entry[0] > self.ttl:
+                del self._data[key]
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    try:
+        return float(value) if value else default
+    except ValueError:
+        return default
+
+
+EMBEDDINGS = TTLCache(DEFAULT_EMBEDDING_ENTRIES, _env_float("HINDSIGHT_EMBED_CACHE_TTL", DEFAULT_EMBEDDING_TTL))
+RESULTS = TTLCache(DEFAULT_RESULT_ENTRIES, _env_float("HINDSIGHT_RESULT_CACHE_TTL", DEFAULT_RESULT_TTL))
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different queries share entries."""
+    return " ".join((query or "").casefold().split())
+
+
+def model_version(backend: Optional[str] = None) -> str:
+    """Identifier of the embedding model and backend producing query vectors."""
+    return f"{semantic.EMBED_MODEL_NAME}@{semantic.inference_backend(backend)}"
+
+
+def embed_query(query: str) -> semantic.EmbeddingResult:
+    """Embed one query through ``EMBEDDINGS``."""
+    key = (normalize_query(query), model_version())
+    cached = EMBEDDINGS.get(key)
+    if cached is not None:
+        return cached
+    result = semantic.embed_texts([query])
+    if result.dim > 1:  # the dim-1 placeholder means no model was available; do not pin it
+        EMBEDDINGS.put(key, result)
+    return result
+
+
+def index_generation() -> Tuple[int, int]:
+    """``(keyword, vector)`` generations of the default indexes (0 where absent)."""
+    keyword = indexer.default_index().generation if indexer.default_db_path().exists() else 0
+    store = vector_store.default_store()
+    return keyword, store.generation if store is not None else 0
+
+
+def result_key(query: str, generation: Tuple[int, int], **params: Any) -> Tuple:
+    """Result-cache key; ``params`` must be hashable (filters, limit, fusion, ...)."""
+    return (normalize_query(query), generation, tuple(sorted(params.items())))
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters of the embedding and result caches."""
+    return {"embeddings": EMBEDDINGS.stats(), "results": RESULTS.stats()}
+
+
+def clear() -> None:
+    """Drop every cached embedding and result (counters are kept)."""
+    EMBEDDINGS.clear()
+    RESULTS.clear()
+
+
+def copy_results(results: List[Any]) -> List[Any]:
+    """Shallow copies of cached ``SearchResult`` objects, so callers cannot mutate the cache."""
+    from dataclasses import replace
+
+    return [replace(r, ranks=dict(r.ranks), raw_scores=dict(r.raw_scores)) for r in results]
@@ -0,0 +1,335 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Background embedding of captured OCR text into the vector store.
+
+``embed_texts`` pads a batch to its longest text and truncates at the model's
+512-token limit. For whole OCR pages this worker instead:
+
+1. tokenizes each capture once and splits it into overlapping token windows
+   (``window`` tokens, ``stride`` apart) so nothing past 512 tokens is lost;
+2. sorts the windows by length and cuts fixed-size batches from that order, so
+   each batch pads to roughly its own length instead of the longest page;
+3. mean-pools the last hidden state over the attention mask (padding excluded);
+4. writes every vector of a batch of captures to the store in one transaction.
+
+The worker consumes captures submitted by the capture service and, on start,
+catches up on ``.txt.enc`` files newer than its checkpoint (stored in the
+vector store's metadata) that have no vectors yet. The checkpoint is a capture
+timestamp, the clock the capture catalog is queried by, and only advances once
+the store has written the vectors to a segment; segment writes follow the
+store's own size/delay thresholds rather than one per batch. Throughput is reported in
+chunks/sec and can be capped with ``target_chunks_per_sec`` so embedding does
+not starve capture and OCR of CPU.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:  # pragma: no cover - optional
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+from . import semantic
+from .indexer import CATCH_UP_SLACK, _catch_up_candidates
+
+LOGGER = logging.getLogger("hindsight.search")
+
+DEFAULT_WINDOW = 256  # tokens per chunk, excluding [CLS]/[SEP]
+DEFAULT_STRIDE = 192  # window start offset; window - stride tokens of overlap
+DEFAULT_BATCH_SIZE = 16
+CHECKPOINT_KEY = "embed_checkpoint"
+
+Forward = Callable[[Any, Any], Any]  # (input_ids, attention_mask) int arrays -> (b, t, d) hidden states
+
+
+@dataclass
+class Chunk:
+    """One token window of a capture."""
+
+    capture: str
+    index: int
+    ts: float
+    token_ids: List[int]
+
+
+def token_windows(token_ids: Sequence[int], window: int = DEFAULT_WINDOW, stride: int = DEFAULT_STRIDE) -> List[List[int]]:
+    """Split ``token_ids`` into overlapping windows covering every token.
+
+    Args:
+        token_ids: Tokens of one document (no special tokens).
+        window: Maximum tokens per window.
+        stride: Offset between window starts (``<= window``).
+
+    Returns:
+        list[list[int]]: Windows in document order (one empty window for empty input).
+    """
+    window = max(1, window)
+    stride = max(1, min(stride, window))
+    ids = list(token_ids)
+    if len(ids) <= window:
+        return [ids]
+    windows = []
+    for start in range(0, len(ids), stride):
+        windows.append(ids[start:start + window])
+        if start + window >= len(ids):
+            break
+    return windows
+
+
+def length_buckets(chunks: Sequence[Chunk], batch_size: int = DEFAULT_BATCH_SIZE) -> List[List[Chunk]]:
+    """Group chunks of similar length into batches of ``batch_size``."""
+    ordered = sorted(chunks, key=lambda c: len(c.token_ids))
+    size = max(1, batch_size)
+    return [ordered[i:i + size] for i in range(0, len(ordered), size)]
+
+
+def pad_batch(batch: Sequence[Chunk], cls_id: int, sep_id: int, pad_id: int):
+    """Return ``(input_ids, attention_mask)`` int64 arrays with [CLS]/[SEP] added."""
+    width = max(len(c.token_ids) for c in batch) + 2
+    input_ids = np.full((len(batch), width), pad_id, dtype="int64")
+    mask = np.zeros((len(batch), width), dtype="int64")
+    for row, chunk in enumerate(batch):
+        seq = [cls_id, *chunk.token_ids, sep_id]
+        input_ids[row, :len(seq)] = seq
+        mask[row, :len(seq)] = 1
+    return input_ids, mask
+
+
+def masked_mean_pool(hidden, mask):
+    """Average ``hidden`` (b, t, d) over positions where ``mask`` (b, t) is 1."""
+    weights = np.asarray(mask, dtype="float32")[:, :, None]
+    summed = (np.asarray(hidden, dtype="float32") * weights).sum(axis=1)
+    return summed / np.clip(weights.sum(axis=1), 1e-9, None)
+
+
+def torch_forward(model) -> Forward:
+    """Wrap a Hugging Face model as a ``Forward`` callable."""
+    torch = semantic.torch
+
+    def _forward(input_ids, attention_mask):
+        with torch.inference_mode():
+            out = model(input_ids=torch.from_numpy(input_ids), attention_mask=torch.from_numpy(attention_mask))
+        return out.last_hidden_state.float().cpu().numpy()
+
+    return _forward
+
+
+class EmbeddingWorker:
+    """Thread that embeds submitted captures into a ``VectorStore``.
+
+    Args:
+        store: Destination ``search.vector_store.VectorStore``.
+        tokenizer: Hugging Face tokenizer (defaults to the shared registry model).
+        forward: Model forward callable (defaults to the shared registry model).
+        window: Tokens per chunk.
+        stride: Token offset between chunks.
+        batch_size: Chunks per forward pass.
+        max_captures: Captures gathered from the queue per bulk write.
+        target_chunks_per_sec: Upper bound on embedding throughput (None = unthrottled).
+    """
+
+    def __init__(
+        self,
+        store,
+        tokenizer: Any = None,
+        forward: Optional[Forward] = None,
+        window: int = DEFAULT_WINDOW,
+        stride: int = DEFAULT_STRIDE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_captures: int = 32,
+        target_chunks_per_sec: Optional[float] = None,
+    ) -> None:
+        self.store = store
+        self._tokenizer = tokenizer
+        self._forward = forward
+        self.window = window
+        self.stride = stride
+        self.batch_size = batch_size
+        self.max_captures = max(1, max_captures)
+        self.target_chunks_per_sec = target_chunks_per_sec
+        self._queue: "queue.Queue[Optional[Tuple[str, str, float, Optional[Dict[str, Any]]]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._newest = 0.0  # newest capture ts handed to the store, not yet checkpointed
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, float] = {"captures": 0, "chunks": 0, "batches": 0, "seconds": 0.0, "failed": 0}
+
+    # --- model ---
+    def _model(self) -> Tuple[Any, Forward]:
+        if self._tokenizer is None or self._forward is None:
+            tokenizer, model = semantic.get_model()
+            self._tokenizer = self._tokenizer or tokenizer
+            self._forward = self._forward or torch_forward(model)
+        return self._tokenizer, self._forward
+
+    # --- lifecycle ---
+    def start(self, catch_up: Optional[Tuple[Path, bytes]] = None, catalog=None) -> None:
+        """Start the worker; ``catch_up=(enc_dir, key)`` first embeds captures missed earlier."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, args=(catch_up, catalog), name="EmbeddingWorker", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Finish queued captures, then stop."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(
+        self, capture: str, text: str, ts: Optional[float] = None, meta: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Queue OCR ``text`` of ``capture`` (its encrypted text path) for embedding.
+
+        ``ts`` is the capture time (default: now); ``meta`` (window title, bbox,
+        backend) is stored with the vectors for filtering.
+        """
+        self._queue.put((capture, text, time.time() if ts is None else ts, meta))
+
+    def _run(self, catch_up: Optional[Tuple[Path, bytes]], catalog=None) -> None:
+        if catch_up is not None:
+            try:
+                self.catch_up(*catch_up, catalog=catalog)
+            except Exception as exc:  # noqa: BLE001
+                LOGGER.warning("Embedding catch-up failed: %s", exc)
+        while True:
+            try:
+                # With vectors buffered, wake up to write them once they are due.
+                item = self._queue.get(timeout=self.store.max_delay if self.store.pending else None)
+            except queue.Empty:
+                self._flush_if_due()
+                continue
+            if item is None:
+                self.flush()
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_captures:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            try:
+                self.embed_captures(batch)
+            except Exception as exc:  # noqa: BLE001 - keep consuming
+                with self._stats_lock:
+                    self.stats["failed"] += len(batch)
+                LOGGER.warning("Embedding %s captures failed: %s", len(batch), exc)
+            if stop:
+                self.flush()
+                return
+
+    # --- work ---
+    def catch_up(self, enc_dir: Path, key: bytes, decrypt=None, catalog=None) -> int:
+        """Embed ``*.txt.enc`` captures at or after the checkpoint that have no vectors yet.
+
+        ``catalog`` (a ``capture.catalog.CaptureCatalog``) supplies candidates and
+        metadata without listing ``enc_dir``.
+
+        Returns:
+            int: Captures embedded.
+        """
+        if decrypt is None:
+            from capture.segments import read_artifact as decrypt
+
+        checkpoint = max(0.0, float(self.store.get_meta(CHECKPOINT_KEY) or 0.0) - CATCH_UP_SLACK)
+        pending = [c for c in _catch_up_candidates(enc_dir, checkpoint, catalog) if not self.store.contains(str(c[1]))]
+        done = 0
+        for offset in range(0, len(pending), self.max_captures):
+            items = []
+            for mtime, path, meta in pending[offset:offset + self.max_captures]:
+                try:
+                    items.append((str(path), decrypt(path, key).decode("utf-8", errors="replace"), mtime, meta))
+                except Exception as exc:  # noqa: BLE001
+                    LOGGER.warning("Skipping %s: %s", path, exc)
+            done += self.embed_captures(items)
+        self.flush()
+        return done
+
+    def embed_captures(self, items: Sequence[Tuple]) -> int:
+        """Chunk, embed and store ``(capture, text, ts[, meta])`` items in bulk.
+
+        Returns:
+            int: Captures written.
+        """
+        items = [i for i in items if i[1].strip()]
+        if not items:
+            return 0
+        tokenizer, forward = self._model()
+        started = time.monotonic()
+        chunks: List[Chunk] = []
+        meta = {item[0]: item[3] for item in items if len(item) > 3 and item[3] is not None}
+        for capture, text, ts, *_ in items:
+            ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+            for idx, window in enumerate(token_windows(ids, self.window, self.stride)):
+                chunks.append(Chunk(capture=capture, index=idx, ts=ts, token_ids=window))
+        rows = []
+        for batch in length_buckets(chunks, self.batch_size):
+            input_ids, mask = pad_batch(batch, tokenizer.cls_token_id, tokenizer.sep_token_id, tokenizer.pad_token_id)
+            vectors = masked_mean_pool(forward(input_ids, mask), mask)
+            rows.extend((c.capture, c.index, vec, c.ts) for c, vec in zip(batch, vectors))
+            with self._stats_lock:
+                self.stats["batches"] += 1
+            self._throttle(started, len(rows))
+        self.store.add_many(rows, meta=meta)
+        self._newest = max(self._newest, max(item[2] for item in items))
+        self._checkpoint()
+        with self._stats_lock:
+            self.stats["captures"] += len(items)
+            self.stats["chunks"] += len(chunks)
+            self.stats["seconds"] += time.monotonic() - started
+        return len(items)
+
+    def flush(self) -> None:
+        """Write buffered vectors to a segment and advance the checkpoint."""
+        self.store.flush()
+        self._checkpoint()
+
+    def _flush_if_due(self) -> None:
+        if self.store.flush_due():
+            self.flush()
+
+    def _checkpoint(self) -> None:
+        """Persist the newest capture ts once nothing handed to the store is still buffered.
+
+        Captures arrive in (nearly) capture-time order, so every capture at or
+        before it is in a segment; catch-up re-scans ``CATCH_UP_SLACK`` seconds
+        before it for the few that the pipeline's worker pools finished late.
+        """
+        if self.store.pending or not self._newest:
+            return
+        if self._newest > float(self.store.get_meta(CHECKPOINT_KEY) or 0.0):
+            self.store.set_meta(CHECKPOINT_KEY, repr(self._newest))
+        self._newest = 0.0
+
+    def _throttle(self, started: float, done: int) -> None:
+        """Sleep just long enough to keep ``done`` chunks at or under the target rate."""
+        if not self.target_chunks_per_sec:
+            return
+        ahead = done / self.target_chunks_per_sec - (time.monotonic() - started)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Throughput counters (``chunks_per_sec`` over time spent embedding)."""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["chunks_per_sec"] = round(stats["chunks"] / stats["seconds"], 2) if stats["seconds"] else 0.0
+        stats["target_chunks_per_sec"] = self.target_chunks_per_sec
+        stats["queued"] = self._queue.qsize()
+        return stats
@@ -0,0 +1,149 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Search filters pushed down into the keyword and vector indexes.
+
+Both indexes keep a small metadata record per capture: timestamp, window
+title, window bbox and capture backend (the fields the capture service already
+publishes in ``status.json``). A ``SearchFilters`` renders to a SQL predicate
+over those columns, so the keyword index filters inside its FTS query and the
+vector store turns it into a FAISS id selector, instead of post-filtering
+full result lists.
+
+Window titles are matched case-insensitively on a normalised key (alphanumeric
+words separated by single spaces), so "in Firefox" matches both a live title
+"Docs - Mozilla Firefox" and ``Docs_Mozilla_Firefox`` recovered from a capture
+filename.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+_WORD_RE = re.compile(r"[^0-9a-z]+")
+_FILENAME_RE = re.compile(r"^(?P<title>.*)_(?P<ts>\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})(?:-\d+)?$")
+
+METADATA_COLUMNS = (
+    ("title", "TEXT"),
+    ("title_key", "TEXT"),
+    ("bbox", "TEXT"),
+    ("backend", "TEXT"),
+)
+
+
+def title_key(title: Optional[str]) -> str:
+    """Normalised window title used for matching (lowercase words, single spaces)."""
+    return _WORD_RE.sub(" ", (title or "").lower()).strip()
+
+
+def metadata_from_filename(path: Path) -> Dict[str, Any]:
+    """Recover title and capture time from a ``TITLE_YYYY-MM-DD_HH-MM-SS`` artifact name.
+
+    The stamp is read in the ``HINDSIGHT_TZ_SPEC`` zone it was written in. Used
+    for captures indexed without live metadata (catch-up runs).
+    """
+    from capture.screenshot import filename_timestamp  # capture imports search; resolve lazily
+
+    stem = Path(path).name.split(".", 1)[0]
+    match = _FILENAME_RE.match(stem)
+    if match is None:
+        return {"title": stem.replace("_", " ")}
+    meta: Dict[str, Any] = {"title": match.group("title").replace("_", " ")}
+    try:
+        meta["ts"] = filename_timestamp(match.group("ts"))
+    except ValueError:  # pragma: no cover - regex guarantees the shape
+        pass
+    return meta
+
+
+def metadata_values(meta: Optional[Dict[str, Any]]) -> Tuple[Optional[str], str, Optional[str], Optional[str]]:
+    """Row values for ``METADATA_COLUMNS`` from a capture metadata mapping."""
+    meta = meta or {}
+    bbox = meta.get("bbox")
+    return (
+        meta.get("title"),
+        title_key(meta.get("title")),
+        ",".join(str(int(v)) for v in bbox) if bbox else None,
+        meta.get("backend"),
+    )
+
+
+def ensure_metadata_columns(conn, table: str) -> None:
+    """Add ``METADATA_COLUMNS`` to ``table`` if an older schema lacks them."""
+    present = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, kind in METADATA_COLUMNS:
+        if name not in present:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind}")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_backend ON {table}(backend)")
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Constraints applied inside the indexes.
+
+    Attributes:
+        start: Inclusive lower bound on capture time (epoch seconds).
+        end: Inclusive upper bound on capture time (epoch seconds).
+        window_title: Case-insensitive substring of the window title (app names
+            such as "Firefox" are part of the title). Matched with a
+            leading-wildcard ``LIKE``, which no B-tree index can serve: it is
+            checked row by row on the rows left by the other predicates (FTS
+            matches in the keyword index; every row of the date-selected
+            shards in the vector store). Narrow with ``start``/``end`` on
+            large archives.
+        backends: Capture backends to include (``mss``, ``imagegrab``).
+    """
+
+    start: Optional[float] = None
+    end: Optional[float] = None
+    window_title: Optional[str] = None
+    backends: Optional[Tuple[str, ...]] = None
+
+    def is_empty(self) -> bool:
+        return self.start is None and self.end is None and not self.window_title and not self.backends
+
+    def has_metadata(self) -> bool:
+        """True when the filter needs more than the timestamp."""
+        return bool(self.window_title) or bool(self.backends)
+
+    def key(self) -> Tuple:
+        """Hashable form for cache keys."""
+        return astuple(self)
+
+    def where(self, ts_column: str = "ts", prefix: str = "") -> Tuple[str, List[Any]]:
+        """Render as a SQL predicate (``"1"`` when empty) plus its parameters.
+
+        Args:
+            ts_column: Name of the timestamp column.
+            prefix: Table alias including the dot (e.g. ``"d."``).
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if self.start is not None:
+            clauses.append(f"{prefix}{ts_column} >= ?")
+            params.append(self.start)
+        if self.end is not None:
+            clauses.append(f"{prefix}{ts_column} <= ?")
+            params.append(self.end)
+        if self.window_title and title_key(self.window_title):
+            # title_key leaves only [0-9a-z ], so LIKE wildcards cannot sneak in.
+            # Substring match: evaluated per row, never through an index.
+            clauses.append(f"{prefix}title_key LIKE ?")
+            params.append(f"%{title_key(self.window_title)}%")
+        if self.backends:
+            clauses.append(f"{prefix}backend IN ({','.join('?' * len(self.backends))})")
+            params.extend(self.backends)
+        return (" AND ".join(clauses) or "1"), params
+
+
+def make_filters(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    window_title: Optional[str] = None,
+    backends: Optional[Sequence[str]] = None,
+) -> Optional[SearchFilters]:
+    """Build ``SearchFilters`` from loose arguments (None when nothing is constrained)."""
+    filters = SearchFilters(start, end, window_title or None, tuple(backends) if backends else None)
+    return None if filters.is_empty() else filters
@@ -0,0 +1,104 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Rank fusion for hybrid search.
+
+Each retriever ("leg") returns ``(doc_id, raw_score)`` pairs, best first, on
+its own scale: BM25 for keywords, cosine similarity for vectors. Methods:
+
+* ``rrf``     reciprocal rank fusion, ``sum(w / (k + rank))``; ignores raw scores,
+              so it needs no calibration between legs.
+* ``minmax``  raw scores rescaled to [0, 1] per leg, then weighted sum.
+* ``zscore``  raw scores standardised per leg, then weighted sum.
+
+For the score-based methods a document missing from a leg contributes that
+leg's minimum normalised score (0 for minmax), not a penalty below it.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+FUSION_METHODS = ("rrf", "minmax", "zscore")
+RRF_K = 60  # damping constant from Cormack et al.; larger flattens rank differences
+
+Ranking = Sequence[Tuple[str, float]]
+
+
+@dataclass
+class FusedHit:
+    """One fused document.
+
+    Attributes:
+        doc_id: Document identifier.
+        score: Fused score (higher is better).
+        ranks: 1-based rank per leg that returned the document.
+        raw_scores: Raw retriever score per leg that returned the document.
+    """
+
+    doc_id: str
+    score: float
+    ranks: Dict[str, int] = field(default_factory=dict)
+    raw_scores: Dict[str, float] = field(default_factory=dict)
+
+
+def _collect(rankings: Mapping[str, Ranking]) -> Dict[str, FusedHit]:
+    hits: Dict[str, FusedHit] = {}
+    for leg, ranking in rankings.items():
+        for rank, (doc_id, raw) in enumerate(ranking, start=1):
+            hit = hits.setdefault(doc_id, FusedHit(doc_id=doc_id, score=0.0))
+            if leg not in hit.ranks:  # first (best) occurrence wins
+                hit.ranks[leg] = rank
+                hit.raw_scores[leg] = float(raw)
+    return hits
+
+
+def _normalise(scores: Sequence[float], method: str) -> List[float]:
+    if not scores:
+        return []
+    if method == "minmax":
+        lo, hi = min(scores), max(scores)
+        if hi - lo <= 1e-12:
+            return [1.0] * len(scores)
+        return [(s - lo) / (hi - lo) for s in scores]
+    mean = sum(scores) / len(scores)
+    std = math.sqrt(sum((s - mean) ** 2 for s in scores) / len(scores))
+    if std <= 1e-12:
+        return [0.0] * len(scores)
+    return [(s - mean) / std for s in scores]
+
+
+def fuse(
+    rankings: Mapping[str, Ranking],
+    method: str = "rrf",
+    weights: Optional[Mapping[str, float]] = None,
+    k: int = RRF_K,
+) -> List[FusedHit]:
+    """Fuse per-leg rankings into one list, best first.
+
+    Args:
+        rankings: Leg name -> ``(doc_id, raw_score)`` pairs, best first.
+        method: One of ``FUSION_METHODS``.
+        weights: Per-leg weight (default 1.0).
+        k: RRF damping constant.
+
+    Returns:
+        list[FusedHit]: Fused hits; ties are broken by best rank in any leg.
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method {method!r}; expected one of {FUSION_METHODS}")
+    weights = weights or {}
+    hits = _collect(rankings)
+    if method == "rrf":
+        for hit in hits.values():
+            hit.score = sum(weights.get(leg, 1.0) / (k + rank) for leg, rank in hit.ranks.items())
+    else:
+        for leg in rankings:
+            docs = [h for h in hits.values() if leg in h.raw_scores]
+            normalised = _normalise([h.raw_scores[leg] for h in docs], method)
+            floor = min(normalised) if normalised else 0.0
+            by_doc = {h.doc_id: n for h, n in zip(docs, normalised)}
+            for hit in hits.values():
+                hit.score += weights.get(leg, 1.0) * by_doc.get(hit.doc_id, floor if method == "zscore" else 0.0)
+    return sorted(hits.values(), key=lambda h: (-h.score, min(h.ranks.values())))
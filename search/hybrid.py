@@ -1,13 +1,33 @@
 """SPDX-License-Identifier: GPL-3.0-only
 
-Hybrid search orchestration (keyword + semantic + rerank)."""
+Hybrid search orchestration (keyword + semantic + rerank).
+
+The keyword and semantic legs run concurrently, each with its own timeout; a
+leg that misses its deadline is left out of that query (its late result is
+discarded) so a slow vector search cannot hold back keyword hits. Leg results
+are combined with ``search.fusion`` and then optionally reranked. Complete
+result lists are cached per index generation (``search.cache``).
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from . import cache, fusion, indexer, rerank, vector_store
+from .filters import SearchFilters
+
+LOGGER = logging.getLogger("hindsight.search")
+
+DEFAULT_CANDIDATES_PER_SOURCE = 50
+DEFAULT_LEG_TIMEOUTS = {"keyword": 1.0, "semantic": 2.0}  # seconds
 
-from . import indexer, semantic, rerank
+TextLoader = Callable[[str], Optional[str]]  # doc id -> OCR text (None if unreadable)
 
 
 @dataclass
@@ -16,39 +36,184 @@ class SearchResult:
 
     Attributes:
         doc_id: Internal identifier or path string.
-        score: Final combined score after reranking.
-        source: Source of initial retrieval (keyword/semantic).
+        score: Final combined score after reranking (the fused score if not reranked).
+        source: Retrieval source: keyword, semantic, or hybrid (found by both).
+        reranked: True if ``score`` is a cross-encoder score.
+        partial: True if the rerank budget ran out before all candidates were scored.
+        ranks: 1-based rank per retriever that returned the document.
+        raw_scores: Raw score per retriever (BM25 for keyword, cosine for semantic).
+        fused_score: Score assigned by fusion, before reranking.
     """
 
     doc_id: str
     score: float
     source: str
+    reranked: bool = False
+    partial: bool = False
+    ranks: Dict[str, int] = field(default_factory=dict)
+    raw_scores: Dict[str, float] = field(default_factory=dict)
+    fused_score: float = 0.0
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="HybridLeg")
+        return _EXECUTOR
+
+
+def _keyword_leg(query: str, k: int, filters: Optional[SearchFilters] = None) -> List[Tuple[str, float]]:
+    return [(str(p), score) for p, score in indexer.keyword_search_scored(query, limit=k, filters=filters)]
+
+
+def _semantic_leg(query: str, k: int, filters: Optional[SearchFilters] = None) -> List[Tuple[str, float]]:
+    store = vector_store.default_store()
+    if store is None:
+        return []
+    embeddings = cache.embed_query(query)
+    if embeddings.dim != store.dim:
+        return []
+    return store.search(embeddings.vectors[0], k=k, filters=filters)
+
+
+LEGS = {"keyword": _keyword_leg, "semantic": _semantic_leg}
 
 
-def hybrid_search(query: str, limit: int = 20) -> List[SearchResult]:
+def run_legs(
+    query: str,
+    k: int,
+    timeouts: Optional[Mapping[str, float]] = None,
+    filters: Optional[SearchFilters] = None,
+) -> Dict[str, List[Tuple[str, float]]]:
+    """Query every leg concurrently; legs that fail or time out are omitted.
+
+    Args:
+        query: Query text.
+        k: Hits requested from each leg.
+        timeouts: Seconds allowed per leg (defaults to ``DEFAULT_LEG_TIMEOUTS``).
+        filters: Constraints each leg applies inside its index.
+
+    Returns:
+        dict: Leg name -> ``(doc_id, raw_score)`` pairs, best first.
+    """
+    timeouts = {**DEFAULT_LEG_TIMEOUTS, **(timeouts or {})}
+    started = time.monotonic()
+    futures = {name: _executor().submit(leg, query, k, filters) for name, leg in LEGS.items()}
+    rankings: Dict[str, List[Tuple[str, float]]] = {}
+    for name, future in futures.items():
+        remaining = timeouts.get(name, max(DEFAULT_LEG_TIMEOUTS.values())) - (time.monotonic() - started)
+        try:
+            rankings[name] = future.result(timeout=max(0.0, remaining))
+        except FutureTimeout:
+            LOGGER.warning("Search leg %s timed out after %.2fs", name, time.monotonic() - started)
+        except Exception as exc:  # noqa: BLE001 - one broken leg must not fail the search
+            LOGGER.warning("Search leg %s failed: %s", name, exc)
+    return rankings
+
+
+def encrypted_text_loader(key: bytes, decrypt=None) -> TextLoader:
+    """Return a ``TextLoader`` that decrypts ``.txt.enc`` doc ids with ``key``."""
+    if decrypt is None:
+        from capture.segments import read_artifact as decrypt
+
+    def _load(doc_id: str) -> Optional[str]:
+        try:
+            return decrypt(Path(doc_id), key).decode("utf-8", errors="replace")
+        except Exception as exc:  # noqa: BLE001 - an unreadable candidate is just not reranked
+            LOGGER.debug("Cannot load %s for reranking: %s", doc_id, exc)
+            return None
+
+    return _load
+
+
+def hybrid_search(
+    query: str,
+    limit: int = 20,
+    text_loader: Optional[TextLoader] = None,
+    reranker: Optional[rerank.CrossEncoderReranker] = None,
+    candidates_per_source: int = DEFAULT_CANDIDATES_PER_SOURCE,
+    fusion_method: str = "rrf",
+    weights: Optional[Mapping[str, float]] = None,
+    timeouts: Optional[Mapping[str, float]] = None,
+    use_cache: bool = True,
+    filters: Optional[SearchFilters] = None,
+) -> List[SearchResult]:
     """Perform a hybrid search and return merged results.
 
     Args:
         query: The natural language query.
         limit: Maximum number of results to return.
+        text_loader: Loads candidate text for the cross-encoder (see
+            ``encrypted_text_loader``); without it results keep fusion order.
+        reranker: Reranker to use (defaults to ``rerank.default_reranker()``).
+        candidates_per_source: Hits taken from each retriever before reranking.
+        fusion_method: ``rrf``, ``minmax`` or ``zscore`` (see ``search.fusion``).
+        weights: Per-retriever fusion weights, e.g. ``{"semantic": 0.5}``.
+        timeouts: Per-retriever timeouts in seconds.
+        use_cache: Serve and store results in ``search.cache.RESULTS``.
+        filters: Time range, window title and capture backend constraints,
+            pushed down into both indexes.
 
     Returns:
         list[SearchResult]: Final reranked results.
     """
-    # Keyword phase (placeholder paths as strings)
-    keyword_hits = [str(p) for p in indexer.keyword_search(query, limit=limit)]
-
-    # Semantic phase (placeholder: embedding and search not wired yet)
-    embeddings = semantic.embed_texts([query])
-    # NOTE: Without a real FAISS index yet, semantic hits empty.
-    semantic_hits: List[str] = []
-
-    combined = keyword_hits + [h for h in semantic_hits if h not in keyword_hits]
-    reranked_order = rerank.rerank(query, combined)
-    results: List[SearchResult] = []
-    for rank, idx in enumerate(reranked_order):
-        doc_id = combined[idx]
-        results.append(SearchResult(doc_id=doc_id, score=1.0 - (rank * 0.01), source="hybrid"))
-        if len(results) >= limit:
-            break
-    return results
\ No newline at end of file
+    key = None
+    if use_cache:
+        key = cache.result_key(
+            query,
+            cache.index_generation(),
+            filters=filters.key() if filters is not None else None,
+            limit=limit,
+            candidates=candidates_per_source,
+            fusion=fusion_method,
+            weights=tuple(sorted((weights or {}).items())),
+            rerank=(reranker or rerank.default_reranker()).model_name if text_loader is not None else None,
+        )
+        cached = cache.RESULTS.get(key)
+        if cached is not None:
+            return cache.copy_results(cached)
+    results, complete = _search(
+        query, limit, text_loader, reranker, candidates_per_source, fusion_method, weights, timeouts, filters
+    )
+    # Results missing a timed-out leg or a full rerank are not worth pinning.
+    if key is not None and complete:
+        cache.RESULTS.put(key, cache.copy_results(results))
+    return results
+
+
+def _search(query, limit, text_loader, reranker, candidates_per_source, fusion_method, weights, timeouts, filters):
+    """Uncached ``hybrid_search``; returns ``(results, complete)``."""
+    per_source = max(limit, candidates_per_source)
+    rankings = run_legs(query, per_source, timeouts, filters)
+    complete = len(rankings) == len(LEGS)
+    fused = fusion.fuse(rankings, method=fusion_method, weights=weights)
+    results = [
+        SearchResult(
+            doc_id=hit.doc_id,
+            score=hit.score,
+            source=next(iter(hit.ranks)) if len(hit.ranks) == 1 else "hybrid",
+            ranks=hit.ranks,
+            raw_scores=hit.raw_scores,
+            fused_score=hit.score,
+        )
+        for hit in fused
+    ]
+    if text_loader is None or not results:
+        return results[:limit], complete
+
+    outcome = (reranker or rerank.default_reranker()).rerank(query, [r.doc_id for r in results], text_loader)
+    reranked: List[SearchResult] = []
+    for idx in outcome.order[:limit]:
+        result = results[idx]
+        score = outcome.scores[idx]
+        if score is not None:
+            result.score = score
+            result.reranked = True
+        result.partial = outcome.partial
+        reranked.append(result)
+    return reranked, complete and not outcome.partial
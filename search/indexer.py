@@ -1,15 +1,354 @@
 """SPDX-License-Identifier: GPL-3.0-only
 
-Keyword (Recoll) indexing integration layer.
+Keyword indexing integration layer.
 
-Responsible for feeding OCR text documents into Recoll and querying them
-for exact/lexical matches.
+OCR text is indexed into an embedded SQLite FTS5 table and queried with BM25
+ranking. Recoll was the original plan, but it indexes plaintext files on disk,
+while captures only exist as encrypted ``.txt.enc`` artifacts; FTS5 ships with
+Python's ``sqlite3`` and needs no extra daemon.
+
+The FTS table is contentless (``content=''``): it stores the inverted index
+(terms and positions) but not the OCR text itself. Documents are keyed by the
+path of their encrypted text artifact. The index is *not* encrypted: every OCR
+term and its positions sit in plaintext in the SQLite file and much of the
+text can be rebuilt from them without the data key.
+
+Indexing is incremental: ``KeywordIndex.update_from_encrypted`` decrypts only
+captures taken since the stored checkpoint (the newest committed capture
+time, the clock the capture catalog is queried by) and commits in batches,
+advancing the checkpoint with each commit so an interrupted run resumes where
+it stopped.
+
+Each document row also carries capture metadata (window title, bbox, capture
+backend; ``mtime`` is the capture time), so ``search`` applies
+``search.filters.SearchFilters`` inside the FTS query.
 """
 
 from __future__ import annotations
 
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .filters import SearchFilters, ensure_metadata_columns, metadata_from_filename, metadata_values
+
+LOGGER = logging.getLogger("hindsight.search")
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_MAX_DELAY = 30.0  # seconds a pending batch may wait before it is committed
+CATCH_UP_SLACK = 300.0  # s before the checkpoint re-scanned; pipeline workers finish out of order
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS docs (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, mtime REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS docs_mtime ON docs(mtime)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(body, content='', tokenize='unicode61 remove_diacritics 2')",
+)
+
+
+class KeywordIndex:
+    """SQLite FTS5 keyword index with batched commits and a capture-time checkpoint.
+
+    Args:
+        db_path: SQLite database file (created if missing).
+        batch_size: Documents added per transaction.
+        max_delay: Seconds after which a partial batch is committed anyway, by
+            the next ``add`` or ``commit_if_due`` call.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max_delay
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._batch_started = 0.0
+        self._pending_checkpoint = 0.0
+        with self._lock:
+            # WAL lets the UI process search while the capture service writes.
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            for stmt in _SCHEMA:
+                self._conn.execute(stmt)
+            ensure_metadata_columns(self._conn, "docs")
+
+    # --- writes ---
+    def add(
+        self,
+        doc_id: str,
+        text: str,
+        mtime: Optional[float] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Queue ``text`` under ``doc_id``; committed once the batch fills.
+
+        Args:
+            doc_id: Document key (encrypted text artifact path).
+            text: OCR text.
+            mtime: Capture time (default: now); the checkpoint advances on it.
+            meta: Capture metadata (``title``, ``bbox``, ``backend``); recovered
+                from the file name when omitted.
+
+        Returns:
+            bool: False if ``doc_id`` was already indexed.
+        """
+        mtime = time.time() if mtime is None else mtime
+        with self._lock:
+            if self._pending == 0:
+                self._conn.execute("BEGIN")
+                self._batch_started = time.monotonic()
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO docs(path, mtime, title, title_key, bbox, backend) VALUES (?, ?, ?, ?, ?, ?)",
+                (doc_id, mtime, *metadata_values(meta if meta is not None else metadata_from_filename(Path(doc_id)))),
+            )
+            added = cur.rowcount == 1
+            if added:
+                self._conn.execute("INSERT INTO docs_fts(rowid, body) VALUES (?, ?)", (cur.lastrowid, text))
+                self._pending += 1
+                self._pending_checkpoint = max(self._pending_checkpoint, mtime)
+            if self._pending >= self.batch_size:
+                self.commit()
+            elif self._pending == 0:
+                self._conn.execute("COMMIT")
+            else:
+                self.commit_if_due()
+            return added
+
+    def commit_if_due(self) -> bool:
+        """Commit a partial batch that has waited ``max_delay`` seconds.
+
+        The capture service calls this from its loop, so a batch left open when
+        capture goes quiet still reaches readers.
+
+        Returns:
+            bool: True if a batch was committed.
+        """
+        with self._lock:
+            if not self._pending or time.monotonic() - self._batch_started < self.max_delay:
+                return False
+            self.commit()
+            return True
+
+    def commit(self) -> None:
+        """Commit the pending batch and advance the checkpoint."""
+        with self._lock:
+            if not self._conn.in_transaction:
+                return
+            if self._pending_checkpoint > self.checkpoint:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta(key, value) VALUES ('checkpoint', ?)",
+                    (repr(self._pending_checkpoint),),
+                )
+            if self._pending:
+                self._bump_generation()
+            self._conn.execute("COMMIT")
+            self._pending = 0
+            self._pending_checkpoint = 0.0
+
+    def remove(self, doc_id: str, text: Optional[str] = None) -> bool:
+        """Drop ``doc_id`` from search results.
+
+        A contentless FTS table can only purge a row's terms when given the
+        original ``text``; without it the orphaned terms stay in the index but
+        never match, because queries join on ``docs``.
+        """
+        return self.remove_many([(doc_id, text)]) == 1
+
+    def remove_many(self, docs: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """Drop ``(doc_id, text)`` pairs in one transaction (see ``remove``).
+
+        Returns:
+            int: Documents removed.
+        """
+        removed = 0
+        with self._lock:
+            self.commit()
+            self._conn.execute("BEGIN")
+            for doc_id, text in docs:
+                row = self._conn.execute("SELECT id FROM docs WHERE path = ?", (doc_id,)).fetchone()
+                if row is None:
+                    continue
+                if text is not None:
+                    self._conn.execute(
+                        "INSERT INTO docs_fts(docs_fts, rowid, body) VALUES ('delete', ?, ?)", (row[0], text)
+                    )
+                self._conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+                removed += 1
+            if removed:
+                self._bump_generation()
+            self._conn.execute("COMMIT")
+        return removed
+
+    def rename(self, old_id: str, new_id: str) -> bool:
+        """Re-key a document whose artifact moved (layout migration); its terms are kept."""
+        with self._lock:
+            self.commit()
+            self._conn.execute("BEGIN")
+            renamed = self._conn.execute("UPDATE OR IGNORE docs SET path = ? WHERE path = ?", (new_id, old_id)).rowcount == 1
+            if renamed:
+                self._bump_generation()
+            self._conn.execute("COMMIT")
+            return renamed
+
+    def _bump_generation(self) -> None:
+        self._conn.execute(
+            "INSERT INTO meta(key, value) VALUES ('generation', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def update_from_encrypted(
+        self,
+        enc_dir: Path,
+        key: bytes,
+        decrypt: Optional[Callable[[Path, bytes], bytes]] = None,
+        catalog=None,
+    ) -> int:
+        """Index ``*.txt.enc`` captures taken since the checkpoint that are not indexed yet.
+
+        Args:
+            enc_dir: Directory holding encrypted capture artifacts (searched recursively).
+            key: Data key used to decrypt the text artifacts.
+            decrypt: Override for ``capture.encryption.decrypt_file``.
+            catalog: ``capture.catalog.CaptureCatalog`` to read candidates and
+                metadata from instead of listing ``enc_dir``.
+
+        Returns:
+            int: Number of newly indexed documents.
+        """
+        if decrypt is None:
+            from capture.segments import read_artifact as decrypt
+        candidates = _catch_up_candidates(enc_dir, max(0.0, self.checkpoint - CATCH_UP_SLACK), catalog)
+        added = 0
+        for mtime, path, meta in candidates:
+            if self.contains(str(path)):
+                continue
+            try:
+                text = decrypt(path, key).decode("utf-8", errors="replace")
+            except Exception as exc:  # noqa: BLE001 - skip unreadable artifacts
+                LOGGER.warning("Skipping %s: %s", path, exc)
+                continue
+            added += int(self.add(str(path), text, mtime=mtime, meta=meta))
+        self.commit()
+        if added:
+            LOGGER.info("Keyword index: %s new documents (checkpoint %.0f)", added, self.checkpoint)
+        return added
+
+    # --- reads ---
+    def search(self, query: str, limit: int = 20, filters: Optional[SearchFilters] = None) -> List[Tuple[str, float]]:
+        """Return ``(doc_id, score)`` pairs ranked by BM25 (higher is better).
+
+        ``filters`` are applied in the same statement, before the limit.
+        """
+        expression = match_expression(query)
+        if not expression or limit <= 0:
+            return []
+        where, params = (filters or SearchFilters()).where(ts_column="mtime", prefix="d.")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.path, bm25(docs_fts) AS rank FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+                f"WHERE docs_fts MATCH ? AND {where} ORDER BY rank LIMIT ?",
+                (expression, *params, limit),
+            ).fetchall()
+        return [(path, -rank) for path, rank in rows]
+
+    def contains(self, doc_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM docs WHERE path = ?", (doc_id,)).fetchone() is not None
+
+    @property
+    def checkpoint(self) -> float:
+        """Capture time of the newest committed document (0.0 when empty)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'checkpoint'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    @property
+    def generation(self) -> int:
+        """Counter advanced by every committed add or remove (for result caches)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self.commit()
+            self._conn.close()
+
+
+def _catch_up_candidates(enc_dir: Path, since: float, catalog=None) -> List[Tuple[float, Path, Optional[Dict[str, Any]]]]:
+    """``(ts, text path, metadata)`` of captures at or after ``since``, oldest first.
+
+    Reads the capture catalog when given (no directory listing); otherwise
+    lists ``*.txt.enc`` under ``enc_dir`` and uses file mtimes.
+    """
+    if catalog is not None:
+        return [
+            (e.ts, Path(e.text_path), {"title": e.title, "bbox": e.bbox, "backend": e.backend})
+            for e in catalog.query(start=since)
+            if e.text_path
+        ]
+    candidates = []
+    for path in Path(enc_dir).rglob("*.txt.enc"):
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            continue
+        if mtime >= since:
+            candidates.append((mtime, path, None))
+    candidates.sort(key=lambda c: (c[0], str(c[1])))
+    return candidates
+
+
+def match_expression(query: str) -> str:
+    """Turn free text into an FTS5 MATCH expression (all terms, last one as prefix).
+
+    Every token is quoted, so FTS5 operators in user input are treated as text.
+    """
+    tokens = _TOKEN_RE.findall(query or "")
+    if not tokens:
+        return ""
+    quoted = ['"%s"' % t for t in tokens]
+    quoted[-1] += "*"  # search-as-you-type
+    return " ".join(quoted)
+
+
+def default_db_path() -> Path:
+    """Index location: HINDSIGHT_KEYWORD_DB or <HINDSIGHT_BASE_DIR|data>/index/keyword.sqlite3."""
+    explicit = os.environ.get("HINDSIGHT_KEYWORD_DB")
+    if explicit:
+        return Path(explicit)
+    return Path(os.environ.get("HINDSIGHT_BASE_DIR") or "data") / "index" / "keyword.sqlite3"
+
+
+_DEFAULT: dict = {}
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_index() -> KeywordIndex:
+    """Return the process-wide index at ``default_db_path()``."""
+    path = default_db_path()
+    with _DEFAULT_LOCK:
+        index = _DEFAULT.get(path)
+        if index is None:
+            index = _DEFAULT[path] = KeywordIndex(path)
+        return index
 
 
 def index_text_files(paths: Iterable[Path]) -> int:
@@ -19,10 +358,24 @@ def index_text_files(paths: Iterable[Path]) -> int:
         paths: Iterable of plaintext (possibly decrypted) text file paths.
 
     Returns:
-        int: Count of files scheduled for indexing.
+        int: Count of newly indexed files.
     """
-    # TODO: Implement Recoll indexing invocation.
-    return sum(1 for _ in paths)
+    index = default_index()
+    added = 0
+    for path in paths:
+        path = Path(path)
+        added += int(index.add(str(path), path.read_text(encoding="utf-8", errors="replace"), path.stat().st_mtime))
+    index.commit()
+    return added
+
+
+def keyword_search_scored(
+    query: str, limit: int = 20, filters: Optional[SearchFilters] = None
+) -> List[Tuple[Path, float]]:
+    """Execute a keyword search returning ``(path, score)`` pairs, best first."""
+    if not match_expression(query) or not default_db_path().exists():
+        return []
+    return [(Path(p), score) for p, score in default_index().search(query, limit=limit, filters=filters)]
 
 
 def keyword_search(query: str, limit: int = 20) -> List[Path]:
@@ -35,5 +388,4 @@ def keyword_search(query: str, limit: int = 20) -> List[Path]:
     Returns:
         list[Path]: Ranked list of matching document paths.
     """
-    # TODO: Call Recoll CLI / API and parse results.
-    return []
\ No newline at end of file
+    return [path for path, _score in keyword_search_scored(query, limit=limit)]
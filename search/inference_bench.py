@@ -0,0 +1,206 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+fp32 vs int8 inference benchmark: embedding drift, latency and resident memory.
+
+Usage::
+
+    python -m search.inference_bench --texts 64 --repeats 5
+    python -m search.inference_bench --file sample.txt --max-drift 0.02 --json
+
+Each backend runs in its own child process so peak RSS reflects that backend
+alone (a quantized copy loaded next to the fp32 weights would hide the saving).
+Drift is ``1 - cosine`` between the fp32 and int8 embedding of the same text;
+the command exits with status 1 when the mean drift exceeds ``--max-drift``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:  # pragma: no cover - optional
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore
+
+from . import semantic
+
+DEFAULT_MAX_DRIFT = 0.02
+
+_SAMPLE_LINES = (
+    "Quarterly revenue report draft - Q3 figures pending review",
+    "def parse_config(path): return json.loads(Path(path).read_text())",
+    "Meeting notes: migrate the staging cluster before the freeze on Friday",
+    "Inbox (42) - Re: invoice #1187 overdue, please advise",
+    "Terminal: pytest -q tests/test_vector_store.py 12 passed in 3.41s",
+    "Flight LH 401 Frankfurt to New York departs 13:20 gate B44",
+    "The quick brown fox jumps over the lazy dog",
+    "Settings > Privacy > Screen Recording > allow Hindsight Recall",
+)
+
+
+@dataclass
+class BackendResult:
+    """Measurements for one inference backend.
+
+    Attributes:
+        backend: ``fp32`` or ``int8``.
+        texts: Texts embedded per repeat.
+        load_seconds: Model load (and quantization) time.
+        p50_ms: Median batch latency.
+        p99_ms: 99th percentile batch latency.
+        peak_rss_mb: Peak resident memory of the process after the run.
+    """
+
+    backend: str
+    texts: int
+    load_seconds: float
+    p50_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+
+
+def cosine_drift(reference, candidate) -> Dict[str, float]:
+    """Compare two ``(n, dim)`` embedding matrices row by row.
+
+    Returns:
+        dict: ``mean_drift`` / ``max_drift`` (``1 - cosine``) and ``min_cosine``.
+    """
+    ref = np.asarray(reference, dtype="float64")
+    cand = np.asarray(candidate, dtype="float64")
+    if ref.shape != cand.shape:
+        raise ValueError(f"Shape mismatch: {ref.shape} vs {cand.shape}")
+    norms = np.linalg.norm(ref, axis=1) * np.linalg.norm(cand, axis=1)
+    cosine = (ref * cand).sum(axis=1) / np.clip(norms, 1e-12, None)
+    drift = 1.0 - cosine
+    return {
+        "mean_drift": float(drift.mean()) if len(drift) else 0.0,
+        "max_drift": float(drift.max()) if len(drift) else 0.0,
+        "min_cosine": float(cosine.min()) if len(cosine) else 1.0,
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB (0.0 when unknown)."""
+    if resource is None:  # pragma: no cover
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def sample_texts(n: int) -> List[str]:
+    """``n`` OCR-like sample texts of varying length."""
+    return [" ".join(_SAMPLE_LINES[j % len(_SAMPLE_LINES)] for j in range(i, i + 1 + i % 6)) for i in range(n)]
+
+
+def measure_backend(backend: str, texts: Sequence[str], repeats: int = 5, embed=None):
+    """Embed ``texts`` with ``backend`` in this process.
+
+    Args:
+        backend: Inference backend.
+        texts: Batch embedded on every repeat.
+        repeats: Timed repetitions after one untimed warm-up pass.
+        embed: Override for ``semantic.embed_texts`` (tests).
+
+    Returns:
+        tuple[BackendResult, list[list[float]]]: Measurements and the embeddings.
+    """
+    embed = embed or semantic.embed_texts
+    started = time.perf_counter()
+    vectors = embed(list(texts), backend=backend).vectors
+    load_seconds = time.perf_counter() - started
+    latencies = []
+    for _ in range(max(1, repeats)):
+        t0 = time.perf_counter()
+        embed(list(texts), backend=backend)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    result = BackendResult(
+        backend=backend,
+        texts=len(texts),
+        load_seconds=load_seconds,
+        p50_ms=float(np.percentile(latencies, 50)),
+        p99_ms=float(np.percentile(latencies, 99)),
+        peak_rss_mb=peak_rss_mb(),
+    )
+    return result, vectors
+
+
+def run_isolated(backend: str, texts: Sequence[str], repeats: int = 5):
+    """Run ``measure_backend`` in a child interpreter; same return value."""
+    with tempfile.TemporaryDirectory(prefix="hindsight-bench-") as tmp:
+        texts_path = Path(tmp) / "texts.json"
+        out_path = Path(tmp) / "out.json"
+        texts_path.write_text(json.dumps(list(texts)), encoding="utf-8")
+        subprocess.run(
+            [sys.executable, "-m", "search.inference_bench", "--child", backend,
+             "--texts-json", str(texts_path), "--out", str(out_path), "--repeats", str(repeats)],
+            check=True,
+            cwd=str(Path(__file__).resolve().parent.parent),
+            env=dict(os.environ),
+        )
+        payload = json.loads(out_path.read_text(encoding="utf-8"))
+    return BackendResult(**payload["result"]), payload["vectors"]
+
+
+def _format_table(results: List[BackendResult], drift: Dict[str, float]) -> str:
+    header = f"{'backend':<8} {'texts':>6} {'load s':>8} {'p50 ms':>9} {'p99 ms':>9} {'peak RSS MiB':>13}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.backend:<8} {r.texts:>6} {r.load_seconds:>8.2f} {r.p50_ms:>9.2f} {r.p99_ms:>9.2f} {r.peak_rss_mb:>13.1f}"
+        )
+    lines.append(
+        f"drift vs fp32: mean {drift['mean_drift']:.5f}  max {drift['max_drift']:.5f}  min cosine {drift['min_cosine']:.5f}"
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8 embedding inference")
+    parser.add_argument("--texts", type=int, default=32, help="Number of generated sample texts")
+    parser.add_argument("--file", type=Path, help="Embed the non-empty lines of this file instead")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-drift", type=float, default=DEFAULT_MAX_DRIFT)
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    parser.add_argument("--child", choices=semantic.INFERENCE_BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--texts-json", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--out", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if np is None or semantic.torch is None or semantic.AutoModel is None:
+        print("numpy, torch and transformers are required", file=sys.stderr)
+        return 2
+    if args.child:
+        texts = json.loads(args.texts_json.read_text(encoding="utf-8"))
+        result, vectors = measure_backend(args.child, texts, args.repeats)
+        args.out.write_text(json.dumps({"result": asdict(result), "vectors": vectors}), encoding="utf-8")
+        return 0
+    if args.file is not None:
+        texts = [line.strip() for line in args.file.read_text(encoding="utf-8").splitlines() if line.strip()]
+    else:
+        texts = sample_texts(args.texts)
+    reference, ref_vectors = run_isolated("fp32", texts, args.repeats)
+    quantized, q_vectors = run_isolated("int8", texts, args.repeats)
+    drift = cosine_drift(ref_vectors, q_vectors)
+    if args.json:
+        print(json.dumps({"results": [asdict(reference), asdict(quantized)], "drift": drift}, indent=2))
+    else:
+        print(_format_table([reference, quantized], drift))
+    return 0 if drift["mean_drift"] <= args.max_drift else 1
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
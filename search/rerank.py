@@ -1,13 +1,275 @@
 """SPDX-License-Identifier: GPL-3.0-only
 
-Reranking logic using a (future) fine-tuned DistilBERT model.
+Reranking of hybrid search candidates with a cross-encoder.
 
-Takes a candidate list from hybrid search and reorders based on relevance.
+A cross-encoder reads the query and a candidate's OCR text together and emits
+one relevance logit, which is far more precise than comparing independent
+embeddings but costs a full forward pass per pair. To keep that affordable:
+
+* only the first ``max_candidates`` of the fused candidate list are scored;
+* pairs are scored in batches of ``batch_size``;
+* scores are cached per ``(query hash, doc id)``, so paging through results or
+  repeating a query does not run the model again;
+* a latency budget bounds each call. Once it is spent, the scored prefix stays
+  reranked, everything after it keeps the incoming (fusion) order, and the
+  result is flagged ``partial``.
 """
 
 from __future__ import annotations
 
-from typing import List, Sequence
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import semantic
+
+try:
+    from transformers import AutoModelForSequenceClassification  # type: ignore
+except ImportError:  # pragma: no cover
+    AutoModelForSequenceClassification = None  # type: ignore
+
+LOGGER = logging.getLogger("hindsight.search")
+
+RERANK_MODEL_NAME = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_MAX_CANDIDATES = 50
+DEFAULT_BUDGET_MS = 300.0
+DEFAULT_MAX_LENGTH = 256  # tokens per (query, text) pair
+DEFAULT_CACHE_SIZE = 10_000
+
+Scorer = Callable[[str, Sequence[str]], List[float]]  # (query, texts) -> one score per text
+
+
+def query_hash(query: str) -> str:
+    """Stable key for ``query`` (case- and whitespace-insensitive)."""
+    normalized = " ".join((query or "").lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """Thread-safe LRU of cross-encoder scores keyed by ``(query hash, doc id)``.
+
+    Args:
+        max_entries: Scores kept before the least recently used are evicted.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE) -> None:
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, qhash: str, doc_id: str) -> Optional[float]:
+        with self._lock:
+            score = self._data.get((qhash, doc_id))
+            if score is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end((qhash, doc_id))
+            self.hits += 1
+            return score
+
+    def put(self, qhash: str, doc_id: str, score: float) -> None:
+        with self._lock:
+            self._data[(qhash, doc_id)] = score
+            self._data.move_to_end((qhash, doc_id))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+@dataclass
+class RerankResult:
+    """Outcome of one rerank call.
+
+    Attributes:
+        order: Indices into the input candidates, best first (covers every input).
+        scores: Cross-encoder score per input index (None if not scored).
+        partial: True when the latency budget ran out (or the model was unavailable)
+            before every capped candidate was scored.
+        scored: Candidates scored by the model in this call.
+        cached: Candidates whose score came from the cache.
+    """
+
+    order: List[int]
+    scores: List[Optional[float]] = field(default_factory=list)
+    partial: bool = False
+    scored: int = 0
+    cached: int = 0
+
+
+def load_cross_encoder(name: str = RERANK_MODEL_NAME):
+    """Load a sequence-classification cross-encoder (uncached)."""
+    if semantic.AutoTokenizer is None or AutoModelForSequenceClassification is None:
+        raise RuntimeError("transformers not installed")
+    tokenizer = semantic.AutoTokenizer.from_pretrained(name)
+    model = AutoModelForSequenceClassification.from_pretrained(name)
+    model.eval()
+    return tokenizer, model
+
+
+class CrossEncoderReranker:
+    """Batched, cached, time-bounded cross-encoder reranker.
+
+    Args:
+        model_name: Hugging Face cross-encoder name or path.
+        batch_size: Pairs per forward pass.
+        max_candidates: Leading candidates considered for reranking.
+        budget_ms: Time allowed per call (None or 0 = unbounded).
+        cache: Score cache (a private one by default).
+        scorer: Override scoring callable (defaults to the model via ``semantic.MODELS``).
+        backend: Inference backend passed to the model registry.
+        max_length: Token limit per (query, text) pair.
+    """
+
+    def __init__(
+        self,
+        model_name: str = RERANK_MODEL_NAME,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_candidates: int = DEFAULT_MAX_CANDIDATES,
+        budget_ms: Optional[float] = DEFAULT_BUDGET_MS,
+        cache: Optional[ScoreCache] = None,
+        scorer: Optional[Scorer] = None,
+        backend: Optional[str] = None,
+        max_length: int = DEFAULT_MAX_LENGTH,
+    ) -> None:
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.max_candidates = max(0, max_candidates)
+        self.budget_ms = budget_ms
+        self.cache = cache if cache is not None else ScoreCache()
+        self.backend = backend
+        self.max_length = max_length
+        self._scorer = scorer
+        self._disabled: Optional[str] = None
+
+    def score_pairs(self, query: str, texts: Sequence[str]) -> List[float]:
+        """Score ``(query, text)`` pairs with the cross-encoder (one batch)."""
+        if self._scorer is not None:
+            return list(self._scorer(query, texts))
+        torch = semantic.torch
+        if torch is None:
+            raise RuntimeError("torch not installed")
+        tokenizer, model = semantic.MODELS.get(self.model_name, self.backend, loader=load_cross_encoder)
+        encoded = tokenizer(
+            [query] * len(texts),
+            list(texts),
+            padding=True,
+            truncation="only_second",
+            max_length=self.max_length,
+            return_tensors="pt",
+        )
+        with torch.inference_mode():
+            logits = model(**encoded).logits
+        # Single-logit heads give relevance directly; two-class heads use the "relevant" logit.
+        return logits[:, -1].float().cpu().tolist()
+
+    def rerank(
+        self,
+        query: str,
+        doc_ids: Sequence[str],
+        text_for: Callable[[str], Optional[str]],
+    ) -> RerankResult:
+        """Reorder ``doc_ids`` (given in fusion order) by cross-encoder relevance.
+
+        Args:
+            query: User query.
+            doc_ids: Candidate ids, best first according to retrieval/fusion.
+            text_for: Returns a candidate's text (None if unavailable); called lazily
+                per batch so decryption is bounded by the budget too.
+
+        Returns:
+            RerankResult: Order over all ``doc_ids`` plus per-candidate scores.
+        """
+        started = time.monotonic()
+        deadline = started + self.budget_ms / 1000.0 if self.budget_ms else None
+        qhash = query_hash(query)
+        limit = min(len(doc_ids), self.max_candidates)
+        scores: List[Optional[float]] = [None] * len(doc_ids)
+        result = RerankResult(order=list(range(len(doc_ids))), scores=scores)
+        missing: List[int] = []
+        for idx in range(limit):
+            cached = self.cache.get(qhash, doc_ids[idx])
+            if cached is None:
+                missing.append(idx)
+            else:
+                scores[idx] = cached
+                result.cached += 1
+        # Candidates whose text cannot be loaded are never scored; they rank after scored ones.
+        for offset in range(0, len(missing), self.batch_size):
+            if self._disabled is not None:
+                result.partial = True
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                result.partial = True
+                break
+            batch, texts = [], []
+            for idx in missing[offset:offset + self.batch_size]:
+                text = text_for(doc_ids[idx])
+                if text is None or not text.strip():
+                    continue
+                batch.append(idx)
+                texts.append(text)
+            if not batch:
+                continue
+            try:
+                batch_scores = self.score_pairs(query, texts)
+            except (RuntimeError, OSError) as exc:
+                # Missing dependencies or model files will not fix themselves; stop retrying.
+                self._disabled = str(exc)
+                LOGGER.warning("Reranking disabled: %s", exc)
+                result.partial = True
+                break
+            for idx, score in zip(batch, batch_scores):
+                scores[idx] = float(score)
+                self.cache.put(qhash, doc_ids[idx], float(score))
+                result.scored += 1
+        head = [i for i in range(limit) if scores[i] is not None]
+        head.sort(key=lambda i: scores[i], reverse=True)  # stable: ties keep fusion order
+        rest = [i for i in range(len(doc_ids)) if scores[i] is None]
+        result.order = head + rest
+        elapsed_ms = (time.monotonic() - started) * 1000.0
+        if result.partial:
+            LOGGER.info(
+                "Rerank budget %.0f ms spent after %s/%s candidates", elapsed_ms, result.scored + result.cached, limit
+            )
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Cache counters for tuning."""
+        return {"cache_entries": len(self.cache), "cache_hits": self.cache.hits, "cache_misses": self.cache.misses}
+
+
+_DEFAULT: Dict[str, CrossEncoderReranker] = {}
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_reranker() -> CrossEncoderReranker:
+    """Process-wide reranker configured from ``HINDSIGHT_RERANK_*`` variables."""
+    with _DEFAULT_LOCK:
+        reranker = _DEFAULT.get("default")
+        if reranker is None:
+            budget = os.environ.get("HINDSIGHT_RERANK_BUDGET_MS")
+            candidates = os.environ.get("HINDSIGHT_RERANK_CANDIDATES")
+            reranker = _DEFAULT["default"] = CrossEncoderReranker(
+                model_name=os.environ.get("HINDSIGHT_RERANK_MODEL") or RERANK_MODEL_NAME,
+                budget_ms=float(budget) if budget else DEFAULT_BUDGET_MS,
+                max_candidates=int(candidates) if candidates else DEFAULT_MAX_CANDIDATES,
+            )
+        return reranker
 
 
 def rerank(query: str, documents: Sequence[str]) -> List[int]:
@@ -18,7 +280,9 @@ def rerank(query: str, documents: Sequence[str]) -> List[int]:
         documents: Candidate document texts.
 
     Returns:
-        list[int]: Indices representing a new order (highest relevance first).
+        list[int]: Indices representing a new order (highest relevance first);
+        the input order when the model is unavailable.
     """
-    # TODO: Replace with model inference.
-    return list(range(len(documents)))
\ No newline at end of file
+    keys = [hashlib.sha1(doc.encode("utf-8")).hexdigest() for doc in documents]
+    texts = dict(zip(keys, documents))
+    return default_reranker().rerank(query, keys, texts.get).order
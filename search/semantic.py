@@ -3,19 +3,37 @@
 Semantic embedding generation using DistilBERT.
 
 Provides utilities to embed text chunks and persist vectors in a FAISS index.
+
+Models are held by a process-wide ``ModelRegistry``: the tokenizer and weights
+load once (on first use or at ``warmup``), torch thread counts are set before
+the first forward pass, and ``unload`` releases them under memory pressure.
+
+The inference backend is ``fp32`` (default) or ``int8``: dynamic int8
+quantization of every ``nn.Linear`` (weights stored as int8, activations
+quantized per batch), which cuts the model's Linear weight memory about 4x and
+speeds up CPU inference. Select it with ``HINDSIGHT_INFERENCE_BACKEND``; use
+``python -m search.inference_bench`` to measure drift, latency and RSS.
 """
 
 from __future__ import annotations
 
+import gc
+import logging
+import os
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 try:
     import faiss  # type: ignore
+except ImportError:  # pragma: no cover
+    faiss = None  # type: ignore
+
+try:
     from transformers import AutoModel, AutoTokenizer  # type: ignore
     import torch  # type: ignore
 except ImportError:  # pragma: no cover
-    faiss = None  # type: ignore
     AutoModel = None  # type: ignore
     AutoTokenizer = None  # type: ignore
     torch = None  # type: ignore
@@ -27,7 +45,10 @@ except ImportError:  # pragma: no cover
     np = None  # type: ignore
 
 
+LOGGER = logging.getLogger("hindsight.search")
+
 EMBED_MODEL_NAME = "distilbert-base-uncased"
+INFERENCE_BACKENDS = ("fp32", "int8")
 
 
 @dataclass
@@ -43,24 +64,167 @@ class EmbeddingResult:
     dim: int
 
 
-def load_model():  # pragma: no cover - heavyweight
-    """Load embedding model resources.
+def load_model(name: str = EMBED_MODEL_NAME):
+    """Load embedding model resources from disk (uncached; see ``get_model``).
+
+    Args:
+        name: Hugging Face model name or local path.
 
     Returns:
         (tokenizer, model): The tokenizer and model instances.
     """
     if AutoTokenizer is None or AutoModel is None:
         raise RuntimeError("transformers not installed")
-    tokenizer = AutoTokenizer.from_pretrained(EMBED_MODEL_NAME)
-    model = AutoModel.from_pretrained(EMBED_MODEL_NAME)
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = AutoModel.from_pretrained(name)
+    model.eval()
     return tokenizer, model
 
 
-def embed_texts(texts: Sequence[str]) -> EmbeddingResult:
+def inference_backend(backend: Optional[str] = None) -> str:
+    """Resolve the inference backend (argument, else ``HINDSIGHT_INFERENCE_BACKEND``, else fp32)."""
+    backend = (backend or os.environ.get("HINDSIGHT_INFERENCE_BACKEND") or "fp32").strip().lower()
+    if backend not in INFERENCE_BACKENDS:
+        LOGGER.warning("Unknown inference backend %r; using fp32", backend)
+        return "fp32"
+    return backend
+
+
+def quantize_model(model):
+    """Return ``model`` with dynamic int8 ``nn.Linear`` layers (CPU inference)."""
+    if torch is None:
+        raise RuntimeError("torch not installed")
+    quantization = getattr(getattr(torch, "ao", None), "quantization", None) or torch.quantization
+    quantized = quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    quantized.eval()
+    return quantized
+
+
+def configure_torch_threads(threads: Optional[int] = None) -> Optional[int]:
+    """Set torch intra-op threads (``HINDSIGHT_TORCH_THREADS`` when not given).
+
+    Inter-op threads are pinned to 1: embedding runs one batch at a time and
+    the capture pipeline already uses the remaining cores.
+
+    Returns:
+        Optional[int]: Thread count applied, or None if torch is unavailable.
+    """
+    if torch is None:
+        return None
+    if threads is None:
+        try:
+            threads = int(os.environ.get("HINDSIGHT_TORCH_THREADS") or 0)
+        except ValueError:
+            threads = 0
+    if threads <= 0:
+        threads = max(1, min(4, (os.cpu_count() or 2) // 2))
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:  # already set, or parallel work has started
+        pass
+    return threads
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded (tokenizer, model) pairs per backend.
+
+    Entries are keyed by model name (``name@int8`` for quantized copies).
+
+    Args:
+        loader: Callable loading ``(tokenizer, model)`` for a model name.
+        quantizer: Callable applying the int8 backend to a loaded model.
+    """
+
+    def __init__(self, loader=None, quantizer=None) -> None:
+        self._loader = loader
+        self._quantizer = quantizer
+        self._models: Dict[str, Tuple[Any, Any]] = {}
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._threads_configured = False
+        self.loads = 0
+
+    def get(self, name: str = EMBED_MODEL_NAME, backend: Optional[str] = None, loader=None) -> Tuple[Any, Any]:
+        """Return the cached model for ``name``, loading it on first use.
+
+        Args:
+            name: Model name or path.
+            backend: ``fp32`` or ``int8`` (default from ``inference_backend()``).
+            loader: Override loader for this model (e.g. a reranker head).
+        """
+        backend = inference_backend(backend)
+        key = name if backend == "fp32" else f"{name}@{backend}"
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                if not self._threads_configured:
+                    configure_torch_threads()
+                    self._threads_configured = True
+                started = time.monotonic()
+                tokenizer, model = (loader or self._loader or load_model)(name)
+                if backend == "int8":
+                    model = (self._quantizer or quantize_model)(model)
+                entry = (tokenizer, model)
+                self._models[key] = entry
+                self.loads += 1
+                LOGGER.info("Loaded model %s (%s) in %.2fs", name, backend, time.monotonic() - started)
+            self._last_used[key] = time.monotonic()
+            return entry
+
+    def warmup(self, name: str = EMBED_MODEL_NAME, backend: Optional[str] = None) -> None:
+        """Load ``name`` now and run a dummy forward pass to initialise kernels."""
+        tokenizer, model = self.get(name, backend)
+        if torch is None:
+            return
+        encoded = tokenizer(["warmup"], padding=True, truncation=True, return_tensors="pt")
+        with torch.no_grad():
+            model(**encoded)
+
+    def unload(self, name: Optional[str] = None) -> int:
+        """Drop ``name`` (or every model) so its memory can be reclaimed.
+
+        Returns:
+            int: Number of models unloaded.
+        """
+        with self._lock:
+            names = [k for k in self._models if name is None or k == name or k.startswith(name + "@")]
+            dropped = 0
+            for key in names:
+                if self._models.pop(key, None) is not None:
+                    dropped += 1
+                self._last_used.pop(key, None)
+        if dropped:
+            gc.collect()
+            LOGGER.info("Unloaded %s embedding model(s)", dropped)
+        return dropped
+
+    def unload_idle(self, max_idle: float) -> int:
+        """Unload models unused for more than ``max_idle`` seconds."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [n for n, used in self._last_used.items() if now - used > max_idle]
+        return sum(self.unload(n) for n in idle)
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return sorted(self._models)
+
+
+MODELS = ModelRegistry()
+
+
+def get_model(name: str = EMBED_MODEL_NAME, backend: Optional[str] = None) -> Tuple[Any, Any]:
+    """Return the shared (tokenizer, model) pair, loading it once per process."""
+    return MODELS.get(name, backend)
+
+
+def embed_texts(texts: Sequence[str], backend: Optional[str] = None) -> EmbeddingResult:
     """Embed a batch of texts into dense vectors.
 
     Args:
         texts: Input text strings.
+        backend: Inference backend (default from ``HINDSIGHT_INFERENCE_BACKEND``).
 
     Returns:
         EmbeddingResult: Embedding vectors and dimension.
@@ -69,12 +233,13 @@ def embed_texts(texts: Sequence[str]) -> EmbeddingResult:
         return EmbeddingResult(vectors=[], dim=0)
     if AutoTokenizer is None or AutoModel is None or torch is None:  # pragma: no cover
         return EmbeddingResult(vectors=[[0.0] for _ in texts], dim=1)
-    tokenizer, model = load_model()
+    tokenizer, model = get_model(backend=backend)
     encoded = tokenizer(list(texts), padding=True, truncation=True, return_tensors="pt")
     with torch.no_grad():
         output = model(**encoded)
-    # Use mean pooling over sequence length.
-    embeddings = output.last_hidden_state.mean(dim=1)
+    # Mean-pool over real tokens only; padding would pull short texts towards the pad embedding.
+    mask = encoded["attention_mask"].unsqueeze(-1).to(output.last_hidden_state.dtype)
+    embeddings = (output.last_hidden_state * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
     vectors = embeddings.cpu().tolist()
     dim = len(vectors[0]) if vectors else 0
     return EmbeddingResult(vectors=vectors, dim=dim)
@@ -0,0 +1,736 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Persistent, time-sharded FAISS vector store.
+
+Layout under ``root`` (default ``data/index/vectors``)::
+
+    ids.sqlite3              vector id -> (capture, chunk, shard, ts) mapping
+    2025-09/seg-000001.faiss append-only segments of the September 2025 shard
+    2025-10/seg-000001.faiss ...
+
+Vectors are L2-normalised and stored in ``IndexIDMap2(IndexFlatIP)`` segments,
+so scores are cosine similarities (higher is better) and ids are the rowids of
+the mapping table. New vectors accumulate in an in-memory segment per month
+(searchable immediately) and are written out as a *new* segment file on
+``flush()``, once ``flush_every`` vectors are buffered or the oldest has waited
+``max_delay`` seconds. Existing files are never rewritten except when a month
+collects more than ``max_segments`` segments: then only the small newest
+segments are merged (size-tiered), so each vector is rewritten a logarithmic
+number of times rather than on every merge.
+
+Segments are opened with ``IO_FLAG_MMAP`` so startup does not read every vector
+into RAM; only the shards overlapping a query's date range are touched.
+
+Flat segments stay the source of truth. With an ANN mode (``search.ann``) each
+shard additionally gets ``ann.faiss`` (+ ``ann.json``), built in the background
+from the shard's flat vectors once it holds ``min_ann_size`` vectors and rebuilt
+(retrained) whenever the shard grows by ``retrain_growth``. The ANN index
+covers every id up to ``covered_max_id``; newer vectors are searched exactly in
+their flat segments until the next rebuild.
+
+Only one writer (the capture service) may open a store read-write; it alone
+drops id-map rows left unflushed by a crash. Search processes open the store
+with ``read_only=True`` so they never touch rows the writer is still buffering.
+
+Rows of the id map also hold capture metadata (``search.filters``). A filtered
+search resolves the matching vector ids in SQL and hands them to FAISS as an
+``IDSelectorBatch``, so only allowed vectors compete for the top k. HNSW graph
+traversal degrades under restrictive selectors, so filtered queries skip a
+shard's HNSW index and scan its flat segments instead.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .ann import ANNParams, configure_search, create_index, min_train_points, search_parameters
+from .filters import SearchFilters, ensure_metadata_columns, metadata_from_filename, metadata_values
+
+try:  # optional heavy dependencies
+    import faiss  # type: ignore
+except ImportError:  # pragma: no cover
+    faiss = None  # type: ignore
+
+try:  # pragma: no cover - optional
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+LOGGER = logging.getLogger("hindsight.search")
+
+SHARD_FORMAT = "%Y-%m"
+DEFAULT_FLUSH_EVERY = 512  # vectors buffered in RAM before a segment is written
+DEFAULT_MAX_DELAY = 30.0  # seconds a buffered vector may wait before a segment is written
+DEFAULT_MAX_SEGMENTS = 16  # segments per shard before the small tail is merged
+DEFAULT_MIN_ANN_SIZE = 10_000  # below this a shard is searched exactly
+DEFAULT_RETRAIN_GROWTH = 1.5  # rebuild a shard's ANN index once it grows by this factor
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS vectors ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " capture TEXT NOT NULL, chunk INTEGER NOT NULL DEFAULT 0,"
+    " shard TEXT NOT NULL, ts REAL NOT NULL, flushed INTEGER NOT NULL DEFAULT 0,"
+    " UNIQUE(capture, chunk))",
+    "CREATE INDEX IF NOT EXISTS vectors_ts ON vectors(ts)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+)
+
+
+def shard_key(ts: float) -> str:
+    """Return the shard (UTC month) holding timestamp ``ts``."""
+    return datetime.fromtimestamp(ts, timezone.utc).strftime(SHARD_FORMAT)
+
+
+def shards_between(start: Optional[float], end: Optional[float], available: Sequence[str]) -> List[str]:
+    """Filter ``available`` shard keys to those overlapping ``[start, end]``."""
+    lo = shard_key(start) if start is not None else None
+    hi = shard_key(end) if end is not None else None
+    return sorted(k for k in available if (lo is None or k >= lo) and (hi is None or k <= hi))
+
+
+class VectorStore:
+    """Append-only vector store with monthly mmap'd shards.
+
+    Args:
+        root: Directory holding shards and the id map.
+        dim: Embedding dimension; required when creating a new store.
+        flush_every: Buffered vectors that trigger a segment write.
+        max_delay: Seconds after which buffered vectors are written anyway.
+        max_segments: Segments per shard before the small tail is merged.
+        ann: ANN parameters for per-shard indexes (None or ``flat`` = exact only).
+        min_ann_size: Shard size at which an ANN index is first built.
+        retrain_growth: Growth factor that triggers an ANN rebuild.
+        background: Build ANN indexes on a daemon thread (False: inline).
+        read_only: Open for searching only: no crash recovery, writes raise.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        dim: Optional[int] = None,
+        flush_every: int = DEFAULT_FLUSH_EVERY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_segments: int = DEFAULT_MAX_SEGMENTS,
+        ann: Optional[ANNParams] = None,
+        min_ann_size: int = DEFAULT_MIN_ANN_SIZE,
+        retrain_growth: float = DEFAULT_RETRAIN_GROWTH,
+        background: bool = True,
+        read_only: bool = False,
+    ) -> None:
+        if faiss is None or np is None:
+            raise RuntimeError("faiss or numpy not installed")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flush_every = max(1, flush_every)
+        self.max_delay = max_delay
+        self.max_segments = max(1, max_segments)
+        self.ann = ann if ann is not None and ann.kind != "flat" else None
+        self.min_ann_size = max(min_ann_size, min_train_points(self.ann) if self.ann else 1)
+        self.retrain_growth = max(1.0, retrain_growth)
+        self.background = background
+        self.read_only = read_only
+        self._building: set = set()
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(str(self.root / "ids.sqlite3"), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        for stmt in _SCHEMA:
+            self._db.execute(stmt)
+        ensure_metadata_columns(self._db, "vectors")
+        stored = self._meta("dim")
+        if stored is not None and dim is not None and int(stored) != dim:
+            raise ValueError(f"store dimension is {stored}, got {dim}")
+        if stored is None and dim is not None and not read_only:
+            self._db.execute("INSERT INTO meta(key, value) VALUES ('dim', ?)", (str(dim),))
+        self.dim = int(stored) if stored is not None else dim
+        if not read_only:
+            # Rows whose vectors never reached a segment (crash before flush) are dropped
+            # so the capture can be embedded again; AUTOINCREMENT never reuses their ids.
+            # A reader must not do this: the rows may belong to a live writer's buffer.
+            self._db.execute("DELETE FROM vectors WHERE flushed = 0")
+        self._pending: Dict[str, object] = {}
+        self._pending_count = 0
+        self._pending_since = 0.0
+        self._segments: Dict[Path, Tuple[float, object]] = {}
+        self._id_ranges: Dict[Path, Tuple[float, int, int, int]] = {}
+        self._ann_cache: Dict[str, Tuple[float, object, int]] = {}
+
+    # --- writes ---
+    def add(self, capture: str, vector: Sequence[float], ts: Optional[float] = None, chunk: int = 0) -> Optional[int]:
+        """Append one embedding for ``capture``.
+
+        Returns:
+            Optional[int]: The vector id, or None if already stored or degenerate.
+        """
+        return self.add_many([(capture, chunk, vector, ts)])[0]
+
+    def add_many(
+        self,
+        items: Sequence[Tuple[str, int, Sequence[float], Optional[float]]],
+        meta: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    ) -> List[Optional[int]]:
+        """Append ``(capture, chunk, vector, ts)`` rows in one transaction.
+
+        Vectors are grouped per shard and added with a single FAISS call each.
+        ``meta`` maps a capture to its metadata (``title``, ``bbox``, ``backend``);
+        captures without an entry get the title recovered from their file name.
+
+        Returns:
+            list[Optional[int]]: Vector id per item (None if already stored or degenerate).
+        """
+        self._check_writable()
+        prepared = []
+        for capture, chunk, vector, ts in items:
+            vec = self._normalise(vector)
+            ts = time.time() if ts is None else ts
+            prepared.append((capture, chunk, vec, ts))
+        ids: List[Optional[int]] = [None] * len(prepared)
+        with self._lock:
+            by_shard: Dict[str, Tuple[list, list]] = {}
+            self._db.execute("BEGIN")
+            try:
+                for pos, (capture, chunk, vec, ts) in enumerate(prepared):
+                    if vec is None:
+                        continue
+                    if self.dim is None:
+                        self.dim = vec.shape[1]
+                        self._db.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('dim', ?)", (str(self.dim),))
+                    elif vec.shape[1] != self.dim:
+                        raise ValueError(f"store dimension is {self.dim}, got {vec.shape[1]}")
+                    key = shard_key(ts)
+                    info = (meta or {}).get(capture)
+                    cur = self._db.execute(
+                        "INSERT OR IGNORE INTO vectors(capture, chunk, shard, ts, title, title_key, bbox, backend) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (capture, chunk, key, ts, *metadata_values(info or metadata_from_filename(Path(capture)))),
+                    )
+                    if cur.rowcount != 1:
+                        continue
+                    ids[pos] = cur.lastrowid
+                    vecs, vids = by_shard.setdefault(key, ([], []))
+                    vecs.append(vec)
+                    vids.append(cur.lastrowid)
+                if by_shard:
+                    self._bump_generation()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            for key, (vecs, vids) in by_shard.items():
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = self._new_index()
+                if self._pending_count == 0:
+                    self._pending_since = time.monotonic()
+                pending.add_with_ids(np.concatenate(vecs), np.asarray(vids, dtype="int64"))
+                self._pending_count += len(vids)
+            if self.flush_due():
+                self.flush()
+        return ids
+
+    @property
+    def pending(self) -> int:
+        """Vectors buffered in RAM, not yet written to a segment."""
+        with self._lock:
+            return self._pending_count
+
+    def flush_due(self) -> bool:
+        """True once the buffer holds ``flush_every`` vectors or has waited ``max_delay`` seconds."""
+        with self._lock:
+            return self._pending_count > 0 and (
+                self._pending_count >= self.flush_every or time.monotonic() - self._pending_since >= self.max_delay
+            )
+
+    def flush(self) -> int:
+        """Write buffered vectors as new segment files.
+
+        Returns:
+            int: Vectors written.
+        """
+        written = 0
+        with self._lock:
+            for key, index in list(self._pending.items()):
+                if index.ntotal == 0:
+                    continue
+                shard_dir = self.root / key
+                shard_dir.mkdir(parents=True, exist_ok=True)
+                path = shard_dir / f"seg-{self._next_segment(shard_dir):06d}.faiss"
+                tmp = path.with_suffix(".tmp")
+                faiss.write_index(index, str(tmp))
+                os.replace(tmp, path)
+                ids = faiss.vector_to_array(index.id_map).tolist()
+                self._db.executemany("UPDATE vectors SET flushed = 1 WHERE id = ?", [(i,) for i in ids])
+                written += index.ntotal
+                del self._pending[key]
+                if len(self._mergeable_segments(key)) > self.max_segments:
+                    self.merge_shard(key)
+                self._maybe_build_ann(key)
+            self._pending_count = 0
+            if written:
+                # Other processes only see vectors once they are in a segment.
+                self._bump_generation()
+        return written
+
+    def merge_shard(self, key: str) -> Optional[Path]:
+        """Merge the small newest segments of shard ``key`` into one file.
+
+        Starting from the newest segment, older segments are added while each
+        holds no more vectors than those already selected; segments covered by
+        the shard's ANN index are never merged.
+        """
+        self._check_writable()
+        with self._lock:
+            paths = self._merge_tail(key)
+            if len(paths) < 2:
+                return None
+            merged = self._new_index()
+            ranges = [self._id_range(p) for p in paths]
+            lo, hi = min(r[0] for r in ranges), max(r[1] for r in ranges)
+            live_ids = np.fromiter(
+                (r[0] for r in self._db.execute(
+                    "SELECT id FROM vectors WHERE shard = ? AND id BETWEEN ? AND ?", (key, lo, hi)
+                )),
+                dtype="int64",
+            )
+            for path in paths:
+                seg = faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                ids = faiss.vector_to_array(seg.id_map).astype("int64")
+                live = np.isin(ids, live_ids)  # vectors removed by retention are not carried over
+                merged.add_with_ids(seg.index.reconstruct_n(0, seg.ntotal)[live], ids[live])
+            target = paths[-1].with_name(f"seg-{self._next_segment(paths[-1].parent):06d}.faiss")
+            tmp = target.with_suffix(".tmp")
+            faiss.write_index(merged, str(tmp))
+            os.replace(tmp, target)
+            for path in paths:
+                self._segments.pop(path, None)
+                self._id_ranges.pop(path, None)
+                path.unlink(missing_ok=True)
+            LOGGER.info("Merged %s segments of shard %s (%s vectors)", len(paths), key, merged.ntotal)
+            return target
+
+    def rename(self, old_capture: str, new_capture: str) -> int:
+        """Re-key the vectors of a capture whose artifact moved (layout migration).
+
+        Returns:
+            int: Vector rows updated.
+        """
+        self._check_writable()
+        with self._lock:
+            self._db.execute("BEGIN")
+            moved = self._db.execute(
+                "UPDATE OR IGNORE vectors SET capture = ? WHERE capture = ?", (new_capture, old_capture)
+            ).rowcount
+            if moved:
+                self._bump_generation()
+            self._db.execute("COMMIT")
+            return moved
+
+    def remove(self, captures: Iterable[str]) -> int:
+        """Forget every vector of ``captures`` (retention).
+
+        Their id-map rows are deleted, so searches skip the vectors at once; the
+        vectors themselves leave disk when the shard's segments are next merged,
+        or with the whole shard directory once none of its rows remain.
+
+        Returns:
+            int: Vector rows removed.
+        """
+        self._check_writable()
+        captures = list(captures)
+        removed = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            shards = set()
+            dropped: List[int] = []
+            for offset in range(0, len(captures), 500):
+                batch = captures[offset:offset + 500]
+                marks = ",".join("?" * len(batch))
+                rows = self._db.execute(f"SELECT id, shard FROM vectors WHERE capture IN ({marks})", batch).fetchall()
+                shards.update(shard for _, shard in rows)
+                dropped.extend(vid for vid, _ in rows)
+                removed += self._db.execute(f"DELETE FROM vectors WHERE capture IN ({marks})", batch).rowcount
+            if removed:
+                self._bump_generation()
+            self._db.execute("COMMIT")
+            for key in shards:
+                pending = self._pending.get(key)
+                if pending is not None:
+                    self._pending_count -= pending.remove_ids(np.asarray(dropped, dtype="int64"))
+                if self._db.execute("SELECT 1 FROM vectors WHERE shard = ? LIMIT 1", (key,)).fetchone() is None:
+                    self._drop_shard(key)
+        return removed
+
+    # --- reads ---
+    def search(
+        self,
+        vector: Sequence[float],
+        k: int = 10,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``k`` ``(capture, score)`` pairs, best first.
+
+        Args:
+            vector: Query embedding.
+            k: Number of captures to return.
+            start: Optional inclusive lower bound (epoch seconds).
+            end: Optional inclusive upper bound (epoch seconds).
+            filters: Metadata/time filters, applied as a FAISS id selector.
+        """
+        q = self._normalise(vector)
+        if q is None or k <= 0 or self.dim is None or q.shape[1] != self.dim:
+            return []
+        if filters is not None:
+            start = filters.start if start is None else start
+            end = filters.end if end is None else end
+        fetch = k * 4  # over-fetch: several chunks may map to one capture, some fall outside the range
+        candidates: List[Tuple[float, int]] = []
+        with self._lock:
+            keys = shards_between(start, end, self.shards())
+            selector = None
+            if (filters is not None and filters.has_metadata()) or start is not None or end is not None:
+                allowed = self._filtered_ids(keys, replace(filters or SearchFilters(), start=start, end=end))
+                if allowed.size == 0:
+                    return []
+                selector = faiss.IDSelectorBatch(allowed)
+            for key in keys:
+                for index, covered in self._shard_indexes(key, exact=selector is not None):
+                    if index.ntotal == 0:
+                        continue
+                    if selector is None:
+                        scores, ids = index.search(q, min(fetch, index.ntotal))
+                    else:
+                        params = search_parameters(index, selector)
+                        scores, ids = index.search(q, min(fetch, index.ntotal), params=params)
+                    # Flat segments skip ids the shard's ANN index already answers for.
+                    candidates.extend(
+                        (float(s), int(i)) for s, i in zip(scores[0], ids[0]) if i >= 0 and i > covered
+                    )
+            candidates.sort(reverse=True)
+            rows = self._lookup([i for _, i in candidates[: fetch * 2]])
+        results: List[Tuple[str, float]] = []
+        seen = set()
+        for score, vid in candidates:
+            row = rows.get(vid)
+            if row is None:
+                continue  # orphaned vector (its row was rolled back)
+            capture, ts = row
+            if (start is not None and ts < start) or (end is not None and ts > end) or capture in seen:
+                continue
+            seen.add(capture)
+            results.append((capture, score))
+            if len(results) >= k:
+                break
+        return results
+
+    def shards(self) -> List[str]:
+        """Shard keys with stored or buffered vectors."""
+        with self._lock:
+            on_disk = {p.name for p in self.root.iterdir() if p.is_dir() and any(p.glob("seg-*.faiss"))}
+            return sorted(on_disk | set(self._pending))
+
+    def contains(self, capture: str, chunk: int = 0) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM vectors WHERE capture = ? AND chunk = ?", (capture, chunk))
+            return row.fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    @property
+    def generation(self) -> int:
+        """Counter advanced whenever searchable content changes (for result caches)."""
+        with self._lock:
+            return int(self._meta("generation") or 0)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            segments = list(self.root.glob("*/seg-*.faiss"))
+            ann_files = list(self.root.glob("*/ann.faiss"))
+            return {
+                "vectors": len(self),
+                "pending": self._pending_count,
+                "shards": len(self.shards()),
+                "segments": len(segments),
+                "bytes": sum(p.stat().st_size for p in segments),
+                "ann_kind": self.ann.kind if self.ann else "flat",
+                "ann_shards": len(ann_files),
+                "ann_bytes": sum(p.stat().st_size for p in ann_files),
+                "ann_building": sorted(self._building),
+            }
+
+    # --- ANN ---
+    def ann_info(self, key: str) -> Optional[Dict[str, object]]:
+        """Return the ``ann.json`` sidecar of shard ``key`` (None if it has no ANN index)."""
+        path = self.root / key / "ann.json"
+        if not path.exists() or not (self.root / key / "ann.faiss").exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def build_ann(self, key: str) -> Optional[Path]:
+        """(Re)train and write the ANN index of shard ``key`` from its flat segments.
+
+        Training uses a random sample of at most ``ann.train_size`` vectors;
+        vectors are then added segment by segment, so only one segment is
+        materialised in RAM at a time.
+        """
+        if self.ann is None:
+            return None
+        self._check_writable()
+        with self._lock:
+            paths = self._segment_paths(key)
+            segments = [(p, faiss.read_index(str(p), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)) for p in paths]
+        total = sum(seg.ntotal for _, seg in segments)
+        if total < self.min_ann_size:
+            return None
+        started = time.monotonic()
+        index = create_index(self.ann, self.dim, total)
+        if not index.is_trained:
+            rng = np.random.default_rng()
+            chosen = np.sort(rng.choice(total, min(total, self.ann.train_size), replace=False))
+            sample, offset = [], 0
+            for _, seg in segments:
+                local = chosen[(chosen >= offset) & (chosen < offset + seg.ntotal)] - offset
+                if local.size:
+                    sample.append(seg.index.reconstruct_n(0, seg.ntotal)[local])
+                offset += seg.ntotal
+            index.train(np.concatenate(sample))
+        covered = -1
+        for _, seg in segments:
+            ids = faiss.vector_to_array(seg.id_map).astype("int64")
+            index.add_with_ids(seg.index.reconstruct_n(0, seg.ntotal), ids)
+            covered = max(covered, int(ids.max()))
+        target = self.root / key / "ann.faiss"
+        tmp = target.with_suffix(".tmp")
+        faiss.write_index(index, str(tmp))
+        info = {
+            "params": self.ann.to_dict(),
+            "ntotal": int(index.ntotal),
+            "covered_max_id": covered,
+            "build_seconds": round(time.monotonic() - started, 3),
+            "built_utc": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            os.replace(tmp, target)
+            (self.root / key / "ann.json").write_text(json.dumps(info), encoding="utf-8")
+            self._ann_cache.pop(key, None)
+        LOGGER.info("Built %s index for shard %s: %s vectors in %.1fs", self.ann.kind, key, total, info["build_seconds"])
+        return target
+
+    def _maybe_build_ann(self, key: str) -> None:
+        if self.ann is None or key in self._building:
+            return
+        total = sum(self._id_range(p)[2] for p in self._segment_paths(key))
+        info = self.ann_info(key)
+        covered = int(info["ntotal"]) if info else 0
+        stale = info is not None and info.get("params") != self.ann.to_dict()
+        if total < self.min_ann_size or (covered and not stale and total < covered * self.retrain_growth):
+            return
+        self._building.add(key)
+
+        def _run() -> None:
+            try:
+                self.build_ann(key)
+            except Exception as exc:  # noqa: BLE001 - exact search keeps working
+                LOGGER.warning("ANN build for shard %s failed: %s", key, exc)
+            finally:
+                with self._lock:
+                    self._building.discard(key)
+
+        if self.background:
+            threading.Thread(target=_run, name=f"ANNBuild-{key}", daemon=True).start()
+        else:
+            _run()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._segments.clear()
+            self._db.close()
+
+    # --- internals ---
+    def _check_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError("vector store opened read-only")
+
+    def _drop_shard(self, key: str) -> None:
+        """Delete shard ``key`` from disk and the caches (no id-map rows left)."""
+        self._pending.pop(key, None)
+        self._ann_cache.pop(key, None)
+        shard_dir = self.root / key
+        for path in list(self._segments):
+            if path.parent == shard_dir:
+                self._segments.pop(path, None)
+                self._id_ranges.pop(path, None)
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        LOGGER.info("Dropped empty vector shard %s", key)
+
+    def _new_index(self):
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
+
+    def _normalise(self, vector: Sequence[float]):
+        vec = np.asarray(vector, dtype="float32").reshape(1, -1)
+        norm = float(np.linalg.norm(vec))
+        if not np.isfinite(norm) or norm == 0.0:
+            return None
+        return np.ascontiguousarray(vec / norm)
+
+    def _segment_paths(self, key: str) -> List[Path]:
+        return sorted((self.root / key).glob("seg-*.faiss"))
+
+    @staticmethod
+    def _next_segment(shard_dir: Path) -> int:
+        numbers = [int(p.stem.split("-", 1)[1]) for p in shard_dir.glob("seg-*.faiss")]
+        return max(numbers, default=0) + 1
+
+    def _mergeable_segments(self, key: str) -> List[Path]:
+        """Segments holding ids newer than the shard's ANN index (all of them without one)."""
+        info = self.ann_info(key)
+        covered = int(info["covered_max_id"]) if info else -1
+        return [p for p in self._segment_paths(key) if self._id_range(p)[0] > covered]
+
+    def _merge_tail(self, key: str) -> List[Path]:
+        """Newest mergeable segments, oldest first, whose sizes keep the merge size-tiered."""
+        tail: List[Path] = []
+        total = 0
+        for path in reversed(self._mergeable_segments(key)):
+            count = self._id_range(path)[2]
+            if tail and count > total:
+                break
+            tail.append(path)
+            total += count
+        return tail[::-1]
+
+    def _segment(self, path: Path):
+        mtime = path.stat().st_mtime
+        cached = self._segments.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY))
+            self._segments[path] = cached
+        return cached[1]
+
+    def _id_range(self, path: Path) -> Tuple[int, int, int]:
+        """Return (min id, max id, count) of a segment (cached per mtime)."""
+        mtime = path.stat().st_mtime
+        cached = self._id_ranges.get(path)
+        if cached is None or cached[0] != mtime:
+            ids = faiss.vector_to_array(self._segment(path).id_map)
+            if ids.size:
+                cached = (mtime, int(ids.min()), int(ids.max()), int(ids.size))
+            else:
+                cached = (mtime, 0, -1, 0)
+            self._id_ranges[path] = cached
+        return cached[1], cached[2], cached[3]
+
+    def _ann_index(self, key: str) -> Tuple[Optional[object], int]:
+        path = self.root / key / "ann.faiss"
+        info = self.ann_info(key)
+        if info is None:
+            return None, -1
+        mtime = path.stat().st_mtime
+        cached = self._ann_cache.get(key)
+        if cached is None or cached[0] != mtime:
+            try:
+                index = faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:  # index type without mmap support
+                index = faiss.read_index(str(path))
+            configure_search(index, ANNParams(**info["params"]))
+            cached = (mtime, index, int(info["covered_max_id"]))
+            self._ann_cache[key] = cached
+        return cached[1], cached[2]
+
+    def _shard_indexes(self, key: str, exact: bool = False) -> List[Tuple[object, int]]:
+        """Indexes to query for shard ``key`` with the id each must exceed to count.
+
+        ``exact`` (filtered queries) bypasses an HNSW index in favour of the flat segments.
+        """
+        ann_index, covered = self._ann_index(key)
+        if exact and ann_index is not None and (self.ann_info(key) or {}).get("params", {}).get("kind") == "hnsw":
+            ann_index, covered = None, -1
+        indexes: List[Tuple[object, int]] = []
+        if ann_index is not None:
+            indexes.append((ann_index, -1))
+        for path in self._segment_paths(key):
+            if self._id_range(path)[1] > covered:
+                indexes.append((self._segment(path), covered))
+        if key in self._pending:
+            indexes.append((self._pending[key], covered))
+        return indexes
+
+    def _filtered_ids(self, keys: Sequence[str], filters: SearchFilters):
+        """Vector ids in shards ``keys`` matching ``filters`` as an int64 array."""
+        if not keys:
+            return np.zeros(0, dtype="int64")
+        where, params = filters.where()
+        marks = ",".join("?" * len(keys))
+        rows = self._db.execute(f"SELECT id FROM vectors WHERE shard IN ({marks}) AND {where}", (*keys, *params))
+        return np.fromiter((r[0] for r in rows), dtype="int64")
+
+    def _lookup(self, ids: List[int]) -> Dict[int, Tuple[str, float]]:
+        rows: Dict[int, Tuple[str, float]] = {}
+        for offset in range(0, len(ids), 500):  # stay under SQLite's host-parameter limit
+            batch = ids[offset:offset + 500]
+            marks = ",".join("?" * len(batch))
+            for vid, capture, ts in self._db.execute(
+                f"SELECT id, capture, ts FROM vectors WHERE id IN ({marks})", batch
+            ):
+                rows[vid] = (capture, ts)
+        return rows
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _bump_generation(self) -> None:
+        self._db.execute(
+            "INSERT INTO meta(key, value) VALUES ('generation', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Read a value from the store's metadata table (e.g. a consumer checkpoint)."""
+        with self._lock:
+            return self._meta(key)
+
+    def set_meta(self, key: str, value: str) -> None:
+        self._check_writable()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+
+def default_store_path() -> Path:
+    """Store location: HINDSIGHT_VECTOR_DIR or <HINDSIGHT_BASE_DIR|data>/index/vectors."""
+    explicit = os.environ.get("HINDSIGHT_VECTOR_DIR")
+    if explicit:
+        return Path(explicit)
+    return Path(os.environ.get("HINDSIGHT_BASE_DIR") or "data") / "index" / "vectors"
+
+
+_DEFAULT: Dict[Path, VectorStore] = {}
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_store() -> Optional[VectorStore]:
+    """Return the process-wide read-only store, or None if none exists yet or faiss is missing."""
+    path = default_store_path()
+    if faiss is None or np is None or not (path / "ids.sqlite3").exists():
+        return None
+    with _DEFAULT_LOCK:
+        store = _DEFAULT.get(path)
+        if store is None:
+            store = _DEFAULT[path] = VectorStore(path, read_only=True)
+        return store
@@ -60,4 +60,18 @@ def stub_get_active_window(monkeypatch):
         bbox = (0, 0, 10, 10)
 
     monkeypatch.setattr('capture.service.get_active_window', lambda: DummyWin())
-    yield
\ No newline at end of file
+    yield
+
+
+@pytest.fixture
+def non_utc_host(monkeypatch):
+    """Run with a non-UTC host clock; file names keep the default UTC spec."""
+    import time
+
+    monkeypatch.setenv("TZ", "America/New_York")
+    monkeypatch.delenv("HINDSIGHT_TZ_SPEC", raising=False)
+    monkeypatch.delenv("HINDSIGHT_DST_ADJUST", raising=False)
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
@@ -70,6 +70,9 @@ def test_capture_region_mss_failure_then_imagegrab(monkeypatch, tmp_path):
     fake_pil = _types.ModuleType('PIL')
 
     class FakeGrabImg:
+        size = (2, 2)
+        mode = "RGB"
+
         def save(self, path, format=None):
             Path(path).write_text("OK")
 
@@ -99,3 +102,24 @@ def test_capture_region_both_fail(monkeypatch):
         assert False, "Expected RuntimeError"
     except RuntimeError:
         pass
+
+
+def test_capture_region_in_memory_returns_png_bytes(monkeypatch):
+    monkeypatch.setattr(aw, "mss", True)
+    monkeypatch.setattr(aw, "_get_mss", lambda: make_fake_sct((2, 2), b'\x00' * 12))
+    import types as _types
+    fake_pil = _types.ModuleType('PIL')
+    fake_pil.__path__ = []
+    fake_image = _types.ModuleType('PIL.Image')
+
+    class Img:
+        def save(self, fp, format=None):
+            fp.write(b"PNG-IN-MEMORY")
+
+    fake_image.frombytes = lambda mode, size, data: Img()  # type: ignore[attr-defined]
+    fake_pil.Image = fake_image  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, 'PIL', fake_pil)
+    monkeypatch.setitem(sys.modules, 'PIL.Image', fake_image)
+    monkeypatch.setattr(aw, "_BACKEND", "mss")
+
+    assert aw.capture_region((0, 0, 2, 2)) == b"PNG-IN-MEMORY"
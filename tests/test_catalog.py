@@ -0,0 +1,85 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the SQLite capture metadata catalog.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from capture.catalog import CaptureCatalog, CatalogEntry
+from capture.service import CaptureService
+
+
+def test_record_query_and_tombstones(tmp_path: Path):
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite3")
+    for i, title in enumerate(["Inbox - Mozilla Firefox", "main.py - VS Code", "Docs - Mozilla Firefox"]):
+        catalog.record(CatalogEntry(capture_id=f"c{i}", ts=100.0 + i, title=title, bbox=(0, 0, 10, 10), image_bytes=5))
+    with pytest.raises(sqlite3.IntegrityError):  # append-only; a colliding id is an error, not a no-op
+        catalog.record(CatalogEntry(capture_id="c0", ts=500.0))
+    assert catalog.count() == 3
+    assert [e.capture_id for e in catalog.query(title="firefox")] == ["c0", "c2"]
+    assert [e.capture_id for e in catalog.query(start=101.0, end=101.0)] == ["c1"]
+    assert catalog.get("c1").bbox == (0, 0, 10, 10)
+    assert [e.capture_id for e in catalog.recent(2)] == ["c2", "c1"]
+
+    assert catalog.mark_deleted([catalog.get("c0").id]) == 1
+    assert catalog.count() == 2
+    assert [e.capture_id for e in catalog.query()] == ["c1", "c2"]
+    assert len(catalog.query(include_deleted=True)) == 3
+    assert catalog.stats()["bytes"] == 10
+    catalog.close()
+    # The count survives a reopen.
+    assert CaptureCatalog(tmp_path / "catalog.sqlite3").count() == 2
+
+
+def test_import_existing_parses_file_names(tmp_path: Path, non_utc_host):
+    (tmp_path / "Inbox_Mozilla_Firefox_2025-10-02_09-30-00.png.enc").write_bytes(b"img")
+    (tmp_path / "Inbox_Mozilla_Firefox_2025-10-02_09-30-00.txt.enc").write_bytes(b"text")
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite3")
+    assert catalog.import_existing(tmp_path) == 1
+    assert catalog.import_existing(tmp_path) == 0
+    (entry,) = catalog.query()
+    assert entry.title == "Inbox Mozilla Firefox"
+    # Read in the file name's zone (HINDSIGHT_TZ_SPEC, UTC by default), not the host's.
+    assert entry.ts == datetime(2025, 10, 2, 9, 30, tzinfo=timezone.utc).timestamp()
+    assert entry.text_path.endswith(".txt.enc") and entry.total_bytes == 7
+
+
+def test_service_records_captures_and_counts_incrementally(
+    tmp_path: Path, stub_image_open, stub_capture_region, stub_extract_text, stub_get_active_window, monkeypatch
+):
+    enc = tmp_path / "encrypted"
+    service = CaptureService(
+        output_dir=tmp_path / "plain",
+        enc_dir=enc,
+        status_file=tmp_path / "status.json",
+        dedup_threshold=-1,
+        catalog=enc / "catalog.sqlite3",
+    )
+    monkeypatch.setattr(Path, "glob", lambda *a, **k: (_ for _ in ()).throw(AssertionError("enc_dir listed")))
+    service._capture_once()
+    assert service.get_status()["capture_count"] == 1
+    (entry,) = service._catalog.query()
+    assert entry.title == "TestWindow" and entry.bbox == (0, 0, 10, 10)
+    assert entry.image_sha256 and Path(entry.image_path).exists() and entry.text_bytes > 0
+
+
+def test_same_second_captures_get_distinct_ids(tmp_path: Path, monkeypatch, non_utc_host):
+    from capture import screenshot
+    from capture.catalog import entry_from_files
+    from capture.layout import partition
+
+    monkeypatch.setattr(screenshot, "_now_utc", lambda: datetime(2025, 10, 2, 9, 30, tzinfo=timezone.utc))
+    service = CaptureService(output_dir=tmp_path / "plain", enc_dir=tmp_path / "enc", status_file=tmp_path / "s.json")
+    names = [service._unique_filename("Editor") for _ in range(3)]
+    assert names == ["Editor_2025-10-02_09-30-00.png", "Editor_2025-10-02_09-30-00-1.png", "Editor_2025-10-02_09-30-00-2.png"]
+    img = tmp_path / (names[1] + ".enc")
+    img.write_bytes(b"img")
+    entry = entry_from_files(img, None)
+    assert entry.title == "Editor" and entry.ts == datetime(2025, 10, 2, 9, 30, tzinfo=timezone.utc).timestamp()
+    assert partition(entry.capture_id) == Path("2025", "10", "02")
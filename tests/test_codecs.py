@@ -0,0 +1,90 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the frame codecs and the codec benchmark.
+"""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from capture import codecs
+from capture.codec_bench import measure_codec, sample_frames, text_similarity
+from capture.service import CaptureService
+
+
+@pytest.fixture(autouse=True)
+def _reset_codec():
+    yield
+    codecs.configure_codec(codecs.DEFAULT_CODEC)
+
+
+def _frame(size=(64, 40)):
+    img = Image.new("RGB", size, (250, 250, 250))
+    img.paste((10, 10, 10), (4, 4, 40, 12))
+    return img
+
+
+@pytest.mark.parametrize("name", list(codecs.CODECS))
+def test_codecs_round_trip(name):
+    if codecs.CODECS[name].format == "WEBP" and not codecs.webp_available():
+        pytest.skip("Pillow built without WebP")
+    codec = codecs.get_codec(name)
+    data = codecs.encode_image(_frame(), codec)
+    assert codecs.sniff(data) == codec.format.lower()
+    with Image.open(io.BytesIO(data)) as img:
+        assert img.size == (64, 40)
+        if codec.lossless:
+            assert img.convert("RGB").tobytes() == _frame().tobytes()
+
+
+def test_max_dim_downscales_keeping_aspect(tmp_path: Path):
+    codec = codecs.get_codec("png-fast", max_dim=32)
+    codecs.save_image(_frame((64, 40)), str(tmp_path / "f.png"), codec)
+    with Image.open(tmp_path / "f.png") as img:
+        assert img.size == (32, 20)
+    assert codecs.get_codec("png", max_dim=0).max_dim is None
+    assert codecs.prepare(_frame((16, 10)), codec).size == (16, 10)
+
+
+def test_unknown_codec_falls_back_to_png(caplog):
+    assert codecs.configure_codec("jpeg-xl").name == "png"
+    assert codecs.current_codec().name == "png"
+    assert "Unknown image codec" in caplog.text
+
+
+def test_service_records_codec(
+    tmp_path: Path, stub_image_open, stub_capture_region, stub_extract_text, stub_get_active_window
+):
+    codecs.configure_codec("png-fast")
+    enc = tmp_path / "encrypted"
+    service = CaptureService(
+        output_dir=tmp_path / "plain",
+        enc_dir=enc,
+        status_file=tmp_path / "status.json",
+        dedup_threshold=-1,
+        catalog=enc / "catalog.sqlite3",
+    )
+    service._capture_once()
+    (entry,) = service._catalog.query()
+    assert entry.codec == "png-fast"
+    assert service.get_status()["image_codec"] == "png-fast"
+
+
+def test_bench_measures_size_and_ocr_similarity():
+    frames = sample_frames(1, 200, 80)
+    png = measure_codec("png", frames, repeats=1)
+    fast = measure_codec(
+        "png-fast",
+        frames,
+        repeats=1,
+        ocr=lambda data: "hello world",
+        png_sizes=[png.bytes_per_frame],
+    )
+    assert fast.frames == 1 and fast.bytes_per_frame > 0 and fast.encode_ms_p50 >= 0
+    assert fast.ocr_similarity == 1.0 and png.ocr_similarity is None
+    assert fast.size_vs_png == pytest.approx(fast.bytes_per_frame / png.bytes_per_frame, rel=1e-2)
+    assert text_similarity("a b c d", "a b x d") == 0.75
@@ -0,0 +1,103 @@
+"""Tests for perceptual near-duplicate frame detection."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+ImageDraw = pytest.importorskip("PIL.ImageDraw")
+
+import capture.service as svc
+from capture.dedup import FrameHash, NearDuplicateDetector, perceptual_hash
+from capture.frame import Frame
+
+
+def _text_frame(lines, cursor=False, size=(640, 360)):
+    im = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(im)
+    for i, line in enumerate(lines):
+        draw.text((20, 20 + i * 18), line, fill="black")
+    if cursor:
+        draw.rectangle((600, 330, 601, 345), fill="black")
+    return im
+
+
+def _raw(im) -> Frame:
+    """Frame over a BGRA buffer, as mss hands it over."""
+    return Frame(bytearray(im.convert("RGBA").tobytes("raw", "BGRA")), im.size)
+
+
+def test_cursor_blink_is_near_but_new_text_is_not():
+    a = perceptual_hash(_text_frame(["hello", "world"]))
+    blink = perceptual_hash(_text_frame(["hello", "world"], cursor=True))
+    typed = perceptual_hash(_text_frame(["hello", "world", "a brand new line of text"]))
+    assert a.distance(blink) <= 3
+    assert a.distance(typed) > 3
+    # Resized windows are never compared.
+    assert a.distance(perceptual_hash(_text_frame(["hello"], size=(320, 200)))) is None
+
+
+def test_detector_keeps_per_title_history():
+    h = lambda bits: FrameHash(width=4, height=1, bits=bits)  # noqa: E731
+    det = NearDuplicateDetector(threshold=0, history=2)
+    det.remember("editor", h(0b1010))
+    det.remember("browser", h(0b0101))
+    assert det.match("editor", h(0b1010)) == 0
+    assert det.match("browser", h(0b1010)) is None
+    # Older hashes for a title stay matchable until pushed out of the history window.
+    det.remember("editor", h(0b1111))
+    assert det.match("editor", h(0b1010)) == 0
+    det.remember("editor", h(0b0000))
+    assert det.match("editor", h(0b1010)) is None
+    det.forget("editor", h(0b0000))
+    assert det.match("editor", h(0b0000)) is None
+
+
+def test_small_text_edit_is_not_a_near_duplicate():
+    det = NearDuplicateDetector()
+    base = perceptual_hash(_text_frame(["hello", "world"]))
+    edited = perceptual_hash(_text_frame(["hellp", "world"]))
+    # A one-character edit is invisible to the ink map...
+    assert base.distance(edited) <= det.threshold
+    det.remember("editor", base)
+    # ...but its band digest is new, so the frame is kept.
+    assert det.match("editor", edited) is None
+    det.remember("editor", perceptual_hash(_text_frame(["hello", "world"], cursor=True)))
+    assert det.match("editor", perceptual_hash(_text_frame(["hello", "world"]))) == 0
+
+
+def test_service_skips_near_duplicate_frames(tmp_path: Path, monkeypatch, stub_get_active_window):
+    frames = [
+        _raw(_text_frame(["hello", "world"])),
+        _raw(_text_frame(["hello", "world"], cursor=True)),
+        _raw(_text_frame(["hello", "world"])),
+        _raw(_text_frame(["hello", "world", "new content on screen"])),
+    ]
+
+    monkeypatch.setattr(svc, "grab_frame", lambda bbox: frames.pop(0))
+    monkeypatch.setattr(svc, "extract_text", lambda src: "text")
+    service = svc.CaptureService(
+        output_dir=tmp_path / "plain",
+        enc_dir=tmp_path / "encrypted",
+        status_file=tmp_path / "status.json",
+        in_memory=True,
+        dedup_threshold=3,
+    )
+    service._capture_once()
+    assert service.get_status()["duplicate"] is False
+    # The first cursor state is new band content; once both states are known, blinks are skipped.
+    service._capture_once()
+    assert service.get_status()["duplicate"] is False
+    service._capture_once()
+    status = service.get_status()
+    assert status["duplicate"] is True and status["duplicate_kind"] == "near"
+    assert status["dedup"]["skipped_near"] == 1
+    service._capture_once()
+    assert service.get_status()["duplicate"] is False
+
+
+def test_frame_hash_matches_decoded_image_hash():
+    im = _text_frame(["hello", "world"], cursor=True)
+    assert perceptual_hash(_raw(im)) == perceptual_hash(im)
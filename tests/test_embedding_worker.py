@@ -0,0 +1,120 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the chunked, length-bucketed embedding worker (fake model, no torch).
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+
+from capture.encryption import encrypt_to_file, generate_key  # noqa: E402
+from search.embedding_worker import (  # noqa: E402
+    Chunk,
+    EmbeddingWorker,
+    length_buckets,
+    masked_mean_pool,
+    pad_batch,
+    token_windows,
+)
+from search.vector_store import VectorStore  # noqa: E402
+
+
+class FakeTokenizer:
+    cls_token_id, sep_token_id, pad_token_id = 1, 2, 0
+
+    def __call__(self, text, add_special_tokens=False):
+        return {"input_ids": [3 + (sum(map(ord, w)) % 97) for w in text.split()]}
+
+
+TABLE = np.random.default_rng(0).standard_normal((100, 8)).astype("float32")
+
+
+def fake_forward(input_ids, attention_mask):
+    hidden = TABLE[input_ids]
+    hidden[input_ids == 0] = 100.0  # padding embeddings must not leak into the pooled vector
+    return hidden
+
+
+def test_token_windows_overlap_and_cover_everything():
+    windows = token_windows(list(range(10)), window=4, stride=3)
+    assert windows == [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9]]
+    assert token_windows([1, 2], window=4, stride=3) == [[1, 2]]
+
+
+def test_length_buckets_and_masked_pooling():
+    chunks = [Chunk("c", i, 0.0, [5] * n) for i, n in enumerate((9, 1, 5, 2))]
+    assert [[len(c.token_ids) for c in b] for b in length_buckets(chunks, 2)] == [[1, 2], [5, 9]]
+    short = Chunk("s", 0, 0.0, [7, 8])
+    long = Chunk("l", 0, 0.0, list(range(10, 30)))
+    ids, mask = pad_batch([short, long], 1, 2, 0)
+    pooled_together = masked_mean_pool(fake_forward(ids, mask), mask)[0]
+    ids_alone, mask_alone = pad_batch([short], 1, 2, 0)
+    assert np.allclose(pooled_together, masked_mean_pool(fake_forward(ids_alone, mask_alone), mask_alone)[0])
+
+
+def test_worker_embeds_long_pages_and_resumes_from_checkpoint(tmp_path: Path):
+    key = generate_key()
+    enc = tmp_path / "encrypted"
+    long_text = " ".join(f"word{i}" for i in range(50)) + " tail marker phrase"
+    for name, text, mtime in (("a", long_text, 1000), ("b", "short note", 2000)):
+        path = encrypt_to_file(text.encode(), key, enc / f"{name}.txt.enc")
+        os.utime(path, (mtime, mtime))
+    store = VectorStore(tmp_path / "vectors", dim=8)
+    worker = EmbeddingWorker(store, tokenizer=FakeTokenizer(), forward=fake_forward, window=16, stride=12, batch_size=3)
+    assert worker.catch_up(enc, key) == 2
+    # The long page was split into several chunks; its tail (past one window) is still searchable.
+    assert store.contains(str(enc / "a.txt.enc"), chunk=3)
+    ids, mask = pad_batch([Chunk("q", 0, 0.0, FakeTokenizer()("tail marker phrase")["input_ids"])], 1, 2, 0)
+    query = masked_mean_pool(fake_forward(ids, mask), mask)[0]
+    assert store.search(query, k=1)[0][0] == str(enc / "a.txt.enc")
+    assert worker.metrics()["chunks"] == len(token_windows(list(range(53)), 16, 12)) + 1
+    # Restart: nothing is re-embedded.
+    again = EmbeddingWorker(store, tokenizer=FakeTokenizer(), forward=fake_forward)
+    assert again.catch_up(enc, key) == 0
+    store.close()
+
+
+def test_worker_thread_consumes_submissions(tmp_path: Path):
+    store = VectorStore(tmp_path / "vectors", dim=8)
+    worker = EmbeddingWorker(store, tokenizer=FakeTokenizer(), forward=fake_forward, target_chunks_per_sec=1000)
+    worker.start()
+    worker.submit("x.txt.enc", "hello there", ts=5000.0)
+    worker.submit("y.txt.enc", "   ", ts=5001.0)
+    worker.stop(timeout=5)
+    assert store.contains("x.txt.enc") and not store.contains("y.txt.enc")
+    assert float(store.get_meta("embed_checkpoint")) == 5000.0
+    store.close()
+
+
+def test_checkpoint_waits_for_segment_write(tmp_path: Path):
+    store = VectorStore(tmp_path / "vectors", dim=8, flush_every=100, max_delay=3600)
+    worker = EmbeddingWorker(store, tokenizer=FakeTokenizer(), forward=fake_forward)
+    worker.embed_captures([("x.txt.enc", "hello there", 5000.0)])
+    # Batches no longer force a segment per call; the checkpoint only covers written vectors.
+    assert store.pending > 0 and store.get_meta("embed_checkpoint") is None
+    worker.flush()
+    assert store.pending == 0 and float(store.get_meta("embed_checkpoint")) == 5000.0
+    store.close()
+
+
+def test_catch_up_checkpoint_uses_capture_time(tmp_path: Path):
+    from capture.catalog import CaptureCatalog, CatalogEntry
+
+    key = generate_key()
+    enc = tmp_path / "encrypted"
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite3")
+    for name, ts in (("a", 1000.0), ("b", 2000.0)):
+        path = encrypt_to_file(f"note {name}".encode(), key, enc / f"{name}.txt.enc")
+        os.utime(path, (9000, 9000))  # written long after capture
+        catalog.record(CatalogEntry(capture_id=name, ts=ts, title="t", text_path=str(path)))
+    store = VectorStore(tmp_path / "vectors", dim=8)
+    worker = EmbeddingWorker(store, tokenizer=FakeTokenizer(), forward=fake_forward)
+    assert worker.catch_up(enc, key, catalog=catalog) == 2
+    assert float(store.get_meta("embed_checkpoint")) == 2000.0
+    store.close()
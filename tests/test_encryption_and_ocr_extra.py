@@ -44,3 +44,141 @@ def test_ocr_extract_text_with_deps(monkeypatch, tmp_path):
     img = tmp_path / "img2.png"
     img.write_text("png")
     assert ocr.extract_text(img) == "detected text"
+
+
+def test_incremental_ocr_only_reocrs_changed_bands(monkeypatch):
+    Image = __import__('pytest').importorskip('PIL.Image')
+    ImageDraw = __import__('PIL.ImageDraw', fromlist=['Draw'])
+
+    calls = []
+
+    class FakeTess:
+        class Output:
+            DICT = 'dict'
+
+        @staticmethod
+        def image_to_data(img, lang=None, output_type=None):
+            # One line per dark 20px stripe, reported at the stripe's position in the crop.
+            calls.append(img.size)
+            gray = img.convert('L')
+            out = {k: [] for k in ('text', 'block_num', 'par_num', 'line_num', 'top', 'left', 'height')}
+            for y in range(0, img.size[1], 4):
+                if gray.getpixel((5, y)) < 128 and (y == 0 or gray.getpixel((5, y - 4)) >= 128):
+                    shade = gray.getpixel((6, y))
+                    out['text'].append(f'line{shade}')
+                    for k, v in (('block_num', 1), ('par_num', 1), ('line_num', y), ('top', y), ('left', 5), ('height', 12)):
+                        out[k].append(v)
+            return out
+
+    monkeypatch.setattr(ocr, 'pytesseract', FakeTess)
+
+    def frame(shades):
+        im = Image.new('RGB', (64, 256), 'white')
+        draw = ImageDraw.Draw(im)
+        for i, shade in enumerate(shades):
+            draw.rectangle((5, 20 + i * 64, 40, 32 + i * 64), fill=(0, 0, 0))
+            draw.point((6, 20 + i * 64), fill=(shade, shade, shade))
+        return im
+
+    engine = ocr.IncrementalOCR(band_height=64, margin=8)
+    first = engine.extract(frame([1, 2, 3, 4]), 'editor')
+    assert first.splitlines() == ['line1', 'line2', 'line3', 'line4']
+    assert calls == [(64, 256)]
+    # Change only band 2: just that band (plus margin) is re-OCR'd and the text stitched back.
+    second = engine.extract(frame([1, 2, 9, 4]), 'editor')
+    assert second.splitlines() == ['line1', 'line2', 'line9', 'line4']
+    assert len(calls) == 2 and calls[1][1] < 100
+    # Unchanged frame: no Tesseract call at all.
+    assert engine.extract(frame([1, 2, 9, 4]), 'editor') == second
+    assert len(calls) == 2
+    assert engine.stats['cache_hits'] == 1
+
+
+def test_tesserocr_pool_reuses_and_restarts_handles(monkeypatch):
+    Image = __import__('pytest').importorskip('PIL.Image')
+    import capture.ocr_engine as ocr_engine
+
+    created = []
+
+    class FakeAPI:
+        fail_next = False
+
+        def __init__(self, lang='eng', path=None):
+            self.lang = lang
+            self.ended = False
+            created.append(self)
+
+        def SetImage(self, img):
+            self.size = img.size
+
+        def GetUTF8Text(self):
+            if FakeAPI.fail_next:
+                FakeAPI.fail_next = False
+                raise RuntimeError('tesseract crashed')
+            return f'{self.lang} {self.size[0]}x{self.size[1]}'
+
+        def End(self):
+            self.ended = True
+
+    fake = type('tesserocr', (), {'PyTessBaseAPI': FakeAPI})
+    monkeypatch.setattr(ocr_engine, 'tesserocr', fake)
+    monkeypatch.setattr(ocr, 'pytesseract', None)
+    ocr.configure_engine('tesserocr', size=2)
+    try:
+        assert ocr.warmup_engine('eng') is True
+        assert len(created) == 2
+        img = Image.new('RGB', (8, 4), 'white')
+        for _ in range(3):
+            assert ocr.extract_text(img) == 'eng 8x4'
+        # Warm handles are reused; no per-call engine start-up.
+        assert len(created) == 2
+        FakeAPI.fail_next = True
+        assert ocr.extract_text(img) == 'eng 8x4'
+        stats = ocr.engine_stats()
+        # The failed handle was ended; a replacement is created on demand.
+        assert stats['restarts'] == 1 and stats['handles']['eng'] == 1
+        assert sum(api.ended for api in created) == 1
+    finally:
+        ocr.configure_engine()
+    assert all(api.ended for api in created)
+
+
+def test_tesserocr_pool_waiter_gets_replacement_for_crashed_handle(monkeypatch):
+    import threading
+    import time
+
+    import capture.ocr_engine as ocr_engine
+
+    created = []
+
+    class FakeAPI:
+        def __init__(self, lang='eng', path=None):
+            created.append(self)
+
+        def End(self):
+            pass
+
+    monkeypatch.setattr(ocr_engine, 'tesserocr', type('tesserocr', (), {'PyTessBaseAPI': FakeAPI}))
+    pool = ocr_engine.TesserocrPool(size=1)
+    got = []
+    holding = threading.Event()
+    waiter = threading.Thread(target=lambda: got.append(_borrow(pool, holding)))
+    try:
+        with pool._api('eng'):
+            holding.set()
+            waiter.start()
+            while not pool._available._waiters:  # the waiter is blocked on the full pool
+                time.sleep(0.001)
+            raise RuntimeError('tesseract crashed')
+    except RuntimeError:
+        pass
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert len(created) == 2 and got == [created[1]]
+    pool.close()
+
+
+def _borrow(pool, holding):
+    holding.wait()
+    with pool._api('eng') as api:
+        return api
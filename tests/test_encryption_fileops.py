@@ -19,3 +19,45 @@ def test_encrypt_and_decrypt_file_roundtrip(tmp_path: Path):
     assert src.exists()
     recovered = decrypt_file(enc_path, key)
     assert recovered.decode("utf-8") == "hello-encrypt"
+
+
+def test_encrypt_to_file_from_memory(tmp_path: Path):
+    from capture.encryption import encrypt_to_file
+
+    key = generate_key()
+    dest = tmp_path / "enc" / "frame.png.enc"
+    out = encrypt_to_file(b"frame-bytes", key, dest)
+    assert out == dest and dest.exists()
+    assert decrypt_file(dest, key) == b"frame-bytes"
+
+
+def test_chunked_container_roundtrip_and_random_access(tmp_path: Path):
+    import pytest
+    from cryptography.exceptions import InvalidTag
+    from capture.encryption import ChunkedReader, decrypt_bytes, encrypt_bytes, is_chunked_file
+
+    key = generate_key()
+    payload = bytes(range(256)) * 1000  # 256000 bytes -> 4 chunks of 64 KiB
+    src = tmp_path / "frame.png"
+    src.write_bytes(payload)
+    enc = encrypt_file(src, key, tmp_path / "enc", chunked=True)
+    assert is_chunked_file(enc)
+    # Binary chunks: no base64 inflation, just header + one tag per chunk.
+    assert enc.stat().st_size < len(payload) + 128
+    assert decrypt_file(enc, key) == payload
+
+    with ChunkedReader(enc, key) as reader:
+        assert reader.size == len(payload) and reader.num_chunks == 4
+        assert reader.read(70000, 100) == payload[70000:70100]
+        assert reader.read(200000) == payload[200000:]
+
+    # Legacy Fernet files remain readable side by side.
+    legacy = tmp_path / "legacy.enc"
+    legacy.write_bytes(encrypt_bytes(b"old", key))
+    assert not is_chunked_file(legacy)
+    assert decrypt_file(legacy, key) == b"old"
+
+    # Dropping the final chunk is detected (previous chunk was not flagged last).
+    data = enc.read_bytes()
+    with pytest.raises(InvalidTag):
+        decrypt_bytes(data[:len(data) - (len(payload) % 65536 + 16)], key)
@@ -0,0 +1,74 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for zero-copy captured frames and the handoff benchmark.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+import pytest
+from PIL import Image
+
+import capture.ocr as ocr
+from capture.frame import Frame
+from capture.frame_bench import measure_path, sample_screenshot
+
+
+def _bgra(size=(8, 6), colour=(10, 20, 30)):
+    img = Image.new("RGB", size, colour)
+    img.paste((200, 100, 50), (2, 2, 5, 4))
+    return img, bytearray(img.convert("RGBA").tobytes("raw", "BGRA"))
+
+
+def test_frame_shares_buffer_and_converts_once():
+    img, raw = _bgra()
+    frame = Frame(raw, img.size)
+    assert frame.digest() == hashlib.sha256(raw).hexdigest()
+    assert frame.rows(2, 4).obj is raw  # a view, not a copy
+    assert not frame.converted
+    rgb = frame.image()
+    assert rgb.tobytes() == img.tobytes() and frame.image() is rgb
+    frame.check()
+    with pytest.raises(ValueError):
+        Frame(raw[:-4], img.size).check()
+
+
+def test_thumbnail_matches_resize_of_converted_image():
+    img, raw = _bgra((64, 40))
+    frame = Frame(raw, img.size)
+    assert frame.thumbnail((8, 5)).tobytes() == img.resize((8, 5), Image.BOX).tobytes()
+    assert not frame.converted
+
+
+def test_from_screenshot_wraps_mss_raw_buffer():
+    pytest.importorskip("mss")
+    shot = sample_screenshot(32, 24)
+    frame = Frame.from_screenshot(shot)
+    assert frame.buffer.obj is shot.raw and frame.raw_mode == "BGRA"
+    assert frame.image().tobytes() == shot.rgb
+
+
+def test_incremental_ocr_skips_conversion_for_unchanged_frame(monkeypatch):
+    calls = []
+
+    def fake_data(image, lang):
+        calls.append(image.size)
+        return {"text": ["hi"], "block_num": [1], "par_num": [1], "line_num": [1],
+                "top": [0], "left": [0], "height": [8]}
+
+    monkeypatch.setattr(ocr, "_image_to_data", fake_data)
+    cache = ocr.IncrementalOCR(band_height=8, margin=0)
+    img, raw = _bgra((16, 16))
+    assert cache.extract(Frame(bytearray(raw), img.size), "w") == "hi"
+    repeat = Frame(bytearray(raw), img.size)
+    assert cache.extract(repeat, "w") == "hi"
+    assert len(calls) == 1 and not repeat.converted
+
+
+def test_frame_handoff_copies_less_than_legacy():
+    pytest.importorskip("mss")
+    shots = [sample_screenshot(64, 48)]
+    legacy, frame = measure_path("legacy", shots), measure_path("frame", shots)
+    assert frame.bytes_copied_per_frame < legacy.bytes_copied_per_frame / 3
+    assert "mss .rgb" in legacy.steps and "mss .rgb" not in frame.steps
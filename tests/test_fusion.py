@@ -0,0 +1,58 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for rank fusion and concurrent retrieval legs in hybrid search.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from search import hybrid
+from search.fusion import RRF_K, fuse
+
+KEYWORD = [("a", 12.0), ("b", 8.0), ("c", 1.0)]
+SEMANTIC = [("c", 0.9), ("d", 0.8), ("a", 0.2)]
+
+
+def test_rrf_prefers_documents_found_by_both_legs():
+    fused = fuse({"keyword": KEYWORD, "semantic": SEMANTIC}, method="rrf")
+    assert [h.doc_id for h in fused][:2] == ["a", "c"]
+    top = fused[0]
+    assert top.ranks == {"keyword": 1, "semantic": 3}
+    assert top.raw_scores == {"keyword": 12.0, "semantic": 0.2}
+    assert top.score == pytest.approx(1 / (RRF_K + 1) + 1 / (RRF_K + 3))
+
+
+def test_score_fusion_methods_and_weights():
+    minmax = fuse({"keyword": KEYWORD, "semantic": SEMANTIC}, method="minmax")
+    scores = {h.doc_id: h.score for h in minmax}
+    assert scores["a"] == pytest.approx(1.0) and scores["c"] == pytest.approx(1.0)
+    assert scores["d"] == pytest.approx(6 / 7)
+
+    weighted = fuse({"keyword": KEYWORD, "semantic": SEMANTIC}, method="zscore", weights={"keyword": 0.0})
+    assert weighted[0].doc_id == "c"
+    with pytest.raises(ValueError):
+        fuse({}, method="borda")
+
+
+def test_hybrid_search_fuses_and_drops_slow_leg(monkeypatch):
+    release = threading.Event()
+
+    def slow_semantic(query, k, filters=None):
+        release.wait(5)
+        return SEMANTIC
+
+    monkeypatch.setitem(hybrid.LEGS, "keyword", lambda q, k, f=None: KEYWORD)
+    monkeypatch.setitem(hybrid.LEGS, "semantic", slow_semantic)
+    try:
+        results = hybrid.hybrid_search("q", limit=5, timeouts={"semantic": 0.05}, use_cache=False)
+    finally:
+        release.set()
+    assert [r.doc_id for r in results] == ["a", "b", "c"]
+    assert all(r.source == "keyword" and "semantic" not in r.ranks for r in results)
+
+    monkeypatch.setitem(hybrid.LEGS, "semantic", lambda q, k, f=None: SEMANTIC)
+    results = hybrid.hybrid_search("q", limit=2, fusion_method="minmax", use_cache=False)
+    assert results[0].source == "hybrid" and results[0].raw_scores["semantic"] in (0.2, 0.9)
@@ -0,0 +1,113 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the SQLite FTS5 keyword index.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+
+from capture.encryption import encrypt_to_file, generate_key
+from search import indexer
+from search.indexer import KeywordIndex, match_expression
+
+
+def _write(enc_dir: Path, name: str, text: str, key: bytes, mtime: float) -> Path:
+    path = encrypt_to_file(text.encode("utf-8"), key, enc_dir / f"{name}.txt.enc")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_incremental_update_from_encrypted(tmp_path: Path):
+    key = generate_key()
+    enc = tmp_path / "encrypted"
+    _write(enc, "a", "quarterly budget spreadsheet", key, 1000)
+    _write(enc, "b", "budget budget meeting notes", key, 2000)
+    (enc / "x.png.enc").write_bytes(b"ignored")
+
+    decrypted = []
+
+    def counting_decrypt(path, k):
+        decrypted.append(path.name)
+        from capture.encryption import decrypt_file
+        return decrypt_file(path, k)
+
+    idx = KeywordIndex(tmp_path / "kw.sqlite3", batch_size=1)
+    assert idx.update_from_encrypted(enc, key, decrypt=counting_decrypt) == 2
+    assert idx.checkpoint == 2000
+    # Nothing new: no file is decrypted again.
+    decrypted.clear()
+    assert idx.update_from_encrypted(enc, key, decrypt=counting_decrypt) == 0
+    assert decrypted == []
+    _write(enc, "c", "holiday photos", key, 3000)
+    assert idx.update_from_encrypted(enc, key, decrypt=counting_decrypt) == 1
+    assert decrypted == ["c.txt.enc"]
+
+    hits = idx.search("budget")
+    assert [Path(p).name for p, _ in hits] == ["b.txt.enc", "a.txt.enc"]
+    assert hits[0][1] > hits[1][1]
+    # Prefix match on the last term, and every term required.
+    assert [Path(p).name for p, _ in idx.search("holi")] == ["c.txt.enc"]
+    assert idx.search("budget holiday") == []
+    assert idx.remove(str(enc / "b.txt.enc"))
+    assert [Path(p).name for p, _ in idx.search("budget")] == ["a.txt.enc"]
+    idx.close()
+
+
+def test_catch_up_from_catalog_uses_capture_time(tmp_path: Path):
+    from capture.catalog import CaptureCatalog, CatalogEntry
+
+    key = generate_key()
+    enc = tmp_path / "encrypted"
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite3")
+    for name, ts in (("a", 1000.0), ("b", 1500.0)):
+        path = _write(enc, name, f"note {name}", key, 9000)  # encrypted long after capture
+        catalog.record(CatalogEntry(capture_id=name, ts=ts, title="t", text_path=str(path)))
+    idx = KeywordIndex(tmp_path / "kw.sqlite3")
+    # The service indexed "a" live, then stopped before "b" reached the index.
+    idx.add(str(enc / "a.txt.enc"), "note a", mtime=1000.0)
+    idx.commit()
+    assert idx.checkpoint == 1000.0
+    assert idx.update_from_encrypted(enc, key, catalog=catalog) == 1
+    assert idx.checkpoint == 1500.0
+    idx.close()
+
+
+def test_batched_commit_persists_on_close(tmp_path: Path):
+    db = tmp_path / "kw.sqlite3"
+    idx = KeywordIndex(db, batch_size=100)
+    assert idx.add("doc1", "hello world", mtime=5.0)
+    assert not idx.add("doc1", "hello again", mtime=6.0)
+    idx.close()
+    reopened = KeywordIndex(db)
+    assert [p for p, _ in reopened.search("hello")] == ["doc1"]
+    assert reopened.checkpoint == 5.0 and len(reopened) == 1
+    reopened.close()
+
+
+def test_idle_batch_commits_after_max_delay(tmp_path: Path, monkeypatch):
+    db = tmp_path / "kw.sqlite3"
+    clock = [100.0]
+    monkeypatch.setattr(indexer.time, "monotonic", lambda: clock[0])
+    idx = KeywordIndex(db, batch_size=100, max_delay=30.0)
+    assert idx.add("doc1", "hello world", mtime=5.0)
+    reader = sqlite3.connect(str(db))
+    assert reader.execute("SELECT COUNT(*) FROM docs").fetchone()[0] == 0
+    assert not idx.commit_if_due()
+    clock[0] += 30.0  # capture went quiet: no further add()
+    assert idx.commit_if_due() and not idx.commit_if_due()
+    assert reader.execute("SELECT COUNT(*) FROM docs").fetchone()[0] == 1
+    assert idx.checkpoint == 5.0
+    reader.close()
+    idx.close()
+
+
+def test_match_expression_neutralises_operators(tmp_path: Path, monkeypatch):
+    assert match_expression('foo OR "bar" NEAR(') == '"foo" "OR" "bar" "NEAR"*'
+    assert match_expression("  !!  ") == ""
+    monkeypatch.setenv("HINDSIGHT_KEYWORD_DB", str(tmp_path / "missing" / "kw.sqlite3"))
+    # No index yet: keyword search is empty and does not create the database.
+    assert indexer.keyword_search("anything") == []
+    assert not (tmp_path / "missing").exists()
@@ -0,0 +1,69 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the date-partitioned encrypted capture layout and its migration.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from capture.catalog import CaptureCatalog
+from capture.layout import artifact_dir, migrate, partition, resolve, resolve_pair
+from capture.service import CaptureService
+from search.indexer import KeywordIndex
+
+CID = "Inbox_Mozilla_Firefox_2025-10-02_09-30-00"
+
+
+def test_partition_and_resolve_without_listing(tmp_path: Path):
+    assert partition(CID) == Path("2025", "10", "02")
+    assert partition("no_timestamp") is None
+    assert artifact_dir(tmp_path, CID, "flat") == tmp_path
+    assert artifact_dir(tmp_path, "no_timestamp") == tmp_path
+
+    (tmp_path / f"{CID}.txt.enc").write_bytes(b"t")  # legacy flat artifact
+    dated = tmp_path / "2025" / "10" / "02"
+    dated.mkdir(parents=True)
+    (dated / f"{CID}.png.enc").write_bytes(b"i")
+    assert resolve_pair(tmp_path, CID) == (dated / f"{CID}.png.enc", tmp_path / f"{CID}.txt.enc")
+    assert resolve(tmp_path, "Other_2025-10-02_09-30-01") is None
+
+
+def test_migrate_moves_files_and_rekeys_references(tmp_path: Path):
+    enc = tmp_path / "encrypted"
+    enc.mkdir()
+    img, txt = enc / f"{CID}.png.enc", enc / f"{CID}.txt.enc"
+    img.write_bytes(b"img")
+    txt.write_bytes(b"text")
+    (enc / "key.fernet").write_bytes(b"k")
+    catalog = CaptureCatalog(enc / "catalog.sqlite3")
+    catalog.import_existing(enc)
+    index = KeywordIndex(tmp_path / "kw.sqlite3")
+    index.add(str(txt), "quarterly report")
+    index.commit()
+
+    assert migrate(enc, dry_run=True).moved == 2 and img.exists()
+    report = migrate(enc, catalog=catalog, keyword_index=index)
+    assert (report.moved, report.captures, report.reindexed, report.failed) == (2, 1, 1, 0)
+    new_txt = enc / "2025" / "10" / "02" / txt.name
+    assert new_txt.read_bytes() == b"text" and not txt.exists()
+    assert (enc / "key.fernet").exists()
+    assert catalog.get(CID).text_path == str(new_txt)
+    assert [p for p, _ in index.search("quarterly")] == [str(new_txt)]
+    assert migrate(enc, catalog=catalog, keyword_index=index).moved == 0
+
+
+def test_service_writes_dated_layout(
+    tmp_path: Path, stub_image_open, stub_capture_region, stub_extract_text, stub_get_active_window
+):
+    enc = tmp_path / "encrypted"
+    service = CaptureService(
+        output_dir=tmp_path / "plain", enc_dir=enc, status_file=tmp_path / "status.json", layout="dated"
+    )
+    service._capture_once()
+    (image,) = enc.rglob("*.png.enc")
+    assert image.parent != enc and image.relative_to(enc).parts[0].isdigit()
+    with pytest.raises(ValueError):
+        CaptureService(output_dir=tmp_path / "plain", enc_dir=enc, layout="hourly")
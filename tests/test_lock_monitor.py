@@ -0,0 +1,150 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the cached screen-lock monitor (stub D-Bus, no session bus).
+"""
+
+from __future__ import annotations
+
+import queue
+import subprocess
+import time
+from pathlib import Path
+
+import capture.service as svc
+from capture.lock_monitor import LOGIND_SESSION, LockMonitor, Signal, session_path
+
+
+class FakeBus:
+    def __init__(self):
+        self.matches = []
+        self.inbox = queue.Queue()
+        self.closed = False
+
+    def add_match(self, **rule):
+        self.matches.append(rule)
+
+    def receive(self, timeout):
+        try:
+            item = self.inbox.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def close(self):
+        self.closed = True
+
+
+class Probe:
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.answers.pop(0) if len(self.answers) > 1 else self.answers[0]
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_session_path_escapes_like_logind():
+    assert session_path("c2") == "/org/freedesktop/login1/session/c2"
+    assert session_path("2") == "/org/freedesktop/login1/session/_32"
+    assert session_path("12-a") == "/org/freedesktop/login1/session/_312_2da"
+
+
+def test_working_probe_is_remembered():
+    loginctl, gnome, kde = Probe(None), Probe(None), Probe(False, True, None, False)
+    monitor = LockMonitor([("loginctl", loginctl), ("gnome", gnome), ("freedesktop", kde)], buses={})
+    assert monitor.locked() is False and monitor.stats()["probe"] == "freedesktop"
+    assert monitor.locked() is False and kde.calls == 1  # served from the cache
+    assert monitor.refresh() is True
+    assert (loginctl.calls, gnome.calls, kde.calls) == (1, 1, 2)
+    # The remembered probe stops answering: the others run again, the state is kept.
+    assert monitor.refresh() is True
+    assert (loginctl.calls, gnome.calls, kde.calls) == (2, 2, 3)
+    assert monitor.stats()["probe"] is None
+    assert monitor.refresh() is False and monitor.stats()["probe"] == "freedesktop"
+
+
+def test_signals_update_cached_state_without_probing():
+    system, session = FakeBus(), FakeBus()
+    probe = Probe(False)
+    heard = []
+    monitor = LockMonitor(
+        [("gnome", probe)], session_id="c2", buses={"system": system, "session": session}, wait=0.05
+    )
+    monitor.add_listener(heard.append)
+    monitor.start()
+    try:
+        assert monitor.subscribed and _wait_for(lambda: monitor.stats()["probe_runs"] == 1)
+        path = session_path("c2")
+        assert {m["member"] for m in system.matches} == {"Lock", "Unlock"}
+        assert all(m["path"] == path for m in system.matches)
+        assert {m["interface"] for m in session.matches} == {"org.freedesktop.ScreenSaver", "org.gnome.ScreenSaver"}
+
+        system.inbox.put(Signal(LOGIND_SESSION, "Lock", session_path("c7")))  # another session
+        system.inbox.put(Signal(LOGIND_SESSION, "Lock", path))
+        assert _wait_for(lambda: monitor.locked())
+        session.inbox.put(Signal("org.gnome.ScreenSaver", "ActiveChanged", "/org/gnome/ScreenSaver", (False,)))
+        assert _wait_for(lambda: not monitor.locked())
+        assert heard == [True, False] and probe.calls == 1
+        assert monitor.stats()["source"] == "screensaver" and monitor.stats()["signals"] == 2
+    finally:
+        monitor.stop()
+    assert system.closed and session.closed
+
+
+def test_signal_during_probe_wins_over_its_answer():
+    monitor = LockMonitor([], session_id="c2", buses={})
+
+    def slow_probe():
+        monitor._handle(Signal(LOGIND_SESSION, "Lock", session_path("c2")))  # lands mid-probe
+        return False
+
+    monitor._probes = [("gnome", slow_probe)]
+    assert monitor.refresh() is True
+    assert monitor.stats()["source"] == "logind" and monitor.stats()["probe_runs"] == 1
+
+
+def test_lost_bus_falls_back_to_polling():
+    bus = FakeBus()
+    probe = Probe(False, True)
+    monitor = LockMonitor([("gnome", probe)], buses={"session": bus}, poll_interval=0.1, wait=0.05)
+    monitor.start()
+    try:
+        assert _wait_for(lambda: probe.calls == 1) and monitor.subscribed
+        bus.inbox.put(ConnectionResetError("bus went away"))
+        assert _wait_for(lambda: not monitor.subscribed)
+        assert _wait_for(lambda: monitor.locked())  # picked up by the poll
+        assert probe.calls >= 2
+    finally:
+        monitor.stop()
+
+
+def test_service_reads_cached_lock_state(tmp_path: Path, monkeypatch):
+    monkeypatch.delenv("HINDSIGHT_SCREEN_LOCKED", raising=False)
+    monkeypatch.delenv("XDG_SESSION_ID", raising=False)
+    service = svc.CaptureService(
+        output_dir=tmp_path / "plain", enc_dir=tmp_path / "encrypted", lock_monitor=True
+    )
+    forks = []
+
+    def fake_check_output(cmd, timeout=1, **kwargs):
+        forks.append(cmd[0])
+        if cmd[0] != "dbus-send":
+            raise FileNotFoundError(cmd[0])
+        return b"method return\n   boolean true\n"
+
+    monkeypatch.setattr(subprocess, "check_output", fake_check_output)
+    for _ in range(5):
+        assert service._is_screen_locked() is True
+    # One probe sequence for five cycles: only dbus-send is installed.
+    assert forks == ["gdbus", "qdbus", "dbus-send"]
+    assert service._lock_monitor.stats()["probe"] == "freedesktop"
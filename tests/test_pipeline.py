@@ -0,0 +1,108 @@
+"""Tests for the bounded capture pipeline stages and pipelined CaptureService."""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import capture.service as svc
+from capture.pipeline import Stage, StageQueue
+
+
+def test_drop_oldest_policy_discards_head():
+    dropped = []
+    q = StageQueue(maxsize=2, policy="drop_oldest", on_drop=dropped.append)
+    for item in (1, 2, 3):
+        assert q.put(item) is True
+    assert dropped == [1]
+    assert q.drain() == [2, 3]
+    assert q.dropped == 1
+
+
+def test_coalesce_policy_replaces_same_key():
+    dropped = []
+    q = StageQueue(maxsize=4, policy="coalesce", key_fn=lambda x: x[0], on_drop=dropped.append)
+    q.put(("editor", 1))
+    q.put(("browser", 1))
+    q.put(("editor", 2))
+    assert q.drain() == [("editor", 2), ("browser", 1)]
+    assert dropped == [("editor", 1)]
+    assert q.coalesced == 1
+
+
+def test_block_policy_times_out_and_rejects():
+    dropped = []
+    q = StageQueue(maxsize=1, policy="block", on_drop=dropped.append)
+    assert q.put("a") is True
+    assert q.put("b", timeout=0.05) is False
+    assert dropped == ["b"]
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        StageQueue(policy="nope")
+
+
+def test_stage_processes_and_reports_metrics():
+    seen = []
+    done = threading.Event()
+
+    def handler(item):
+        seen.append(item)
+        if len(seen) == 3:
+            done.set()
+
+    stage = Stage("t", handler, workers=2, maxsize=8)
+    stage.start()
+    for i in range(3):
+        stage.submit(i)
+    assert done.wait(2.0)
+    stage.stop(timeout=2.0)
+    m = stage.metrics()
+    assert sorted(seen) == [0, 1, 2]
+    assert m["processed"] == 3 and m["depth"] == 0 and m["workers"] == 2
+
+
+def test_pipelined_grab_not_blocked_by_slow_ocr(tmp_path: Path, monkeypatch, stub_image_open, stub_get_active_window):
+    counter = {"n": 0}
+
+    def fake_capture(bbox, output_path):
+        counter["n"] += 1
+        Path(output_path).write_bytes(b"FRAME-%d" % counter["n"])
+
+    release = threading.Event()
+
+    def slow_ocr(path, **_kw):
+        release.wait(2.0)
+        return "text"
+
+    monkeypatch.setattr(svc, "capture_region", fake_capture)
+    monkeypatch.setattr(svc, "extract_text", slow_ocr)
+    # Distinct filenames per grab (real names only have second resolution).
+    monkeypatch.setattr(svc, "generate_filename", lambda title, **_: f"{title}_{counter['n']}.png")
+    service = svc.CaptureService(
+        output_dir=tmp_path / "plain",
+        enc_dir=tmp_path / "encrypted",
+        status_file=tmp_path / "status.json",
+        pipeline=True,
+        queue_size=1,
+        backpressure="drop_oldest",
+    )
+    service._ocr_stage.start()
+    service._encrypt_stage.start()
+    started = time.monotonic()
+    for _ in range(4):
+        service._capture_once()
+    # Grabs returned immediately even though OCR is stalled.
+    assert time.monotonic() - started < 1.0
+    release.set()
+    service._ocr_stage.stop(timeout=3.0)
+    service._encrypt_stage.stop(timeout=3.0)
+    metrics = service.pipeline_metrics()
+    assert metrics["ocr"]["dropped"] >= 1
+    # Dropped jobs had their plaintext removed; encrypted jobs were cleaned up too.
+    assert list((tmp_path / "plain").iterdir()) == []
+    assert service.get_status()["pipeline"]["ocr"]["capacity"] == 1
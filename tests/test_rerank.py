@@ -0,0 +1,86 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the cross-encoder reranking stage (fake scorer, no model download).
+"""
+
+from __future__ import annotations
+
+import time
+
+from search import hybrid
+from search.rerank import CrossEncoderReranker, ScoreCache, query_hash, rerank
+
+TEXTS = {"a": "alpha", "b": "beta beta", "c": "gamma gamma gamma", "d": "delta", "e": None}
+
+
+def length_scorer(calls):
+    def _score(query, texts):
+        calls.append(list(texts))
+        return [float(len(t)) for t in texts]
+
+    return _score
+
+
+def test_rerank_batches_caps_and_caches():
+    calls = []
+    reranker = CrossEncoderReranker(batch_size=2, max_candidates=4, budget_ms=None, scorer=length_scorer(calls))
+    ids = ["a", "b", "c", "e", "d"]
+    out = reranker.rerank("Query", ids, TEXTS.get)
+    # "e" has no text and "d" is beyond the cap: both keep fusion order after the scored ones.
+    assert [ids[i] for i in out.order] == ["c", "b", "a", "e", "d"]
+    assert calls == [["alpha", "beta beta"], ["gamma gamma gamma"]]
+    assert out.scored == 3 and not out.partial and out.scores[4] is None
+
+    again = reranker.rerank("  query ", ids, TEXTS.get)
+    assert again.order == out.order and again.cached == 3 and again.scored == 0
+    assert len(calls) == 2  # no new model calls
+    assert reranker.stats()["cache_hits"] == 3
+
+
+def test_rerank_budget_returns_partial_order():
+    def slow(query, texts):
+        time.sleep(0.05)
+        return [float(len(t)) for t in texts]
+
+    reranker = CrossEncoderReranker(batch_size=1, budget_ms=10, scorer=slow)
+    ids = ["a", "b", "c"]
+    out = reranker.rerank("q", ids, TEXTS.get)
+    assert out.partial and out.scored == 1
+    assert out.order == [0, 1, 2]
+
+
+def test_rerank_unavailable_model_keeps_order():
+    def broken(query, texts):
+        raise RuntimeError("transformers not installed")
+
+    reranker = CrossEncoderReranker(scorer=broken)
+    out = reranker.rerank("q", ["b", "a"], TEXTS.get)
+    assert out.order == [0, 1] and out.partial
+    assert rerank("q", ["x", "y"]) in ([0, 1], [1, 0])
+
+
+def test_score_cache_lru():
+    cache = ScoreCache(max_entries=2)
+    cache.put("q", "a", 1.0)
+    cache.put("q", "b", 2.0)
+    assert cache.get("q", "a") == 1.0
+    cache.put("q", "c", 3.0)
+    assert cache.get("q", "b") is None and len(cache) == 2
+    assert query_hash("A  b") == query_hash("a b")
+
+
+def test_hybrid_search_reranks_with_text_loader(monkeypatch):
+    from pathlib import Path
+
+    monkeypatch.setattr(
+        hybrid.indexer, "keyword_search_scored", lambda q, limit, filters=None: [(Path("a"), 3.0), (Path("b"), 2.0), (Path("c"), 1.0)]
+    )
+    monkeypatch.setattr(hybrid.vector_store, "default_store", lambda: None)
+    reranker = CrossEncoderReranker(budget_ms=None, scorer=length_scorer([]))
+
+    plain = hybrid.hybrid_search("q", limit=2, use_cache=False)
+    assert [r.doc_id for r in plain] == ["a", "b"] and not plain[0].reranked
+
+    results = hybrid.hybrid_search("q", limit=2, text_loader=TEXTS.get, reranker=reranker, use_cache=False)
+    assert [r.doc_id for r in results] == ["c", "b"]
+    assert results[0].reranked and results[0].score == float(len("gamma gamma gamma"))
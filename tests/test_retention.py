@@ -0,0 +1,120 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the retention engine.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from capture.catalog import CaptureCatalog, CatalogEntry
+from capture.encryption import decrypt_file, encrypt_bytes, generate_key
+from capture.retention import RetentionEngine, configured_retention_days
+from search.indexer import KeywordIndex
+
+NOW = datetime(2025, 10, 31, 12, 0).timestamp()
+
+
+def _capture(enc: Path, key: bytes, day: int, text: str, dated: bool = False) -> Path:
+    cid = f"Editor_2025-10-{day:02d}_09-00-00"
+    directory = enc / "2025" / "10" / f"{day:02d}" if dated else enc
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{cid}.png.enc").write_bytes(encrypt_bytes(b"png", key))
+    txt = directory / f"{cid}.txt.enc"
+    txt.write_bytes(encrypt_bytes(text.encode(), key))
+    return txt
+
+
+def test_retention_days_from_env_and_config(tmp_path: Path, monkeypatch):
+    config = tmp_path / "default.yaml"
+    config.write_text("capture_interval: 5  # seconds\nretention_days: 30\n", encoding="utf-8")
+    monkeypatch.delenv("HINDSIGHT_RETENTION_DAYS", raising=False)
+    assert configured_retention_days(config) == 30
+    assert configured_retention_days(tmp_path / "missing.yaml") == 0
+    monkeypatch.setenv("HINDSIGHT_RETENTION_DAYS", "7")
+    assert configured_retention_days(config) == 7
+
+
+def test_catalog_retention_purges_files_indexes_and_rows(tmp_path: Path):
+    enc = tmp_path / "encrypted"
+    key = generate_key()
+    catalog = CaptureCatalog(enc / "catalog.sqlite3")
+    index = KeywordIndex(tmp_path / "kw.sqlite3")
+    texts = {}
+    for day in (1, 2, 3, 30):
+        txt = _capture(enc, key, day, f"note{day} shared")
+        texts[day] = txt
+        index.add(str(txt), f"note{day} shared")
+    index.commit()
+    catalog.import_existing(enc)
+    sleeps = []
+    engine = RetentionEngine(
+        enc, 7, catalog=catalog, keyword_index=index, key=key, decrypt=decrypt_file,
+        batch_size=2, max_deletes_per_sec=1000.0, clock=lambda: NOW, sleep=sleeps.append,
+    )
+    assert [e.capture_id for e in engine.expired()] == [f"Editor_2025-10-{d:02d}_09-00-00" for d in (1, 2, 3)]
+
+    report = engine.run()
+    assert (report.deleted, report.keyword_docs, report.batches, report.more) == (3, 3, 2, False)
+    assert report.reclaimed_bytes > 0 and len(sleeps) == 1
+    assert sorted(p.name for p in enc.glob("*.enc")) == [texts[30].name.replace(".txt", ".png"), texts[30].name]
+    assert catalog.count() == 1
+    assert [p for p, _ in index.search("shared")] == [str(texts[30])]
+    assert index.search("note1") == []  # terms purged, not just the doc row
+    assert engine.stats()["deleted"] == 3 and engine.run().deleted == 0
+
+
+def test_failed_delete_keeps_capture_searchable(tmp_path: Path, monkeypatch):
+    enc = tmp_path / "encrypted"
+    key = generate_key()
+    catalog = CaptureCatalog(enc / "catalog.sqlite3")
+    index = KeywordIndex(tmp_path / "kw.sqlite3")
+    stuck = _capture(enc, key, 1, "stuck note")
+    gone = _capture(enc, key, 2, "gone note")
+    for txt, text in ((stuck, "stuck note"), (gone, "gone note")):
+        index.add(str(txt), text)
+    index.commit()
+    catalog.import_existing(enc)
+    real_unlink = Path.unlink
+
+    def unlink(self, *args, **kwargs):
+        if self == stuck:
+            raise PermissionError("read-only")
+        return real_unlink(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "unlink", unlink)
+    engine = RetentionEngine(enc, 7, catalog=catalog, keyword_index=index, key=key, decrypt=decrypt_file,
+                             clock=lambda: NOW, max_deletes_per_sec=None)
+    report = engine.run_batch()
+    assert (report.deleted, report.failed, report.keyword_docs) == (1, 1, 1)
+    # The capture still on disk stays in the catalog and in search.
+    assert stuck.exists() and catalog.count() == 1
+    assert [p for p, _ in index.search("note")] == [str(stuck)]
+
+
+def test_partition_retention_without_catalog(tmp_path: Path):
+    enc = tmp_path / "encrypted"
+    key = generate_key()
+    _capture(enc, key, 1, "old", dated=True)
+    _capture(enc, key, 2, "old flat")
+    keep = _capture(enc, key, 29, "recent", dated=True)
+    engine = RetentionEngine(enc, 7, clock=lambda: NOW, max_deletes_per_sec=None)
+    assert engine.run().deleted == 2
+    assert sorted(p.name for p in enc.rglob("*.enc")) == sorted([keep.name, keep.name.replace(".txt", ".png")])
+    assert not (enc / "2025" / "10" / "01").exists()  # emptied partitions are pruned
+
+
+def test_vector_store_remove_drops_vectors_and_empty_shards(tmp_path: Path):
+    pytest.importorskip("faiss")
+    from search.vector_store import VectorStore
+
+    store = VectorStore(tmp_path / "vectors", dim=2, flush_every=1)
+    store.add_many([("a.txt.enc", 0, [1.0, 0.0], NOW - 40 * 86400), ("b.txt.enc", 0, [0.9, 0.1], NOW)])
+    old_shard = store.shards()[0]
+    assert store.remove(["a.txt.enc"]) == 1
+    assert [c for c, _ in store.search([1.0, 0.0], k=2)] == ["b.txt.enc"]
+    assert old_shard not in store.shards() and not (tmp_path / "vectors" / old_shard).exists()
+    store.close()
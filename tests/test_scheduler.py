@@ -0,0 +1,109 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the adaptive capture scheduler.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import capture.service as svc
+from capture.scheduler import AdaptiveScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_idle_back_off_is_exponential_and_capped():
+    sched = AdaptiveScheduler(2.0, max_interval=10.0, clock=Clock())
+    for expected in (4.0, 8.0, 10.0, 10.0):
+        sched.record(False)
+        assert sched.current_interval == expected
+    sched.record(True)
+    assert sched.current_interval == 2.0
+    sched.record(False)
+    sched.trigger("focus")  # activity resets the back-off too
+    assert sched.current_interval == 2.0 and sched.stats()["idle_streak"] == 0
+
+
+def test_events_fire_after_settle_and_are_rate_limited():
+    clock = Clock()
+    sched = AdaptiveScheduler(30.0, settle=0.5, burst=2, refill=10.0, clock=clock)
+    assert sched.wait() == "timer"  # first capture is immediate
+    for reason in ("focus", "title"):
+        sched.trigger(reason)
+        assert sched._next(clock.now) == (clock.now + 0.5, reason)
+        clock.now += 0.5
+        assert sched.wait() == reason
+    sched.trigger("focus")
+    sched.trigger("title")  # coalesced into the pending capture
+    # Bucket nearly empty (0.05 tokens earned back since the last capture): wait 9.5 s.
+    due, reason = sched._next(clock.now)
+    assert reason == "title" and due == pytest.approx(clock.now + 9.5)
+    clock.now = due
+    assert sched.wait() == "title"
+    stats = sched.stats()
+    assert stats["triggered"] == 3 and stats["coalesced"] == 1 and stats["rate_limited"] == 1
+
+
+def test_timer_tick_absorbs_rate_limited_event():
+    clock = Clock()
+    sched = AdaptiveScheduler(1.0, settle=0.0, burst=1, refill=100.0, clock=clock)
+    assert sched.wait() == "timer"
+    sched.trigger("focus")
+    assert sched.wait() == "focus"
+    sched.trigger("title")
+    due, reason = sched._next(clock.now)
+    assert (due, reason) == (clock.now + 1.0, "timer")
+    clock.now = due
+    assert sched.wait() == "timer"
+    assert sched._next(clock.now) == (clock.now + 1.0, "timer")  # nothing left pending
+
+
+def test_wait_wakes_on_trigger_and_interrupt():
+    sched = AdaptiveScheduler(60.0, settle=0.0)
+    assert sched.wait() == "timer"
+    threading.Timer(0.05, sched.trigger, args=("focus",)).start()
+    started = time.monotonic()
+    assert sched.wait() == "focus"
+    threading.Timer(0.05, sched.interrupt).start()
+    assert sched.wait() is None
+    assert time.monotonic() - started < 2.0
+
+
+def test_service_captures_on_window_event(tmp_path: Path, monkeypatch):
+    listeners = []
+    calls = []
+    monkeypatch.setattr(svc, "watch_window_changes", lambda cb: listeners.append(cb) or True)
+    monkeypatch.setattr(svc, "unwatch_window_changes", lambda cb: listeners.remove(cb))
+    service = svc.CaptureService(
+        output_dir=tmp_path / "plain",
+        enc_dir=tmp_path / "encrypted",
+        status_file=tmp_path / "status.json",
+        interval=30.0,
+        adaptive=True,
+    )
+    monkeypatch.setattr(service, "_is_screen_locked", lambda: False)
+    monkeypatch.setattr(service, "_capture_once", lambda: calls.append(time.monotonic()) or False)
+    monkeypatch.setattr(svc.CaptureService, "_warm_ocr", staticmethod(lambda: None))
+    service.start()
+    deadline = time.monotonic() + 2.0
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    (trigger,) = listeners
+    trigger("focus", None)
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    service.stop(timeout=2.0)
+    assert len(calls) == 2 and calls[1] - calls[0] < 2.0  # not 30 s later
+    assert not listeners and not service._thread.is_alive()
+    assert service._scheduler.stats()["triggered"] == 1
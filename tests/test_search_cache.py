@@ -0,0 +1,67 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the query embedding and search result caches.
+"""
+
+from __future__ import annotations
+
+from search import cache, hybrid
+from search.indexer import KeywordIndex
+
+
+def test_ttl_cache_expiry_and_lru():
+    now = [0.0]
+    c = cache.TTLCache(max_entries=2, ttl=10, clock=lambda: now[0])
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1
+    c.put("c", 3)  # evicts "b", the least recently used
+    assert c.get("b") is None and c.evictions == 1
+    now[0] = 11
+    assert c.get("a") is None
+    assert c.stats()["hits"] == 1 and c.stats()["misses"] == 2
+
+
+def test_embed_query_cached_per_model_version(monkeypatch):
+    calls = []
+
+    def embed(texts, backend=None):
+        calls.append(texts)
+        return cache.semantic.EmbeddingResult(vectors=[[0.1, 0.2]], dim=2)
+
+    monkeypatch.setattr(cache.semantic, "embed_texts", embed)
+    monkeypatch.setattr(cache, "EMBEDDINGS", cache.TTLCache(8))
+    monkeypatch.delenv("HINDSIGHT_INFERENCE_BACKEND", raising=False)
+    cache.embed_query("Hello  World")
+    cache.embed_query("hello world")
+    assert len(calls) == 1
+    monkeypatch.setenv("HINDSIGHT_INFERENCE_BACKEND", "int8")
+    cache.embed_query("hello world")
+    assert len(calls) == 2
+
+
+def test_result_cache_invalidated_by_index_generation(monkeypatch, tmp_path):
+    index = KeywordIndex(tmp_path / "kw.sqlite3")
+    monkeypatch.setattr(cache, "index_generation", lambda: (index.generation, 0))
+    monkeypatch.setattr(cache, "RESULTS", cache.TTLCache(8))
+    calls = []
+
+    def keyword_leg(query, k, filters=None):
+        calls.append(query)
+        return index.search(query, limit=k)
+
+    monkeypatch.setitem(hybrid.LEGS, "keyword", keyword_leg)
+    monkeypatch.setitem(hybrid.LEGS, "semantic", lambda q, k, f=None: [])
+
+    index.add("doc-1", "quarterly report", mtime=1.0)
+    index.commit()
+    first = hybrid.hybrid_search("report")
+    first[0].score = -1.0  # callers get copies
+    again = hybrid.hybrid_search("Report ")
+    assert len(calls) == 1 and [r.doc_id for r in again] == ["doc-1"] and again[0].score > 0
+
+    index.add("doc-2", "annual report", mtime=2.0)
+    index.commit()
+    assert len(hybrid.hybrid_search("report")) == 2 and len(calls) == 2
+    assert cache.RESULTS.stats()["hits"] == 1
+    index.close()
@@ -0,0 +1,63 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for search filters pushed down into the keyword index and vector store.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from search.filters import SearchFilters, make_filters, metadata_from_filename, title_key
+from search.indexer import KeywordIndex
+
+
+def test_filter_rendering_and_filename_metadata(non_utc_host):
+    assert make_filters() is None
+    where, params = SearchFilters(start=1.0, window_title="Mozilla  Firefox!", backends=("mss",)).where(prefix="d.")
+    assert where == "d.ts >= ? AND d.title_key LIKE ? AND d.backend IN (?)"
+    assert params == [1.0, "%mozilla firefox%", "mss"]
+    assert title_key("Docs — Mozilla_Firefox") == "docs mozilla firefox"
+    meta = metadata_from_filename(Path("enc/Inbox_Mozilla_Firefox_2025-10-02_09-30-00.txt.enc"))
+    assert meta["title"] == "Inbox Mozilla Firefox"
+    assert meta["ts"] == datetime(2025, 10, 2, 9, 30, tzinfo=timezone.utc).timestamp()
+
+
+def test_keyword_search_applies_filters_before_limit(tmp_path: Path):
+    idx = KeywordIndex(tmp_path / "kw.sqlite3")
+    for i in range(5):
+        idx.add(f"term{i}.txt.enc", "report report report", mtime=100.0 + i, meta={"title": "Terminal", "backend": "mss"})
+    idx.add("Budget_Mozilla_Firefox_2025-10-02_09-30-00.txt.enc", "report", mtime=50.0)
+    idx.add("calc.txt.enc", "report", mtime=200.0, meta={"title": "Budget - LibreOffice Calc", "backend": "imagegrab"})
+    idx.commit()
+
+    firefox = idx.search("report", limit=1, filters=SearchFilters(window_title="firefox"))
+    assert [p for p, _ in firefox] == ["Budget_Mozilla_Firefox_2025-10-02_09-30-00.txt.enc"]
+    assert [p for p, _ in idx.search("report", filters=SearchFilters(backends=("imagegrab",)))] == ["calc.txt.enc"]
+    window = idx.search("report", filters=SearchFilters(start=101.0, end=102.0))
+    assert sorted(p for p, _ in window) == ["term1.txt.enc", "term2.txt.enc"]
+    assert idx.search("report", filters=SearchFilters(window_title="%")) == idx.search("report")
+    idx.close()
+
+
+def test_vector_search_uses_id_selector(tmp_path: Path):
+    pytest.importorskip("faiss")
+    from search.vector_store import VectorStore
+
+    store = VectorStore(tmp_path / "vectors", dim=2, flush_every=2)
+    store.add_many(
+        [
+            ("code.txt.enc", 0, [1.0, 0.0], 1000.0),
+            ("mail.txt.enc", 0, [0.9, 0.1], 2000.0),
+            ("docs.txt.enc", 0, [0.0, 1.0], 3000.0),
+        ],
+        meta={"code.txt.enc": {"title": "main.py - VS Code"}, "mail.txt.enc": {"title": "Inbox - Mozilla Firefox"}},
+    )
+    query = [1.0, 0.0]
+    assert store.search(query, k=1, filters=SearchFilters(window_title="firefox"))[0][0] == "mail.txt.enc"
+    # Even with k=1 the best match inside the time window is found (no post-filtering loss).
+    assert store.search(query, k=1, filters=SearchFilters(start=2500.0)) == [("docs.txt.enc", pytest.approx(0.0, abs=1e-6))]
+    assert store.search(query, k=3, filters=SearchFilters(window_title="terminal")) == []
+    store.close()
@@ -0,0 +1,102 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for encrypted segment (pack-file) storage.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+from capture.encryption import generate_key
+from capture.segments import SegmentStore, read_artifact
+from capture.service import CaptureService
+
+
+def test_append_read_seal_and_random_access(tmp_path: Path):
+    key = generate_key()
+    now = [1000.0]
+    store = SegmentStore(tmp_path / "segments", key=key, max_bytes=300, max_age=60, clock=lambda: now[0])
+    for i in range(6):
+        store.append(f"c{i}.txt.enc", f"text {i}".encode() * 10)
+    stats = store.stats()
+    assert stats["records"] == 6 and stats["segments"] > 1 and stats["sealed"] == stats["segments"] - 1
+    assert store.read("c4.txt.enc") == b"text 4" * 10
+    with pytest.raises(KeyError):
+        store.read("missing.txt.enc")
+    # Records are bound to their name: a different key or a swapped index row fails authentication.
+    with pytest.raises(InvalidTag):
+        store.read("c1.txt.enc", key=generate_key())
+    store._db.execute("UPDATE records SET name = 'swapped' WHERE name = 'c1.txt.enc'")
+    with pytest.raises(InvalidTag):
+        store.read("swapped")
+    now[0] += 120  # the time boundary seals the active segment too
+    store.append("late.txt.enc", b"late")
+    assert store.stats()["sealed"] == store.stats()["segments"] - 1
+
+
+def test_delete_and_compact_keep_live_records(tmp_path: Path):
+    key = generate_key()
+    store = SegmentStore(tmp_path / "segments", key=key, max_bytes=10_000)
+    for i in range(10):
+        store.append(f"c{i}.png.enc", bytes([i]) * 100)
+    store.seal()
+    assert store.delete([f"c{i}.png.enc" for i in range(7)]) > 0
+    before = sum(p.stat().st_size for p in (tmp_path / "segments").glob("seg-*.hrs"))
+    report = store.compact()
+    after = sum(p.stat().st_size for p in (tmp_path / "segments").glob("seg-*.hrs"))
+    assert report.rewritten == 1 and after < before
+    assert [store.read(f"c{i}.png.enc") for i in (7, 8, 9)] == [bytes([i]) * 100 for i in (7, 8, 9)]
+    store.delete(["c7.png.enc", "c8.png.enc", "c9.png.enc"])
+    assert store.compact().dropped == 1 and not list((tmp_path / "segments").glob("seg-*.hrs"))
+
+
+def test_torn_append_is_cut_back_on_open(tmp_path: Path):
+    key = generate_key()
+    store = SegmentStore(tmp_path / "segments", key=key)
+    store.append("a.txt.enc", b"alpha")
+    store.close()
+    (segment,) = (tmp_path / "segments").glob("seg-*.hrs")
+    committed = segment.stat().st_size
+    with open(segment, "ab") as fh:
+        fh.write(b"\x00" * 7)  # crash mid-append: bytes without an index row
+    store = SegmentStore(tmp_path / "segments", key=key)
+    assert segment.stat().st_size == committed
+    store.append("b.txt.enc", b"beta")
+    assert store.read("a.txt.enc") == b"alpha" and store.read("b.txt.enc") == b"beta"
+
+
+def test_service_segment_mode_writes_no_per_capture_files(
+    tmp_path: Path, stub_image_open, stub_capture_region, stub_extract_text, stub_get_active_window
+):
+    enc = tmp_path / "encrypted"
+    service = CaptureService(
+        output_dir=tmp_path / "plain",
+        enc_dir=enc,
+        status_file=tmp_path / "status.json",
+        segments=True,
+        catalog=enc / "catalog.sqlite3",
+    )
+    service._capture_once()
+    assert not list(enc.rglob("*.enc"))
+    (entry,) = service._catalog.query()
+    assert entry.text_bytes > 0
+    assert read_artifact(Path(entry.text_path), service._key).decode()
+    assert read_artifact(Path(entry.image_path), service._key)
+
+
+def test_retention_deletes_segment_records_and_compacts(tmp_path: Path):
+    from capture.retention import RetentionEngine
+
+    key = generate_key()
+    store = SegmentStore(tmp_path / "segments", key=key)
+    store.append_many([("Old_2025-01-01_00-00-00.png.enc", b"i" * 50), ("Old_2025-01-01_00-00-00.txt.enc", b"t")], ts=10.0)
+    store.append("New_2025-03-01_00-00-00.png.enc", b"n", ts=5_000_000.0)
+    store.seal()
+    engine = RetentionEngine(tmp_path, 1, segments=store, clock=lambda: 5_000_000.0, max_deletes_per_sec=None)
+    report = engine.run()
+    assert report.deleted == 1 and report.reclaimed_bytes > 50
+    assert [name for name, _ in store.names()] == ["New_2025-03-01_00-00-00.png.enc"]
+    assert store.stats()["dead_bytes"] == 0  # compacted after the pass
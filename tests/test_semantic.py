@@ -29,4 +29,101 @@ def test_build_faiss_index_success():
         index = build_faiss_index(er)
     except RuntimeError:
         pytest.skip("faiss or numpy not installed")
-    assert index.ntotal == 2
\ No newline at end of file
+    assert index.ntotal == 2
+
+def test_model_registry_loads_once_and_unloads():
+    from search.semantic import ModelRegistry
+
+    loaded = []
+
+    def loader(name):
+        loaded.append(name)
+        return object(), object()
+
+    registry = ModelRegistry(loader=loader)
+    first = registry.get("m")
+    assert registry.get("m") is first
+    assert loaded == ["m"] and registry.loaded() == ["m"]
+    assert registry.unload_idle(3600) == 0
+    assert registry.unload() == 1 and registry.loaded() == []
+    registry.get("m")
+    assert registry.loads == 2
+    assert registry.unload_idle(-1) == 1
+
+
+def test_configure_torch_threads(monkeypatch):
+    import search.semantic as semantic
+
+    calls = {}
+
+    class FakeTorch:
+        @staticmethod
+        def set_num_threads(n):
+            calls["intra"] = n
+
+        @staticmethod
+        def set_num_interop_threads(n):
+            raise RuntimeError("already started")
+
+    monkeypatch.setattr(semantic, "torch", FakeTorch)
+    monkeypatch.setenv("HINDSIGHT_TORCH_THREADS", "3")
+    assert semantic.configure_torch_threads() == 3 and calls["intra"] == 3
+    monkeypatch.setattr(semantic, "torch", None)
+    assert semantic.configure_torch_threads(2) is None
+
+
+def test_inference_backend_selection(monkeypatch):
+    from search.semantic import ModelRegistry, inference_backend
+
+    monkeypatch.delenv("HINDSIGHT_INFERENCE_BACKEND", raising=False)
+    assert inference_backend() == "fp32"
+    monkeypatch.setenv("HINDSIGHT_INFERENCE_BACKEND", "INT8")
+    assert inference_backend() == "int8"
+    assert inference_backend("onnx") == "fp32"
+
+    quantized = []
+    registry = ModelRegistry(loader=lambda name: ("tok", "model"), quantizer=lambda m: quantized.append(m) or "q")
+    assert registry.get("m") == ("tok", "q")
+    assert registry.get("m", backend="fp32") == ("tok", "model")
+    assert quantized == ["model"] and registry.loaded() == ["m", "m@int8"]
+    assert registry.unload("m") == 2
+
+
+def test_cosine_drift_and_measure_backend():
+    np = pytest.importorskip("numpy")
+    from search.inference_bench import cosine_drift, measure_backend
+
+    ref = np.array([[1.0, 0.0], [0.0, 2.0]])
+    drift = cosine_drift(ref, ref * 3)
+    assert drift["max_drift"] == pytest.approx(0.0, abs=1e-12)
+    drift = cosine_drift(ref, np.array([[1.0, 1.0], [0.0, 1.0]]))
+    assert drift["min_cosine"] == pytest.approx(2 ** -0.5)
+    with pytest.raises(ValueError):
+        cosine_drift(ref, ref[:1])
+
+    calls = []
+
+    def embed(texts, backend=None):
+        calls.append(backend)
+        return EmbeddingResult(vectors=[[1.0, 0.0] for _ in texts], dim=2)
+
+    result, vectors = measure_backend("int8", ["a", "b"], repeats=3, embed=embed)
+    assert calls == ["int8"] * 4 and vectors == [[1.0, 0.0], [1.0, 0.0]]
+    assert result.texts == 2 and result.p99_ms >= result.p50_ms >= 0
+
+
+def test_int8_parity_with_fp32():
+    """Quantized embeddings stay close to fp32 (downloads the model; skipped offline)."""
+    import search.semantic as semantic
+
+    if semantic.torch is None or semantic.AutoModel is None:
+        pytest.skip("torch/transformers not installed")
+    from search.inference_bench import DEFAULT_MAX_DRIFT, cosine_drift, sample_texts
+
+    texts = sample_texts(8)
+    try:
+        fp32 = semantic.embed_texts(texts, backend="fp32").vectors
+    except OSError:
+        pytest.skip("model not available")
+    int8 = semantic.embed_texts(texts, backend="int8").vectors
+    assert cosine_drift(fp32, int8)["mean_drift"] <= DEFAULT_MAX_DRIFT
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import io
 import os
 from pathlib import Path
 import hashlib
@@ -47,3 +48,124 @@ def test_capture_duplicate_detection(tmp_path: Path, stub_image_open, stub_extra
     svc._capture_once()
     second_status = svc.get_status()
     assert second_status.get('duplicate') is True
+
+
+def test_capture_once_in_memory_writes_no_plaintext(tmp_path: Path, monkeypatch, stub_get_active_window):
+    import capture.service as _svc
+    from capture.codecs import sniff
+    from capture.encryption import decrypt_file
+    from capture.frame import Frame
+    from PIL import Image
+
+    calls = []
+
+    def fake_grab(bbox):
+        calls.append(bbox)
+        return Frame(bytearray(b"\x30\x20\x10\xff" * 4), (2, 2))  # BGRA, fresh buffer per grab like mss
+
+    monkeypatch.setattr(_svc, 'grab_frame', fake_grab)
+    monkeypatch.setattr(_svc, 'capture_region', lambda *a: (_ for _ in ()).throw(AssertionError("encoded on grab")))
+    monkeypatch.setattr(_svc, 'extract_text', lambda src: "ocr:%dx%d" % src.size)
+    plain = tmp_path / "plain"
+    enc = tmp_path / "encrypted"
+    svc = CaptureService(output_dir=plain, enc_dir=enc, status_file=tmp_path / "status.json", in_memory=True)
+    svc._capture_once()
+
+    assert calls == [(0, 0, 10, 10)]
+    assert list(plain.iterdir()) == []
+    status = svc.get_status()
+    assert status.get('duplicate') is False
+    image = decrypt_file(enc / status['encrypted_image'], svc._key)
+    assert sniff(image) == "png"
+    assert Image.open(io.BytesIO(image)).getpixel((1, 1)) == (0x10, 0x20, 0x30)
+    assert decrypt_file(enc / status['encrypted_text'], svc._key) == b"ocr:2x2"
+    # Same pixels again are detected as a duplicate without touching disk.
+    svc._capture_once()
+    assert svc.get_status().get('duplicate') is True
+
+
+def test_service_adds_ocr_text_to_keyword_index(tmp_path: Path, stub_capture_region, stub_image_open, stub_get_active_window, monkeypatch):
+    import capture.service as _svc
+    from search.indexer import KeywordIndex
+
+    monkeypatch.setattr(_svc, "extract_text", lambda p: "invoice from acme corp")
+    service = CaptureService(
+        output_dir=tmp_path / "plain",
+        enc_dir=tmp_path / "encrypted",
+        status_file=tmp_path / "status.json",
+        keyword_index=tmp_path / "index" / "keyword.sqlite3",
+    )
+    service._capture_once()
+    service.stop()
+    hits = KeywordIndex(tmp_path / "index" / "keyword.sqlite3").search("acme")
+    assert len(hits) == 1 and hits[0][0].endswith(".txt.enc")
+
+
+def test_quiet_capture_loop_commits_keyword_batch(
+    tmp_path: Path, stub_capture_region, stub_image_open, stub_get_active_window, monkeypatch
+):
+    import sqlite3
+    import capture.service as _svc
+
+    monkeypatch.setattr(_svc, "extract_text", lambda p: "invoice from acme corp")
+    db = tmp_path / "index" / "keyword.sqlite3"
+    service = CaptureService(
+        output_dir=tmp_path / "plain",
+        enc_dir=tmp_path / "encrypted",
+        status_file=tmp_path / "status.json",
+        keyword_index=db,
+    )
+    service._capture_once()
+    reader = sqlite3.connect(str(db))
+    assert reader.execute("SELECT COUNT(*) FROM docs").fetchone()[0] == 0  # batch still open
+    service._on_lock_change(True)  # the lock monitor reports a lock
+    assert reader.execute("SELECT COUNT(*) FROM docs").fetchone()[0] == 1
+    # Still locked: no capture, but the loop commits the next batch once it is due.
+    service._keyword_index.add("later.txt.enc", "late ocr text")
+    monkeypatch.setenv("HINDSIGHT_SCREEN_LOCKED", "1")
+    service._keyword_index.max_delay = 0.0
+    assert service._cycle() is False
+    assert reader.execute("SELECT COUNT(*) FROM docs").fetchone()[0] == 2
+    reader.close()
+    service.stop()
+
+
+def test_interleaved_windows_in_one_second_keep_distinct_captures(
+    tmp_path: Path, monkeypatch, stub_image_open, stub_extract_text
+):
+    import capture.service as _svc
+    from capture import screenshot
+    from datetime import datetime, timezone
+
+    class Win:
+        def __init__(self, title):
+            self.title, self.bbox = title, (0, 0, 10, 10)
+
+    titles = iter(["A", "B", "A"])
+    grabs = iter(range(3))
+
+    def fake_capture(bbox, output_path):
+        Path(output_path).write_bytes(b"frame-%d" % next(grabs))
+
+    now = datetime(2025, 10, 2, 9, 30, 43, tzinfo=timezone.utc)
+    monkeypatch.setattr(screenshot, "_now_utc", lambda: now)
+    monkeypatch.setattr(_svc, "get_active_window", lambda: Win(next(titles)))
+    monkeypatch.setattr(_svc, "capture_region", fake_capture)
+    enc = tmp_path / "encrypted"
+    svc = CaptureService(
+        output_dir=tmp_path / "plain",
+        enc_dir=enc,
+        status_file=tmp_path / "status.json",
+        catalog=tmp_path / "catalog.sqlite3",
+    )
+    for _ in range(3):
+        assert svc._capture_once()
+
+    images = sorted(p.name for p in enc.rglob("*.png.enc"))
+    assert images == [
+        "A_2025-10-02_09-30-43-1.png.enc",
+        "A_2025-10-02_09-30-43.png.enc",
+        "B_2025-10-02_09-30-43.png.enc",
+    ]
+    assert len(list(enc.rglob("*.txt.enc"))) == 3
+    assert svc._catalog.count() == 3
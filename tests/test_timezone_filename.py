@@ -31,3 +31,12 @@ def test_filename_fixed_offset_with_dst(monkeypatch):
     # +0200 plus DST hour => +0300 effective -> 15:00:00
     name = screenshot.generate_filename("Another")
     assert name.startswith("Another_2025-01-01_15-00-00")
+
+
+def test_filename_timestamp_round_trips_in_spec_zone(monkeypatch):
+    monkeypatch.setenv("HINDSIGHT_TZ_SPEC", "+0200")
+    monkeypatch.setenv("HINDSIGHT_DST_ADJUST", "1")
+    monkeypatch.setattr(screenshot, "_now_utc", fixed_utc)
+    stamp = screenshot.generate_filename("W")[len("W_"):-len(".png")]
+    assert screenshot.filename_timestamp(stamp) == fixed_utc().timestamp()
+    assert screenshot.filename_date(fixed_utc().timestamp() + 10 * 3600) == dt.date(2025, 1, 2)
@@ -0,0 +1,143 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the persistent time-sharded vector store.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from search.vector_store import shard_key, shards_between
+
+SEPT = datetime(2025, 9, 15, tzinfo=timezone.utc).timestamp()
+OCT = datetime(2025, 10, 2, tzinfo=timezone.utc).timestamp()
+NOV = datetime(2025, 11, 20, tzinfo=timezone.utc).timestamp()
+
+
+def test_shard_selection_by_date_range():
+    assert shard_key(SEPT) == "2025-09"
+    available = ["2025-09", "2025-10", "2025-11"]
+    assert shards_between(OCT, None, available) == ["2025-10", "2025-11"]
+    assert shards_between(None, OCT, available) == ["2025-09", "2025-10"]
+    assert shards_between(None, None, available) == available
+
+
+def test_store_persists_shards_and_filters_by_date(tmp_path: Path):
+    pytest.importorskip("faiss")
+    from search.vector_store import VectorStore
+
+    store = VectorStore(tmp_path / "vectors", dim=3, flush_every=2, max_segments=2)
+    store.add("sept.txt.enc", [1.0, 0.0, 0.0], ts=SEPT)
+    store.add("oct.txt.enc", [0.9, 0.1, 0.0], ts=OCT)  # triggers a flush
+    store.add("nov.txt.enc", [0.0, 1.0, 0.0], ts=NOV)  # still buffered, but searchable
+    generation = store.generation
+    assert store.add("nov.txt.enc", [0.0, 1.0, 0.0], ts=NOV) is None
+    assert store.generation == generation > 0
+    assert [c for c, _ in store.search([1.0, 0.0, 0.0], k=2)] == ["sept.txt.enc", "oct.txt.enc"]
+    assert [c for c, _ in store.search([1.0, 0.0, 0.0], k=5, start=OCT)] == ["oct.txt.enc", "nov.txt.enc"]
+    store.close()
+    assert sorted(p.name for p in (tmp_path / "vectors").iterdir() if p.is_dir()) == ["2025-09", "2025-10", "2025-11"]
+
+    reopened = VectorStore(tmp_path / "vectors")
+    assert reopened.dim == 3 and len(reopened) == 3
+    hits = reopened.search([0.0, 1.0, 0.0], k=1, end=NOV)
+    assert hits[0][0] == "nov.txt.enc" and hits[0][1] == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        reopened.add("bad", [1.0, 0.0])
+    reopened.close()
+
+
+def test_reader_leaves_writer_buffer_alone(tmp_path: Path):
+    pytest.importorskip("faiss")
+    from search.vector_store import VectorStore
+
+    writer = VectorStore(tmp_path / "vectors", dim=2, flush_every=10)
+    writer.add("a", [1.0, 0.0], ts=SEPT)
+    reader = VectorStore(tmp_path / "vectors", read_only=True)
+    assert len(reader) == 1  # the buffered row survives the reader opening the store
+    with pytest.raises(RuntimeError):
+        reader.add("b", [0.0, 1.0], ts=SEPT)
+    writer.flush()
+    assert [c for c, _ in reader.search([1.0, 0.0], k=1)] == ["a"]
+    reader.close()
+    writer.close()
+    # A crashed writer's unflushed rows are dropped by the next writer only.
+    crashed = VectorStore(tmp_path / "vectors", flush_every=10)
+    crashed.add("c", [0.0, 1.0], ts=SEPT)
+    assert len(VectorStore(tmp_path / "vectors", read_only=True)) == 2
+    assert len(VectorStore(tmp_path / "vectors")) == 1
+
+
+def test_segments_merge_when_shard_grows(tmp_path: Path):
+    pytest.importorskip("faiss")
+    from search.vector_store import VectorStore
+
+    store = VectorStore(tmp_path / "vectors", dim=2, flush_every=1, max_segments=2)
+    for i in range(3):
+        store.add(f"c{i}", [1.0, float(i)], ts=SEPT + i)
+    assert len(list((tmp_path / "vectors" / "2025-09").glob("seg-*.faiss"))) == 1
+    assert {c for c, _ in store.search([1.0, 1.0], k=3)} == {"c0", "c1", "c2"}
+    # Only the small tail is merged later; the big segment is not rewritten.
+    (big,) = (tmp_path / "vectors" / "2025-09").glob("seg-*.faiss")
+    big_mtime = big.stat().st_mtime_ns
+    for i in range(3, 5):
+        store.add(f"c{i}", [1.0, float(i)], ts=SEPT + i)
+    segments = sorted((tmp_path / "vectors" / "2025-09").glob("seg-*.faiss"))
+    assert len(segments) == 2 and segments[0] == big and big.stat().st_mtime_ns == big_mtime
+    assert {c for c, _ in store.search([1.0, 1.0], k=5)} == {f"c{i}" for i in range(5)}
+    store.close()
+
+
+def test_buffer_flushes_after_max_delay(tmp_path: Path):
+    pytest.importorskip("faiss")
+    from search.vector_store import VectorStore
+
+    store = VectorStore(tmp_path / "vectors", dim=2, flush_every=100, max_delay=0.0)
+    store.add("a", [1.0, 0.0], ts=SEPT)
+    assert store.pending == 0 and list((tmp_path / "vectors" / "2025-09").glob("seg-*.faiss"))
+    store.close()
+
+
+def test_shard_ann_index_built_and_retrained(tmp_path: Path):
+    pytest.importorskip("numpy")
+    pytest.importorskip("faiss")
+    from search.ann import ANNParams
+    from search.benchmark import synthetic_vectors
+    from search.vector_store import VectorStore
+
+    data = synthetic_vectors(900, 16, clusters=8)
+    store = VectorStore(
+        tmp_path / "vectors", dim=16, flush_every=100,
+        ann=ANNParams(kind="ivf_flat", nlist=4, nprobe=4), min_ann_size=300, background=False,
+    )
+    for i in range(300):
+        store.add(f"c{i}", data[i], ts=SEPT + i)
+    info = store.ann_info("2025-09")
+    assert info is not None and info["ntotal"] == 300
+    # Vectors added after the build are still found (exact search on newer segments).
+    store.add("late", data[899], ts=SEPT + 900)
+    assert store.search(data[899], k=1)[0][0] == "late"
+    assert store.search(data[5], k=1)[0][0] == "c5"
+    for i in range(300, 560):
+        store.add(f"c{i}", data[i], ts=SEPT + i)
+    # Grew past 1.5x the indexed size: retrained over everything flushed so far.
+    assert store.ann_info("2025-09")["ntotal"] >= 450
+    assert store.stats()["ann_shards"] == 1
+    store.close()
+
+
+def test_benchmark_reports_recall_latency_and_size():
+    pytest.importorskip("faiss")
+    from search.ann import ANNParams
+    from search.benchmark import run_benchmark, split_queries, synthetic_vectors
+
+    corpus, queries = split_queries(synthetic_vectors(2000, 32, clusters=16), 50)
+    results = {r.kind: r for r in run_benchmark(corpus, queries, kinds=("flat", "ivf_flat", "hnsw"), k=5,
+                                                base=ANNParams(nprobe=8))}
+    assert results["flat"].recall_at_k == 1.0
+    assert results["flat"].bytes_per_vector >= 32 * 4
+    assert 0.5 < results["ivf_flat"].recall_at_k <= 1.0
+    assert results["hnsw"].p99_ms >= results["hnsw"].p50_ms > 0
@@ -0,0 +1,153 @@
+"""SPDX-License-Identifier: GPL-3.0-only
+
+Tests for the in-process X11 active window tracker (fake display, no X server).
+"""
+
+from __future__ import annotations
+
+import subprocess
+from types import SimpleNamespace
+
+import capture.active_window as aw
+from capture.window_tracker import X11WindowTracker, _CONFIGURE_NOTIFY, _DESTROY_NOTIFY, _PROPERTY_NOTIFY
+
+
+class FakeWindow:
+    def __init__(self, wid, title=None, geometry=(0, 0, 100, 50)):
+        self.id = wid
+        self.props = {}
+        self.title = title
+        self.geometry = geometry
+        self.masks = []
+
+    def change_attributes(self, event_mask=0, onerror=None):
+        self.masks.append(event_mask)
+
+    def get_full_property(self, atom, kind):
+        if atom == self.display.atoms["_NET_WM_NAME"] and self.title is not None:
+            return SimpleNamespace(value=self.title.encode("utf-8"))
+        value = self.props.get(atom)
+        return SimpleNamespace(value=value) if value is not None else None
+
+    def get_geometry(self):
+        return SimpleNamespace(width=self.geometry[2], height=self.geometry[3])
+
+    def translate_coords(self, window, x, y):
+        return SimpleNamespace(x=window.geometry[0] + x, y=window.geometry[1] + y)
+
+
+class FakeDisplay:
+    def __init__(self):
+        self.atoms = {}
+        self.windows = {}
+        self.root = self.add(FakeWindow(1))
+        self.closed = False
+
+    def add(self, window):
+        window.display = self
+        self.windows[window.id] = window
+        return window
+
+    def activate(self, wid):
+        self.root.props[self.atoms["_NET_ACTIVE_WINDOW"]] = [wid]
+
+    def screen(self):
+        return SimpleNamespace(root=self.root)
+
+    def intern_atom(self, name):
+        return self.atoms.setdefault(name, 100 + len(self.atoms))
+
+    def create_resource_object(self, kind, wid):
+        return self.windows[wid]
+
+    def set_error_handler(self, handler):
+        self.handler = handler
+
+    def close(self):
+        self.closed = True
+
+
+def _tracker():
+    display = FakeDisplay()
+    display.intern_atom("_NET_ACTIVE_WINDOW")
+    display.add(FakeWindow(7, "Inbox - Mail", (10, 20, 800, 600)))
+    display.activate(7)
+    return display, X11WindowTracker(display=display)
+
+
+def test_tracker_reads_active_window_and_follows_events():
+    display, tracker = _tracker()
+    assert tracker.current() == aw.WindowInfo(title="Inbox - Mail", bbox=(10, 20, 800, 600))
+    editor = display.windows[7]
+    assert editor.masks, "active window events were not selected"
+
+    editor.title = "Drafts - Mail"
+    tracker._handle(SimpleNamespace(type=_PROPERTY_NOTIFY, window=editor, atom=display.atoms["_NET_WM_NAME"]))
+    editor.geometry = (0, 0, 640, 480)
+    tracker._handle(SimpleNamespace(type=_CONFIGURE_NOTIFY, window=editor))
+    assert tracker.current() == aw.WindowInfo(title="Drafts - Mail", bbox=(0, 0, 640, 480))
+
+    display.add(FakeWindow(9, None))  # no _NET_WM_NAME: falls back to "window"
+    display.activate(9)
+    tracker._handle(
+        SimpleNamespace(type=_PROPERTY_NOTIFY, window=display.root, atom=display.atoms["_NET_ACTIVE_WINDOW"])
+    )
+    assert tracker.current().title == "window"
+
+    display.activate(0)
+    tracker._handle(SimpleNamespace(type=_DESTROY_NOTIFY, window=display.windows[9]))
+    assert tracker.current() is None
+    assert tracker.stats()["events"] == 4 and not tracker.failed
+
+
+def test_get_active_window_uses_tracker_without_subprocess(monkeypatch):
+    _, tracker = _tracker()
+    monkeypatch.setattr(aw.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(aw, "_window_tracker", lambda: tracker)
+    monkeypatch.setattr(subprocess, "check_output", lambda *a, **k: (_ for _ in ()).throw(AssertionError("forked")))
+    assert aw.get_active_window().title == "Inbox - Mail"
+
+
+def test_failed_tracker_falls_back_to_xdotool(monkeypatch):
+    _, tracker = _tracker()
+    tracker._failed = True
+    monkeypatch.setenv("DISPLAY", ":0")
+    monkeypatch.setattr(aw, "_WINDOW_TRACKER", "x11")
+    monkeypatch.setattr(aw, "_TRACKER", tracker)
+    monkeypatch.setattr(aw, "_TRACKER_NEXT_TRY", 0.0)
+    monkeypatch.setattr(aw.platform, "system", lambda: "Linux")
+    fallback = aw.WindowInfo(title="from xdotool", bbox=(0, 0, 1, 1))
+    monkeypatch.setattr(aw, "_linux_active_window", lambda: fallback)
+    assert aw.get_active_window() is fallback
+    assert aw._TRACKER is None and aw.get_window_tracker() == "xdotool"
+    # The failed connection was closed and reconnecting waits for the retry interval.
+    assert tracker._display.closed and aw._TRACKER_NEXT_TRY > 0
+
+
+def test_connection_loss_marks_tracker_failed():
+    display, tracker = _tracker()
+    display.fileno = lambda: -1
+    display.pending_events = lambda: 1
+    display.next_event = lambda: (_ for _ in ()).throw(ConnectionResetError("X server went away"))
+    tracker.start()
+    tracker._thread.join(2.0)
+    assert tracker.failed and tracker.stats()["failed"]
+    tracker.stop()
+    assert display.closed
+
+
+def test_listeners_hear_focus_and_title_changes():
+    display, tracker = _tracker()
+    heard = []
+    tracker.add_listener(lambda kind, info: heard.append((kind, info.title if info else None)))
+    editor = display.windows[7]
+    name = display.atoms["_NET_WM_NAME"]
+    tracker._handle(SimpleNamespace(type=_PROPERTY_NOTIFY, window=editor, atom=name))  # title unchanged
+    editor.title = "Sent - Mail"
+    tracker._handle(SimpleNamespace(type=_PROPERTY_NOTIFY, window=editor, atom=name))
+    display.add(FakeWindow(8, "Terminal"))
+    display.activate(8)
+    tracker._handle(
+        SimpleNamespace(type=_PROPERTY_NOTIFY, window=display.root, atom=display.atoms["_NET_ACTIVE_WINDOW"])
+    )
+    assert heard == [("title", "Sent - Mail"), ("focus", "Terminal")]